@@ -9,6 +9,7 @@ import random
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tourism_api.settings')
 django.setup()
 
+from django.core.management import call_command
 from django.utils import timezone
 from analytics.models import Place, SocialPost
 
@@ -124,6 +125,10 @@ for place in alor_setar_places:
     print(f"✓ Added {num_posts} posts for: {place.name} ({place.category})")
 
 print("=" * 60)
+
+# The posts were written directly: rebuild the rollups the analytics endpoints read
+call_command('rebuild_rollups', '--all')
+
 print(f"\n✅ Complete!")
 print(f"   Total social posts added: {total_posts}")
 print(f"\nNow all Alor Setar destinations will appear in the Popular Places list!")
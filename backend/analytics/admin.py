@@ -1,7 +1,12 @@
 from django.contrib import admin
 from django import forms
 from django.utils.html import format_html
-from .models import Place, SocialPost, PostRaw, PostClean, SentimentTopic
+from .models import (
+    Place, SocialPost, PostRaw, PostClean, SentimentTopic, ScrapeCheckpoint,
+    EntityDailyRollup, PipelineRun, PipelineStageTiming, BackfillCheckpoint, TermSketch,
+    HiddenGemScore, AuthorSketch, PlaceVisitTier, VisitTierSummary, PlacePeriodRollup,
+    SlowQuery,
+)
 
 
 # ---------- Custom Form for Place with better amenities handling ----------
@@ -117,7 +122,7 @@ class SocialPostAdmin(admin.ModelAdmin):
         "id", "platform", "post_id", "place", "created_at",
         "likes", "comments", "shares", "engagement", "is_tourism",
     )
-    list_filter = ("platform", "is_tourism", "created_at", "place")
+    list_filter = ("platform", "is_tourism", "is_duplicate", "created_at", "place")
     search_fields = ("post_id", "content", "url", "platform", "place__name")
     autocomplete_fields = ("place",)
     list_select_related = ("place",)
@@ -166,7 +171,95 @@ class PostCleanAdmin(admin.ModelAdmin):
 
 @admin.register(SentimentTopic)
 class SentimentTopicAdmin(admin.ModelAdmin):
-    list_display = ('topic', 'sentiment', 'count', 'category', 'date')
-    list_filter = ('sentiment', 'category', 'date')
+    list_display = ('topic', 'sentiment', 'count', 'category', 'city', 'date')
+    list_filter = ('sentiment', 'category', 'city', 'date')
     search_fields = ('topic',)
     date_hierarchy = 'date'
+
+
+@admin.register(ScrapeCheckpoint)
+class ScrapeCheckpointAdmin(admin.ModelAdmin):
+    list_display = ('platform', 'keyword', 'since_id', 'last_timestamp', 'paging_token', 'updated_at')
+    list_filter = ('platform',)
+    search_fields = ('keyword',)
+
+
+@admin.register(EntityDailyRollup)
+class EntityDailyRollupAdmin(admin.ModelAdmin):
+    list_display = ('entity_type', 'entity_id', 'date', 'platform', 'posts', 'likes', 'positive', 'negative')
+    list_filter = ('entity_type', 'platform')
+    date_hierarchy = 'date'
+
+
+@admin.register(PlacePeriodRollup)
+class PlacePeriodRollupAdmin(admin.ModelAdmin):
+    list_display = ('place', 'period', 'period_start', 'platform', 'posts', 'likes', 'positive', 'negative')
+    list_filter = ('period', 'platform')
+    list_select_related = ('place',)
+    date_hierarchy = 'period_start'
+
+
+class PipelineStageTimingInline(admin.TabularInline):
+    model = PipelineStageTiming
+    extra = 0
+    fields = ('stage', 'chunk', 'started_at', 'duration_ms', 'items', 'succeeded')
+    readonly_fields = fields
+
+
+@admin.register(PipelineRun)
+class PipelineRunAdmin(admin.ModelAdmin):
+    list_display = ('id', 'status', 'started_at', 'finished_at', 'stats')
+    list_filter = ('status',)
+    inlines = [PipelineStageTimingInline]
+
+
+@admin.register(BackfillCheckpoint)
+class BackfillCheckpointAdmin(admin.ModelAdmin):
+    list_display = ('name', 'updated_at')
+    readonly_fields = ('updated_at',)
+
+
+@admin.register(TermSketch)
+class TermSketchAdmin(admin.ModelAdmin):
+    list_display = ('date', 'city', 'total', 'updated_at')
+    list_filter = ('city',)
+    date_hierarchy = 'date'
+    readonly_fields = ('updated_at',)
+
+
+@admin.register(HiddenGemScore)
+class HiddenGemScoreAdmin(admin.ModelAdmin):
+    list_display = ('rank', 'place', 'score', 'city', 'category', 'posts', 'engagement', 'computed_at')
+    list_filter = ('city', 'category')
+    list_select_related = ('place',)
+
+
+@admin.register(PlaceVisitTier)
+class PlaceVisitTierAdmin(admin.ModelAdmin):
+    list_display = ('place', 'tier', 'city', 'category', 'posts', 'engagement', 'avg_sentiment', 'computed_at')
+    list_filter = ('tier', 'city', 'category')
+    list_select_related = ('place',)
+
+
+@admin.register(VisitTierSummary)
+class VisitTierSummaryAdmin(admin.ModelAdmin):
+    list_display = ('tier', 'city', 'category', 'places', 'posts', 'engagement', 'avg_sentiment', 'computed_at')
+    list_filter = ('tier',)
+
+
+@admin.register(AuthorSketch)
+class AuthorSketchAdmin(admin.ModelAdmin):
+    list_display = ('entity_type', 'entity_id', 'date', 'city', 'updated_at')
+    list_filter = ('entity_type', 'city')
+    date_hierarchy = 'date'
+    exclude = ('registers',)
+    readonly_fields = ('updated_at',)
+
+
+@admin.register(SlowQuery)
+class SlowQueryAdmin(admin.ModelAdmin):
+    list_display = ('created_at', 'duration_ms', 'fingerprint', 'view', 'location')
+    list_filter = ('database',)
+    search_fields = ('fingerprint', 'view', 'sql')
+    date_hierarchy = 'created_at'
+    readonly_fields = ('created_at',)
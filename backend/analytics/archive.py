@@ -0,0 +1,137 @@
+"""
+Cold Archival for SocialPost
+============================
+Moves posts older than the retention horizon out of the database into
+gzip JSONL files, keeping their daily rollups (EntityDailyRollup).
+
+Layout (settings.SOCIAL_ARCHIVE_DIR):
+    2024-01/socialpost-20250301T020000-0001.jsonl.gz
+    2024-02/socialpost-20250301T020000-0002.jsonl.gz
+
+Order of operations, so totals are never lost:
+1. Rebuild rollups for every archived day from the posts still in the DB
+2. Move the archive watermark: rollups before it are final from now on
+3. Per chunk: write the archive file (temp file + rename), then delete the rows
+
+Posts that arrive later with a created_at before the watermark are archived
+on the next run but are not added to the (final) rollups.
+
+Only rollup-backed views keep archived days; views that still aggregate
+SocialPost lose them, which is why the job is not in the beat schedule.
+"""
+
+import gzip
+import json
+import os
+from collections import defaultdict
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .checkpoints import ARCHIVE_CHECKPOINT, archive_watermark, load_backfill_state, save_backfill_state
+from .models import SocialPost
+from .rollups import rebuild_rollups
+
+ARCHIVE_FIELDS = [field.attname for field in SocialPost._meta.concrete_fields]
+KEY_BATCH = 1000
+
+
+def archive_root(root=None):
+    return Path(root or settings.SOCIAL_ARCHIVE_DIR)
+
+
+def _rollup_keys_before(cutoff):
+    """Distinct (entity_type, entity_id, day) keys of posts created before cutoff."""
+    rows = (
+        SocialPost.objects
+        .in_window(None, cutoff - timedelta(days=1))
+        .annotate(day=TruncDate('created_at'))
+        .values_list('place_id', 'vendor_id', 'stay_id', 'day')
+        .distinct()
+    )
+    for place_id, vendor_id, stay_id, day in rows.iterator():
+        for entity_type, entity_id in (('place', place_id), ('vendor', vendor_id), ('stay', stay_id)):
+            if entity_id:
+                yield (entity_type, entity_id, day)
+
+
+def _write_file(path, rows):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+        for row in rows:
+            f.write(json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n')
+    os.replace(tmp_path, path)
+
+
+def archive_posts(cutoff, root=None, chunk_size=5000, dry_run=False):
+    """
+    Archive every SocialPost created before the day `cutoff`.
+
+    Returns:
+        {'posts': archived count, 'files': [paths], 'watermark': date}
+    """
+    candidates = SocialPost.objects.in_window(None, cutoff - timedelta(days=1))
+    if dry_run:
+        return {'posts': candidates.count(), 'files': [], 'watermark': archive_watermark()}
+
+    # 1. Make the rollups for archived days complete while the posts are still here
+    batch = []
+    for key in _rollup_keys_before(cutoff):
+        batch.append(key)
+        if len(batch) >= KEY_BATCH:
+            rebuild_rollups(batch)
+            batch = []
+    rebuild_rollups(batch)
+
+    # 2. From now on, days before the watermark are never rebuilt
+    watermark = archive_watermark()
+    if not watermark or cutoff > watermark:
+        state = load_backfill_state(ARCHIVE_CHECKPOINT)
+        save_backfill_state(ARCHIVE_CHECKPOINT, {**state, 'archived_before': cutoff.isoformat()})
+        watermark = cutoff
+
+    # 3. Move posts out chunk by chunk
+    stamp = timezone.localtime().strftime('%Y%m%dT%H%M%S')
+    archived, files, sequence, last_pk = 0, [], 0, 0
+    while True:
+        rows = list(
+            candidates.filter(pk__gt=last_pk).order_by('pk').values(*ARCHIVE_FIELDS)[:chunk_size]
+        )
+        if not rows:
+            break
+        last_pk = rows[-1]['id']
+
+        by_month = defaultdict(list)
+        for row in rows:
+            by_month[timezone.localtime(row['created_at']).strftime('%Y-%m')].append(row)
+        for month, month_rows in sorted(by_month.items()):
+            sequence += 1
+            path = archive_root(root) / month / f"socialpost-{stamp}-{sequence:04d}.jsonl.gz"
+            _write_file(path, month_rows)
+            files.append(path)
+
+        with transaction.atomic():
+            SocialPost.objects.filter(pk__in=[row['id'] for row in rows]).delete()
+        archived += len(rows)
+
+    state = load_backfill_state(ARCHIVE_CHECKPOINT)
+    save_backfill_state(ARCHIVE_CHECKPOINT, {
+        **state,
+        'archived_posts': state.get('archived_posts', 0) + archived,
+        'last_run': timezone.now().isoformat(),
+    })
+    return {'posts': archived, 'files': files, 'watermark': watermark}
+
+
+def read_archive(path):
+    """Yield archived SocialPost rows (dicts of column values) from one file."""
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
@@ -0,0 +1,183 @@
+"""
+Endpoint Benchmarks
+===================
+Drives every GET endpoint in analytics/urls.py and api/urls.py through the
+Django test client and measures latency percentiles, query count and peak
+Python memory. Used by the benchmark_endpoints command (over the synthetic
+datasets in analytics/synthetic.py) and by tests/test_query_budgets.py
+(endpoint discovery).
+
+Endpoints are named after their view ("analytics.views_new.TrendingPlacesView",
+or "vendors.views.VendorViewSet.retrieve" for viewset actions) so results
+line up between runs.
+
+Usage:
+    endpoints = get_endpoints()
+    results = run(Client(), endpoints, route_ids(), iterations=20)
+    # → {'analytics.views_new.TrendingPlacesView': {'p50_ms': 4.1, ..., 'queries': 3}, ...}
+"""
+
+import re
+import time
+import tracemalloc
+from importlib import import_module
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver
+
+URL_MODULES = ('analytics.urls', 'api.urls')
+
+FORMAT_SUFFIX = re.compile(r'\(\?P<format>')
+GROUP = re.compile(r'\(\?P<(\w+)>[^)]*\)')
+
+
+def endpoint_name(callback):
+    view = getattr(callback, 'cls', None) or getattr(callback, 'view_class', None)
+    if view is None:
+        return f'{callback.__module__}.{callback.__name__}'
+    name = f'{view.__module__}.{view.__name__}'
+    actions = getattr(callback, 'actions', None)
+    if actions:
+        name = f"{name}.{actions['get']}"
+    return name
+
+
+def iter_patterns(patterns, prefix=''):
+    for pattern in patterns:
+        regex = prefix + pattern.pattern.regex.pattern.lstrip('^').replace(r'\Z', '').rstrip('$')
+        if isinstance(pattern, URLResolver):
+            yield from iter_patterns(pattern.url_patterns, regex)
+        elif isinstance(pattern, URLPattern):
+            yield regex, pattern.callback
+
+
+def get_endpoints(modules=URL_MODULES):
+    """{endpoint name: path regex} for every GET route, one path per view."""
+    endpoints = {}
+    for module in modules:
+        for regex, callback in iter_patterns(import_module(module).urlpatterns):
+            actions = getattr(callback, 'actions', None)
+            if FORMAT_SUFFIX.search(regex) or (actions is not None and 'get' not in actions):
+                continue
+            endpoints.setdefault(endpoint_name(callback), regex)
+    return endpoints
+
+
+def route_ids():
+    """First pk of every routed resource, to fill in detail URLs."""
+    from analytics.models import Place, SocialPost
+    from events.models import Event
+    from stays.models import Stay
+    from vendors.models import MenuItem, OpeningHours, Promotion, Reservation, Review, Vendor
+
+    def first(model):
+        return model.objects.order_by('pk').values_list('pk', flat=True).first() or 1
+
+    ids = {
+        'places': first(Place),
+        'posts': first(SocialPost),
+        'vendors': first(Vendor),
+        'stays': first(Stay),
+        'events': first(Event),
+        'reviews': first(Review),
+        'menu-items': first(MenuItem),
+        'opening-hours': first(OpeningHours),
+        'promotions': first(Promotion),
+        'reservations': first(Reservation),
+    }
+    ids.update({
+        'pois': ids['places'], 'posts-raw': ids['posts'], 'posts-clean': ids['posts'],
+        'place_id': ids['places'],
+    })
+    return ids
+
+
+def concrete_path(regex, ids):
+    resource = regex.split('/', 1)[0]
+
+    def fill(match):
+        name = match.group(1)
+        return str(ids[resource] if name == 'pk' else ids[name])
+
+    path = GROUP.sub(fill, regex).replace('\\', '').replace('/?', '/')
+    return f'/api/{path}'
+
+
+def percentile(values, q):
+    """Nearest-rank percentile (q in 0..100) of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, -(-q * len(ordered) // 100))
+    return ordered[int(rank) - 1]
+
+
+def measure(client, path, iterations=20, warm_cache=False):
+    """
+    Time `iterations` GETs of path (after one warm-up request), then repeat
+    it once under tracemalloc for peak memory.
+
+    The cache is cleared before every request unless warm_cache is set, so
+    by default the numbers are for the database path.
+    """
+    cache.clear()
+    response = client.get(path)
+
+    timings, query_counts = [], []
+    for _ in range(iterations):
+        if not warm_cache:
+            cache.clear()
+        # One context per request: request_started resets the query log
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = client.get(path)
+            timings.append((time.perf_counter() - started) * 1000)
+        query_counts.append(len(queries))
+
+    if not warm_cache:
+        cache.clear()
+    tracemalloc.start()
+    try:
+        client.get(path)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'path': path,
+        'status': response.status_code,
+        'p50_ms': round(percentile(timings, 50), 2),
+        'p95_ms': round(percentile(timings, 95), 2),
+        'p99_ms': round(percentile(timings, 99), 2),
+        'mean_ms': round(sum(timings) / len(timings), 2),
+        'queries': max(query_counts),
+        'peak_memory_kb': round(peak / 1024, 1),
+    }
+
+
+def run(client, endpoints, ids, iterations=20, warm_cache=False, on_result=None):
+    """measure() every endpoint; on_result(name, result) is called as each finishes."""
+    results = {}
+    for name, regex in sorted(endpoints.items()):
+        results[name] = measure(client, concrete_path(regex, ids), iterations, warm_cache)
+        if on_result:
+            on_result(name, results[name])
+    return results
+
+
+def compare(current, baseline):
+    """
+    Per-endpoint p95 and query-count changes between two results dicts
+    (endpoint name → result), for endpoints present in both.
+    """
+    changes = {}
+    for name, result in current.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        changes[name] = {
+            'p95_ms': round(result['p95_ms'] - before['p95_ms'], 2),
+            'p95_ratio': round(result['p95_ms'] / before['p95_ms'], 2) if before['p95_ms'] else None,
+            'queries': result['queries'] - before['queries'],
+        }
+    return changes
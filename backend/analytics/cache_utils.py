@@ -161,6 +161,7 @@ def invalidate_analytics_cache():
         'top_destinations:*',   # Top destinations rankings
         'social:*',             # Social media metrics
         'sentiment:*',          # Sentiment analysis
+        'sentiment_summary:*',  # Sentiment summary endpoint
         'events:*',             # Event analytics
         'vendors:*',            # Restaurant analytics
         'stays:*',              # Accommodation analytics
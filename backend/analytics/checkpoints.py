@@ -0,0 +1,149 @@
+"""
+Scrape Checkpoints
+==================
+Load and commit the per platform × keyword cursors used for incremental
+scraping (see ScrapeCheckpoint).
+
+Cursors are plain dicts so they can travel through the scraper (and Celery)
+unchanged:
+    {'since_id': str, 'last_timestamp': datetime|None, 'paging_token': str,
+     'head_id': str, 'head_timestamp': datetime|None}
+
+Commit checkpoints only AFTER the posts they cover have been persisted;
+otherwise a failed write would make the next run skip those posts forever.
+"""
+
+from datetime import date
+
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+CURSOR_FIELDS = ["since_id", "last_timestamp", "paging_token", "head_id", "head_timestamp"]
+
+
+def load_checkpoints(platforms=None):
+    """Return {(platform, keyword): cursor} for every stored checkpoint."""
+    from .models import ScrapeCheckpoint  # scraper imports this module before Django is set up
+
+    qs = ScrapeCheckpoint.objects.all()
+    if platforms:
+        qs = qs.filter(platform__in=platforms)
+    return {
+        (row["platform"], row["keyword"]): {field: row[field] for field in CURSOR_FIELDS}
+        for row in qs.values("platform", "keyword", *CURSOR_FIELDS)
+    }
+
+
+def commit_checkpoints(updates):
+    """
+    Upsert cursors in one statement.
+
+    Args:
+        updates: {(platform, keyword): cursor} as returned by SocialMediaScraper.collect()
+    """
+    if not updates:
+        return 0
+
+    from .models import ScrapeCheckpoint
+
+    now = timezone.now()
+    rows = [
+        ScrapeCheckpoint(
+            platform=platform,
+            keyword=keyword,
+            since_id=cursor.get("since_id") or "",
+            last_timestamp=cursor.get("last_timestamp"),
+            paging_token=cursor.get("paging_token") or "",
+            head_id=cursor.get("head_id") or "",
+            head_timestamp=cursor.get("head_timestamp"),
+            updated_at=now,
+        )
+        for (platform, keyword), cursor in updates.items()
+    ]
+    ScrapeCheckpoint.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=["platform", "keyword"],
+        update_fields=CURSOR_FIELDS + ["updated_at"],
+    )
+    return len(rows)
+
+
+def advance_cursor(cursor, newest_id=None, newest_timestamp=None, next_token=None):
+    """
+    Compute a platform × keyword cursor after one walk.
+
+    Args:
+        cursor: the cursor the walk started from ({} for a first run)
+        newest_id / newest_timestamp: newest post seen by this run
+        next_token: paging token if the walk stopped before reaching the checkpoint
+    """
+    # When resuming an unfinished walk, its head (from an earlier run) is the newest post
+    head_id = cursor.get("head_id") or newest_id or ""
+    head_timestamp = cursor.get("head_timestamp") or newest_timestamp
+
+    if next_token:
+        # Capped: keep the old high-water mark and remember where to resume
+        return {
+            "since_id": cursor.get("since_id") or "",
+            "last_timestamp": cursor.get("last_timestamp"),
+            "paging_token": next_token,
+            "head_id": head_id,
+            "head_timestamp": head_timestamp,
+        }
+
+    return {
+        "since_id": head_id or cursor.get("since_id") or "",
+        "last_timestamp": head_timestamp or cursor.get("last_timestamp"),
+        "paging_token": "",
+        "head_id": "",
+        "head_timestamp": None,
+    }
+
+
+def dump_updates(updates):
+    """Cursor updates as a JSON-friendly list (for Celery and PipelineRun)."""
+    return [[platform, keyword, cursor] for (platform, keyword), cursor in updates.items()]
+
+
+def load_updates(rows):
+    """Inverse of dump_updates(); timestamps come back as datetimes."""
+    updates = {}
+    for platform, keyword, cursor in rows or []:
+        cursor = dict(cursor)
+        for field in ("last_timestamp", "head_timestamp"):
+            if isinstance(cursor.get(field), str):
+                cursor[field] = parse_datetime(cursor[field])
+        updates[(platform, keyword)] = cursor
+    return updates
+
+
+def load_backfill_state(name):
+    """Saved state of a replay/backfill command ({} if it never ran)."""
+    from .models import BackfillCheckpoint
+
+    row = BackfillCheckpoint.objects.filter(name=name).values_list("state", flat=True).first()
+    return row or {}
+
+
+def save_backfill_state(name, state):
+    from .models import BackfillCheckpoint
+
+    BackfillCheckpoint.objects.update_or_create(name=name, defaults={"state": state})
+
+
+def reset_backfill_state(name):
+    from .models import BackfillCheckpoint
+
+    BackfillCheckpoint.objects.filter(name=name).delete()
+
+
+# Posts created before this date have been moved to cold archive files;
+# their rollups are final and must not be rebuilt from SocialPost.
+ARCHIVE_CHECKPOINT = "socialpost_archive"
+
+
+def archive_watermark():
+    """First day still held in SocialPost (None if nothing was archived)."""
+    value = load_backfill_state(ARCHIVE_CHECKPOINT).get("archived_before")
+    return date.fromisoformat(value) if value else None
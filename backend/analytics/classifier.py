@@ -29,16 +29,18 @@ class PostClassifier:
     Falls back to simple keyword matching if no API key is available.
     """
     
-    def __init__(self, places_list=None):
+    def __init__(self, places_list=None, use_ai=True):
         """
         Args:
             places_list: List of known tourist place names (from your database)
+            use_ai: Set False to skip connecting to Gemini (keyword matching only,
+                e.g. for bulk replays)
         """
         self.gemini_client = None
         self.places_list = places_list or []
         
         # ✅ Only initialize Gemini if we have a key
-        if GEMINI_API_KEY:
+        if GEMINI_API_KEY and use_ai:
             try:
                 import google.generativeai as genai
                 genai.configure(api_key=GEMINI_API_KEY)
@@ -89,12 +91,14 @@ class PostClassifier:
         else:
             print("⚠️ No Gemini API key found. Using simple keyword matching.")
     
-    def classify_post(self, post_content: str):
+    def classify_post(self, post_content: str, use_ai=True):
         """
         Analyze a social media post to determine if it's about tourism.
         
         Args:
             post_content: The text content of the post
+            use_ai: Set False to skip Gemini and use keyword matching
+                (the pipeline does this once its time budget is spent)
             
         Returns:
             Dictionary with classification results:
@@ -105,6 +109,9 @@ class PostClassifier:
                 "confidence": float (0-1)
             }
         """
+        if not use_ai:
+            return self._classify_with_keywords(post_content)
+        
         if not self.gemini_client:
             print("⚠️ Gemini not available. Using keyword-based classification.")
             return self._classify_with_keywords(post_content)
@@ -0,0 +1,338 @@
+"""
+Near-Duplicate Detection (SimHash + banded LSH)
+===============================================
+Cross-posted captions (Instagram → Facebook) and reshares inflate mention
+counts and cost a classifier call each. Every post gets a 64-bit SimHash
+of its normalized text (words + word bigrams) at ingestion; posts within
+MAX_DISTANCE bits of an earlier post are near-duplicates. On short posts a
+reshare or an added hashtag moves 0-5 bits, unrelated posts 13+.
+
+Lookup is sublinear: the fingerprint is split into BANDS 16-bit bands,
+stored in indexed columns, and only posts agreeing exactly on one band are
+compared bit by bit (one indexed OR query per chunk). Pairs within 3 bits
+always share a band (pigeonhole); pairs 4-6 bits apart share one most of
+the time, so a few looser duplicates of older posts are missed.
+
+The canonical post of a group is the earliest one (created_at, then lowest
+pk; stored posts win ties against a new batch). A post that arrives late
+but is older than a stored canonical match takes its place: the stored post
+is demoted to a duplicate of the new one (persist_posts()).
+
+Duplicates inherit the canonical post's classification and entity link
+and are flagged (is_duplicate), so analytics count them once.
+SocialPost.duplicate_of has no database constraint: a partitioned table
+(analytics/partitions.py) can't be referenced by id alone.
+
+Posts stored before fingerprinting existed are fingerprinted by
+backfill_fingerprints() (the fingerprint_posts command).
+
+Usage:
+    posts = mark_duplicates(posts)     # before classification
+    fingerprint('Sunset at Pantai Cenang 🌅 #langkawi')
+    backfill_fingerprints()            # existing rows, oldest first
+"""
+
+import hashlib
+import re
+from collections import Counter
+from datetime import datetime, timezone as dt_timezone
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+BITS = 64
+BANDS = 4
+BAND_BITS = BITS // BANDS
+MAX_DISTANCE = 6
+
+# Very short posts ("nice!", "😍😍") collide too easily to be fingerprinted
+MIN_TOKENS = 4
+
+URL_RE = re.compile(r'https?://\S+|www\.\S+')
+MENTION_RE = re.compile(r'(^|\s)rt\s+@\w+:?|@\w+')
+TOKEN_RE = re.compile(r'\w+')
+
+CLASSIFICATION_FIELDS = ('is_tourism', 'sentiment', 'sentiment_score', 'confidence')
+
+
+def tokens(text):
+    """Lowercased words with URLs, mentions and the 'RT @user:' prefix removed."""
+    text = (text or '').lower()
+    text = URL_RE.sub(' ', text)
+    text = MENTION_RE.sub(' ', text)
+    return TOKEN_RE.findall(text)
+
+
+def _feature_hash(feature):
+    # blake2b rather than hash(): fingerprints must match across processes
+    return int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def fingerprint(text):
+    """
+    64-bit SimHash over words and word bigrams (unsigned int), or None for
+    posts too short to compare.
+    """
+    words = tokens(text)
+    if len(words) < MIN_TOKENS:
+        return None
+
+    features = Counter(words)
+    features.update(f'{a} {b}' for a, b in zip(words, words[1:]))
+
+    weights = [0] * BITS
+    for feature, weight in features.items():
+        value = _feature_hash(feature)
+        for bit in range(BITS):
+            weights[bit] += weight if value >> bit & 1 else -weight
+    return sum(1 << bit for bit in range(BITS) if weights[bit] > 0)
+
+
+def bands(value):
+    """The BANDS 16-bit slices of a fingerprint, low bits first."""
+    mask = (1 << BAND_BITS) - 1
+    return [(value >> (band * BAND_BITS)) & mask for band in range(BANDS)]
+
+
+def to_signed(value):
+    """Unsigned 64-bit fingerprint → signed value for a BigIntegerField."""
+    return value - (1 << BITS) if value >= 1 << (BITS - 1) else value
+
+
+def to_unsigned(value):
+    return value + (1 << BITS) if value < 0 else value
+
+
+def distance(a, b):
+    return bin(a ^ b).count('1')
+
+
+def fingerprint_fields(value):
+    """SocialPost field values for a fingerprint (all None when unfingerprinted)."""
+    if value is None:
+        return {'simhash': None, **{f'simhash_b{band}': None for band in range(BANDS)}}
+    return {
+        'simhash': to_signed(value),
+        **{f'simhash_b{band}': part for band, part in enumerate(bands(value))},
+    }
+
+
+def _canonical_candidates(values):
+    """Canonical posts sharing at least one band with any of the fingerprints."""
+    from .models import SocialPost
+
+    query = Q()
+    for band in range(BANDS):
+        parts = {bands(value)[band] for value in values}
+        query |= Q(**{f'simhash_b{band}__in': parts})
+
+    return (
+        SocialPost.objects
+        .canonical()
+        .filter(query)
+        .order_by('created_at', 'pk')
+        .values('pk', 'platform', 'post_id', 'simhash', 'created_at', *CLASSIFICATION_FIELDS,
+                'place__name', 'vendor__name', 'stay__name')
+    )
+
+
+def _inherited_classification(row):
+    entity_name = row['place__name'] or row['vendor__name'] or row['stay__name']
+    return {
+        'is_tourism': row['is_tourism'],
+        'sentiment': row['sentiment'],
+        'sentiment_score': row['sentiment_score'],
+        'confidence': row['confidence'],
+        'place_name': entity_name,
+        'inherited': True,
+    }
+
+
+# Batch posts without a parseable timestamp sort after everything stored
+_UNDATED = datetime.max.replace(tzinfo=dt_timezone.utc)
+
+
+def _posted_at(post):
+    value = post.get('created_at')
+    if isinstance(value, str):
+        value = parse_datetime(value)
+    return value or _UNDATED
+
+
+def mark_duplicates(posts):
+    """
+    Fingerprint post dicts and flag near-duplicates, in place.
+
+    Sets post['simhash'] on every post. A near-duplicate also gets
+    post['duplicate_of'] = [platform, post_id] of its canonical post (the
+    earliest matching post, stored or in this batch) and, when the canonical
+    post is already stored, its classification (post['classification']).
+    Duplicates of an earlier post in the same batch inherit its
+    classification in persist_posts(). A post older than stored canonical
+    matches gets post['demotes'] = [[platform, post_id], ...]: those stored
+    posts become its duplicates once it is persisted.
+
+    Returns:
+        The same list
+    """
+    for post in posts:
+        post['simhash'] = fingerprint(post.get('content'))
+
+    values = {post['simhash'] for post in posts if post['simhash'] is not None}
+    if not values:
+        return posts
+
+    # (sort key, simhash, key, stored row or None); the earliest match is canonical
+    canonicals = [
+        ((row['created_at'], 0, row['pk']), to_unsigned(row['simhash']), (row['platform'], row['post_id']), row)
+        for row in _canonical_candidates(values)
+    ]
+    batch = sorted(
+        ((_posted_at(post), 1, index), post)
+        for index, post in enumerate(posts) if post['simhash'] is not None
+    )
+    for order, post in batch:
+        value = post['simhash']
+        key = (post['platform'], post['post_id'])
+        matches = [
+            candidate for candidate in canonicals
+            if candidate[2] != key and distance(candidate[1], value) <= MAX_DISTANCE
+        ]
+        older = [candidate for candidate in matches if candidate[0] < order]
+        if older:
+            _, _, canonical_key, row = min(older, key=lambda candidate: candidate[0])
+            post['duplicate_of'] = list(canonical_key)
+            if row is not None:
+                post['classification'] = _inherited_classification(row)
+            continue
+
+        newer_stored = [candidate for candidate in matches if candidate[3] is not None]
+        if newer_stored:
+            post['demotes'] = [list(candidate[2]) for candidate in newer_stored]
+            canonicals = [candidate for candidate in canonicals if candidate not in newer_stored]
+        canonicals.append((order, value, key, None))
+    return posts
+
+
+def stored_pks(keys):
+    """{(platform, post_id): pk} for the stored posts among `keys`."""
+    from .models import SocialPost
+
+    keys = set(keys)
+    return {
+        (platform, post_id): pk
+        for pk, platform, post_id in SocialPost.objects
+        .filter(post_id__in={post_id for _, post_id in keys})
+        .values_list('id', 'platform', 'post_id')
+        if (platform, post_id) in keys
+    }
+
+
+def demote_to_duplicates(demotions):
+    """
+    Make stored posts (and their own duplicates) duplicates of an older
+    canonical post, then copy its classification onto them.
+
+    Args:
+        demotions: {demoted pk: canonical pk}
+
+    Returns:
+        Rollup keys of the demoted posts before and after (they stop
+        counting and may move entity)
+    """
+    from .models import SocialPost
+    from .rollups import rollup_key
+
+    if not demotions:
+        return []
+
+    def entity_keys(pks):
+        keys = []
+        for place_id, vendor_id, stay_id, created_at in (
+            SocialPost.objects.filter(pk__in=pks).values_list('place_id', 'vendor_id', 'stay_id', 'created_at')
+        ):
+            for entity_type, entity_id in (('place', place_id), ('vendor', vendor_id), ('stay', stay_id)):
+                if entity_id:
+                    keys.append(rollup_key(entity_type, entity_id, created_at))
+        return keys
+
+    keys = entity_keys(demotions)
+    for demoted, canonical in demotions.items():
+        SocialPost.objects.filter(duplicate_of_id=demoted).update(duplicate_of_id=canonical)
+        SocialPost.objects.filter(pk=demoted).update(is_duplicate=True, duplicate_of_id=canonical)
+    propagate_to_duplicates(set(demotions.values()))
+    return keys + entity_keys(demotions)
+
+
+def backfill_fingerprints(chunk_size=500):
+    """
+    Fingerprint stored posts that have no simhash yet, oldest first, and
+    flag near-duplicates among them and against already fingerprinted
+    posts (same rules as ingestion, so the earliest post stays canonical).
+
+    Returns:
+        {'fingerprinted', 'duplicates', 'keys'} - keys are the rollup keys
+        to rebuild
+    """
+    from .models import SocialPost
+
+    fingerprinted = duplicates = 0
+    keys = []
+    last = None
+    pending = SocialPost.objects.filter(simhash__isnull=True).exclude(content='')
+    while True:
+        chunk = pending.order_by('created_at', 'pk')
+        if last is not None:
+            chunk = chunk.filter(Q(created_at__gt=last[0]) | Q(created_at=last[0], pk__gt=last[1]))
+        rows = list(chunk.values('pk', 'platform', 'post_id', 'content', 'created_at')[:chunk_size])
+        if not rows:
+            break
+        last = (rows[-1]['created_at'], rows[-1]['pk'])
+
+        mark_duplicates(rows)
+        SocialPost.objects.bulk_update(
+            [SocialPost(pk=row['pk'], **fingerprint_fields(row['simhash'])) for row in rows],
+            ['simhash', *(f'simhash_b{band}' for band in range(BANDS))],
+            batch_size=200,
+        )
+        fingerprinted += len(rows)
+
+        links = {}  # duplicate key → canonical key
+        for row in rows:
+            key = (row['platform'], row['post_id'])
+            if row.get('duplicate_of'):
+                links[key] = tuple(row['duplicate_of'])
+            for demoted in row.get('demotes', ()):
+                links[tuple(demoted)] = key
+        if links:
+            pks = stored_pks(set(links) | set(links.values()))
+            demotions = {pks[key]: pks[canonical] for key, canonical in links.items() if key in pks and canonical in pks}
+            duplicates += len(demotions)
+            keys.extend(demote_to_duplicates(demotions))
+    return {'fingerprinted': fingerprinted, 'duplicates': duplicates, 'keys': keys}
+
+
+def propagate_to_duplicates(canonical_pks):
+    """
+    Copy classification and entity links from canonical posts to their
+    duplicates (after the canonical posts were reclassified).
+
+    Returns:
+        Number of duplicates updated
+    """
+    from .models import SocialPost
+
+    canonical = {
+        row['pk']: row
+        for row in SocialPost.objects.filter(pk__in=canonical_pks).values(
+            'pk', 'place_id', 'vendor_id', 'stay_id', *CLASSIFICATION_FIELDS)
+    }
+    fields = ['place_id', 'vendor_id', 'stay_id', *CLASSIFICATION_FIELDS]
+    duplicates = list(SocialPost.objects.filter(duplicate_of_id__in=canonical).only('pk', 'duplicate_of_id'))
+    for duplicate in duplicates:
+        source = canonical[duplicate.duplicate_of_id]
+        for field in fields:
+            setattr(duplicate, field, source[field])
+    SocialPost.objects.bulk_update(
+        duplicates, ['place', 'vendor', 'stay', *CLASSIFICATION_FIELDS], batch_size=200)
+    return len(duplicates)
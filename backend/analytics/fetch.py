@@ -0,0 +1,173 @@
+"""
+Async Fetch Layer
+=================
+Pooled, rate-limited HTTP access for the social media scraper.
+
+- One ``httpx.AsyncClient`` per platform (connection pool + keep-alive)
+- Per-host concurrency limits so one slow API can't hog every socket
+- Timeouts on every request
+- Retries with exponential backoff for timeouts, connection errors,
+  429 and 5xx responses (honours ``Retry-After`` when the API sends it,
+  in seconds or as an HTTP date, capped at ``max_retry_after``)
+"""
+
+import asyncio
+import logging
+import random
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Longest Retry-After we wait out; a server asking for more would stall the
+# whole pooled fetch (and the Celery task running it)
+MAX_RETRY_AFTER = 60.0
+
+
+class FetchError(Exception):
+    """Raised when a request still fails after all retries."""
+
+    def __init__(self, message, status_code=None, body=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.body = body
+
+
+class PlatformFetcher:
+    """
+    Pooled async HTTP client for a single platform.
+
+    Usage:
+        fetcher = PlatformFetcher('twitter', 'https://api.twitter.com/2',
+                                  headers={'Authorization': 'Bearer ...'})
+        data = await fetcher.get_json('/tweets/search/recent', params={...})
+        await fetcher.aclose()
+    """
+
+    def __init__(self, platform, base_url, headers=None, params=None, timeout=10.0,
+                 max_connections=10, per_host_limit=4, retries=3, backoff=0.5,
+                 max_retry_after=MAX_RETRY_AFTER):
+        self.platform = platform
+        self.base_url = base_url.rstrip('/')
+        self.default_params = dict(params or {})
+        self.per_host_limit = per_host_limit
+        self.retries = retries
+        self.backoff = backoff
+        self.max_retry_after = max_retry_after
+        self._host_limits = {}
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers=headers or {},
+            timeout=httpx.Timeout(timeout),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+        )
+
+    def _host_limit(self, url):
+        """Semaphore shared by every request to the same host."""
+        host = urlsplit(url).netloc or urlsplit(self.base_url).netloc
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.per_host_limit)
+        return self._host_limits[host]
+
+    @staticmethod
+    def _parse_retry_after(value):
+        """Seconds to wait for a Retry-After header (delay-seconds or HTTP-date), or None."""
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+    def _retry_delay(self, attempt, response=None):
+        if response is not None:
+            retry_after = response.headers.get('Retry-After')
+            delay = self._parse_retry_after(retry_after) if retry_after else None
+            if delay is not None:
+                return min(delay, self.max_retry_after)
+        # Exponential backoff with a little jitter so parallel retries spread out
+        return self.backoff * (2 ** attempt) * (1 + random.random() * 0.1)
+
+    async def get_json(self, url, params=None):
+        """
+        GET ``url`` (relative to base_url, or absolute for paging links) and
+        return the decoded JSON body.
+
+        Raises:
+            FetchError: on non-retryable errors or once retries are exhausted
+        """
+        merged_params = {**self.default_params, **(params or {})}
+        semaphore = self._host_limit(url)
+
+        attempt = 0
+        while True:
+            response = None
+            try:
+                async with semaphore:
+                    response = await self._client.get(url, params=merged_params)
+            except (httpx.TimeoutException, httpx.TransportError) as e:
+                if attempt >= self.retries:
+                    raise FetchError(f"{self.platform}: {e.__class__.__name__} after {attempt + 1} attempts") from e
+                logger.warning(f"⏳ {self.platform} request failed ({e.__class__.__name__}), retrying...")
+            else:
+                if response.status_code < 400:
+                    return response.json()
+                if response.status_code not in RETRYABLE_STATUS_CODES or attempt >= self.retries:
+                    raise FetchError(
+                        f"{self.platform}: HTTP {response.status_code}",
+                        status_code=response.status_code,
+                        body=response.text,
+                    )
+                logger.warning(f"⏳ {self.platform} returned {response.status_code}, retrying...")
+
+            await asyncio.sleep(self._retry_delay(attempt, response))
+            attempt += 1
+
+    async def aclose(self):
+        await self._client.aclose()
+
+
+class FetchPool:
+    """
+    Holds one PlatformFetcher per platform and closes them together.
+
+    Usage:
+        async with FetchPool() as pool:
+            twitter = pool.register('twitter', base_url, headers=...)
+            ...
+    """
+
+    def __init__(self, **defaults):
+        self.defaults = defaults  # timeout, retries, per_host_limit, ...
+        self._fetchers = {}
+
+    def register(self, platform, base_url, **options):
+        fetcher = PlatformFetcher(platform, base_url, **{**self.defaults, **options})
+        self._fetchers[platform] = fetcher
+        return fetcher
+
+    def get(self, platform):
+        return self._fetchers.get(platform)
+
+    async def aclose(self):
+        await asyncio.gather(*(f.aclose() for f in self._fetchers.values()))
+        self._fetchers = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
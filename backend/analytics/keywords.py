@@ -0,0 +1,143 @@
+"""
+Keyword Extraction & Daily Topic Counts
+=======================================
+Extracts keyphrases from post text at ingestion (stored in
+SocialPost.extra['topics']) and maintains SentimentTopic: daily
+topic × sentiment × category × city mention counts, plus a TermSketch
+(heavy-hitter sketch, analytics/sketches.py) per day × city.
+
+Keyphrases are the words and word pairs inside runs of non-stopword
+tokens (English, Malay and social media filler are stopwords), so
+"the Langkawi cable car" gives "langkawi", "cable", "car",
+"langkawi cable" and "cable car" without an NLP dependency.
+
+Like the entity rollups, topic counts are rebuilt from SocialPost for the
+days that changed (see rebuild_topics), so re-fetched posts and retried
+chunks are never counted twice.
+
+Usage:
+    extract_keywords('Sunset cruise in Langkawi was amazing! #travel')
+    # → ['sunset', 'cruise', 'sunset cruise', 'langkawi', 'amazing', 'travel', 'amazing travel']
+"""
+
+from collections import Counter
+from datetime import date
+
+from django.db import transaction
+
+from .dedup import tokens
+from .sketches import SpaceSaving
+
+MAX_KEYWORDS_PER_POST = 12
+MIN_WORD_LENGTH = 3
+
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being
+below between both but by can could did do does doing down during each few for from further get got
+had has have having he her here hers him his how i if in into is it its itself just like me more
+most my no nor not now of off on once only or other our ours out over own really same she should so
+some such than that the their them then there these they this those through to too under until up
+very was we were what when where which while who whom why will with would you your yours
+im ive dont cant wont thats its lets one two go going went today day days time lol omg amp rt via
+dan di ke yang ini itu untuk dengan tak tidak ada saya kami kita aku dia mereka pun lah je ja dah
+sudah akan pada dari juga atau sangat lagi kat nak
+""".split())
+
+# Mentions of vendors and stays have no Place.category of their own
+ENTITY_CATEGORIES = {'vendor': 'Dining', 'stay': 'Accommodation'}
+
+
+def extract_keywords(text, limit=MAX_KEYWORDS_PER_POST):
+    """
+    Distinct keyphrases of a post, in order of appearance.
+
+    Every content word, and every pair of adjacent content words, is a
+    keyphrase. Stopwords, numbers and words shorter than MIN_WORD_LENGTH
+    break phrases.
+    """
+    phrases, run = [], []
+
+    def flush():
+        for position, word in enumerate(run):
+            phrases.append(word)
+            if position:
+                phrases.append(f'{run[position - 1]} {word}')
+        run.clear()
+
+    for word in tokens(text):
+        if word in STOPWORDS or word.isdigit() or len(word) < MIN_WORD_LENGTH:
+            flush()
+        else:
+            run.append(word)
+    flush()
+
+    return list(dict.fromkeys(phrase[:100] for phrase in phrases))[:limit]
+
+
+def _topic_rows(day):
+    """
+    Count (topic, sentiment, category, city) mentions for one day's
+    canonical posts, and sketch the topics per city.
+    """
+    from .models import SocialPost
+
+    counts = Counter()
+    sketches = {}
+    posts = (
+        SocialPost.objects
+        .canonical()
+        .in_window(day, day)
+        .values('content', 'extra', 'sentiment', 'place_id', 'place__category', 'place__city',
+                'vendor_id', 'vendor__city', 'stay_id', 'stay__district')
+    )
+    for post in posts.iterator(chunk_size=2000):
+        extra = post['extra'] or {}
+        topics = extra.get('topics')
+        if topics is None:  # posts stored before extraction existed
+            topics = extract_keywords(post['content'])
+
+        if post['place_id']:
+            category, city = post['place__category'], post['place__city']
+        elif post['vendor_id']:
+            category, city = ENTITY_CATEGORIES['vendor'], post['vendor__city']
+        elif post['stay_id']:
+            category, city = ENTITY_CATEGORIES['stay'], post['stay__district']
+        else:
+            category, city = '', ''
+
+        sketch = sketches.setdefault(city or '', SpaceSaving())
+        for topic in topics:
+            counts[(topic, post['sentiment'] or 'neutral', category or '', city or '')] += 1
+            sketch.add(topic)
+    return counts, sketches
+
+
+def rebuild_topics(days):
+    """
+    Recompute SentimentTopic rows and TermSketches for the given days from
+    SocialPost.
+
+    Returns:
+        Number of topic rows written
+    """
+    from .models import SentimentTopic, TermSketch
+
+    written = 0
+    for day in sorted({d if isinstance(d, date) else date.fromisoformat(d) for d in days}):
+        counts, sketches = _topic_rows(day)
+        rows = [
+            SentimentTopic(date=day, topic=topic, sentiment=sentiment, category=category,
+                           city=city, count=count)
+            for (topic, sentiment, category, city), count in counts.items()
+        ]
+        term_sketches = [
+            TermSketch(date=day, city=city, total=sketch.total, sketch=sketch.to_dict())
+            for city, sketch in sketches.items()
+        ]
+        with transaction.atomic():
+            SentimentTopic.objects.filter(date=day).delete()
+            SentimentTopic.objects.bulk_create(rows, batch_size=500)
+            TermSketch.objects.filter(date=day).delete()
+            TermSketch.objects.bulk_create(term_sketches)
+        written += len(rows)
+    return written
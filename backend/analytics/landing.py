@@ -0,0 +1,107 @@
+"""
+Raw Post Landing Zone
+=====================
+Append-only store of every payload the scraper fetched, so history can be
+reclassified or re-matched without calling the social media APIs again.
+
+Layout (settings.RAW_LANDING_DIR):
+    dt=2025-01-05/083000-run12-1a2b3c4d.jsonl.gz
+    dt=2025-01-05/103000-run13-5e6f7a8b.jsonl.gz
+
+- One gzip JSONL segment per fetch, partitioned by fetch date
+- Segments are written to a temp file and renamed, so readers never see
+  a half-written segment, and are never modified afterwards
+- Each line: {"fetched_at": ..., "run_id": ..., "post": {...scraper post...}}
+
+Usage:
+    append_segment(posts, run_id=run.pk)
+    for path in list_segments(since=date(2025, 1, 1)):
+        for post in read_segment(path):
+            ...
+    run_segment(run.pk)  # the segment a run already landed, if any
+"""
+
+import gzip
+import json
+import os
+import uuid
+from datetime import date
+from pathlib import Path
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+SEGMENT_SUFFIX = '.jsonl.gz'
+
+
+def landing_root(root=None):
+    return Path(root or settings.RAW_LANDING_DIR)
+
+
+def append_segment(posts, run_id=None, root=None, fetched_at=None):
+    """
+    Write posts as a new segment.
+
+    Returns:
+        Path of the segment, or None if there was nothing to write
+    """
+    if not posts:
+        return None
+
+    fetched_at = timezone.localtime(fetched_at or timezone.now())
+    partition = landing_root(root) / f"dt={fetched_at.date().isoformat()}"
+    partition.mkdir(parents=True, exist_ok=True)
+
+    name = f"{fetched_at.strftime('%H%M%S')}-run{run_id or 0}-{uuid.uuid4().hex[:8]}{SEGMENT_SUFFIX}"
+    path = partition / name
+    tmp_path = partition / f".{name}.tmp"
+
+    with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+        for post in posts:
+            record = {'fetched_at': fetched_at, 'run_id': run_id, 'post': post}
+            f.write(json.dumps(record, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n')
+    os.replace(tmp_path, path)
+    return path
+
+
+def list_segments(root=None, since=None, until=None):
+    """
+    Segment paths in write order, optionally limited to fetch dates
+    since..until (inclusive).
+    """
+    base = landing_root(root)
+    if not base.exists():
+        return []
+
+    segments = []
+    for partition in sorted(base.glob('dt=*')):
+        try:
+            day = date.fromisoformat(partition.name[3:])
+        except ValueError:
+            continue
+        if (since and day < since) or (until and day > until):
+            continue
+        segments.extend(sorted(partition.glob(f'[0-9]*{SEGMENT_SUFFIX}')))
+    return segments
+
+
+def run_segment(run_id, root=None):
+    """Path of the segment written by pipeline run `run_id`, or None."""
+    base = landing_root(root)
+    if not run_id or not base.exists():
+        return None
+    return next(iter(sorted(base.glob(f'dt=*/[0-9]*-run{run_id}-*{SEGMENT_SUFFIX}'))), None)
+
+
+def segment_name(path, root=None):
+    """Stable id of a segment (its path relative to the landing root)."""
+    return Path(path).relative_to(landing_root(root)).as_posix()
+
+
+def read_segment(path):
+    """Yield the scraper posts stored in a segment."""
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)['post']
@@ -0,0 +1,74 @@
+"""
+Management command to archive old social posts
+==============================================
+python manage.py archive_social_posts                       - Archive posts older than SOCIAL_POST_RETENTION_DAYS
+python manage.py archive_social_posts --older-than-days 90  - Custom retention horizon
+python manage.py archive_social_posts --before 2025-01-01   - Archive everything created before a date
+python manage.py archive_social_posts --dry-run             - Only count what would be archived
+
+Archived posts are written to SOCIAL_ARCHIVE_DIR as gzip JSONL files
+(one folder per month) and deleted from the database. Their daily rollups
+are rebuilt first and kept, so views built on EntityDailyRollup (visit
+tiers, period rollups, hidden gems) don't change. Views that still aggregate
+SocialPost directly (overview, sentiment summary, social metrics, popular
+places, ...) lose the archived days, so this is not scheduled in beat; only
+archive past the longest window those dashboards compare against.
+"""
+
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from analytics.archive import archive_posts, archive_root
+from analytics.cache_utils import invalidate_analytics_cache
+
+
+class Command(BaseCommand):
+    help = 'Move social posts past the retention horizon into compressed archive files'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than-days',
+            type=int,
+            default=settings.SOCIAL_POST_RETENTION_DAYS,
+            help='Archive posts created more than this many days ago',
+        )
+        parser.add_argument('--before', help='Archive posts created before this date (YYYY-MM-DD)')
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Posts per archive chunk')
+        parser.add_argument('--dry-run', action='store_true', help='Count posts without archiving them')
+
+    def handle(self, *args, **options):
+        if options['before']:
+            try:
+                cutoff = date.fromisoformat(options['before'])
+            except ValueError:
+                raise CommandError(f"--before must be YYYY-MM-DD, got '{options['before']}'")
+        else:
+            cutoff = timezone.localdate() - timedelta(days=options['older_than_days'])
+
+        self.stdout.write("=" * 60)
+        self.stdout.write(self.style.SUCCESS("🧊 ARCHIVING SOCIAL POSTS"))
+        self.stdout.write("=" * 60)
+        self.stdout.write(f"📅 Posts created before {cutoff} → {archive_root()}")
+
+        result = archive_posts(cutoff, chunk_size=options['chunk_size'], dry_run=options['dry_run'])
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f"✅ Dry run: {result['posts']} posts would be archived"))
+            return
+
+        for path in result['files']:
+            self.stdout.write(f"   📦 {path}")
+
+        if result['posts']:
+            try:
+                invalidate_analytics_cache()
+            except Exception as e:
+                self.stdout.write(f"⚠️ Cache invalidation failed (non-critical): {e}")
+
+        self.stdout.write("=" * 60)
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Archived {result['posts']} posts in {len(result['files'])} files "
+            f"(rollups final before {result['watermark']})"
+        ))
@@ -0,0 +1,176 @@
+"""
+Management command to benchmark API endpoints
+=============================================
+python manage.py benchmark_endpoints                          - xs dataset, results in benchmark_results.json
+python manage.py benchmark_endpoints --scale s m              - Several scales in one report
+python manage.py benchmark_endpoints --endpoint views_new     - Only endpoints whose name contains views_new
+python manage.py benchmark_endpoints --compare baseline.json  - Show p95 / query changes against an earlier run
+python manage.py benchmark_endpoints --output -               - Print the JSON report instead of writing a file
+
+Each scale runs in a fresh test database (never the real one) filled by
+analytics/synthetic.py, so runs on different commits see identical data.
+Reports p50/p95/p99 latency, queries per request and peak Python memory
+per endpoint (see analytics/benchmark.py).
+"""
+
+import json
+import subprocess
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+from django.utils import timezone
+
+from analytics import benchmark, synthetic
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+class Command(BaseCommand):
+    help = 'Benchmark every GET endpoint over deterministic synthetic datasets'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale',
+            nargs='+',
+            choices=list(synthetic.SCALES),
+            default=['xs'],
+            help='Dataset scales to run (see analytics/synthetic.py)',
+        )
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=20,
+            help='Timed requests per endpoint',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Random seed for the synthetic dataset',
+        )
+        parser.add_argument(
+            '--endpoint',
+            action='append',
+            default=[],
+            help='Only endpoints whose name contains this (repeatable)',
+        )
+        parser.add_argument(
+            '--warm-cache',
+            action='store_true',
+            help='Keep the cache between requests (default clears it, timing the database path)',
+        )
+        parser.add_argument(
+            '--output',
+            default='benchmark_results.json',
+            help='Where to write the JSON report ("-" for stdout)',
+        )
+        parser.add_argument(
+            '--compare',
+            help='Earlier JSON report to compare p95 latency and query counts against',
+        )
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError('--iterations must be at least 1')
+
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare']) as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Cannot read {options['compare']}: {e}")
+
+        quiet = options['output'] == '-'
+        log = self.stderr if quiet else self.stdout
+
+        log.write("=" * 60)
+        log.write(self.style.SUCCESS("⏱️  ENDPOINT BENCHMARK"))
+        log.write("=" * 60)
+
+        endpoints = benchmark.get_endpoints()
+        if options['endpoint']:
+            endpoints = {
+                name: regex for name, regex in endpoints.items()
+                if any(part in name for part in options['endpoint'])
+            }
+        if not endpoints:
+            raise CommandError('No endpoints match --endpoint')
+
+        report = {
+            'generated_at': timezone.now().isoformat(),
+            'commit': git_commit(),
+            'database': connection.vendor,
+            'python': sys.version.split()[0],
+            'iterations': options['iterations'],
+            'warm_cache': options['warm_cache'],
+            'seed': options['seed'],
+            'scales': {},
+        }
+
+        setup_test_environment()
+        try:
+            for scale in options['scale']:
+                report['scales'][scale] = self.run_scale(scale, endpoints, options, log)
+        finally:
+            teardown_test_environment()
+
+        if baseline:
+            self.print_comparison(report, baseline, log)
+
+        output = json.dumps(report, indent=2)
+        if quiet:
+            self.stdout.write(output)
+        else:
+            with open(options['output'], 'w') as f:
+                f.write(output)
+            log.write(self.style.SUCCESS(f"✅ Report written to {options['output']}"))
+
+    def run_scale(self, scale, endpoints, options, log):
+        log.write(f"\n📦 Scale '{scale}': generating {synthetic.SCALES[scale]['posts']:,} posts...")
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            rows = synthetic.generate(scale, seed=options['seed'])
+            log.write(f"   {', '.join(f'{n:,} {table}' for table, n in rows.items())}")
+
+            def on_result(name, result):
+                flag = '❌' if result['status'] >= 500 else '  '
+                log.write(
+                    f"{flag} {result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f} {result['p99_ms']:>8.1f} ms "
+                    f"{result['queries']:>4} q {result['peak_memory_kb']:>9.1f} KB  {name}"
+                )
+
+            log.write("       p50      p95      p99        queries   peak mem   endpoint")
+            results = benchmark.run(
+                Client(raise_request_exception=False), endpoints, benchmark.route_ids(), options['iterations'],
+                warm_cache=options['warm_cache'], on_result=on_result,
+            )
+        finally:
+            teardown_databases(old_config, verbosity=0)
+        return {'rows': rows, 'endpoints': results}
+
+    def print_comparison(self, report, baseline, log):
+        log.write(f"\n🔍 Compared with {baseline.get('commit') or 'baseline'}:")
+        for scale, data in report['scales'].items():
+            before = baseline.get('scales', {}).get(scale)
+            if not before:
+                log.write(f"   Scale '{scale}' not in baseline")
+                continue
+            changes = benchmark.compare(data['endpoints'], before['endpoints'])
+            report['scales'][scale]['comparison'] = changes
+            for name, change in sorted(changes.items(), key=lambda item: -(item[1]['p95_ratio'] or 0)):
+                if change['queries'] or (change['p95_ratio'] or 1) >= 1.2 or (change['p95_ratio'] or 1) <= 0.8:
+                    log.write(
+                        f"   [{scale}] {name}: p95 {change['p95_ms']:+.1f} ms "
+                        f"(x{change['p95_ratio']}), queries {change['queries']:+d}"
+                    )
@@ -0,0 +1,43 @@
+"""
+Management command to fingerprint stored social posts
+=====================================================
+python manage.py fingerprint_posts                      - Fingerprint posts stored without a SimHash
+python manage.py fingerprint_posts --chunk-size 2000    - Bigger chunks
+
+Posts stored before near-duplicate detection have no SimHash, so new posts
+never match them. This fingerprints them oldest first with the same rules as
+ingestion (the earliest post of a group stays canonical), flags the
+near-duplicates among them and rebuilds the rollups of the flagged posts.
+Safe to re-run: only posts without a fingerprint are read.
+"""
+
+from django.core.management.base import BaseCommand
+
+from analytics.cache_utils import invalidate_analytics_cache
+from analytics.dedup import backfill_fingerprints
+from analytics.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = 'Fingerprint stored social posts and flag near-duplicates among them'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500, help='Posts per chunk')
+
+    def handle(self, *args, **options):
+        self.stdout.write("=" * 60)
+        self.stdout.write(self.style.SUCCESS("🔎 FINGERPRINTING SOCIAL POSTS"))
+        self.stdout.write("=" * 60)
+
+        result = backfill_fingerprints(chunk_size=options['chunk_size'])
+        rebuild_rollups(result['keys'])
+
+        if result['duplicates']:
+            try:
+                invalidate_analytics_cache()
+            except Exception as e:
+                self.stdout.write(f"⚠️ Cache invalidation failed (non-critical): {e}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Fingerprinted {result['fingerprinted']} posts, {result['duplicates']} near-duplicates flagged"
+        ))
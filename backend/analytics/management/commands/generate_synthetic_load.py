@@ -0,0 +1,125 @@
+"""
+Management command to generate high-volume synthetic data
+=========================================================
+python manage.py generate_synthetic_load                          - 's' scale (20k posts), seed 0
+python manage.py generate_synthetic_load --scale l                - 1M posts, 500 of each entity
+python manage.py generate_synthetic_load --posts 5000000 --seed 2 - Override any count
+python manage.py generate_synthetic_load --skip-rollups           - Insert only (rebuild later with replay/reclassify)
+python manage.py generate_synthetic_load --clear                  - Remove all synthetic rows
+
+Writes into the configured database (unlike benchmark_endpoints, which uses
+a throwaway test database), so it refuses to run with DEBUG off unless
+--force is given. Popularity is Zipfian, posting is diurnal and seasonal;
+see analytics/synthetic.py.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from analytics import synthetic
+from analytics.cache_utils import invalidate_analytics_cache
+
+COUNT_OPTIONS = ('posts', 'places', 'vendors', 'stays', 'events', 'users', 'reviews', 'reservations',
+                 'registrations', 'days')
+
+
+class Command(BaseCommand):
+    help = 'Bulk-create skewed synthetic posts, events, registrations, reviews, reservations and stays'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale',
+            choices=list(synthetic.SCALES),
+            default='s',
+            help='Base counts (see analytics/synthetic.py SCALES)',
+        )
+        for name in COUNT_OPTIONS:
+            parser.add_argument(
+                f'--{name}',
+                type=int,
+                help=f'Override the number of {name}' if name != 'days' else 'Override the number of days covered',
+            )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Random seed (same seed and counts → same rows)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=synthetic.CHUNK_SIZE,
+            help='Rows per bulk_create transaction',
+        )
+        parser.add_argument(
+            '--skip-rollups',
+            action='store_true',
+            help='Do not rebuild rollups and place scores after inserting',
+        )
+        parser.add_argument(
+            '--clear',
+            action='store_true',
+            help='Delete all synthetic rows instead of generating',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Allow running with DEBUG off',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write("=" * 60)
+        self.stdout.write(self.style.SUCCESS("🧪 SYNTHETIC LOAD"))
+        self.stdout.write("=" * 60)
+
+        if not settings.DEBUG and not options['force']:
+            raise CommandError('DEBUG is off - this looks like a real database. Use --force to write anyway.')
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be at least 1')
+
+        started = time.monotonic()
+        if options['clear']:
+            deleted = synthetic.clear()
+            self.invalidate_cache()
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ Removed {deleted:,} synthetic posts and their entities in {time.monotonic() - started:.1f}s"
+            ))
+            return
+
+        counts = {name: options[name] for name in COUNT_OPTIONS}
+        spec = {**synthetic.SCALES[options['scale']], **{k: v for k, v in counts.items() if v is not None}}
+        self.stdout.write(
+            f"📦 Scale '{options['scale']}', seed {options['seed']}: {spec['posts']:,} posts over "
+            f"{spec['days']} days, {spec['places']:,} places, {spec['vendors']:,} vendors, "
+            f"{spec['stays']:,} stays, {spec['events']:,} events"
+        )
+
+        next_report = [0]
+
+        def progress(label, done, total):
+            if done >= next_report[0] or done == total:
+                rate = done / max(time.monotonic() - started, 1e-6)
+                self.stdout.write(f"   {label}: {done:,}/{total:,} ({rate:,.0f} rows/s)")
+                next_report[0] = done + max(total // 10, 1)
+
+        try:
+            result = synthetic.generate(
+                options['scale'], seed=options['seed'], chunk_size=options['chunk_size'],
+                rollups=not options['skip_rollups'], progress=progress, **counts,
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if not options['skip_rollups']:
+            self.invalidate_cache()
+        for table, count in result.items():
+            self.stdout.write(f"   {table:<14} {count:>12,}")
+        self.stdout.write(self.style.SUCCESS(f"✅ Done in {time.monotonic() - started:.1f}s"))
+
+    def invalidate_cache(self):
+        try:
+            invalidate_analytics_cache()
+        except Exception as e:
+            self.stdout.write(f"⚠️ Cache invalidation failed (non-critical): {e}")
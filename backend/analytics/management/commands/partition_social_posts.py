@@ -0,0 +1,56 @@
+"""
+Management command to manage monthly SocialPost partitions (PostgreSQL)
+=======================================================================
+python manage.py partition_social_posts                   - Create partitions up to 3 months ahead
+python manage.py partition_social_posts --months-ahead 6  - ...or further ahead
+python manage.py partition_social_posts --convert         - One-time conversion of the existing table
+
+On SQLite (development) there is nothing to partition; use
+archive_social_posts to keep the table small instead.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from analytics import partitions
+
+
+class Command(BaseCommand):
+    help = 'Create monthly partitions for SocialPost (PostgreSQL only)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months-ahead',
+            type=int,
+            default=3,
+            help='Months of empty partitions to keep ahead of today',
+        )
+        parser.add_argument(
+            '--convert',
+            action='store_true',
+            help='Convert the plain table into a partitioned one (locks the table while copying)',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write("=" * 60)
+        self.stdout.write(self.style.SUCCESS("🗂️  SOCIALPOST PARTITIONS"))
+        self.stdout.write("=" * 60)
+
+        if not partitions.is_supported():
+            self.stdout.write("ℹ️  Database is not PostgreSQL - partitioning skipped.")
+            return
+
+        months_ahead = options['months_ahead']
+        if options['convert']:
+            if partitions.convert_to_partitioned(months_ahead):
+                self.stdout.write(self.style.SUCCESS("✅ Converted analytics_socialpost to monthly partitions"))
+            else:
+                self.stdout.write("ℹ️  Table is already partitioned.")
+
+        try:
+            created = partitions.ensure_partitions(months_ahead)
+        except RuntimeError as e:
+            raise CommandError(str(e))
+
+        for name in created:
+            self.stdout.write(f"   ➕ {name}")
+        self.stdout.write(self.style.SUCCESS(f"✅ {len(created)} partitions created"))
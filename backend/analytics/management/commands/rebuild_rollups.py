@@ -0,0 +1,74 @@
+"""
+Management command to rebuild the analytics rollups
+===================================================
+python manage.py rebuild_rollups --all                  - Every day that has posts
+python manage.py rebuild_rollups --all --once           - Same, unless a full rebuild already ran (deploys)
+python manage.py rebuild_rollups --since 2025-01-01     - Days from a date onwards
+
+Rebuilds EntityDailyRollup, PlacePeriodRollup, SentimentTopic, TermSketch
+and AuthorSketch from SocialPost. The collection pipeline keeps these up to
+date for the posts it persists; run this once on databases whose posts were
+stored before the rollup tables existed, and after loading posts directly
+(seed scripts, imports). Days before the archive watermark are skipped.
+Visit tiers and hidden gems are recomputed from the rebuilt rollups.
+
+Deploy scripts run it with --once right after migrate, so the rollup-backed
+endpoints (visit levels, place sentiment detail, keywords, unique authors)
+have the existing posts before they serve traffic.
+"""
+
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from analytics.cache_utils import invalidate_analytics_cache
+from analytics.checkpoints import load_backfill_state, save_backfill_state
+from analytics.rollups import rebuild_all_rollups
+from analytics.scoring import refresh_place_scores
+
+CHECKPOINT = 'rebuild_rollups'
+
+
+class Command(BaseCommand):
+    help = 'Rebuild daily / period rollups, topics and sketches from stored social posts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Rebuild every day that has posts')
+        parser.add_argument('--since', help='Rebuild days from this date onwards (YYYY-MM-DD)')
+        parser.add_argument('--days-per-batch', type=int, default=31, help='Days rebuilt per batch')
+        parser.add_argument('--once', action='store_true', help='Skip if a full rebuild (--all) already completed')
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            try:
+                since = date.fromisoformat(options['since'])
+            except ValueError:
+                raise CommandError(f"--since must be YYYY-MM-DD, got '{options['since']}'")
+        elif not options['all']:
+            raise CommandError("Pass --all or --since YYYY-MM-DD")
+
+        state = load_backfill_state(CHECKPOINT)
+        if options['once'] and state.get('completed_at'):
+            self.stdout.write(f"✅ Rollups already rebuilt on {state['completed_at']}, skipping.")
+            return
+
+        self.stdout.write("=" * 60)
+        self.stdout.write(self.style.SUCCESS("🧮 REBUILDING ROLLUPS"))
+        self.stdout.write("=" * 60)
+
+        result = rebuild_all_rollups(since=since, days_per_batch=options['days_per_batch'])
+        scores = refresh_place_scores()
+        if options['all']:
+            save_backfill_state(CHECKPOINT, {**state, 'completed_at': timezone.now().isoformat()})
+
+        try:
+            invalidate_analytics_cache()
+        except Exception as e:
+            self.stdout.write(f"⚠️ Cache invalidation failed (non-critical): {e}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Rebuilt {result['days']} days ({result['rollup_rows']} daily rollup rows), "
+            f"{scores['visit_tiers']} places tiered, {scores['hidden_gems']} hidden gems ranked"
+        ))
@@ -0,0 +1,187 @@
+"""
+Management command to reclassify stored social posts
+====================================================
+Re-runs classification and entity matching over existing SocialPost rows,
+e.g. after changing the classifier or adding places / vendors / stays.
+
+python manage.py reclassify_posts                     - Reclassify everything (resumes an interrupted run)
+python manage.py reclassify_posts --workers 8         - More classification processes
+python manage.py reclassify_posts --use-ai            - Use Gemini instead of keyword matching
+python manage.py reclassify_posts --restart           - Forget progress and start from the first post
+
+Posts are read in primary-key order, chunk by chunk, classified in a process
+pool and written back with bulk_update (changed rows only). Progress is saved
+after every chunk; a finished run is marked complete, so the next invocation
+starts over from the first post. Rollups are rebuilt only for the entities
+and days whose posts changed. Near-duplicates aren't classified; they are
+updated from their canonical post instead.
+"""
+
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+from django.db.models import Max
+
+from analytics.cache_utils import invalidate_analytics_cache
+from analytics.checkpoints import load_backfill_state, reset_backfill_state, save_backfill_state
+from analytics.dedup import propagate_to_duplicates
+from analytics.models import SocialPost
+from analytics.pipeline import classify_rows, init_worker, load_catalog
+from analytics.rollups import rebuild_rollups, rollup_key
+
+ROW_FIELDS = ('pk', 'content', 'created_at', 'place_id', 'vendor_id', 'stay_id',
+              'is_tourism', 'sentiment', 'sentiment_score', 'confidence', 'extra', 'is_duplicate')
+UPDATE_FIELDS = ['place', 'vendor', 'stay', 'is_tourism', 'sentiment', 'sentiment_score', 'confidence', 'extra']
+
+
+class Command(BaseCommand):
+    help = 'Reclassify stored social posts in parallel, with resumable progress'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500, help='Posts per chunk')
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 2,
+            help='Worker processes for classification (0 = run in this process)',
+        )
+        parser.add_argument(
+            '--use-ai',
+            action='store_true',
+            help='Classify with Gemini instead of keyword matching (slow, uses quota)',
+        )
+        parser.add_argument('--name', default='reclassify_posts', help='Checkpoint name')
+        parser.add_argument('--restart', action='store_true', help='Ignore saved progress')
+
+    def handle(self, *args, **options):
+        name = options['name']
+        chunk_size = options['chunk_size']
+
+        self.stdout.write("=" * 60)
+        self.stdout.write(self.style.SUCCESS("🧠 RECLASSIFYING SOCIAL POSTS"))
+        self.stdout.write("=" * 60)
+
+        if options['restart']:
+            reset_backfill_state(name)
+        state = load_backfill_state(name)
+        if state.get('completed'):
+            state = {}  # last run finished: reclassify everything again
+        totals = state.get('totals', {'scanned': 0, 'changed': 0})
+
+        # Fixed upper bound: posts ingested while we run are already classified by the new code
+        max_pk = state.get('max_pk') or SocialPost.objects.aggregate(m=Max('pk'))['m'] or 0
+        last_pk = state.get('last_pk', 0)
+        if last_pk >= max_pk:
+            self.stdout.write("✅ Nothing to reclassify.")
+            return
+
+        keywords, index = load_catalog()
+        verb = "Resuming" if last_pk else "Reclassifying"
+        self.stdout.write(f"📦 {verb} posts {last_pk + 1}…{max_pk} in chunks of {chunk_size}")
+
+        classify = partial(classify_rows, keywords=keywords, use_ai=options['use_ai'])
+        chunks = self._chunks(last_pk, max_pk, chunk_size)
+        for rows, results in self._ordered_map(classify, chunks, options['workers']):
+            changed, keys = self._write_back(rows, dict(results), index)
+            rebuild_rollups(keys)
+            propagate_to_duplicates(changed)
+
+            last_pk = rows[-1]['pk']
+            totals['scanned'] += len(rows)
+            totals['changed'] += len(changed)
+            save_backfill_state(name, {'last_pk': last_pk, 'max_pk': max_pk, 'totals': totals})
+            self.stdout.write(f"   ↳ up to #{last_pk}: {len(changed)}/{len(rows)} changed")
+
+        save_backfill_state(name, {'last_pk': last_pk, 'max_pk': max_pk, 'totals': totals, 'completed': True})
+
+        try:
+            invalidate_analytics_cache()
+        except Exception as e:
+            self.stdout.write(f"⚠️ Cache invalidation failed (non-critical): {e}")
+
+        self.stdout.write("=" * 60)
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Reclassified {totals['scanned']} posts, {totals['changed']} changed"
+        ))
+
+    def _chunks(self, last_pk, max_pk, chunk_size):
+        """
+        Keyset-paginated pk ranges, one bounded query per chunk (no cursor
+        held open across chunks, so worker processes never inherit one).
+        """
+        while last_pk < max_pk:
+            rows = list(
+                SocialPost.objects
+                .filter(pk__gt=last_pk, pk__lte=max_pk)
+                .order_by('pk')
+                .values(*ROW_FIELDS)[:chunk_size]
+            )
+            if not rows:
+                return
+            last_pk = rows[-1]['pk']
+            yield rows
+
+    def _ordered_map(self, classify, chunks, workers):
+        """
+        Yield (rows, classify(rows)) in chunk order, keeping at most
+        2 × workers chunks in flight so memory stays bounded.
+        """
+        def payload(rows):
+            return [{'pk': row['pk'], 'content': row['content']} for row in rows if not row['is_duplicate']]
+
+        if workers <= 0:
+            for rows in chunks:
+                yield rows, classify(payload(rows))
+            return
+
+        connections.close_all()  # workers must not share the parent's DB socket
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=init_worker) as pool:
+            pending = deque()
+            for rows in chunks:
+                pending.append((rows, pool.submit(classify, payload(rows))))
+                if len(pending) >= workers * 2:
+                    rows, future = pending.popleft()
+                    yield rows, future.result()
+            while pending:
+                rows, future = pending.popleft()
+                yield rows, future.result()
+
+    def _write_back(self, rows, results, index):
+        """bulk_update rows whose classification or entity link changed; returns (changed pks, rollup keys)."""
+        changed, keys = [], []
+        for row in rows:
+            if row['pk'] not in results:
+                continue  # near-duplicate: follows its canonical post
+            classification = results[row['pk']]
+            entity_name = classification.get('place_name') if classification.get('is_tourism') else None
+            entity_type, entity_id = index.get(entity_name.lower(), (None, None)) if entity_name else (None, None)
+
+            new = {
+                'place_id': entity_id if entity_type == 'place' else None,
+                'vendor_id': entity_id if entity_type == 'vendor' else None,
+                'stay_id': entity_id if entity_type == 'stay' else None,
+                'is_tourism': bool(classification.get('is_tourism')),
+                'sentiment': classification['sentiment'],
+                'sentiment_score': classification.get('sentiment_score', row['sentiment_score']),
+                'confidence': classification['confidence'],
+            }
+            if all(row[field] == value for field, value in new.items()):
+                continue
+
+            extra = dict(row['extra'] or {}, sentiment=new['sentiment'], confidence=new['confidence'])
+            changed.append(SocialPost(pk=row['pk'], extra=extra, **new))
+            for entity in ('place', 'vendor', 'stay'):
+                for entity_id in {row[f'{entity}_id'], new[f'{entity}_id']}:
+                    if entity_id:
+                        keys.append(rollup_key(entity, entity_id, row['created_at']))
+
+        with transaction.atomic():
+            SocialPost.objects.bulk_update(changed, UPDATE_FIELDS, batch_size=200)
+        return [obj.pk for obj in changed], keys
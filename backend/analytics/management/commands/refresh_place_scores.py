@@ -0,0 +1,33 @@
+"""
+Management command to recompute place scores
+============================================
+python manage.py refresh_place_scores   - Rebuild visit tiers and hidden gems from the rollups
+
+Runs after every collection run; schedule it (or run it by hand) after
+reclassify_posts / replay_raw_posts so the visit-level endpoints catch up.
+"""
+
+from django.core.management.base import BaseCommand
+
+from analytics.scoring import refresh_place_scores
+from analytics.cache_utils import invalidate_analytics_cache
+
+
+class Command(BaseCommand):
+    help = 'Recompute visit tiers and hidden-gem rankings from the daily rollups'
+
+    def handle(self, *args, **options):
+        self.stdout.write("=" * 60)
+        self.stdout.write(self.style.SUCCESS("🏷️  REFRESHING PLACE SCORES"))
+        self.stdout.write("=" * 60)
+
+        result = refresh_place_scores()
+
+        try:
+            invalidate_analytics_cache()
+        except Exception as e:
+            self.stdout.write(f"⚠️ Cache invalidation failed (non-critical): {e}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {result['visit_tiers']} places tiered, {result['hidden_gems']} hidden gems ranked"
+        ))
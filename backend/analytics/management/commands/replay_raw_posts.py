@@ -0,0 +1,131 @@
+"""
+Management command to replay the raw post landing zone
+======================================================
+Streams landing segments (analytics/landing.py) back through the
+classify → persist → rollup stages, without calling any social media API.
+
+python manage.py replay_raw_posts                      - Replay everything not replayed yet
+python manage.py replay_raw_posts --since 2025-01-01   - Only segments fetched since a date
+python manage.py replay_raw_posts --workers 8 --use-ai - More processes, Gemini classification
+python manage.py replay_raw_posts --restart            - Forget progress and start over
+
+Segments are classified in parallel worker processes and persisted in the
+order they were written, so the newest metrics win. Progress is saved after
+each segment, so an interrupted replay resumes where it stopped.
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from functools import partial
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from analytics.cache_utils import invalidate_analytics_cache
+from analytics.checkpoints import load_backfill_state, reset_backfill_state, save_backfill_state
+from analytics.dedup import mark_duplicates
+from analytics.landing import list_segments, segment_name
+from analytics.pipeline import classify_segment, init_worker, load_catalog, persist_posts
+from analytics.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = 'Replay raw landing segments through classification and persistence'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help='First fetch date to replay (YYYY-MM-DD)')
+        parser.add_argument('--until', help='Last fetch date to replay (YYYY-MM-DD)')
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 2,
+            help='Worker processes for classification (0 = run in this process)',
+        )
+        parser.add_argument(
+            '--use-ai',
+            action='store_true',
+            help='Classify with Gemini instead of keyword matching (slow, uses quota)',
+        )
+        parser.add_argument(
+            '--name',
+            default='replay_raw_posts',
+            help='Checkpoint name (use different names for independent replays)',
+        )
+        parser.add_argument(
+            '--restart',
+            action='store_true',
+            help='Ignore saved progress and replay every segment again',
+        )
+
+    def _parse_date(self, value, option):
+        if not value:
+            return None
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            raise CommandError(f"{option} must be YYYY-MM-DD, got '{value}'")
+
+    def handle(self, *args, **options):
+        since = self._parse_date(options['since'], '--since')
+        until = self._parse_date(options['until'], '--until')
+        name = options['name']
+
+        self.stdout.write("=" * 60)
+        self.stdout.write(self.style.SUCCESS("🔁 REPLAYING RAW POST LANDING ZONE"))
+        self.stdout.write("=" * 60)
+
+        if options['restart']:
+            reset_backfill_state(name)
+        state = load_backfill_state(name)
+        done = set(state.get('done', []))
+        totals = state.get('totals', {'added': 0, 'updated': 0, 'skipped': 0})
+
+        segments = [path for path in list_segments(since=since, until=until) if segment_name(path) not in done]
+        if not segments:
+            self.stdout.write("✅ Nothing to replay.")
+            return
+
+        keywords, index = load_catalog()
+        self.stdout.write(f"📦 {len(segments)} segments to replay ({len(done)} already done)")
+        self.stdout.write(f"🔍 Matching against {len(keywords)} places, vendors and stays")
+
+        classify = partial(classify_segment, keywords=keywords, use_ai=options['use_ai'])
+        for number, (path, classified) in enumerate(self._classified(segments, classify, options['workers']), 1):
+            result = persist_posts(mark_duplicates(classified), index)
+            rebuild_rollups(result['keys'])
+
+            for key in totals:
+                totals[key] += result[key]
+            done.add(segment_name(path))
+            save_backfill_state(name, {'done': sorted(done), 'totals': totals})
+
+            self.stdout.write(
+                f"   [{number}/{len(segments)}] {segment_name(path)}: "
+                f"+{result['added']} new, {result['updated']} updated, {result['skipped']} skipped"
+            )
+
+        try:
+            invalidate_analytics_cache()
+        except Exception as e:
+            self.stdout.write(f"⚠️ Cache invalidation failed (non-critical): {e}")
+
+        self.stdout.write("=" * 60)
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Replay complete: {totals['added']} added, {totals['updated']} updated, {totals['skipped']} skipped"
+        ))
+
+    def _classified(self, segments, classify, workers):
+        """Yield (path, classified posts) in segment order."""
+        if workers <= 0:
+            for path in segments:
+                yield classify(path)
+            return
+
+        # Workers inherit no open DB connections; they only classify
+        connections.close_all()
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=init_worker) as pool:
+            yield from pool.map(classify, segments)
@@ -1,3 +1,4 @@
+from django.core.management import call_command
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 from analytics.models import Place, SocialPost
@@ -80,6 +81,9 @@ class Command(BaseCommand):
             )
         )
         
+        # Posts were written directly, so the rollup-backed endpoints need a rebuild
+        call_command('rebuild_rollups', '--since', timezone.localtime(start_date).date().isoformat(), stdout=self.stdout)
+        
         # Print summary statistics
         total_likes = SocialPost.objects.filter(place=langkawi).aggregate(total=Sum('likes'))['total'] or 0
         total_comments = SocialPost.objects.filter(place=langkawi).aggregate(total=Sum('comments'))['total'] or 0
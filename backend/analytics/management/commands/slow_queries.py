@@ -0,0 +1,65 @@
+"""
+Management command to list slow-query top offenders
+===================================================
+python manage.py slow_queries                  - Top 20 fingerprints by total time, last 7 days
+python manage.py slow_queries --order count    - ...by occurrences (also: avg, max)
+python manage.py slow_queries --explain        - Include the sampled EXPLAIN plans
+python manage.py slow_queries --purge          - Delete rows older than SLOW_QUERY_LOG['RETENTION_DAYS']
+
+Queries are captured when SLOW_QUERY_LOG_ENABLED is set (see
+analytics/slow_queries.py).
+"""
+
+from django.core.management.base import BaseCommand
+
+from analytics import slow_queries
+
+
+class Command(BaseCommand):
+    help = 'Show the slowest query patterns captured by the slow-query log'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=7, help='Look back this many days')
+        parser.add_argument('--limit', type=int, default=20, help='Number of fingerprints to show')
+        parser.add_argument(
+            '--order',
+            choices=['total', 'count', 'avg', 'max'],
+            default='total',
+            help='Rank by summed time, occurrences, average or worst duration',
+        )
+        parser.add_argument('--explain', action='store_true', help='Print the EXPLAIN plan of each fingerprint')
+        parser.add_argument(
+            '--purge',
+            action='store_true',
+            help='Delete captured queries older than the retention period instead of listing',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write("=" * 60)
+        self.stdout.write(self.style.SUCCESS("🐢 SLOW QUERIES"))
+        self.stdout.write("=" * 60)
+
+        if options['purge']:
+            deleted = slow_queries.purge()
+            self.stdout.write(self.style.SUCCESS(f"✅ Deleted {deleted} old slow-query rows"))
+            return
+
+        if not slow_queries.get_config()['ENABLED']:
+            self.stdout.write("ℹ️  Capture is disabled (SLOW_QUERY_LOG_ENABLED); showing what was recorded earlier.")
+
+        offenders = slow_queries.top_offenders(options['days'], options['limit'], options['order'])
+        if not offenders:
+            self.stdout.write(f"No slow queries in the last {options['days']} days.")
+            return
+
+        for rank, row in enumerate(offenders, 1):
+            self.stdout.write(self.style.WARNING(
+                f"\n#{rank} {row['fingerprint']}  {row['count']}×  total {row['total_ms']:,.0f} ms  "
+                f"avg {row['avg_ms']:,.0f} ms  max {row['max_ms']:,.0f} ms"
+            ))
+            self.stdout.write(f"   {row['sql'][:500]}")
+            if row['views']:
+                self.stdout.write(f"   📍 {', '.join(row['views'][:5])}")
+            if options['explain'] and row['explain']:
+                for line in row['explain'].splitlines():
+                    self.stdout.write(f"   │ {line}")
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.6 on 2026-10-19 06:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0012_place_is_active_place_is_council_managed_place_owner'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScrapeCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('platform', models.CharField(max_length=50)),
+                ('keyword', models.CharField(blank=True, default='', max_length=200)),
+                ('since_id', models.CharField(blank=True, default='', max_length=100)),
+                ('last_timestamp', models.DateTimeField(blank=True, null=True)),
+                ('paging_token', models.CharField(blank=True, default='', max_length=500)),
+                ('head_id', models.CharField(blank=True, default='', max_length=100)),
+                ('head_timestamp', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ('platform', 'keyword'),
+                'constraints': [models.UniqueConstraint(fields=('platform', 'keyword'), name='uniq_checkpoint_platform_keyword')],
+            },
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.2.6 on 2026-10-19 06:51
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0013_scrape_checkpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PipelineRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], default='running', max_length=20)),
+                ('stats', models.JSONField(blank=True, default=dict)),
+                ('pending_checkpoints', models.JSONField(blank=True, default=list, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+            ],
+            options={
+                'ordering': ('-started_at',),
+            },
+        ),
+        migrations.CreateModel(
+            name='EntityDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entity_type', models.CharField(choices=[('place', 'Place'), ('vendor', 'Vendor'), ('stay', 'Stay')], max_length=10)),
+                ('entity_id', models.PositiveIntegerField()),
+                ('date', models.DateField()),
+                ('platform', models.CharField(blank=True, default='', max_length=50)),
+                ('posts', models.PositiveIntegerField(default=0)),
+                ('likes', models.PositiveBigIntegerField(default=0)),
+                ('comments', models.PositiveBigIntegerField(default=0)),
+                ('shares', models.PositiveBigIntegerField(default=0)),
+                ('views', models.PositiveBigIntegerField(default=0)),
+                ('positive', models.PositiveIntegerField(default=0)),
+                ('neutral', models.PositiveIntegerField(default=0)),
+                ('negative', models.PositiveIntegerField(default=0)),
+                ('sentiment_score_sum', models.FloatField(default=0.0)),
+                ('confidence_sum', models.FloatField(default=0.0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ('-date',),
+                'indexes': [models.Index(fields=['entity_type', 'date'], name='analytics_e_entity__17aa44_idx')],
+                'constraints': [models.UniqueConstraint(fields=('entity_type', 'entity_id', 'date', 'platform'), name='uniq_rollup_entity_date_platform')],
+            },
+        ),
+        migrations.CreateModel(
+            name='PipelineStageTiming',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stage', models.CharField(max_length=20)),
+                ('chunk', models.PositiveIntegerField(blank=True, null=True)),
+                ('started_at', models.DateTimeField()),
+                ('duration_ms', models.PositiveIntegerField(default=0)),
+                ('items', models.PositiveIntegerField(default=0)),
+                ('succeeded', models.BooleanField(default=True)),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timings', to='analytics.pipelinerun')),
+            ],
+            options={
+                'ordering': ('run', 'started_at'),
+            },
+        ),
+    ]
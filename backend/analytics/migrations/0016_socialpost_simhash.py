@@ -0,0 +1,49 @@
+# Generated by Django 5.2.6 on 2026-10-19 07:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0015_backfill_checkpoint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='socialpost',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, db_constraint=False, help_text='Canonical post this one is a near-duplicate of', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicates', to='analytics.socialpost'),
+        ),
+        migrations.AddField(
+            model_name='socialpost',
+            name='is_duplicate',
+            field=models.BooleanField(db_index=True, default=False),
+        ),
+        migrations.AddField(
+            model_name='socialpost',
+            name='simhash',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='socialpost',
+            name='simhash_b0',
+            field=models.PositiveIntegerField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='socialpost',
+            name='simhash_b1',
+            field=models.PositiveIntegerField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='socialpost',
+            name='simhash_b2',
+            field=models.PositiveIntegerField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='socialpost',
+            name='simhash_b3',
+            field=models.PositiveIntegerField(blank=True, db_index=True, null=True),
+        ),
+    ]
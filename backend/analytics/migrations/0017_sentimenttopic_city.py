@@ -0,0 +1,26 @@
+# Generated by Django 5.2.6 on 2026-10-19 07:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0016_socialpost_simhash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sentimenttopic',
+            name='city',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.AddIndex(
+            model_name='sentimenttopic',
+            index=models.Index(fields=['city', 'date'], name='analytics_s_city_fd7be6_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='sentimenttopic',
+            constraint=models.UniqueConstraint(fields=('date', 'topic', 'sentiment', 'category', 'city'), name='uniq_topic_day'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-19 07:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0017_sentimenttopic_city'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TermSketch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('city', models.CharField(blank=True, default='', max_length=100)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('sketch', models.JSONField(blank=True, default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ('-date', 'city'),
+                'constraints': [models.UniqueConstraint(fields=('date', 'city'), name='uniq_term_sketch_day_city')],
+            },
+        ),
+    ]
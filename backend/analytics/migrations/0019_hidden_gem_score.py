@@ -0,0 +1,35 @@
+# Generated by Django 5.2.6 on 2026-10-19 07:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0018_term_sketch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HiddenGemScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveIntegerField()),
+                ('score', models.FloatField()),
+                ('city', models.CharField(blank=True, default='', max_length=100)),
+                ('category', models.CharField(blank=True, default='', max_length=100)),
+                ('posts', models.PositiveIntegerField(default=0)),
+                ('engagement', models.PositiveBigIntegerField(default=0)),
+                ('avg_sentiment', models.FloatField(default=0.0)),
+                ('positive_share', models.FloatField(default=0.0)),
+                ('engagement_percentile', models.FloatField(default=0.0)),
+                ('computed_at', models.DateTimeField()),
+                ('place', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='hidden_gem', to='analytics.place')),
+            ],
+            options={
+                'ordering': ('rank',),
+                'indexes': [models.Index(fields=['rank'], name='analytics_h_rank_a57b4e_idx'), models.Index(fields=['city', 'rank'], name='analytics_h_city_0a4d4a_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.6 on 2026-10-19 07:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0019_hidden_gem_score'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='socialpost',
+            name='author_id',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.CreateModel(
+            name='AuthorSketch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entity_type', models.CharField(choices=[('place', 'Place'), ('vendor', 'Vendor'), ('stay', 'Stay')], max_length=10)),
+                ('entity_id', models.PositiveIntegerField()),
+                ('date', models.DateField()),
+                ('city', models.CharField(blank=True, default='', max_length=120)),
+                ('registers', models.BinaryField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ('-date',),
+                'indexes': [models.Index(fields=['date', 'city'], name='analytics_a_date_e8eacb_idx')],
+                'constraints': [models.UniqueConstraint(fields=('entity_type', 'entity_id', 'date'), name='uniq_author_sketch_entity_date')],
+            },
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.6 on 2026-10-19 07:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0020_author_sketch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VisitTierSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tier', models.CharField(choices=[('most', 'Most visited'), ('medium', 'Moderately visited'), ('least', 'Least visited')], max_length=10)),
+                ('city', models.CharField(blank=True, default='', max_length=100)),
+                ('category', models.CharField(blank=True, default='', max_length=100)),
+                ('places', models.PositiveIntegerField(default=0)),
+                ('posts', models.PositiveIntegerField(default=0)),
+                ('engagement', models.PositiveBigIntegerField(default=0)),
+                ('positive', models.PositiveIntegerField(default=0)),
+                ('neutral', models.PositiveIntegerField(default=0)),
+                ('negative', models.PositiveIntegerField(default=0)),
+                ('avg_sentiment', models.FloatField(default=0.0)),
+                ('p33', models.FloatField(default=0.0)),
+                ('p67', models.FloatField(default=0.0)),
+                ('computed_at', models.DateTimeField()),
+            ],
+            options={
+                'ordering': ('tier', 'city', 'category'),
+                'constraints': [models.UniqueConstraint(fields=('tier', 'city', 'category'), name='uniq_visit_tier_scope')],
+            },
+        ),
+        migrations.CreateModel(
+            name='PlaceVisitTier',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tier', models.CharField(choices=[('most', 'Most visited'), ('medium', 'Moderately visited'), ('least', 'Least visited')], max_length=10)),
+                ('city', models.CharField(blank=True, default='', max_length=100)),
+                ('category', models.CharField(blank=True, default='', max_length=100)),
+                ('posts', models.PositiveIntegerField(default=0)),
+                ('engagement', models.PositiveBigIntegerField(default=0)),
+                ('positive', models.PositiveIntegerField(default=0)),
+                ('neutral', models.PositiveIntegerField(default=0)),
+                ('negative', models.PositiveIntegerField(default=0)),
+                ('avg_sentiment', models.FloatField(default=0.0)),
+                ('engagement_percentile', models.FloatField(default=0.0)),
+                ('computed_at', models.DateTimeField()),
+                ('place', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='visit_tier', to='analytics.place')),
+            ],
+            options={
+                'ordering': ('-engagement',),
+                'indexes': [models.Index(fields=['tier', 'city'], name='analytics_p_tier_2352b7_idx'), models.Index(fields=['tier', 'category'], name='analytics_p_tier_692d4d_idx')],
+            },
+        ),
+    ]
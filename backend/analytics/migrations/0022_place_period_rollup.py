@@ -0,0 +1,99 @@
+# Generated by Django 5.2.6 on 2026-10-19 07:15
+
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+
+TOTALS = (
+    'posts', 'likes', 'comments', 'shares', 'views',
+    'positive', 'neutral', 'negative', 'sentiment_score_sum', 'confidence_sum',
+)
+
+
+def backfill_period_rollups(apps, schema_editor):
+    """
+    Sum every place's canonical posts into weekly / monthly rows, straight
+    from SocialPost: the daily rollups are empty for posts stored before the
+    collection pipeline existed.
+    """
+    Place = apps.get_model('analytics', 'Place')
+    PlacePeriodRollup = apps.get_model('analytics', 'PlacePeriodRollup')
+    SocialPost = apps.get_model('analytics', 'SocialPost')
+
+    place_ids = set(Place.objects.values_list('pk', flat=True))
+    totals = defaultdict(Counter)
+    daily = (
+        SocialPost.objects
+        .filter(place__isnull=False, is_duplicate=False)
+        .annotate(day=TruncDate('created_at'))
+        .values('place_id', 'day', 'platform')
+        .annotate(
+            posts=Count('id'),
+            likes=Sum('likes'),
+            comments=Sum('comments'),
+            shares=Sum('shares'),
+            views=Sum('views'),
+            positive=Count('id', filter=Q(sentiment='positive')),
+            neutral=Count('id', filter=Q(sentiment='neutral')),
+            negative=Count('id', filter=Q(sentiment='negative')),
+            sentiment_score_sum=Sum('sentiment_score'),
+            confidence_sum=Sum('confidence'),
+        )
+        .order_by()
+    )
+    for row in daily.iterator(chunk_size=2000):
+        if row['place_id'] not in place_ids:
+            continue
+        for period, start in (
+            ('week', row['day'] - timedelta(days=row['day'].weekday())),
+            ('month', row['day'].replace(day=1)),
+        ):
+            totals[(row['place_id'], period, start, row['platform'])].update(
+                {field: row[field] or 0 for field in TOTALS})
+
+    PlacePeriodRollup.objects.bulk_create([
+        PlacePeriodRollup(place_id=place_id, period=period, period_start=start, platform=platform,
+                          **{field: total[field] for field in TOTALS})
+        for (place_id, period, start, platform), total in totals.items()
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0021_visit_tiers'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlacePeriodRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('week', 'Week'), ('month', 'Month')], max_length=5)),
+                ('period_start', models.DateField()),
+                ('platform', models.CharField(blank=True, default='', max_length=50)),
+                ('posts', models.PositiveIntegerField(default=0)),
+                ('likes', models.PositiveBigIntegerField(default=0)),
+                ('comments', models.PositiveBigIntegerField(default=0)),
+                ('shares', models.PositiveBigIntegerField(default=0)),
+                ('views', models.PositiveBigIntegerField(default=0)),
+                ('positive', models.PositiveIntegerField(default=0)),
+                ('neutral', models.PositiveIntegerField(default=0)),
+                ('negative', models.PositiveIntegerField(default=0)),
+                ('sentiment_score_sum', models.FloatField(default=0.0)),
+                ('confidence_sum', models.FloatField(default=0.0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('place', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='period_rollups', to='analytics.place')),
+            ],
+            options={
+                'ordering': ('place', 'period', 'period_start'),
+                'indexes': [models.Index(fields=['place', 'period', 'period_start'], name='analytics_p_place_i_db1191_idx')],
+                'constraints': [models.UniqueConstraint(fields=('place', 'period', 'period_start', 'platform'), name='uniq_period_rollup_place_period_platform')],
+            },
+        ),
+        migrations.RunPython(backfill_period_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.6 on 2026-10-19 07:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0022_place_period_rollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlowQuery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fingerprint', models.CharField(db_index=True, max_length=16)),
+                ('sql', models.TextField()),
+                ('duration_ms', models.FloatField()),
+                ('view', models.CharField(blank=True, default='', max_length=200)),
+                ('location', models.CharField(blank=True, default='', max_length=200)),
+                ('database', models.CharField(blank=True, default='', max_length=50)),
+                ('explain', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'ordering': ('-created_at',),
+            },
+        ),
+    ]
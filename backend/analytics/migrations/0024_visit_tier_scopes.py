@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-19 08:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0023_slow_query'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='placevisittier',
+            name='category_tier',
+            field=models.CharField(blank=True, choices=[('most', 'Most visited'), ('medium', 'Moderately visited'), ('least', 'Least visited')], default='', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='placevisittier',
+            name='city_tier',
+            field=models.CharField(blank=True, choices=[('most', 'Most visited'), ('medium', 'Moderately visited'), ('least', 'Least visited')], default='', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='placevisittier',
+            name='scope_tier',
+            field=models.CharField(blank=True, choices=[('most', 'Most visited'), ('medium', 'Moderately visited'), ('least', 'Least visited')], default='', max_length=10),
+        ),
+    ]
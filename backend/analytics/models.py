@@ -1,5 +1,9 @@
+from datetime import datetime, time, timedelta
+
 from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
 from django.conf import settings
+from django.utils import timezone
 
 
 class Place(models.Model):
@@ -88,6 +92,39 @@ class Place(models.Model):
         ]
 
 
+def created_window(start=None, end=None, prefix=''):
+    """
+    Q for rows created on days start..end (inclusive, project timezone).
+
+    Compares created_at against datetime bounds instead of created_at__date,
+    so the (place, created_at) / created_at indexes are used and Postgres can
+    prune monthly partitions. Either bound may be None (open-ended).
+    Use prefix='posts__' when filtering through a relation.
+    """
+    tz = timezone.get_current_timezone()
+    q = models.Q()
+    if start:
+        q &= models.Q(**{f'{prefix}created_at__gte': datetime.combine(start, time.min, tzinfo=tz)})
+    if end:
+        q &= models.Q(**{f'{prefix}created_at__lt': datetime.combine(end + timedelta(days=1), time.min, tzinfo=tz)})
+    return q
+
+
+def canonical_window(start=None, end=None, prefix=''):
+    """created_window() limited to canonical posts (near-duplicates counted once)."""
+    return created_window(start, end, prefix) & models.Q(**{f'{prefix}is_duplicate': False})
+
+
+class SocialPostQuerySet(models.QuerySet):
+    def in_window(self, start=None, end=None):
+        """Posts created on days start..end (inclusive) - see created_window()."""
+        return self.filter(created_window(start, end))
+
+    def canonical(self):
+        """Skip near-duplicates (cross-posts, reshares) - see analytics/dedup.py."""
+        return self.filter(is_duplicate=False)
+
+
 class SocialPost(models.Model):
     # We keep platform (optional) for safe dedup and future analysis
     platform = models.CharField(max_length=50, blank=True, default="")
@@ -97,6 +134,7 @@ class SocialPost(models.Model):
 
     url = models.URLField(blank=True)
     content = models.TextField()
+    author_id = models.CharField(max_length=100, blank=True, default="")  # platform user id / handle
 
     # Timestamps
     created_at = models.DateTimeField()               # when the post was made
@@ -166,6 +204,28 @@ class SocialPost(models.Model):
     # Flexible bucket for anything extra (hashtags, language, keywords, etc.)
     extra = models.JSONField(default=dict, blank=True)
 
+    # Near-duplicate detection (analytics/dedup.py): 64-bit SimHash of the
+    # normalized text, split into four 16-bit bands for LSH lookups
+    simhash = models.BigIntegerField(null=True, blank=True)
+    simhash_b0 = models.PositiveIntegerField(null=True, blank=True, db_index=True)
+    simhash_b1 = models.PositiveIntegerField(null=True, blank=True, db_index=True)
+    simhash_b2 = models.PositiveIntegerField(null=True, blank=True, db_index=True)
+    simhash_b3 = models.PositiveIntegerField(null=True, blank=True, db_index=True)
+    is_duplicate = models.BooleanField(default=False, db_index=True)
+    # No database constraint: once partitioned (analytics/partitions.py) the
+    # table is unique on (id, created_at) only, so id alone can't be referenced
+    duplicate_of = models.ForeignKey(
+        'self',
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        db_constraint=False,
+        related_name="duplicates",
+        help_text="Canonical post this one is a near-duplicate of"
+    )
+
+    objects = SocialPostQuerySet.as_manager()
+
     def __str__(self):
         try:
             place_name = (self.place.name if self.place_id and self.place else "—")
@@ -227,7 +287,10 @@ class PostClean(models.Model):
 
 
 class SentimentTopic(models.Model):
-    """Topics extracted from posts with their sentiment analysis"""
+    """
+    Topics extracted from posts with their sentiment analysis: daily mention
+    counts per topic × sentiment × category × city (see analytics/keywords.py)
+    """
     topic = models.CharField(max_length=100)
     sentiment = models.CharField(max_length=20, choices=[
         ('positive', 'Positive'),
@@ -236,13 +299,371 @@ class SentimentTopic(models.Model):
     ])
     count = models.PositiveIntegerField(default=0)
     category = models.CharField(max_length=100, blank=True)  # e.g., 'Attractions', 'Food', 'Transport'
+    city = models.CharField(max_length=100, blank=True, default="")
     date = models.DateField()
     
     class Meta:
         ordering = ("-date", "-count")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["date", "topic", "sentiment", "category", "city"],
+                name="uniq_topic_day",
+            ),
+        ]
         indexes = [
             models.Index(fields=["topic"]),
             models.Index(fields=["sentiment"]),
             models.Index(fields=["category"]),
             models.Index(fields=["date"]),
+            models.Index(fields=["city", "date"]),
+        ]
+
+
+class ScrapeCheckpoint(models.Model):
+    """
+    Incremental scraping cursor per platform × keyword.
+
+    since_id / last_timestamp mark the newest post already persisted.
+    When a run stops early (page cap), paging_token records where to resume
+    and head_id / head_timestamp remember the newest post of that unfinished
+    walk, so the high-water mark only moves once the walk is complete.
+    """
+    platform = models.CharField(max_length=50)
+    keyword = models.CharField(max_length=200, blank=True, default="")  # "" = platform-wide feed
+    since_id = models.CharField(max_length=100, blank=True, default="")
+    last_timestamp = models.DateTimeField(null=True, blank=True)
+    paging_token = models.CharField(max_length=500, blank=True, default="")
+    head_id = models.CharField(max_length=100, blank=True, default="")
+    head_timestamp = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.platform}:{self.keyword or '*'} → {self.since_id or self.last_timestamp or '—'}"
+
+    class Meta:
+        ordering = ("platform", "keyword")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["platform", "keyword"],
+                name="uniq_checkpoint_platform_keyword",
+            ),
+        ]
+
+
+class EntityDailyRollup(models.Model):
+    """
+    Per entity × day × platform totals of SocialPost, rebuilt by the
+    pipeline's rollup stage (analytics/rollups.py) for the keys it touched.
+    """
+    ENTITY_TYPES = [
+        ('place', 'Place'),
+        ('vendor', 'Vendor'),
+        ('stay', 'Stay'),
+    ]
+
+    entity_type = models.CharField(max_length=10, choices=ENTITY_TYPES)
+    entity_id = models.PositiveIntegerField()
+    date = models.DateField()
+    platform = models.CharField(max_length=50, blank=True, default="")
+
+    posts = models.PositiveIntegerField(default=0)
+    likes = models.PositiveBigIntegerField(default=0)
+    comments = models.PositiveBigIntegerField(default=0)
+    shares = models.PositiveBigIntegerField(default=0)
+    views = models.PositiveBigIntegerField(default=0)
+
+    positive = models.PositiveIntegerField(default=0)
+    neutral = models.PositiveIntegerField(default=0)
+    negative = models.PositiveIntegerField(default=0)
+    sentiment_score_sum = models.FloatField(default=0.0)
+    confidence_sum = models.FloatField(default=0.0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.entity_type}:{self.entity_id} {self.date} {self.platform} → {self.posts} posts"
+
+    class Meta:
+        ordering = ("-date",)
+        constraints = [
+            models.UniqueConstraint(
+                fields=["entity_type", "entity_id", "date", "platform"],
+                name="uniq_rollup_entity_date_platform",
+            ),
         ]
+        indexes = [
+            models.Index(fields=["entity_type", "date"]),
+        ]
+
+
+class PlacePeriodRollup(models.Model):
+    """
+    Per place × week / month × platform totals, summed from
+    EntityDailyRollup whenever the place's daily rows are rebuilt
+    (analytics/rollups.py). Backs the place detail timelines.
+    """
+    PERIODS = [
+        ('week', 'Week'),    # period_start is a Monday
+        ('month', 'Month'),  # period_start is the 1st
+    ]
+
+    place = models.ForeignKey(Place, on_delete=models.CASCADE, related_name="period_rollups")
+    period = models.CharField(max_length=5, choices=PERIODS)
+    period_start = models.DateField()
+    platform = models.CharField(max_length=50, blank=True, default="")
+
+    posts = models.PositiveIntegerField(default=0)
+    likes = models.PositiveBigIntegerField(default=0)
+    comments = models.PositiveBigIntegerField(default=0)
+    shares = models.PositiveBigIntegerField(default=0)
+    views = models.PositiveBigIntegerField(default=0)
+
+    positive = models.PositiveIntegerField(default=0)
+    neutral = models.PositiveIntegerField(default=0)
+    negative = models.PositiveIntegerField(default=0)
+    sentiment_score_sum = models.FloatField(default=0.0)
+    confidence_sum = models.FloatField(default=0.0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.place_id} {self.period} {self.period_start} {self.platform} → {self.posts} posts"
+
+    class Meta:
+        ordering = ("place", "period", "period_start")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["place", "period", "period_start", "platform"],
+                name="uniq_period_rollup_place_period_platform",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["place", "period", "period_start"]),
+        ]
+
+
+class PipelineRun(models.Model):
+    """One run of the staged collection pipeline (analytics/pipeline.py)."""
+    STATUS_CHOICES = [
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='running')
+    stats = models.JSONField(default=dict, blank=True)
+
+    # Cursors from the fetch stage, committed by the rollup stage once every chunk is persisted
+    pending_checkpoints = models.JSONField(default=list, blank=True, encoder=DjangoJSONEncoder)
+
+    def __str__(self):
+        return f"Pipeline run #{self.pk} ({self.status})"
+
+    class Meta:
+        ordering = ("-started_at",)
+
+
+class PipelineStageTiming(models.Model):
+    """Wall-clock timing of one stage (or one chunk of a fan-out stage)."""
+    run = models.ForeignKey(PipelineRun, on_delete=models.CASCADE, related_name='timings')
+    stage = models.CharField(max_length=20)
+    chunk = models.PositiveIntegerField(null=True, blank=True)
+    started_at = models.DateTimeField()
+    duration_ms = models.PositiveIntegerField(default=0)
+    items = models.PositiveIntegerField(default=0)
+    succeeded = models.BooleanField(default=True)
+
+    def __str__(self):
+        chunk = f"[{self.chunk}]" if self.chunk is not None else ""
+        return f"run #{self.run_id} {self.stage}{chunk}: {self.duration_ms} ms"
+
+    class Meta:
+        ordering = ("run", "started_at")
+
+
+class BackfillCheckpoint(models.Model):
+    """Resume state of a long-running replay/backfill command, keyed by name."""
+    name = models.CharField(max_length=100, unique=True)
+    state = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} (updated {self.updated_at:%Y-%m-%d %H:%M})"
+
+
+class TermSketch(models.Model):
+    """
+    Space-Saving heavy-hitter sketch of post terms for one day × city
+    (analytics/sketches.py); merged across days for the trends wordcloud.
+    """
+    date = models.DateField()
+    city = models.CharField(max_length=100, blank=True, default="")
+    total = models.PositiveIntegerField(default=0)  # term occurrences fed in
+    sketch = models.JSONField(default=dict, blank=True)  # SpaceSaving.to_dict()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ("-date", "city")
+        constraints = [
+            models.UniqueConstraint(fields=["date", "city"], name="uniq_term_sketch_day_city"),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.city or '—'} ({self.total} terms)"
+
+
+class HiddenGemScore(models.Model):
+    """
+    Ranked hidden gems: well-liked places in the least-visited engagement
+    tercile. Recomputed once per collection run (analytics/scoring.py).
+    """
+    place = models.OneToOneField(Place, on_delete=models.CASCADE, related_name="hidden_gem")
+    rank = models.PositiveIntegerField()
+    score = models.FloatField()
+    city = models.CharField(max_length=100, blank=True, default="")  # copied from Place for filtering
+    category = models.CharField(max_length=100, blank=True, default="")
+
+    posts = models.PositiveIntegerField(default=0)
+    engagement = models.PositiveBigIntegerField(default=0)
+    avg_sentiment = models.FloatField(default=0.0)
+    positive_share = models.FloatField(default=0.0)  # 0..1
+    engagement_percentile = models.FloatField(default=0.0)  # 0..100 among places with posts
+    computed_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"#{self.rank} {self.place_id} ({self.score:.3f})"
+
+    class Meta:
+        ordering = ("rank",)
+        indexes = [
+            models.Index(fields=["rank"]),
+            models.Index(fields=["city", "rank"]),
+        ]
+
+
+VISIT_TIERS = [
+    ("most", "Most visited"),
+    ("medium", "Moderately visited"),
+    ("least", "Least visited"),
+]
+
+
+class PlaceVisitTier(models.Model):
+    """
+    Visit tier (engagement tercile) and all-time sentiment aggregates per
+    place with posts. Recomputed from the rollups (analytics/scoring.py).
+    tier is cut over all places; city_tier / category_tier / scope_tier
+    over the places of the same city, category, or both.
+    """
+    place = models.OneToOneField(Place, on_delete=models.CASCADE, related_name="visit_tier")
+    tier = models.CharField(max_length=10, choices=VISIT_TIERS)
+    city_tier = models.CharField(max_length=10, choices=VISIT_TIERS, blank=True, default="")
+    category_tier = models.CharField(max_length=10, choices=VISIT_TIERS, blank=True, default="")
+    scope_tier = models.CharField(max_length=10, choices=VISIT_TIERS, blank=True, default="")
+    city = models.CharField(max_length=100, blank=True, default="")  # copied from Place for filtering
+    category = models.CharField(max_length=100, blank=True, default="")
+
+    posts = models.PositiveIntegerField(default=0)
+    engagement = models.PositiveBigIntegerField(default=0)
+    positive = models.PositiveIntegerField(default=0)
+    neutral = models.PositiveIntegerField(default=0)
+    negative = models.PositiveIntegerField(default=0)
+    avg_sentiment = models.FloatField(default=0.0)
+    engagement_percentile = models.FloatField(default=0.0)  # 0..100 among places with posts
+    computed_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.place_id} ({self.tier})"
+
+    class Meta:
+        ordering = ("-engagement",)
+        indexes = [
+            models.Index(fields=["tier", "city"]),
+            models.Index(fields=["tier", "category"]),
+        ]
+
+
+class VisitTierSummary(models.Model):
+    """
+    Per-tier totals for every city / category scope ("" = all), so the
+    visit-level endpoints never aggregate over places at request time.
+    p33 / p67 are the engagement thresholds the scope's tiers were cut at,
+    over the places in that scope.
+    """
+    tier = models.CharField(max_length=10, choices=VISIT_TIERS)
+    city = models.CharField(max_length=100, blank=True, default="")
+    category = models.CharField(max_length=100, blank=True, default="")
+
+    places = models.PositiveIntegerField(default=0)
+    posts = models.PositiveIntegerField(default=0)
+    engagement = models.PositiveBigIntegerField(default=0)
+    positive = models.PositiveIntegerField(default=0)
+    neutral = models.PositiveIntegerField(default=0)
+    negative = models.PositiveIntegerField(default=0)
+    avg_sentiment = models.FloatField(default=0.0)  # mean of the places' averages
+    p33 = models.FloatField(default=0.0)
+    p67 = models.FloatField(default=0.0)
+    computed_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.tier} [{self.city or 'all'} / {self.category or 'all'}]"
+
+    class Meta:
+        ordering = ("tier", "city", "category")
+        constraints = [
+            models.UniqueConstraint(fields=["tier", "city", "category"], name="uniq_visit_tier_scope"),
+        ]
+
+
+class AuthorSketch(models.Model):
+    """
+    HyperLogLog sketch of the distinct post authors per entity × day
+    (analytics/sketches.py), rebuilt with the daily rollups. Merged on
+    demand for unique-author estimates over any range / city.
+    """
+    entity_type = models.CharField(max_length=10, choices=EntityDailyRollup.ENTITY_TYPES)
+    entity_id = models.PositiveIntegerField()
+    date = models.DateField()
+    city = models.CharField(max_length=120, blank=True, default="")  # copied from the entity for filtering
+    registers = models.BinaryField()  # zlib-compressed HLL registers
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.entity_type}:{self.entity_id} {self.date}"
+
+    class Meta:
+        ordering = ("-date",)
+        constraints = [
+            models.UniqueConstraint(
+                fields=["entity_type", "entity_id", "date"],
+                name="uniq_author_sketch_entity_date",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["date", "city"]),
+        ]
+
+
+class SlowQuery(models.Model):
+    """
+    One database query that took longer than the slow-query threshold
+    (analytics/slow_queries.py). Occurrences are grouped by fingerprint -
+    the SQL with literals replaced - into top offenders on read; a
+    sample of them carries the EXPLAIN plan.
+    """
+    fingerprint = models.CharField(max_length=16, db_index=True)
+    sql = models.TextField()  # normalized
+    duration_ms = models.FloatField()
+    view = models.CharField(max_length=200, blank=True, default="")  # outermost project frame
+    location = models.CharField(max_length=200, blank=True, default="")  # innermost project frame
+    database = models.CharField(max_length=50, blank=True, default="")
+    explain = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.fingerprint} {self.duration_ms:.0f}ms {self.view}"
+
+    class Meta:
+        ordering = ("-created_at",)
@@ -0,0 +1,234 @@
+"""
+Monthly Partitions for SocialPost (PostgreSQL)
+==============================================
+Turns analytics_socialpost into a table partitioned by RANGE (created_at),
+one partition per month, and keeps partitions ahead of incoming data.
+
+Dashboard queries filter with SocialPost.objects.in_window() (plain
+created_at bounds), so Postgres only scans the partitions in the window.
+
+Notes:
+- Postgres requires the partition key in every unique constraint, so after
+  conversion the primary key is (id, created_at) and the platform/post_id
+  constraint becomes (platform, post_id, created_at). That constraint no
+  longer stops a re-fetched post whose created_at differs (e.g. the
+  timezone.now() fallback when the timestamp doesn't parse), so
+  persist_posts() enforces (platform, post_id) itself: it looks stored posts
+  up by those two columns under lock_post_keys() and updates them in place,
+  keeping the stored created_at.
+- Foreign keys *to* SocialPost (PostRaw.post) can't reference a partitioned
+  table by id alone; the conversion drops those constraints (the columns and
+  Django's on_delete handling stay). SocialPost.duplicate_of is declared
+  with db_constraint=False for the same reason, so it works on either
+  layout and is deliberately not re-added here.
+- Every non-unique index of the old table (the model's indexes, the
+  foreign-key indexes, the near-duplicate band indexes) is recreated on the
+  partitioned table from its own definition, so the conversion never drops
+  one. Unique indexes other than the two constraints above are not copied
+  (they would need created_at too).
+- Rows outside every monthly range land in the default partition and are
+  moved into their month when ensure_partitions() creates it.
+"""
+
+import re
+from datetime import date, datetime, time
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+TABLE = 'analytics_socialpost'
+DEFAULT_PARTITION = f'{TABLE}_default'
+
+
+def is_supported():
+    return connection.vendor == 'postgresql'
+
+
+def month_start(day):
+    return date(day.year, day.month, 1)
+
+
+def add_months(day, months):
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f'{TABLE}_y{month.year}m{month.month:02d}'
+
+
+def _bound(month):
+    # Month boundaries in the project timezone, matching in_window()
+    return datetime.combine(month, time.min, tzinfo=timezone.get_current_timezone())
+
+
+def lock_post_keys(keys):
+    """
+    Serialize writers of the same (platform, post_id) until the current
+    transaction ends (a transaction-scoped advisory lock per key, taken in
+    sorted order so concurrent chunks can't deadlock). No-op off Postgres,
+    where the unpartitioned table keeps its (platform, post_id) constraint.
+    """
+    if not keys or not is_supported():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT pg_advisory_xact_lock(hashtext(k)) FROM unnest(%s::text[]) AS k ORDER BY k",
+            [sorted(f'socialpost:{platform}:{post_id}' for platform, post_id in keys)],
+        )
+
+
+def is_partitioned(cursor):
+    cursor.execute(
+        "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid WHERE c.relname = %s",
+        [TABLE],
+    )
+    return cursor.fetchone() is not None
+
+
+def existing_partitions(cursor):
+    cursor.execute(
+        """
+        SELECT child.relname FROM pg_inherits
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE parent.relname = %s
+        """,
+        [TABLE],
+    )
+    return {row[0] for row in cursor.fetchall()}
+
+
+def index_definitions(cursor, table):
+    """{name: CREATE INDEX statement} for the table's non-unique indexes."""
+    cursor.execute(
+        """
+        SELECT index_class.relname, pg_get_indexdef(ix.indexrelid) FROM pg_index ix
+        JOIN pg_class index_class ON index_class.oid = ix.indexrelid
+        WHERE ix.indrelid = %s::regclass AND NOT ix.indisunique AND NOT ix.indisprimary
+        """,
+        [table],
+    )
+    return dict(cursor.fetchall())
+
+
+def retarget_index(definition, table):
+    """An index definition from pg_get_indexdef() pointed at another table."""
+    return re.sub(r' ON (ONLY )?\S+ USING ', f' ON "{table}" USING ', definition, count=1)
+
+
+def _create_month(cursor, month, partitions):
+    """Create one monthly partition, moving matching rows out of the default partition."""
+    name = partition_name(month)
+    if name in partitions:
+        return False
+
+    start, end = _bound(month), _bound(add_months(month, 1))
+    cursor.execute(f'CREATE TABLE "{name}" (LIKE "{TABLE}" INCLUDING DEFAULTS)')
+    if DEFAULT_PARTITION in partitions:
+        cursor.execute(
+            f'WITH moved AS (DELETE FROM "{DEFAULT_PARTITION}" '
+            f'WHERE created_at >= %s AND created_at < %s RETURNING *) '
+            f'INSERT INTO "{name}" SELECT * FROM moved',
+            [start, end],
+        )
+    cursor.execute(
+        f'ALTER TABLE "{TABLE}" ATTACH PARTITION "{name}" FOR VALUES FROM (%s) TO (%s)',
+        [start, end],
+    )
+    partitions.add(name)
+    return True
+
+
+def _ensure(cursor, oldest, months_ahead):
+    partitions = existing_partitions(cursor)
+    created = []
+    if DEFAULT_PARTITION not in partitions:
+        cursor.execute(f'CREATE TABLE "{DEFAULT_PARTITION}" PARTITION OF "{TABLE}" DEFAULT')
+        partitions.add(DEFAULT_PARTITION)
+        created.append(DEFAULT_PARTITION)
+
+    month = month_start(timezone.localtime(oldest).date() if oldest else timezone.localdate())
+    last = add_months(month_start(timezone.localdate()), months_ahead)
+    while month <= last:
+        if _create_month(cursor, month, partitions):
+            created.append(partition_name(month))
+        month = add_months(month, 1)
+    return created
+
+
+def ensure_partitions(months_ahead=3):
+    """
+    Create monthly partitions from the oldest post's month through
+    `months_ahead` months from now, plus the default partition.
+
+    Returns:
+        Names of the partitions created
+    """
+    with transaction.atomic(), connection.cursor() as cursor:
+        if not is_partitioned(cursor):
+            raise RuntimeError(f"{TABLE} is not partitioned yet - run with --convert first")
+        cursor.execute(f'SELECT MIN(created_at) FROM "{TABLE}"')
+        return _ensure(cursor, cursor.fetchone()[0], months_ahead)
+
+
+def convert_to_partitioned(months_ahead=3):
+    """
+    One-time conversion of the plain table into a partitioned one
+    (copies every row under an exclusive lock; run in a maintenance window).
+    """
+    old = f'{TABLE}_unpartitioned'
+    with transaction.atomic(), connection.cursor() as cursor:
+        if is_partitioned(cursor):
+            return False
+
+        cursor.execute(f'LOCK TABLE "{TABLE}" IN ACCESS EXCLUSIVE MODE')
+
+        # Foreign keys pointing at SocialPost.id can't target a partitioned table
+        cursor.execute(
+            """
+            SELECT con.conname, rel.relname FROM pg_constraint con
+            JOIN pg_class rel ON rel.oid = con.conrelid
+            WHERE con.contype = 'f' AND con.confrelid = %s::regclass
+            """,
+            [TABLE],
+        )
+        for constraint, referencing_table in cursor.fetchall():
+            cursor.execute(f'ALTER TABLE "{referencing_table}" DROP CONSTRAINT "{constraint}"')
+
+        # Move the old table (and its index names) out of the way
+        cursor.execute(f'ALTER TABLE "{TABLE}" RENAME TO "{old}"')
+        cursor.execute(f'ALTER TABLE "{old}" RENAME CONSTRAINT "{TABLE}_pkey" TO "{old}_pkey"')
+        cursor.execute(f'ALTER TABLE "{old}" RENAME CONSTRAINT uniq_platform_postid TO uniq_platform_postid_old')
+        # Free the index names for the partitioned table; the old table is dropped below anyway
+        indexes = index_definitions(cursor, old)
+        for name in indexes:
+            cursor.execute(f'DROP INDEX "{name}"')
+
+        cursor.execute(
+            f'CREATE TABLE "{TABLE}" (LIKE "{old}" INCLUDING DEFAULTS INCLUDING IDENTITY) '
+            f'PARTITION BY RANGE (created_at)'
+        )
+        cursor.execute(f'ALTER TABLE "{TABLE}" ADD PRIMARY KEY (id, created_at)')
+        cursor.execute(
+            f'ALTER TABLE "{TABLE}" ADD CONSTRAINT uniq_platform_postid '
+            f'UNIQUE (platform, post_id, created_at)'
+        )
+        for definition in indexes.values():
+            cursor.execute(retarget_index(definition, TABLE))
+        for column, target in (('place_id', 'analytics_place'), ('vendor_id', 'vendors_vendor'), ('stay_id', 'stays_stay')):
+            cursor.execute(
+                f'ALTER TABLE "{TABLE}" ADD CONSTRAINT "{TABLE}_{column}_fk" FOREIGN KEY ({column}) '
+                f'REFERENCES "{target}" (id) DEFERRABLE INITIALLY DEFERRED'
+            )
+
+        # Partitions covering the existing data, then copy it over
+        cursor.execute(f'SELECT MIN(created_at) FROM "{old}"')
+        _ensure(cursor, cursor.fetchone()[0], months_ahead)
+        cursor.execute(f'INSERT INTO "{TABLE}" SELECT * FROM "{old}"')
+        cursor.execute(
+            f"SELECT setval(pg_get_serial_sequence('{TABLE}', 'id'), "
+            f'COALESCE((SELECT MAX(id) FROM "{TABLE}"), 1))'
+        )
+        cursor.execute(f'DROP TABLE "{old}"')
+    return True
@@ -0,0 +1,431 @@
+"""
+Collection Pipeline Stages
+==========================
+The social media collection run, split into stages that Celery can fan out
+across workers (see analytics/tasks.py):
+
+    fetch → [dedup → classify → persist] × chunks → rollup → warm
+
+Every stage is a plain function here so it can be retried, tested and run
+inline without a broker. Each stage is idempotent:
+- fetch only reads and appends to the raw landing zone (checkpoints are
+  committed later, by the rollup stage)
+- persist upserts on (platform, post_id)
+- rollup rebuilds totals from SocialPost for the keys it's given
+- warm just re-reads the endpoints
+"""
+
+import time
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.test import RequestFactory
+from django.urls import resolve
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from stays.models import Stay
+from vendors.models import Vendor
+
+from .cache_utils import invalidate_analytics_cache
+from .checkpoints import commit_checkpoints, dump_updates, load_checkpoints, load_updates
+from .dedup import demote_to_duplicates, fingerprint_fields, mark_duplicates, stored_pks
+from .keywords import extract_keywords
+from .landing import append_segment, read_segment, run_segment, segment_name
+from .models import PipelineRun, PipelineStageTiming, Place, SocialPost
+from .partitions import lock_post_keys
+from .rollups import rebuild_rollups, rollup_key
+from .scoring import refresh_place_scores
+
+CHUNK_SIZE = 50
+
+# Seconds of AI classification per chunk; the rest falls back to keyword matching
+CLASSIFY_BUDGET_SECONDS = 120
+
+# Endpoints re-read after invalidation so the first dashboard visit is a cache hit
+WARM_ENDPOINTS = [
+    '/api/overview-metrics/',
+    '/api/sentiment/summary/',
+    '/api/social/platforms/',
+    '/api/analytics/places/popular/',
+]
+
+PERSIST_FIELDS = [
+    'content', 'url', 'author_id', 'likes', 'comments', 'shares', 'views',
+    'is_tourism', 'sentiment', 'sentiment_score', 'confidence', 'extra',
+    'place', 'vendor', 'stay', 'simhash', 'simhash_b0', 'simhash_b1', 'simhash_b2', 'simhash_b3',
+    'is_duplicate', 'duplicate_of',
+]
+
+
+@contextmanager
+def record_stage(run_id, stage, chunk=None):
+    """
+    Time a stage and store a PipelineStageTiming row (also on failure).
+
+    Usage:
+        with record_stage(run_id, 'persist', chunk=3) as timing:
+            ...
+            timing['items'] = len(posts)
+    """
+    timing = {'items': 0}
+    started_at = timezone.now()
+    started = time.perf_counter()
+    succeeded = False
+    try:
+        yield timing
+        succeeded = True
+    finally:
+        PipelineStageTiming.objects.create(
+            run_id=run_id,
+            stage=stage,
+            chunk=chunk,
+            started_at=started_at,
+            duration_ms=int((time.perf_counter() - started) * 1000),
+            items=timing['items'],
+            succeeded=succeeded,
+        )
+
+
+def load_catalog():
+    """
+    Keywords to search for, plus an in-memory name → entity index so posts
+    can be matched without a query per post.
+
+    Returns:
+        (keywords, index) where index maps name.lower() → (entity_type, id)
+        (places win over vendors, vendors over stays, as before)
+    """
+    keywords, index = [], {}
+    sources = [
+        ('place', Place.objects.all()),
+        ('vendor', Vendor.objects.filter(is_active=True)),
+        ('stay', Stay.objects.filter(is_active=True)),
+    ]
+    for entity_type, qs in sources:
+        for pk, name in qs.values_list('id', 'name'):
+            keywords.append(name)
+            index.setdefault(name.lower(), (entity_type, pk))
+    return keywords, index
+
+
+def chunked(items, size=CHUNK_SIZE):
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+# ==========================================
+# Stages
+# ==========================================
+
+def fetch_posts(run_id, scraper=None):
+    """
+    Stage 1: fetch posts newer than the stored checkpoints.
+
+    The new cursors are parked on the PipelineRun; the rollup stage commits
+    them after every chunk has been persisted.
+
+    Idempotent per run: the cursors are parked before the landing segment is
+    renamed into place, so when the segment exists a retried fetch reads it
+    back instead of scraping again (and landing the same posts twice).
+    """
+    from .scraper import SocialMediaScraper
+
+    landed = run_segment(run_id)
+    if landed is not None:
+        posts = list(read_segment(landed))
+        print(f"♻️ Run #{run_id}: reusing {len(posts)} posts from {segment_name(landed)}")
+        return posts
+
+    keywords, _ = load_catalog()
+    if not keywords:
+        print("⚠️ No places, vendors, or stays found in database! Add some data first.")
+        return []
+
+    scraper = scraper or SocialMediaScraper()
+    posts, updates = scraper.collect(keywords, checkpoints=load_checkpoints())
+    
+    PipelineRun.objects.filter(pk=run_id).update(pending_checkpoints=dump_updates(updates))
+    # Keep the raw payloads so history can be replayed without re-scraping
+    append_segment(posts, run_id=run_id)
+    print(f"✅ Collected {len(posts)} raw posts for {len(keywords)} keywords")
+    return posts
+
+
+def classify_posts(posts, keywords, budget_seconds=CLASSIFY_BUDGET_SECONDS, classifier=None):
+    """
+    Stage 2: classify a chunk of posts.
+
+    AI classification runs until budget_seconds is spent; remaining posts use
+    keyword matching, so a slow model provider can't stall the run.
+    Near-duplicates flagged by mark_duplicates() are not classified again:
+    they inherit the canonical post's classification.
+    """
+    from .classifier import PostClassifier
+
+    classifier = classifier or PostClassifier(places_list=keywords)
+    deadline = time.monotonic() + budget_seconds
+
+    classified = []
+    for post in posts:
+        if 'classification' in post or post.get('duplicate_of'):
+            classified.append(post)
+            continue
+        use_ai = time.monotonic() < deadline
+        classified.append({**post, 'classification': classifier.classify_post(post['content'], use_ai=use_ai)})
+    return classified
+
+
+def init_worker():
+    """Process pool initializer (needed where workers are spawned, not forked)."""
+    import django
+    django.setup()
+
+
+def classify_segment(path, keywords, use_ai=False):
+    """
+    Worker entry point for replays: read one landing segment and classify it.
+    Does no database work, so it is safe to run in a process pool.
+    
+    Returns:
+        (path, classified posts)
+    """
+    from .classifier import PostClassifier
+
+    classifier = PostClassifier(places_list=keywords, use_ai=use_ai)
+    posts = list(read_segment(path))
+    budget = CLASSIFY_BUDGET_SECONDS if use_ai else 0
+    return str(path), classify_posts(posts, keywords, budget_seconds=budget, classifier=classifier)
+
+
+def classify_rows(rows, keywords, use_ai=False):
+    """
+    Worker entry point for reclassification: rows are {'pk', 'content'} dicts.
+    
+    Returns:
+        [(pk, classification), ...]
+    """
+    from .classifier import PostClassifier
+
+    classifier = PostClassifier(places_list=keywords, use_ai=use_ai)
+    budget = CLASSIFY_BUDGET_SECONDS if use_ai else 0
+    classified = classify_posts(rows, keywords, budget_seconds=budget, classifier=classifier)
+    return [(item['pk'], item['classification']) for item in classified]
+
+
+def persist_posts(classified, index):
+    """
+    Stage 3: upsert a chunk of classified posts in bulk.
+
+    Existing posts are found with one query (by platform and post_id, under
+    lock_post_keys()) and updated with bulk_update, keeping their stored
+    created_at; new ones are inserted with bulk_create (ignoring rows a
+    retried chunk already wrote). Near-duplicates take the classification
+    of their canonical post and are linked to it.
+
+    Returns:
+        {'added', 'updated', 'skipped', 'keys'} - keys are the rollup keys
+        touched (including the old entity/day of posts that moved)
+    """
+    skipped = 0
+    objects = {}
+    by_key = {(item['platform'], item['post_id']): item for item in classified}
+    for item in classified:
+        duplicate_of = tuple(item.get('duplicate_of') or ())
+        canonical = by_key.get(duplicate_of)
+        classification = canonical['classification'] if canonical else item.get('classification')
+        if not classification:
+            skipped += 1
+            continue
+        entity_name = classification.get('place_name') if classification.get('is_tourism') else None
+        entity = index.get(entity_name.lower()) if entity_name else None
+        if not entity:
+            skipped += 1
+            continue
+
+        entity_type, entity_id = entity
+        objects[(item['platform'], item['post_id'])] = SocialPost(
+            platform=item['platform'],
+            post_id=item['post_id'],
+            place_id=entity_id if entity_type == 'place' else None,
+            vendor_id=entity_id if entity_type == 'vendor' else None,
+            stay_id=entity_id if entity_type == 'stay' else None,
+            content=item['content'],
+            url=item['url'],
+            author_id=str(item.get('author_id') or ''),
+            created_at=parse_datetime(item['created_at']) or timezone.now(),
+            likes=item['likes'],
+            comments=item['comments'],
+            shares=item['shares'],
+            views=item['views'],
+            is_tourism=True,
+            sentiment=classification['sentiment'],
+            sentiment_score=classification.get('sentiment_score', 0.0),
+            confidence=classification['confidence'],
+            extra={
+                'sentiment': classification['sentiment'],
+                'confidence': classification['confidence'],
+                'keywords': item.get('keywords', []),
+                'topics': extract_keywords(item['content']),
+            },
+            is_duplicate=bool(duplicate_of),
+            **fingerprint_fields(item.get('simhash')),
+        )
+
+    keys = []
+    to_update = []
+    with transaction.atomic():
+        # The lookup below is what keeps (platform, post_id) unique: on a
+        # partitioned table the constraint includes created_at, so
+        # ignore_conflicts alone would let a re-fetched post with another
+        # created_at in. The lock stops parallel chunks racing past it.
+        lock_post_keys(objects)
+        existing = (
+            SocialPost.objects
+            .filter(post_id__in={post_id for _, post_id in objects})
+            .values_list('id', 'platform', 'post_id', 'place_id', 'vendor_id', 'stay_id', 'created_at')
+        )
+        for pk, platform, post_id, place_id, vendor_id, stay_id, created_at in existing:
+            obj = objects.pop((platform, post_id), None)
+            if obj is None:
+                continue
+            obj.pk = pk
+            obj.created_at = created_at  # never moves (and never takes the parse-failure fallback)
+            to_update.append(obj)
+            for entity_type, entity_id in (('place', place_id), ('vendor', vendor_id), ('stay', stay_id)):
+                if entity_id:
+                    keys.append(rollup_key(entity_type, entity_id, created_at))
+
+        to_create = list(objects.values())
+        SocialPost.objects.bulk_update(to_update, PERSIST_FIELDS, batch_size=200)
+        SocialPost.objects.bulk_create(to_create, batch_size=200, ignore_conflicts=True)
+
+    keys.extend(_link_duplicates(classified))
+
+    for obj in to_update + to_create:
+        for entity_type in ('place', 'vendor', 'stay'):
+            entity_id = getattr(obj, f'{entity_type}_id')
+            if entity_id:
+                keys.append(rollup_key(entity_type, entity_id, obj.created_at))
+
+    return {'added': len(to_create), 'updated': len(to_update), 'skipped': skipped, 'keys': keys}
+
+
+def _link_duplicates(classified):
+    """
+    Point duplicates at their canonical post (by pk, now that both are
+    stored) and demote stored posts that turned out newer than a post of
+    this batch.
+
+    Returns:
+        Rollup keys of demoted posts
+    """
+    links = {
+        (item['platform'], item['post_id']): tuple(item['duplicate_of'])
+        for item in classified if item.get('duplicate_of')
+    }
+    demotes = {
+        tuple(demoted): (item['platform'], item['post_id'])
+        for item in classified for demoted in item.get('demotes', ())
+    }
+    if not links and not demotes:
+        return []
+    pks = stored_pks(set(links) | set(links.values()) | set(demotes) | set(demotes.values()))
+    duplicates = [
+        SocialPost(pk=pks[key], duplicate_of_id=pks.get(canonical))
+        for key, canonical in links.items() if key in pks
+    ]
+    SocialPost.objects.bulk_update(duplicates, ['duplicate_of'], batch_size=200)
+    return demote_to_duplicates({
+        pks[key]: pks[canonical] for key, canonical in demotes.items() if key in pks and canonical in pks
+    })
+
+
+def finish_rollup(run_id, chunk_results):
+    """
+    Stage 4: rebuild rollups for every touched key, re-score places from
+    the rollups, then commit the fetch stage's checkpoints (all chunks are
+    persisted by now).
+    """
+    keys = {tuple(key) for result in chunk_results for key in result['keys']}
+    written = rebuild_rollups(keys)
+    scores = refresh_place_scores()
+
+    run = PipelineRun.objects.get(pk=run_id)
+    committed = commit_checkpoints(load_updates(run.pending_checkpoints))
+
+    stats = {
+        'added': sum(r['added'] for r in chunk_results),
+        'updated': sum(r['updated'] for r in chunk_results),
+        'skipped': sum(r['skipped'] for r in chunk_results),
+        'rollup_rows': written,
+        **scores,
+        'checkpoints': committed,
+    }
+    PipelineRun.objects.filter(pk=run_id).update(stats=stats, pending_checkpoints=[])
+    return stats
+
+
+def warm_cache(endpoints=WARM_ENDPOINTS):
+    """Stage 5: invalidate analytics cache and re-read the main endpoints."""
+    try:
+        deleted_keys = invalidate_analytics_cache()
+        print(f"✅ Cache invalidation complete! {deleted_keys} keys removed.")
+    except Exception as e:
+        print(f"⚠️ Cache invalidation failed (non-critical): {e}")
+
+    factory = RequestFactory(HTTP_HOST='localhost')
+    warmed = 0
+    for path in endpoints:
+        try:
+            match = resolve(path)
+            response = match.func(factory.get(path), *match.args, **match.kwargs)
+            if response.status_code < 400:
+                warmed += 1
+        except Exception as e:
+            print(f"⚠️ Could not warm {path}: {e}")
+    return warmed
+
+
+def finish_run(run_id, status='succeeded'):
+    PipelineRun.objects.filter(pk=run_id).update(status=status, finished_at=timezone.now())
+
+
+# ==========================================
+# Inline runner (no broker)
+# ==========================================
+
+def run_inline(scraper=None, classifier=None):
+    """
+    Run every stage in this process, in order. Used when Celery isn't
+    configured and for tests; produces the same rows and timings.
+    """
+    run = PipelineRun.objects.create()
+    try:
+        with record_stage(run.pk, 'fetch') as timing:
+            posts = fetch_posts(run.pk, scraper=scraper)
+            timing['items'] = len(posts)
+
+        keywords, index = load_catalog()
+        results = []
+        for number, chunk in enumerate(chunked(posts)):
+            with record_stage(run.pk, 'classify', chunk=number) as timing:
+                mark_duplicates(chunk)
+                classified = classify_posts(chunk, keywords, classifier=classifier)
+                timing['items'] = len(classified)
+            with record_stage(run.pk, 'persist', chunk=number) as timing:
+                results.append(persist_posts(classified, index))
+                timing['items'] = len(classified)
+
+        with record_stage(run.pk, 'rollup') as timing:
+            stats = finish_rollup(run.pk, results)
+            timing['items'] = stats['rollup_rows']
+
+        with record_stage(run.pk, 'warm') as timing:
+            timing['items'] = warm_cache()
+    except Exception:
+        finish_run(run.pk, 'failed')
+        raise
+
+    finish_run(run.pk)
+    run.refresh_from_db()
+    return run
@@ -0,0 +1,159 @@
+"""
+Search Query Planner
+====================
+Packs hundreds of place / vendor / stay names into a handful of OR-combined
+search queries instead of one API call per keyword.
+
+- Keywords are packed greedily within each platform's query length and
+  term limits (multi-word names are quoted as phrases)
+- Keywords with similar checkpoints are packed together, and a packed query
+  resumes from the oldest since_id of its members
+- Returned posts are mapped back to the keywords they mention locally
+  (KeywordMatcher), so per-keyword stats and cursors still work
+
+Usage:
+    groups = pack_keywords(keywords, platform='twitter', checkpoints=checkpoints)
+    for group in groups:
+        query = build_query(group, platform='twitter')
+"""
+
+import re
+
+# Per-platform search limits (Twitter v2 recent search: 512 chars per query)
+PLATFORM_QUERY_LIMITS = {
+    'twitter': {'max_length': 512, 'max_terms': 25, 'suffix': ' -is:retweet'},
+}
+
+
+def quote_term(keyword):
+    """Quote multi-word names so they're searched as a phrase."""
+    keyword = keyword.replace('"', '').strip()
+    return f'"{keyword}"' if re.search(r'[^\w]', keyword) else keyword
+
+
+def build_query(keywords, platform='twitter'):
+    """Build the OR-combined query string for a group of keywords."""
+    suffix = PLATFORM_QUERY_LIMITS[platform]['suffix']
+    terms = [quote_term(keyword) for keyword in keywords]
+    if len(terms) == 1:
+        return terms[0] + suffix
+    return '(' + ' OR '.join(terms) + ')' + suffix
+
+
+def _since_sort_key(keyword, platform, checkpoints):
+    since_id = (checkpoints.get((platform, keyword)) or {}).get('since_id') or ''
+    # Keywords without a checkpoint first, then oldest since_id first
+    return (len(since_id), since_id, keyword.lower())
+
+
+def pack_keywords(keywords, platform='twitter', checkpoints=None):
+    """
+    Split keywords into groups that each fit in one search query.
+
+    Keywords whose last walk was parked mid-way (paging_token) get their own
+    group, because a paging token is only valid for the query that issued it.
+
+    Returns:
+        List of keyword lists
+    """
+    limits = PLATFORM_QUERY_LIMITS[platform]
+    checkpoints = checkpoints or {}
+
+    # Case-insensitive de-dup (a place and a vendor can share a name)
+    unique = {}
+    for keyword in keywords:
+        keyword = keyword.strip()
+        if keyword:
+            unique.setdefault(keyword.lower(), keyword)
+
+    groups, packable = [], []
+    for keyword in unique.values():
+        if (checkpoints.get((platform, keyword)) or {}).get('paging_token'):
+            groups.append([keyword])
+        elif len(build_query([keyword], platform)) > limits['max_length']:
+            print(f"⚠️ Keyword too long for a {platform} query, skipping: {keyword[:40]}...")
+        else:
+            packable.append(keyword)
+
+    packable.sort(key=lambda keyword: _since_sort_key(keyword, platform, checkpoints))
+
+    current = []
+    for keyword in packable:
+        candidate = current + [keyword]
+        if current and (len(candidate) > limits['max_terms']
+                        or len(build_query(candidate, platform)) > limits['max_length']):
+            groups.append(current)
+            candidate = [keyword]
+        current = candidate
+    if current:
+        groups.append(current)
+
+    return groups
+
+
+def group_cursor(keywords, platform, checkpoints):
+    """
+    Starting cursor for a packed query: the oldest since_id of its members
+    (no since_id at all if any member has never been scraped).
+    """
+    cursors = [checkpoints.get((platform, keyword)) or {} for keyword in keywords]
+    if len(cursors) == 1:
+        return cursors[0]
+
+    since_ids = [cursor.get('since_id') for cursor in cursors]
+    timestamps = [cursor.get('last_timestamp') for cursor in cursors]
+    return {
+        'since_id': '' if not all(since_ids) else min(since_ids, key=int),
+        'last_timestamp': None if not all(timestamps) else min(timestamps),
+    }
+
+
+def distribute_cursor(cursor, keywords, platform, checkpoints):
+    """
+    Give every member keyword the cursor of a completed packed walk, never
+    moving a keyword's own since_id backwards.
+    """
+    updates = {}
+    for keyword in keywords:
+        own = checkpoints.get((platform, keyword)) or {}
+        merged = dict(cursor)
+        if own.get('since_id') and (not merged.get('since_id') or int(own['since_id']) > int(merged['since_id'])):
+            merged['since_id'] = own['since_id']
+            merged['last_timestamp'] = own.get('last_timestamp') or merged.get('last_timestamp')
+        updates[(platform, keyword)] = merged
+    return updates
+
+
+class KeywordMatcher:
+    """
+    Maps post text back to the keywords it mentions (case-insensitive,
+    whole words only).
+
+    Usage:
+        matcher = KeywordMatcher(['Langkawi', 'Alor Setar'])
+        matcher.match('Sunset at alor setar tower')  # ['Alor Setar']
+    """
+
+    def __init__(self, keywords):
+        self._by_lower = {}
+        for keyword in keywords:
+            self._by_lower.setdefault(keyword.strip().lower(), keyword.strip())
+        self._by_lower.pop('', None)
+
+        # Longest first so "Alor Setar" wins over "Setar" at the same position
+        alternatives = sorted(self._by_lower, key=len, reverse=True)
+        self._pattern = re.compile(
+            r'(?<!\w)(' + '|'.join(re.escape(k) for k in alternatives) + r')(?!\w)',
+            re.IGNORECASE,
+        ) if alternatives else None
+
+    def match(self, text):
+        """Return matched keywords in order of first appearance."""
+        if not self._pattern or not text:
+            return []
+        found = []
+        for m in self._pattern.finditer(text):
+            keyword = self._by_lower[m.group(1).lower()]
+            if keyword not in found:
+                found.append(keyword)
+        return found
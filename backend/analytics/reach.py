@@ -0,0 +1,99 @@
+"""
+Unique Reach (distinct authors)
+===============================
+Keeps one HyperLogLog sketch of post authors per entity × day
+(AuthorSketch), rebuilt together with the daily rollups, and merges them
+for "unique authors over any range / city" without a COUNT(DISTINCT) over
+the posts.
+
+Authors are counted per platform ("twitter:12345"), so equal ids on two
+platforms aren't merged. Posts without an author and near-duplicates are
+ignored, so the sketches cover the same posts as the canonical post counts
+(see city_filter() for the matching city filter).
+
+Usage:
+    rebuild_author_sketches('place', {3, 7}, {date(2025, 1, 5)})
+    unique_authors(start, end, city='Langkawi')   # → (estimate, relative error)
+"""
+
+from collections import defaultdict
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import AuthorSketch, SocialPost
+from .sketches import HyperLogLog
+
+# entity_type → (model, city field)
+ENTITY_CITY_FIELDS = {
+    'place': ('analytics.Place', 'city'),
+    'vendor': ('vendors.Vendor', 'city'),
+    'stay': ('stays.Stay', 'district'),
+}
+
+
+def rebuild_author_sketches(entity_type, ids, days):
+    """
+    Recompute AuthorSketch rows for every (entity, day) in ids × days.
+
+    Returns:
+        Number of sketches written
+    """
+    field = f'{entity_type}_id'
+    model_name, city_field = ENTITY_CITY_FIELDS[entity_type]
+    cities = dict(apps.get_model(model_name).objects.filter(pk__in=ids).values_list('pk', city_field))
+
+    sketches = defaultdict(HyperLogLog)
+    posts = (
+        SocialPost.objects
+        .canonical()
+        .in_window(min(days), max(days))
+        .filter(**{f'{field}__in': ids})
+        .exclude(author_id='')
+        .values_list(field, 'created_at', 'platform', 'author_id')
+    )
+    for entity_id, created_at, platform, author_id in posts.iterator(chunk_size=2000):
+        day = timezone.localtime(created_at).date()
+        if day in days:
+            sketches[(entity_id, day)].add(f'{platform}:{author_id}')
+
+    rows = [
+        AuthorSketch(
+            entity_type=entity_type, entity_id=entity_id, date=day,
+            city=cities.get(entity_id) or '', registers=sketch.to_bytes(),
+        )
+        for (entity_id, day), sketch in sketches.items()
+    ]
+    with transaction.atomic():
+        AuthorSketch.objects.filter(entity_type=entity_type, entity_id__in=ids, date__in=days).delete()
+        AuthorSketch.objects.bulk_create(rows, batch_size=500)
+    return len(rows)
+
+
+def city_filter(city, prefix=''):
+    """
+    Q for posts whose entity (place, vendor or stay) is in `city` - the
+    same city each entity's AuthorSketch rows are filed under.
+    """
+    query = Q()
+    for entity_type, (_, city_field) in ENTITY_CITY_FIELDS.items():
+        query |= Q(**{f'{prefix}{entity_type}__{city_field}__iexact': city})
+    return query
+
+
+def unique_authors(start, end, city=None):
+    """
+    Estimated distinct authors of posts created on days start..end.
+
+    Returns:
+        (estimate, relative standard error)
+    """
+    qs = AuthorSketch.objects.filter(date__range=[start, end])
+    if city:
+        qs = qs.filter(city__iexact=city)
+    merged = HyperLogLog.merge(
+        HyperLogLog.from_bytes(registers) for registers in qs.values_list('registers', flat=True).iterator()
+    )
+    return round(merged.estimate()), merged.relative_error
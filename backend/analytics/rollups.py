@@ -0,0 +1,229 @@
+"""
+Daily Rollups
+=============
+Maintains EntityDailyRollup: posts / engagement / sentiment totals per
+entity (place, vendor, stay) × day × platform, and PlacePeriodRollup: the
+same totals per place × week / month × platform, summed from the daily rows
+(the 0022 migration seeded it from SocialPost directly).
+
+Rollups are always rebuilt from SocialPost for the keys that changed, so
+the rollup stage is idempotent and safe to retry. Near-duplicates
+(analytics/dedup.py) are not counted. Daily topic counts (SentimentTopic,
+analytics/keywords.py) and unique-author sketches (AuthorSketch,
+analytics/reach.py) are rebuilt for the same days. Days before the archive
+watermark (see analytics/archive.py) are left alone: their posts live in
+cold archive files now and the rollups are the only copy of the totals.
+
+Usage:
+    keys = [('place', 3, '2025-01-05'), ...]   # from the persist stage
+    rebuild_rollups(keys)
+    rebuild_all_rollups()                      # backfill: every day with posts
+"""
+
+from collections import Counter, defaultdict
+from datetime import date, timedelta
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .checkpoints import archive_watermark
+from .keywords import rebuild_topics
+from .models import EntityDailyRollup, Place, PlacePeriodRollup, SocialPost, created_window
+from .reach import rebuild_author_sketches
+
+ENTITY_FIELDS = {
+    'place': 'place_id',
+    'vendor': 'vendor_id',
+    'stay': 'stay_id',
+}
+
+
+ROLLUP_TOTALS = (
+    'posts', 'likes', 'comments', 'shares', 'views',
+    'positive', 'neutral', 'negative', 'sentiment_score_sum', 'confidence_sum',
+)
+
+PERIODS = ('week', 'month')
+
+
+def period_start(day, period):
+    """First day of the week (Monday) or month containing day."""
+    if period == 'week':
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def period_end(start, period):
+    """Last day of the period starting at start."""
+    if period == 'week':
+        return start + timedelta(days=6)
+    return (start.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+
+
+def rollup_key(entity_type, entity_id, created_at):
+    """JSON-friendly rollup key for a post (day in the project timezone)."""
+    return [entity_type, entity_id, timezone.localtime(created_at).date().isoformat()]
+
+
+def rebuild_rollups(keys):
+    """
+    Recompute rollup rows for the given (entity_type, entity_id, day) keys.
+
+    Every (entity, day) pair in the cross product of the touched entities and
+    days is rebuilt, so rows for platforms that no longer have posts are
+    removed as well.
+
+    Returns:
+        Number of rollup rows written (topic rows not included)
+    """
+    watermark = archive_watermark()
+    touched = defaultdict(lambda: (set(), set()))
+    for entity_type, entity_id, day in keys:
+        if entity_type not in ENTITY_FIELDS or entity_id is None:
+            continue
+        day = day if isinstance(day, date) else date.fromisoformat(day)
+        if watermark and day < watermark:
+            continue
+        ids, days = touched[entity_type]
+        ids.add(int(entity_id))
+        days.add(day)
+
+    written = 0
+    rebuild_topics(set().union(*(days for _, days in touched.values())))
+    for entity_type, (ids, days) in touched.items():
+        field = ENTITY_FIELDS[entity_type]
+
+        rows = (
+            SocialPost.objects
+            .canonical()
+            .in_window(min(days), max(days))
+            .filter(**{f'{field}__in': ids})
+            .annotate(day=TruncDate('created_at'))
+            .values(field, 'day', 'platform')
+            .annotate(
+                post_count=Count('id'),
+                like_sum=Sum('likes'),
+                comment_sum=Sum('comments'),
+                share_sum=Sum('shares'),
+                view_sum=Sum('views'),
+                positive_count=Count('id', filter=Q(sentiment='positive')),
+                neutral_count=Count('id', filter=Q(sentiment='neutral')),
+                negative_count=Count('id', filter=Q(sentiment='negative')),
+                score_sum=Sum('sentiment_score'),
+                conf_sum=Sum('confidence'),
+            )
+        )
+
+        rollups = [
+            EntityDailyRollup(
+                entity_type=entity_type,
+                entity_id=row[field],
+                date=row['day'],
+                platform=row['platform'],
+                posts=row['post_count'],
+                likes=row['like_sum'] or 0,
+                comments=row['comment_sum'] or 0,
+                shares=row['share_sum'] or 0,
+                views=row['view_sum'] or 0,
+                positive=row['positive_count'],
+                neutral=row['neutral_count'],
+                negative=row['negative_count'],
+                sentiment_score_sum=row['score_sum'] or 0.0,
+                confidence_sum=row['conf_sum'] or 0.0,
+            )
+            for row in rows
+            if row['day'] in days
+        ]
+
+        with transaction.atomic():
+            EntityDailyRollup.objects.filter(
+                entity_type=entity_type, entity_id__in=ids, date__in=days,
+            ).delete()
+            EntityDailyRollup.objects.bulk_create(rollups, batch_size=500)
+        written += len(rollups)
+        rebuild_author_sketches(entity_type, ids, days)
+        if entity_type == 'place':
+            rebuild_period_rollups(ids, days)
+
+    return written
+
+
+def rebuild_period_rollups(place_ids, days):
+    """
+    Recompute the weekly and monthly rows of the given places for every
+    period containing one of the days, from EntityDailyRollup.
+
+    Returns:
+        Number of period rows written
+    """
+    place_ids = set(Place.objects.filter(pk__in=place_ids).values_list('pk', flat=True))
+    if not place_ids or not days:
+        return 0
+
+    written = 0
+    for period in PERIODS:
+        starts = {period_start(day, period) for day in days}
+        daily = (
+            EntityDailyRollup.objects
+            .filter(entity_type='place', entity_id__in=place_ids,
+                    date__range=[min(starts), period_end(max(starts), period)])
+            .values('entity_id', 'date', 'platform', *ROLLUP_TOTALS)
+        )
+        totals = defaultdict(Counter)
+        for row in daily.iterator(chunk_size=2000):
+            start = period_start(row['date'], period)
+            if start in starts:
+                totals[(row['entity_id'], start, row['platform'])].update(
+                    {field: row[field] for field in ROLLUP_TOTALS})
+
+        rows = [
+            PlacePeriodRollup(place_id=place_id, period=period, period_start=start, platform=platform,
+                              **{field: total[field] for field in ROLLUP_TOTALS})
+            for (place_id, start, platform), total in totals.items()
+        ]
+        with transaction.atomic():
+            PlacePeriodRollup.objects.filter(
+                place_id__in=place_ids, period=period, period_start__in=starts,
+            ).delete()
+            PlacePeriodRollup.objects.bulk_create(rows, batch_size=500)
+        written += len(rows)
+    return written
+
+
+def rebuild_all_rollups(since=None, days_per_batch=31):
+    """
+    Rebuild every rollup (daily and period rows, topics, term and author
+    sketches) for every day that has posts, since `since` (never before the
+    archive watermark), a batch of days at a time.
+
+    Backfills posts that never went through the persist stage: rows stored
+    before the rollup tables existed, or written directly by seed scripts.
+
+    Returns:
+        {'days': days rebuilt, 'rollup_rows': daily rollup rows written}
+    """
+    watermark = archive_watermark()
+    since = max(filter(None, (since, watermark)), default=None)
+    posts = SocialPost.objects.in_window(since, None).annotate(day=TruncDate('created_at')).order_by()
+    days = sorted(posts.values_list('day', flat=True).distinct())
+
+    written = 0
+    for start in range(0, len(days), days_per_batch):
+        batch = days[start:start + days_per_batch]
+        keys, keyed_days = [], set()
+        rows = (
+            posts.filter(created_window(batch[0], batch[-1]))
+            .values_list('place_id', 'vendor_id', 'stay_id', 'day')
+            .distinct()
+        )
+        for place_id, vendor_id, stay_id, day in rows.iterator():
+            for entity_type, entity_id in (('place', place_id), ('vendor', vendor_id), ('stay', stay_id)):
+                if entity_id:
+                    keys.append((entity_type, entity_id, day))
+                    keyed_days.add(day)
+        written += rebuild_rollups(keys)
+        # Topics cover posts without an entity too; rebuild_rollups() only reaches keyed days
+        rebuild_topics(set(batch) - keyed_days)
+    return {'days': len(days), 'rollup_rows': written}
@@ -0,0 +1,302 @@
+"""
+Place Scoring
+=============
+Batch scores computed once per collection run (from EntityDailyRollup,
+never from raw posts), so dashboard cards read a small ranked table.
+
+Visit tiers: places with posts are split at the 33rd / 67th percentile of
+total engagement (likes + comments + shares), separately for every scope:
+all places, each city, each category and each city × category, so a
+city's most / least visited places are relative to that city. Each place's
+tiers are stored in PlaceVisitTier and per-tier totals for every scope in
+VisitTierSummary, which back PlacesByVisitLevelView and
+SentimentComparisonView (see visit_tier_scope()).
+
+Hidden gems are places in the least-visited tier with positive average
+sentiment, ranked by
+
+    score = ((avg_sentiment + 1) / 2) × positive_share × (1 - engagement_percentile / 100)
+
+i.e. well-liked, and the less engagement the better.
+"""
+
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Case, CharField, F, Sum, Value, When
+from django.utils import timezone
+
+from .models import EntityDailyRollup, HiddenGemScore, Place, PlaceVisitTier, VisitTierSummary
+
+TIER_LOW = 33
+TIER_HIGH = 67
+
+# Too few posts for the average sentiment to mean much
+MIN_GEM_POSTS = 3
+
+
+def percentile(values, q):
+    """q-th percentile with linear interpolation (numpy.percentile's default)."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def place_stats():
+    """
+    All-time totals per place that has posts, from the daily rollups.
+
+    Returns:
+        List of dicts: place_id, posts, engagement, positive, neutral,
+        negative, avg_sentiment
+    """
+    rows = (
+        EntityDailyRollup.objects
+        .filter(entity_type='place')
+        .values('entity_id')
+        .annotate(
+            post_count=Sum('posts'),
+            engagement=Sum(F('likes') + F('comments') + F('shares')),
+            positive_count=Sum('positive'),
+            neutral_count=Sum('neutral'),
+            negative_count=Sum('negative'),
+            score_sum=Sum('sentiment_score_sum'),
+        )
+        .filter(post_count__gt=0)
+    )
+    return [
+        {
+            'place_id': row['entity_id'],
+            'posts': row['post_count'],
+            'engagement': row['engagement'] or 0,
+            'positive': row['positive_count'],
+            'neutral': row['neutral_count'],
+            'negative': row['negative_count'],
+            'avg_sentiment': (row['score_sum'] or 0.0) / row['post_count'],
+        }
+        for row in rows
+    ]
+
+
+def assign_tiers(stats):
+    """
+    Add 'tier' (most / medium / least) and 'engagement_percentile' to each
+    stats dict, in place.
+
+    Returns:
+        (p33, p67) engagement thresholds
+    """
+    engagements = sorted(s['engagement'] for s in stats)
+    p33, p67 = percentile(engagements, TIER_LOW), percentile(engagements, TIER_HIGH)
+    for s in stats:
+        below = bisect_left(engagements, s['engagement'])
+        equal = bisect_right(engagements, s['engagement']) - below
+        s['engagement_percentile'] = 100 * (below + 0.5 * equal) / len(engagements)
+        s['tier'] = tier_of(s['engagement'], p33, p67)
+    return p33, p67
+
+
+def tier_of(engagement, p33, p67):
+    if engagement >= p67:
+        return 'most'
+    if engagement <= p33:
+        return 'least'
+    return 'medium'
+
+
+def summarize_scope(stats, city='', category='', now=None):
+    """
+    Cut tiers over the places in one scope and total them per tier.
+
+    Returns:
+        ({place_id: tier}, [unsaved VisitTierSummary per tier])
+    """
+    engagements = [s['engagement'] for s in stats]
+    p33, p67 = percentile(engagements, TIER_LOW), percentile(engagements, TIER_HIGH)
+    tiers = {s['place_id']: tier_of(s['engagement'], p33, p67) for s in stats}
+
+    totals = defaultdict(lambda: defaultdict(float))
+    for s in stats:
+        total = totals[tiers[s['place_id']]]
+        total['places'] += 1
+        total['sentiment_sum'] += s['avg_sentiment']
+        for field in ('posts', 'engagement', 'positive', 'neutral', 'negative'):
+            total[field] += s[field]
+
+    summaries = [
+        VisitTierSummary(
+            tier=tier, city=city, category=category,
+            places=int(total['places']),
+            posts=int(total['posts']),
+            engagement=int(total['engagement']),
+            positive=int(total['positive']),
+            neutral=int(total['neutral']),
+            negative=int(total['negative']),
+            avg_sentiment=total['sentiment_sum'] / total['places'],
+            p33=p33, p67=p67,
+            computed_at=now or timezone.now(),
+        )
+        for tier, total in totals.items()
+    ]
+    return tiers, summaries
+
+
+def refresh_visit_tiers(stats=None):
+    """
+    Recompute PlaceVisitTier and VisitTierSummary, with tiers cut
+    separately in every city / category scope.
+
+    Returns:
+        Number of places tiered
+    """
+    stats = stats if stats is not None else place_stats()
+    assign_tiers(stats)  # engagement_percentile among all places
+
+    places = Place.objects.in_bulk([s['place_id'] for s in stats])
+    stats = [s for s in stats if s['place_id'] in places]
+    scopes = defaultdict(list)
+    for s in stats:
+        place = places[s['place_id']]
+        s['scopes'] = (('', ''), (place.city or '', ''), ('', place.category or ''),
+                       (place.city or '', place.category or ''))
+        for scope in set(s['scopes']):
+            scopes[scope].append(s)
+
+    now = timezone.now()
+    scope_tiers, summaries = {}, []
+    for (city, category), members in scopes.items():
+        scope_tiers[(city, category)], rows = summarize_scope(members, city, category, now)
+        summaries.extend(rows)
+
+    tiers = []
+    for s in stats:
+        place = places[s['place_id']]
+        overall, by_city, by_category, by_both = (scope_tiers[scope][place.pk] for scope in s['scopes'])
+        tiers.append(PlaceVisitTier(
+            place=place,
+            tier=overall,
+            city_tier=by_city,
+            category_tier=by_category,
+            scope_tier=by_both,
+            city=place.city or '',
+            category=place.category or '',
+            posts=s['posts'],
+            engagement=s['engagement'],
+            positive=s['positive'],
+            neutral=s['neutral'],
+            negative=s['negative'],
+            avg_sentiment=s['avg_sentiment'],
+            engagement_percentile=s['engagement_percentile'],
+            computed_at=now,
+        ))
+    with transaction.atomic():
+        PlaceVisitTier.objects.all().delete()
+        PlaceVisitTier.objects.bulk_create(tiers, batch_size=500)
+        VisitTierSummary.objects.all().delete()
+        VisitTierSummary.objects.bulk_create(summaries, batch_size=500)
+    return len(tiers)
+
+
+def visit_tier_scope(city='', category=''):
+    """
+    Precomputed tiers for the ?city= / ?category= filters of the visit-tier
+    views. city matches stored cities case-insensitively as a substring
+    (an exact match wins); category matches case-insensitively. When a
+    partial city matches several cities, their places are tiered together
+    at request time, since no stored scope covers them.
+
+    Returns:
+        ({tier: VisitTierSummary}, PlaceVisitTier queryset annotated with
+        scope_tier_level, the place's tier within the scope) - both empty
+        when nothing matches
+    """
+    summaries = VisitTierSummary.objects.filter(category__iexact=category)
+    summaries = summaries.filter(city__icontains=city) if city else summaries.filter(city='')
+    by_city = defaultdict(dict)
+    for summary in summaries:
+        by_city[summary.city][summary.tier] = summary
+    exact = [name for name in by_city if name.lower() == city.lower()]
+    matched = exact or list(by_city)
+
+    tiers = PlaceVisitTier.objects.select_related('place').order_by('-engagement', 'place_id')
+    if category:
+        tiers = tiers.filter(category__iexact=category)
+    if city:
+        tiers = tiers.filter(city__in=matched)
+    if len(matched) == 1:
+        column = {(False, False): 'tier', (True, False): 'city_tier',
+                  (False, True): 'category_tier', (True, True): 'scope_tier'}[(bool(city), bool(category))]
+        return by_city[matched[0]], tiers.annotate(scope_tier_level=F(column))
+    if not matched:
+        return {}, tiers.none()
+
+    stats = list(tiers.values('place_id', 'posts', 'engagement', 'positive', 'neutral', 'negative', 'avg_sentiment'))
+    levels, rows = summarize_scope(stats, city, category)
+    by_level = defaultdict(list)
+    for place_id, level in levels.items():
+        by_level[level].append(place_id)
+    level = Case(*(When(place_id__in=ids, then=Value(tier)) for tier, ids in by_level.items()),
+                 output_field=CharField())
+    return {summary.tier: summary for summary in rows}, tiers.annotate(scope_tier_level=level)
+
+
+def refresh_place_scores():
+    """
+    Recompute visit tiers and hidden gems from one pass over the rollups.
+
+    Returns:
+        {'visit_tiers': n, 'hidden_gems': n}
+    """
+    stats = place_stats()
+    return {'visit_tiers': refresh_visit_tiers(stats), 'hidden_gems': refresh_hidden_gems(stats)}
+
+
+def refresh_hidden_gems(stats=None):
+    """
+    Recompute the HiddenGemScore table.
+
+    Returns:
+        Number of hidden gems ranked
+    """
+    stats = stats if stats is not None else place_stats()
+    assign_tiers(stats)
+
+    candidates = []
+    for s in stats:
+        if s['tier'] != 'least' or s['posts'] < MIN_GEM_POSTS or s['avg_sentiment'] <= 0:
+            continue
+        positive_share = s['positive'] / s['posts']
+        score = ((s['avg_sentiment'] + 1) / 2) * positive_share * (1 - s['engagement_percentile'] / 100)
+        candidates.append((score, s, positive_share))
+
+    places = Place.objects.in_bulk([s['place_id'] for _, s, _ in candidates])
+    now = timezone.now()
+    ranked = sorted(
+        (c for c in candidates if c[1]['place_id'] in places),
+        key=lambda c: (-c[0], c[1]['engagement'], c[1]['place_id']),
+    )
+    gems = [
+        HiddenGemScore(
+            place_id=s['place_id'],
+            rank=rank,
+            score=round(score, 6),
+            city=places[s['place_id']].city,
+            category=places[s['place_id']].category,
+            posts=s['posts'],
+            engagement=s['engagement'],
+            avg_sentiment=s['avg_sentiment'],
+            positive_share=positive_share,
+            engagement_percentile=s['engagement_percentile'],
+            computed_at=now,
+        )
+        for rank, (score, s, positive_share) in enumerate(ranked, 1)
+    ]
+    with transaction.atomic():
+        HiddenGemScore.objects.all().delete()
+        HiddenGemScore.objects.bulk_create(gems, batch_size=500)
+    return len(gems)
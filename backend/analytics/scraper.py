@@ -7,14 +7,22 @@ Works with or without API keys (gracefully degrades to demo data).
 
 import os
 import sys
+import asyncio
 from datetime import timedelta
 import random
 
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 
 # Add the parent directory to the path so we can import config
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from analytics.fetch import FetchPool
+from analytics.checkpoints import advance_cursor
+from analytics.query_planner import (
+    KeywordMatcher, build_query, distribute_cursor, group_cursor, pack_keywords,
+)
+
 try:
     from config import (
         TWITTER_BEARER_TOKEN,
@@ -30,44 +38,58 @@ except ImportError:
     USE_DEMO_DATA = True
 
 
+TWITTER_API_BASE = "https://api.twitter.com/2"
+GRAPH_API_BASE = "https://graph.facebook.com/v18.0"
+
+# Incremental collection: pages fetched per platform × keyword before the
+# walk is parked (its paging token is checkpointed and resumed next run)
+DEFAULT_MAX_PAGES = 10
+TWITTER_PAGE_SIZE = 100
+INSTAGRAM_PAGE_SIZE = 100
+TWEET_FIELDS = 'public_metrics,created_at,author_id'
+MEDIA_FIELDS = 'id,caption,media_type,media_url,permalink,timestamp,like_count,comments_count,username'
+
+
 class SocialMediaScraper:
     """
     Scrapes social media posts about tourism locations.
     Automatically detects which platforms are available based on API keys.
+
+    All platforms are fetched concurrently through the async fetch layer
+    (analytics/fetch.py): one pooled HTTP client per platform, per-host
+    concurrency limits, timeouts and retries.
     """
     
-    def __init__(self):
+    def __init__(self, twitter_api_base=TWITTER_API_BASE, graph_api_base=GRAPH_API_BASE,
+                 twitter_bearer_token=None, facebook_access_token=None, fetch_options=None):
+        """
+        Args:
+            twitter_api_base / graph_api_base: API roots (point these at the
+                local stub server for tests and load runs)
+            twitter_bearer_token / facebook_access_token: override config.py keys
+            fetch_options: PlatformFetcher options (timeout, retries, per_host_limit, ...)
+        """
+        self.twitter_api_base = twitter_api_base
+        self.graph_api_base = graph_api_base
+        self.fetch_options = fetch_options or {}
         self.twitter_client = None
         self.facebook_client = None
         self.tiktok_client = None
         
-        # ✅ Only initialize Twitter if we have a key
-        if TWITTER_BEARER_TOKEN:
-            try:
-                import tweepy
-                self.twitter_client = tweepy.Client(bearer_token=TWITTER_BEARER_TOKEN)
-                print("✅ Twitter API connected successfully!")
-            except Exception as e:
-                print(f"⚠️ Twitter API failed to connect: {e}")
+        # ✅ Only enable Twitter if we have a key
+        bearer_token = twitter_bearer_token if twitter_bearer_token is not None else TWITTER_BEARER_TOKEN
+        if bearer_token:
+            self.twitter_client = bearer_token
+            print("✅ Twitter API key found.")
         else:
             print("⚠️ No Twitter API key found. Twitter scraping disabled.")
         
-        # ✅ Only initialize Facebook/Instagram if we have a key
-        if FACEBOOK_ACCESS_TOKEN:
-            try:
-                import requests
-                # Test the token with a simple API call
-                test_url = f"https://graph.facebook.com/v18.0/me?access_token={FACEBOOK_ACCESS_TOKEN}"
-                response = requests.get(test_url)
-                if response.status_code == 200:
-                    self.facebook_client = FACEBOOK_ACCESS_TOKEN
-                    print("✅ Instagram/Facebook API connected successfully!")
-                else:
-                    print(f"⚠️ Instagram/Facebook API token invalid: {response.text}")
-                    self.facebook_client = None
-            except Exception as e:
-                print(f"⚠️ Instagram/Facebook API failed to connect: {e}")
-                self.facebook_client = None
+        # ✅ Only enable Facebook/Instagram if we have a key
+        # (the token is validated by the /me call at the start of each fetch)
+        access_token = facebook_access_token if facebook_access_token is not None else FACEBOOK_ACCESS_TOKEN
+        if access_token:
+            self.facebook_client = access_token
+            print("✅ Instagram/Facebook API key found.")
         else:
             print("⚠️ No Instagram/Facebook API key found. Scraping disabled.")
         
@@ -77,6 +99,27 @@ class SocialMediaScraper:
         else:
             print("⚠️ No TikTok API key found. TikTok scraping disabled.")
     
+    def _open_pool(self):
+        """Create the per-platform pooled clients for one scraping run."""
+        pool = FetchPool(**self.fetch_options)
+        if self.twitter_client:
+            pool.register(
+                'twitter',
+                self.twitter_api_base,
+                headers={'Authorization': f'Bearer {self.twitter_client}'},
+            )
+        if self.facebook_client:
+            pool.register(
+                'facebook',
+                self.graph_api_base,
+                params={'access_token': self.facebook_client},
+            )
+        return pool
+    
+    # ==========================================
+    # Synchronous entry points (wrap the async fetchers)
+    # ==========================================
+    
     def search_twitter(self, keywords: list, max_results=10):
         """
         Search Twitter for posts mentioning the given keywords.
@@ -88,7 +131,61 @@ class SocialMediaScraper:
         Returns:
             List of post dictionaries with engagement metrics
         """
-        if not self.twitter_client:
+        return asyncio.run(self._run_single(self._fetch_twitter, keywords, max_results))
+    
+    def search_facebook(self, keywords: list, max_results=10):
+        """
+        Search Instagram/Facebook for public posts using Graph API.
+        
+        Note: This uses Facebook Graph API to search for public posts.
+        Falls back to demo data if specific Instagram Business features aren't available.
+        
+        Args:
+            keywords: List of place names to search for
+            max_results: Maximum number of posts to fetch
+            
+        Returns:
+            List of post dictionaries with engagement metrics
+        """
+        return asyncio.run(self._run_single(self._fetch_facebook, keywords, max_results))
+    
+    def search_tiktok(self, keywords: list, max_results=10):
+        """Search TikTok for posts (placeholder for now)"""
+        return asyncio.run(self._run_single(self._fetch_tiktok, keywords, max_results))
+    
+    def search_all_platforms(self, keywords: list, max_results_per_platform=10):
+        """
+        Search all available platforms at once (fetched in parallel).
+        
+        Returns:
+            List of all posts from all platforms combined
+        """
+        return asyncio.run(self.asearch_all_platforms(keywords, max_results_per_platform))
+    
+    # ==========================================
+    # Async fetchers
+    # ==========================================
+    
+    async def _run_single(self, fetch, keywords, max_results):
+        async with self._open_pool() as pool:
+            return await fetch(pool, keywords, max_results)
+    
+    async def asearch_all_platforms(self, keywords: list, max_results_per_platform=10):
+        """Fetch Twitter, Instagram/Facebook and TikTok concurrently."""
+        async with self._open_pool() as pool:
+            results = await asyncio.gather(
+                self._fetch_twitter(pool, keywords, max_results_per_platform),
+                self._fetch_facebook(pool, keywords, max_results_per_platform),
+                self._fetch_tiktok(pool, keywords, max_results_per_platform),
+            )
+        
+        all_posts = [post for platform_posts in results for post in platform_posts]
+        print(f"✅ Total posts collected: {len(all_posts)}")
+        return all_posts
+    
+    async def _fetch_twitter(self, pool, keywords, max_results):
+        fetcher = pool.get('twitter')
+        if not fetcher:
             print("⚠️ Twitter client not initialized. Returning demo data.")
             return self._generate_demo_twitter_data(keywords, max_results)
         
@@ -101,38 +198,24 @@ class SocialMediaScraper:
             # ✅ FIXED: Ensure max_results is at least 10 (Twitter's minimum)
             twitter_max_results = max(10, min(100, max_results))  # Between 10 and 100
             
-            response = self.twitter_client.search_recent_tweets(
-                query=query,
-                tweet_fields=["public_metrics", "created_at", "author_id"],
-                max_results=twitter_max_results
-            )
+            response = await fetcher.get_json('/tweets/search/recent', params={
+                'query': query,
+                'tweet.fields': TWEET_FIELDS,
+                'max_results': twitter_max_results,
+            })
             
-            if not response.data:
+            tweets = response.get('data') or []
+            if not tweets:
                 print("⚠️ No tweets found. Returning demo data.")
                 return self._generate_demo_twitter_data(keywords, max_results)
             
-            results = []
-            for tweet in response.data:
-                metrics = tweet.public_metrics or {}
-                results.append({
-                    'platform': 'twitter',
-                    'post_id': str(tweet.id),
-                    'content': tweet.text,
-                    'url': f"https://twitter.com/user/status/{tweet.id}",
-                    'created_at': tweet.created_at.isoformat() if tweet.created_at else timezone.now().isoformat(),
-                    'likes': metrics.get('like_count', 0),
-                    'comments': metrics.get('reply_count', 0),
-                    'shares': metrics.get('retweet_count', 0),
-                    'views': metrics.get('impression_count', 0),
-                })
-            
+            results = [self._twitter_post(tweet) for tweet in tweets]
             print(f"✅ Found {len(results)} real tweets!")
             return results
             
         except Exception as e:
-            error_str = str(e)
             # ✅ IMPROVED: Better error handling for rate limits
-            if '429' in error_str or 'Too Many Requests' in error_str:
+            if getattr(e, 'status_code', None) == 429:
                 print(f"⏳ Twitter rate limit reached. Please wait 15 minutes.")
                 print(f"💡 Using demo data for now. Your API key is working fine!")
             else:
@@ -140,27 +223,28 @@ class SocialMediaScraper:
             print("⚠️ Falling back to demo data.")
             return self._generate_demo_twitter_data(keywords, max_results)
     
-    def search_facebook(self, keywords: list, max_results=10):
-        """
-        Search Instagram/Facebook for public posts using Graph API.
-        
-        Note: This uses Facebook Graph API to search for public posts.
-        Falls back to demo data if specific Instagram Business features aren't available.
-        
-        Args:
-            keywords: List of place names to search for
-            max_results: Maximum number of posts to fetch
-            
-        Returns:
-            List of post dictionaries with engagement metrics
-        """
-        if not self.facebook_client:
+    def _twitter_post(self, tweet):
+        metrics = tweet.get('public_metrics') or {}
+        return {
+            'platform': 'twitter',
+            'post_id': str(tweet['id']),
+            'content': tweet.get('text', ''),
+            'url': f"https://twitter.com/user/status/{tweet['id']}",
+            'author_id': str(tweet.get('author_id') or ''),
+            'created_at': tweet.get('created_at') or timezone.now().isoformat(),
+            'likes': metrics.get('like_count', 0),
+            'comments': metrics.get('reply_count', 0),
+            'shares': metrics.get('retweet_count', 0),
+            'views': metrics.get('impression_count', 0),
+        }
+    
+    async def _fetch_facebook(self, pool, keywords, max_results):
+        fetcher = pool.get('facebook')
+        if not fetcher:
             print("⚠️ Instagram/Facebook client not initialized. Returning demo data.")
             return self._generate_demo_facebook_data(keywords, max_results)
         
         try:
-            import requests
-            
             results = []
             
             # Try to get user's own Instagram posts as a test
@@ -168,78 +252,72 @@ class SocialMediaScraper:
             print("🔍 Fetching Instagram data via Facebook Graph API...")
             
             # Get user's Instagram account info
-            me_url = f"https://graph.facebook.com/v18.0/me"
-            me_params = {
+            me_data = await fetcher.get_json('/me', params={
                 'fields': 'id,name,instagram_business_account',
-                'access_token': self.facebook_client
-            }
-            
-            me_response = requests.get(me_url, params=me_params)
+            })
             
-            if me_response.status_code == 200:
-                me_data = me_response.json()
+            # Check if Instagram Business Account is linked
+            if 'instagram_business_account' in me_data:
+                ig_account_id = me_data['instagram_business_account']['id']
+                print(f"✅ Instagram Business Account found: {ig_account_id}")
                 
-                # Check if Instagram Business Account is linked
-                if 'instagram_business_account' in me_data:
-                    ig_account_id = me_data['instagram_business_account']['id']
-                    print(f"✅ Instagram Business Account found: {ig_account_id}")
+                # Page through Instagram media on the pooled client
+                url = f"/{ig_account_id}/media"
+                params = {
+                    'fields': MEDIA_FIELDS,
+                    'limit': max_results,
+                }
+                scanned = 0
+                while url and scanned < max_results:
+                    media_data = await fetcher.get_json(url, params=params)
+                    page = media_data.get('data', [])
+                    scanned += len(page)
                     
-                    # Get Instagram media
-                    media_url = f"https://graph.facebook.com/v18.0/{ig_account_id}/media"
-                    media_params = {
-                        'fields': 'id,caption,media_type,media_url,permalink,timestamp,like_count,comments_count',
-                        'limit': max_results,
-                        'access_token': self.facebook_client
-                    }
+                    for post in page:
+                        # Check if caption mentions any of our keywords
+                        caption = post.get('caption', '')
+                        if any(keyword.lower() in caption.lower() for keyword in keywords):
+                            results.append(self._instagram_post(post))
                     
-                    media_response = requests.get(media_url, params=media_params)
-                    
-                    if media_response.status_code == 200:
-                        media_data = media_response.json()
-                        
-                        for post in media_data.get('data', []):
-                            # Check if caption mentions any of our keywords
-                            caption = post.get('caption', '')
-                            if any(keyword.lower() in caption.lower() for keyword in keywords):
-                                results.append({
-                                    'platform': 'instagram',
-                                    'post_id': post.get('id', f'ig_{random.randint(1000, 9999)}'),
-                                    'content': caption or f'Instagram post about tourism',
-                                    'url': post.get('permalink', f'https://instagram.com/'),
-                                    'created_at': post.get('timestamp', timezone.now().isoformat()),
-                                    'likes': post.get('like_count', 0),
-                                    'comments': post.get('comments_count', 0),
-                                    'shares': 0,
-                                    'views': 0,
-                                })
-                        
-                        if results:
-                            print(f"✅ Found {len(results)} real Instagram posts!")
-                            return results
-                    else:
-                        print(f"⚠️ Instagram media fetch failed: {media_response.text}")
-                else:
-                    print("⚠️ No Instagram Business Account linked to this Facebook account.")
-                    print("💡 To get real Instagram data:")
-                    print("   1. Convert your Instagram to a Business/Creator account")
-                    print("   2. Link it to your Facebook Page")
-                    print("   3. The API will then access your Instagram content")
+                    # Graph API "next" links are absolute and already carry the params
+                    url = (media_data.get('paging') or {}).get('next')
+                    params = None
+                
+                if results:
+                    print(f"✅ Found {len(results)} real Instagram posts!")
+                    return results
             else:
-                print(f"⚠️ Facebook API error: {me_response.text}")
+                print("⚠️ No Instagram Business Account linked to this Facebook account.")
+                print("💡 To get real Instagram data:")
+                print("   1. Convert your Instagram to a Business/Creator account")
+                print("   2. Link it to your Facebook Page")
+                print("   3. The API will then access your Instagram content")
             
             # If no real data, use demo data
-            if not results:
-                print("ℹ️  Using demo Instagram data for now.")
-                print("   Your API token is valid and working! ✅")
-                return self._generate_demo_facebook_data(keywords, max_results)
+            print("ℹ️  Using demo Instagram data for now.")
+            print("   Your API token is valid and working! ✅")
+            return self._generate_demo_facebook_data(keywords, max_results)
             
         except Exception as e:
             print(f"❌ Instagram API error: {e}")
             print("⚠️ Falling back to demo data.")
             return self._generate_demo_facebook_data(keywords, max_results)
     
-    def search_tiktok(self, keywords: list, max_results=10):
-        """Search TikTok for posts (placeholder for now)"""
+    def _instagram_post(self, post):
+        return {
+            'platform': 'instagram',
+            'post_id': post.get('id', f'ig_{random.randint(1000, 9999)}'),
+            'content': post.get('caption') or f'Instagram post about tourism',
+            'url': post.get('permalink', f'https://instagram.com/'),
+            'author_id': post.get('username', ''),
+            'created_at': post.get('timestamp', timezone.now().isoformat()),
+            'likes': post.get('like_count', 0),
+            'comments': post.get('comments_count', 0),
+            'shares': 0,
+            'views': 0,
+        }
+    
+    async def _fetch_tiktok(self, pool, keywords, max_results):
         if not TIKTOK_CLIENT_KEY:
             print("⚠️ TikTok client not initialized. Returning demo data.")
             return self._generate_demo_tiktok_data(keywords, max_results)
@@ -247,29 +325,170 @@ class SocialMediaScraper:
         # TODO: Implement TikTok API search when you get the key
         return self._generate_demo_tiktok_data(keywords, max_results)
     
-    def search_all_platforms(self, keywords: list, max_results_per_platform=10):
+    # ==========================================
+    # Incremental collection (checkpointed cursors)
+    # ==========================================
+    
+    def collect(self, keywords: list, checkpoints=None, max_pages=DEFAULT_MAX_PAGES):
         """
-        Search all available platforms at once.
+        Fetch only posts newer than each platform × keyword checkpoint.
+        
+        Twitter keywords are packed into OR queries (query_planner.py) and each
+        query is walked with since_id + next_token; a packed query that still
+        has pages left at max_pages is split in half and re-walked. The
+        Instagram media feed isn't searchable by keyword, so it is walked once
+        (cursor keyword "") until it reaches the last stored timestamp. A
+        single keyword that hits max_pages is parked and resumes from its
+        paging token on the next run.
         
+        Each returned post carries 'keywords': the names it mentions.
+        
+        Args:
+            keywords: Place names to search for
+            checkpoints: {(platform, keyword): cursor} from checkpoints.load_checkpoints()
+            max_pages: Page cap per walk
+            
         Returns:
-            List of all posts from all platforms combined
+            (posts, checkpoint_updates) - commit the updates only after the
+            posts have been persisted (checkpoints.commit_checkpoints)
         """
-        all_posts = []
+        return asyncio.run(self.acollect(keywords, checkpoints, max_pages))
+    
+    async def acollect(self, keywords: list, checkpoints=None, max_pages=DEFAULT_MAX_PAGES):
+        checkpoints = checkpoints or {}
+        async with self._open_pool() as pool:
+            twitter = pool.get('twitter')
+            facebook = pool.get('facebook')
+            walks = []
+            if twitter:
+                groups = pack_keywords(keywords, 'twitter', checkpoints)
+                print(f"🔍 Searching Twitter: {len(keywords)} keywords packed into {len(groups)} queries")
+                walks += [self._walk_twitter_group(twitter, group, checkpoints, max_pages) for group in groups]
+            if facebook:
+                walks.append(self._walk_instagram(facebook, keywords, checkpoints.get(('instagram', ''), {}), max_pages))
+            results = await asyncio.gather(*walks)
+            tiktok_posts = await self._fetch_tiktok(pool, keywords, 10)
         
-        # Twitter
-        twitter_posts = self.search_twitter(keywords, max_results_per_platform)
-        all_posts.extend(twitter_posts)
+        matcher = KeywordMatcher(keywords)
+        posts, updates, seen = [], {}, set()
+        for walk_posts, walk_updates in results:
+            updates.update(walk_updates)
+            for post in walk_posts:
+                # The same tweet can come back from several queries
+                key = (post['platform'], post['post_id'])
+                if key not in seen:
+                    seen.add(key)
+                    post['keywords'] = matcher.match(post['content'])
+                    posts.append(post)
         
-        # Facebook/Instagram
-        facebook_posts = self.search_facebook(keywords, max_results_per_platform)
-        all_posts.extend(facebook_posts)
+        # Demo data for platforms without keys (never checkpointed)
+        if not twitter:
+            posts += self._generate_demo_twitter_data(keywords, 10)
+        if not facebook:
+            posts += self._generate_demo_facebook_data(keywords, 10)
+        posts += tiktok_posts
         
-        # TikTok
-        tiktok_posts = self.search_tiktok(keywords, max_results_per_platform)
-        all_posts.extend(tiktok_posts)
+        print(f"✅ Incremental collect: {len(posts)} posts, {len(updates)} cursors advanced")
+        return posts, updates
+    
+    async def _walk_twitter_group(self, fetcher, keywords, checkpoints, max_pages):
+        """Walk one packed query, splitting it in half if it saturates."""
+        cursor = group_cursor(keywords, 'twitter', checkpoints)
+        posts, new_cursor = await self._walk_twitter(fetcher, build_query(keywords, 'twitter'), cursor, max_pages)
+        if new_cursor is None:
+            return posts, {}
         
-        print(f"✅ Total posts collected: {len(all_posts)}")
-        return all_posts
+        if new_cursor['paging_token'] and len(keywords) > 1:
+            # More results than max_pages can hold: narrower queries instead of a parked walk
+            mid = len(keywords) // 2
+            halves = await asyncio.gather(
+                self._walk_twitter_group(fetcher, keywords[:mid], checkpoints, max_pages),
+                self._walk_twitter_group(fetcher, keywords[mid:], checkpoints, max_pages),
+            )
+            updates = {}
+            for half_posts, half_updates in halves:
+                posts += half_posts
+                updates.update(half_updates)
+            return posts, updates
+        
+        if len(keywords) == 1:
+            return posts, {('twitter', keywords[0]): new_cursor}
+        return posts, distribute_cursor(new_cursor, keywords, 'twitter', checkpoints)
+    
+    async def _walk_twitter(self, fetcher, query, cursor, max_pages):
+        """
+        Page one query's recent-search results back to the cursor's since_id.
+        
+        Returns:
+            (posts, new_cursor) - new_cursor is None if the walk failed
+        """
+        params = {'query': query, 'tweet.fields': TWEET_FIELDS, 'max_results': TWITTER_PAGE_SIZE}
+        if cursor.get('since_id'):
+            params['since_id'] = cursor['since_id']
+        next_token = cursor.get('paging_token') or None
+        
+        posts, newest_id, newest_timestamp = [], None, None
+        try:
+            for _ in range(max_pages):
+                page_params = dict(params, next_token=next_token) if next_token else params
+                response = await fetcher.get_json('/tweets/search/recent', params=page_params)
+                tweets = response.get('data') or []
+                if newest_id is None and tweets:
+                    # Results are newest first
+                    newest_id = str((response.get('meta') or {}).get('newest_id') or tweets[0]['id'])
+                    newest_timestamp = parse_datetime(tweets[0].get('created_at') or '')
+                posts.extend(self._twitter_post(tweet) for tweet in tweets)
+                next_token = (response.get('meta') or {}).get('next_token')
+                if not next_token:
+                    break
+        except Exception as e:
+            # Keep what we have; the cursor doesn't move so the next run retries
+            print(f"❌ Twitter API error for '{query[:60]}': {e}")
+            return posts, None
+        
+        return posts, advance_cursor(cursor, newest_id, newest_timestamp, next_token)
+    
+    async def _walk_instagram(self, fetcher, keywords, cursor, max_pages):
+        """Page the Instagram media feed back to the last stored timestamp."""
+        try:
+            me_data = await fetcher.get_json('/me', params={'fields': 'id,name,instagram_business_account'})
+            if 'instagram_business_account' not in me_data:
+                print("⚠️ No Instagram Business Account linked to this Facebook account.")
+                return [], {}
+            
+            url = f"/{me_data['instagram_business_account']['id']}/media"
+            params = {'fields': MEDIA_FIELDS, 'limit': INSTAGRAM_PAGE_SIZE}
+            if cursor.get('paging_token'):
+                params['after'] = cursor['paging_token']
+            floor = cursor.get('last_timestamp')
+            matcher = KeywordMatcher(keywords)
+            
+            posts, newest_id, newest_timestamp, next_token = [], None, None, None
+            for _ in range(max_pages):
+                media_data = await fetcher.get_json(url, params=params)
+                reached_floor = False
+                for post in media_data.get('data', []):
+                    timestamp = parse_datetime(post.get('timestamp') or '')
+                    if floor and timestamp and timestamp <= floor:
+                        reached_floor = True
+                        break
+                    if newest_id is None:
+                        newest_id, newest_timestamp = post.get('id'), timestamp
+                    if matcher.match(post.get('caption') or ''):
+                        posts.append(self._instagram_post(post))
+                
+                paging = media_data.get('paging') or {}
+                next_token = (paging.get('cursors') or {}).get('after') if paging.get('next') else None
+                if reached_floor or not next_token:
+                    next_token = None
+                    break
+                # Graph API "next" links are absolute and already carry the params
+                url, params = paging['next'], None
+        except Exception as e:
+            print(f"❌ Instagram API error: {e}")
+            return [], {}
+        
+        return posts, {('instagram', ''): advance_cursor(cursor, newest_id, newest_timestamp, next_token)}
     
     # ==========================================
     # Demo Data Generators (for testing without API keys)
@@ -296,6 +515,7 @@ class SocialMediaScraper:
                 'post_id': f'demo_twitter_{i}_{random.randint(1000, 9999)}',
                 'content': content,
                 'url': f'https://twitter.com/demo/status/{random.randint(100000, 999999)}',
+                'author_id': f'demo_user_{random.randint(1, 500)}',
                 'created_at': (timezone.now() - timedelta(days=random.randint(0, 30))).isoformat(),
                 'likes': random.randint(50, 5000),
                 'comments': random.randint(5, 500),
@@ -317,6 +537,7 @@ class SocialMediaScraper:
                 'post_id': f'demo_facebook_{i}_{random.randint(1000, 9999)}',
                 'content': f'Great day trip to {place} with the family! 👨‍👩‍👧‍👦',
                 'url': f'https://facebook.com/demo/posts/{random.randint(100000, 999999)}',
+                'author_id': f'demo_user_{random.randint(1, 500)}',
                 'created_at': (timezone.now() - timedelta(days=random.randint(0, 30))).isoformat(),
                 'likes': random.randint(100, 10000),
                 'comments': random.randint(10, 1000),
@@ -338,6 +559,7 @@ class SocialMediaScraper:
                 'post_id': f'demo_tiktok_{i}_{random.randint(1000, 9999)}',
                 'content': f'Check out this amazing view at {place}! #travel #tourism',
                 'url': f'https://tiktok.com/@demo/video/{random.randint(100000, 999999)}',
+                'author_id': f'demo_user_{random.randint(1, 500)}',
                 'created_at': (timezone.now() - timedelta(days=random.randint(0, 30))).isoformat(),
                 'likes': random.randint(1000, 100000),
                 'comments': random.randint(50, 5000),
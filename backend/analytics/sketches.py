@@ -0,0 +1,198 @@
+"""
+Sketches
+========
+Small, mergeable summaries stored per day so range queries don't rescan posts.
+
+SpaceSaving - heavy-hitter (top-term) counts behind the trends wordcloud
+HyperLogLog - distinct counts (unique authors) behind metrics/totals
+
+Space-Saving
+------------
+A SpaceSaving sketch keeps at most `capacity` counters. A new term takes
+over the smallest counter when the sketch is full and inherits its count
+as error. For every term in the sketch:
+
+    count - error <= true count <= count
+
+and every term seen more than total / capacity times is in the sketch.
+Sketches are mergeable, so one sketch per day × city (TermSketch) answers
+"top N terms over any range" by merging the days in the range, without
+rescanning post text.
+
+Usage:
+    sketch = SpaceSaving(capacity=200)
+    for term in terms:
+        sketch.add(term)
+    merged = SpaceSaving.merge([day1, day2, day3])
+    merged.top(20)   # → [(term, count, error), ...]
+
+HyperLogLog
+-----------
+2^precision one-byte registers keep the longest run of leading zeros seen
+in the hashed values that fall in them. The estimate has a relative
+standard error of 1.04 / sqrt(2^precision) (1.6% at the default 12).
+Merging is a register-wise max, so per-day sketches combine into a sketch
+of the same accuracy for any range. Registers are stored zlib-compressed
+(mostly-empty sketches of quiet days take a few dozen bytes).
+
+Usage:
+    hll = HyperLogLog()
+    hll.add('twitter:12345')
+    HyperLogLog.merge([day1, day2]).estimate()
+"""
+
+import hashlib
+import heapq
+import math
+import zlib
+
+DEFAULT_CAPACITY = 200
+HLL_PRECISION = 12
+
+# 2^-rank for every possible register value (ranks never exceed 64)
+_INVERSE_POWERS = [2.0 ** -rank for rank in range(65)]
+
+
+class SpaceSaving:
+    def __init__(self, capacity=DEFAULT_CAPACITY, counters=None, total=0):
+        self.capacity = capacity
+        self.total = total
+        self.counters = {term: list(value) for term, value in (counters or {}).items()}
+        # Lazy min-heap of (count, term); stale entries are skipped on pop
+        self._heap = [(count, term) for term, (count, _) in self.counters.items()]
+        heapq.heapify(self._heap)
+
+    def __len__(self):
+        return len(self.counters)
+
+    def __contains__(self, term):
+        return term in self.counters
+
+    def min_count(self):
+        """Smallest counter of a full sketch (0 while there's still room)."""
+        if len(self.counters) < self.capacity:
+            return 0
+        self._drop_stale()
+        return self._heap[0][0]
+
+    def _drop_stale(self):
+        while self._heap:
+            count, term = self._heap[0]
+            if term in self.counters and self.counters[term][0] == count:
+                return
+            heapq.heappop(self._heap)
+
+    def add(self, term, weight=1):
+        self.total += weight
+        counter = self.counters.get(term)
+        if counter is not None:
+            counter[0] += weight
+        elif len(self.counters) < self.capacity:
+            counter = self.counters[term] = [weight, 0]
+        else:
+            self._drop_stale()
+            floor, evicted = heapq.heappop(self._heap)
+            del self.counters[evicted]
+            counter = self.counters[term] = [floor + weight, floor]
+
+        heapq.heappush(self._heap, (counter[0], term))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(count, t) for t, (count, _) in self.counters.items()]
+            heapq.heapify(self._heap)
+
+    def update(self, terms):
+        for term in terms:
+            self.add(term)
+
+    def estimate(self, term):
+        """(count, error) for a term; absent terms are bounded by min_count()."""
+        if term in self.counters:
+            return tuple(self.counters[term])
+        floor = self.min_count()
+        return floor, floor
+
+    def top(self, n=None):
+        ranked = sorted(self.counters.items(), key=lambda item: (-item[1][0], item[0]))
+        return [(term, count, error) for term, (count, error) in ranked[:n]]
+
+    @classmethod
+    def merge(cls, sketches, capacity=None):
+        """
+        Merge sketches into one of `capacity` counters (default: the largest
+        input capacity). A term missing from a full sketch may have been seen
+        up to that sketch's min_count() times, which is added to its count
+        and error, so the bounds above still hold for the merged sketch.
+        """
+        sketches = list(sketches)
+        capacity = capacity or max((s.capacity for s in sketches), default=DEFAULT_CAPACITY)
+        floors = [s.min_count() for s in sketches]
+
+        merged = {}
+        for term in set().union(*(s.counters for s in sketches)):
+            count = error = 0
+            for sketch, floor in zip(sketches, floors):
+                c, e = sketch.counters.get(term, (floor, floor))
+                count += c
+                error += e
+            merged[term] = [count, error]
+
+        kept = sorted(merged.items(), key=lambda item: (-item[1][0], item[0]))[:capacity]
+        return cls(capacity, dict(kept), total=sum(s.total for s in sketches))
+
+    def to_dict(self):
+        return {'capacity': self.capacity, 'total': self.total, 'counters': self.counters}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data.get('capacity', DEFAULT_CAPACITY), data.get('counters'), data.get('total', 0))
+
+
+class HyperLogLog:
+    def __init__(self, precision=HLL_PRECISION, registers=None):
+        self.precision = precision
+        self.size = 1 << precision
+        self.registers = bytearray(registers) if registers is not None else bytearray(self.size)
+
+    def add(self, value):
+        digest = hashlib.blake2b(str(value).encode('utf-8'), digest_size=8).digest()
+        hashed = int.from_bytes(digest, 'big')
+        index = hashed >> (64 - self.precision)
+        rest_bits = 64 - self.precision
+        rest = hashed & ((1 << rest_bits) - 1)
+        rank = rest_bits - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def update(self, values):
+        for value in values:
+            self.add(value)
+
+    @property
+    def relative_error(self):
+        return 1.04 / math.sqrt(self.size)
+
+    def estimate(self):
+        alpha = 0.7213 / (1 + 1.079 / self.size)
+        raw = alpha * self.size * self.size / sum(_INVERSE_POWERS[rank] for rank in self.registers)
+        zeros = self.registers.count(0)
+        if raw <= 2.5 * self.size and zeros:
+            # Small range: linear counting is more accurate
+            return self.size * math.log(self.size / zeros)
+        return raw
+
+    @classmethod
+    def merge(cls, sketches, precision=HLL_PRECISION):
+        sketches = list(sketches)
+        if not sketches:
+            return cls(precision)
+        if len(sketches) == 1:
+            return cls(sketches[0].precision, sketches[0].registers)
+        # Register-wise max over every sketch in one pass
+        return cls(sketches[0].precision, bytes(map(max, *(s.registers for s in sketches))))
+
+    def to_bytes(self):
+        return zlib.compress(bytes(self.registers))
+
+    @classmethod
+    def from_bytes(cls, data, precision=HLL_PRECISION):
+        return cls(precision, zlib.decompress(bytes(data)))
@@ -0,0 +1,287 @@
+"""
+Slow-Query Capture
+==================
+Records every database query slower than THRESHOLD_MS as a SlowQuery row:
+
+    fingerprint - hash of the normalized SQL (literals, numbers and IN lists
+                  collapsed), so the same ORM pattern groups together
+    view        - outermost project frame on the stack (the view method,
+                  Celery task or management command that issued it)
+    location    - innermost project frame (the line that ran the queryset)
+    explain     - EXPLAIN plan, for the first occurrence of a fingerprint in
+                  each process and a random EXPLAIN_SAMPLE_RATE of the rest
+
+The hook is a connection execute_wrapper added to every connection when
+SLOW_QUERY_LOG['ENABLED'] is set (see AnalyticsConfig.ready); when it is
+off nothing is installed. Rows are never written inside the caller's
+transaction: queries inside an atomic block are buffered and written once it
+commits, or at the end of the request / Celery task / process if it rolls
+back, so a rollback doesn't lose them. purge() runs daily from Celery beat.
+
+Top offenders are aggregated on read:
+    python manage.py slow_queries
+    GET /api/admin/slow-queries/   (admin only)
+
+Settings (SLOW_QUERY_LOG, see tourism_api/settings.py):
+    ENABLED, THRESHOLD_MS, EXPLAIN_SAMPLE_RATE, RETENTION_DAYS
+"""
+
+import atexit
+import hashlib
+import os
+import random
+import re
+import sys
+import threading
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from celery.signals import task_postrun
+from django.conf import settings
+from django.core.signals import request_finished
+from django.db import DatabaseError, connections, transaction
+from django.db.backends.signals import connection_created
+from django.db.models import Avg, Count, Max, Sum
+from django.utils import timezone
+
+DEFAULTS = {
+    'ENABLED': False,
+    'THRESHOLD_MS': 200,
+    'EXPLAIN_SAMPLE_RATE': 0.1,
+    'RETENTION_DAYS': 30,
+}
+
+MAX_SQL_LENGTH = 4000
+MAX_EXPLAINED = 1000  # fingerprints remembered per process for first-occurrence EXPLAINs
+MAX_PENDING = 500  # rows buffered per thread while inside atomic blocks; the rest are dropped
+
+EXPLAIN_PREFIX = {
+    'sqlite': 'EXPLAIN QUERY PLAN ',
+    'postgresql': 'EXPLAIN ',
+    'mysql': 'EXPLAIN ',
+}
+
+# Frames in these files are never reported as the caller
+SKIP_FRAMES = ('manage.py', 'slow_queries.py', 'profiling.py', f'{os.sep}tests{os.sep}')
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'(?<![\w"])-?\d+(?:\.\d+)?\b')
+_PLACEHOLDER = re.compile(r'%s|\?')
+_IN_LIST = re.compile(r'\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)', re.IGNORECASE)
+_VALUES_LIST = re.compile(r'\bVALUES\s*\(.*\)', re.IGNORECASE | re.DOTALL)
+_SPACE = re.compile(r'\s+')
+
+_state = threading.local()
+_explained = set()
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'SLOW_QUERY_LOG', {})}
+
+
+def normalize(sql):
+    """SQL with literals and placeholders as ?, IN / VALUES lists collapsed."""
+    sql = _STRING.sub('?', sql)
+    sql = _PLACEHOLDER.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _IN_LIST.sub('IN (...)', sql)
+    sql = _VALUES_LIST.sub('VALUES (...)', sql)
+    return _SPACE.sub(' ', sql).strip()
+
+
+def fingerprint(normalized_sql):
+    return hashlib.sha1(normalized_sql.encode('utf-8')).hexdigest()[:16]
+
+
+def _caller():
+    """(outermost, innermost) project frame as 'module.function' / 'path:line'."""
+    base = str(settings.BASE_DIR)
+    outermost = innermost = None
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if (filename.startswith(base) and 'site-packages' not in filename
+                and not any(part in filename for part in SKIP_FRAMES)):
+            if innermost is None:
+                innermost = frame
+            outermost = frame
+        frame = frame.f_back
+    if outermost is None:
+        return '', ''
+    module = outermost.f_globals.get('__name__', '')
+    owner = outermost.f_locals.get('self')
+    name = f'{type(owner).__name__}.{outermost.f_code.co_name}' if owner is not None else outermost.f_code.co_name
+    relative = Path(innermost.f_code.co_filename).relative_to(base)
+    return f'{module}.{name}'[:200], f'{relative}:{innermost.f_lineno}'[:200]
+
+
+def _explain(connection, sql, params):
+    prefix = EXPLAIN_PREFIX.get(connection.vendor)
+    if not prefix or not sql.lstrip().upper().startswith(('SELECT', 'WITH')):
+        return ''
+    try:
+        # Savepoint so a failed EXPLAIN can't break the caller's transaction
+        with transaction.atomic(using=connection.alias, savepoint=connection.in_atomic_block):
+            with connection.cursor() as cursor:
+                cursor.execute(prefix + sql, params)
+                rows = cursor.fetchall()
+    except (DatabaseError, TypeError, ValueError):
+        return ''
+    return '\n'.join(' | '.join(str(col) for col in row) for row in rows)
+
+
+def _should_explain(key):
+    if key not in _explained and len(_explained) < MAX_EXPLAINED:
+        _explained.add(key)
+        return True
+    return random.random() < get_config()['EXPLAIN_SAMPLE_RATE']
+
+
+class SlowQueryRecorder:
+    """execute_wrapper for one connection."""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __call__(self, execute, sql, params, many, context):
+        if getattr(_state, 'busy', False):
+            return execute(sql, params, many, context)
+
+        started = time.perf_counter()
+        result = execute(sql, params, many, context)
+        duration_ms = (time.perf_counter() - started) * 1000
+        if duration_ms >= get_config()['THRESHOLD_MS']:
+            _state.busy = True
+            try:
+                self.record(sql, params, many, duration_ms)
+            finally:
+                _state.busy = False
+        return result
+
+    def record(self, sql, params, many, duration_ms):
+        from .models import SlowQuery
+
+        normalized = normalize(sql)
+        key = fingerprint(normalized)
+        view, location = _caller()
+        explain = _explain(self.connection, sql, params) if not many and _should_explain(key) else ''
+        pending = _buffer()
+        if len(pending) < MAX_PENDING:
+            pending.append(SlowQuery(
+                fingerprint=key, sql=normalized[:MAX_SQL_LENGTH], duration_ms=round(duration_ms, 2),
+                view=view, location=location, database=self.connection.alias, explain=explain,
+            ))
+        if self.connection.in_atomic_block:
+            # Writing now would tie the row to the caller's transaction
+            transaction.on_commit(flush, using=self.connection.alias)
+        else:
+            flush()
+
+
+def _buffer():
+    if not hasattr(_state, 'pending'):
+        _state.pending = []
+    return _state.pending
+
+
+def flush(**kwargs):
+    """
+    Write buffered SlowQuery rows (also connected to request_finished,
+    Celery's task_postrun and process exit).
+    """
+    from .models import SlowQuery
+
+    pending = _buffer()
+    if not pending:
+        return 0
+    rows, pending[:] = list(pending), []
+    _state.busy = True
+    try:
+        SlowQuery.objects.bulk_create(rows)
+    except DatabaseError:
+        return 0
+    finally:
+        _state.busy = False
+    return len(rows)
+
+
+def _attach(connection, **kwargs):
+    if not any(isinstance(w, SlowQueryRecorder) for w in connection.execute_wrappers):
+        connection.execute_wrappers.append(SlowQueryRecorder(connection))
+
+
+def install():
+    """Record slow queries on every current and future connection."""
+    connection_created.connect(_attach, dispatch_uid='slow_query_capture')
+    request_finished.connect(flush, dispatch_uid='slow_query_flush')
+    task_postrun.connect(flush, dispatch_uid='slow_query_flush', weak=False)
+    atexit.register(flush)  # management commands and scripts
+    for connection in connections.all(initialized_only=True):
+        _attach(connection)
+
+
+def uninstall():
+    connection_created.disconnect(dispatch_uid='slow_query_capture')
+    request_finished.disconnect(dispatch_uid='slow_query_flush')
+    task_postrun.disconnect(dispatch_uid='slow_query_flush')
+    atexit.unregister(flush)
+    for connection in connections.all(initialized_only=True):
+        connection.execute_wrappers[:] = [
+            w for w in connection.execute_wrappers if not isinstance(w, SlowQueryRecorder)
+        ]
+    _explained.clear()
+
+
+def top_offenders(days=7, limit=20, order='total'):
+    """
+    Slow queries of the last `days` days grouped by fingerprint, worst first.
+
+    Args:
+        order: 'total' (summed time), 'count', 'avg' or 'max'
+
+    Returns:
+        [{'fingerprint', 'sql', 'count', 'total_ms', 'avg_ms', 'max_ms',
+          'last_seen', 'views', 'explain'}, ...]
+    """
+    from .models import SlowQuery
+
+    ordering = {'total': '-total_ms', 'count': '-count', 'avg': '-avg_ms', 'max': '-max_ms'}[order]
+    recent = SlowQuery.objects.filter(created_at__gte=timezone.now() - timedelta(days=days))
+    groups = list(
+        recent.values('fingerprint')
+        .annotate(count=Count('id'), total_ms=Sum('duration_ms'), avg_ms=Avg('duration_ms'),
+                  max_ms=Max('duration_ms'), last_seen=Max('created_at'))
+        .order_by(ordering)[:limit]
+    )
+
+    details = {}
+    for row in (recent.filter(fingerprint__in=[g['fingerprint'] for g in groups])
+                .order_by('-created_at').values('fingerprint', 'sql', 'view', 'explain')):
+        detail = details.setdefault(row['fingerprint'], {'sql': row['sql'], 'views': [], 'explain': ''})
+        if row['view'] and row['view'] not in detail['views']:
+            detail['views'].append(row['view'])
+        if row['explain'] and not detail['explain']:
+            detail['explain'] = row['explain']
+
+    return [
+        {
+            'fingerprint': group['fingerprint'],
+            'count': group['count'],
+            'total_ms': round(group['total_ms'], 1),
+            'avg_ms': round(group['avg_ms'], 1),
+            'max_ms': round(group['max_ms'], 1),
+            'last_seen': group['last_seen'],
+            **details.get(group['fingerprint'], {'sql': '', 'views': [], 'explain': ''}),
+        }
+        for group in groups
+    ]
+
+
+def purge(days=None):
+    """Delete SlowQuery rows older than `days` (default RETENTION_DAYS)."""
+    from .models import SlowQuery
+
+    days = get_config()['RETENTION_DAYS'] if days is None else days
+    deleted, _ = SlowQuery.objects.filter(created_at__lt=timezone.now() - timedelta(days=days)).delete()
+    return deleted
@@ -0,0 +1,188 @@
+"""
+Stub Social Media API Server
+============================
+A local HTTP server that replays canned Twitter / Graph API responses.
+
+Used by the scraper tests and for load runs, so the fetch layer can be
+exercised without API keys, quotas or network access.
+
+Usage (tests):
+    with StubAPIServer() as server:
+        scraper = SocialMediaScraper(
+            twitter_api_base=server.base_url + '/2',
+            graph_api_base=server.base_url + '/v18.0',
+            twitter_bearer_token='stub', facebook_access_token='stub',
+        )
+        posts = scraper.search_all_platforms(['Langkawi'])
+
+Usage (load runs):
+    python analytics/stub_server.py --port 8765 --latency 0.05
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+
+# Canned responses keyed by request path. A value can be:
+# - a response spec: {"status": 200, "json": {...}, "headers": {...}}
+# - a list of specs, replayed in order (the last one repeats)
+# - a callable(query_dict) returning a spec
+CANNED_ROUTES = {
+    '/2/tweets/search/recent': {
+        'status': 200,
+        'json': {
+            'data': [
+                {
+                    'id': '1700000000000000001',
+                    'text': 'Just visited Langkawi! Amazing beaches! 🏝️',
+                    'created_at': '2025-01-05T08:30:00.000Z',
+                    'author_id': '101',
+                    'public_metrics': {'like_count': 120, 'reply_count': 8, 'retweet_count': 15, 'impression_count': 4000},
+                },
+                {
+                    'id': '1700000000000000002',
+                    'text': 'Sunset at Alor Setar tower was beautiful 🌅',
+                    'created_at': '2025-01-05T11:10:00.000Z',
+                    'author_id': '102',
+                    'public_metrics': {'like_count': 64, 'reply_count': 3, 'retweet_count': 4, 'impression_count': 1500},
+                },
+            ],
+            'meta': {
+                'newest_id': '1700000000000000002',
+                'oldest_id': '1700000000000000001',
+                'result_count': 2,
+            },
+        },
+    },
+    '/v18.0/me': {
+        'status': 200,
+        'json': {'id': '900', 'name': 'Kedah Tourism', 'instagram_business_account': {'id': '17841400000000000'}},
+    },
+    '/v18.0/17841400000000000/media': {
+        'status': 200,
+        'json': {
+            'data': [
+                {
+                    'id': '18000000000000001',
+                    'caption': 'Island hopping around Langkawi today ⛵',
+                    'permalink': 'https://instagram.com/p/stub1',
+                    'timestamp': '2025-01-05T09:00:00+0000',
+                    'like_count': 210,
+                    'comments_count': 12,
+                },
+            ],
+        },
+    },
+}
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    server_version = 'StubAPI/1.0'
+
+    def do_GET(self):
+        stub = self.server.stub
+        parts = urlsplit(self.path)
+        query = {k: v[0] for k, v in parse_qs(parts.query).items()}
+        spec = stub.resolve(parts.path, query)
+
+        if stub.latency:
+            time.sleep(stub.latency)
+        stub.leave()
+
+        body = json.dumps(spec.get('json', {})).encode('utf-8')
+        self.send_response(spec.get('status', 200))
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (spec.get('headers') or {}).items():
+            self.send_header(name, str(value))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Keep test output quiet
+        pass
+
+
+class StubAPIServer:
+    """Threaded local server replaying canned responses (see CANNED_ROUTES)."""
+
+    def __init__(self, routes=None, host='127.0.0.1', port=0, latency=0.0):
+        self.routes = dict(CANNED_ROUTES if routes is None else routes)
+        self.latency = latency
+        self.requests = []          # (path, query) in arrival order
+        self.max_in_flight = 0      # peak number of concurrent requests seen
+        self._in_flight = 0
+        self._hits = {}
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), _StubHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.stub = self
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def resolve(self, path, query):
+        with self._lock:
+            self.requests.append((path, query))
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+            route = self.routes.get(path)
+            hit = self._hits.get(path, 0)
+            self._hits[path] = hit + 1
+
+        if route is None:
+            return {'status': 404, 'json': {'error': f'No canned response for {path}'}}
+        if callable(route):
+            return route(query)
+        if isinstance(route, list):
+            return route[min(hit, len(route) - 1)]
+        return route
+
+    def leave(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Replay canned social media API responses.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds to sleep before each response')
+    parser.add_argument('--routes', help='JSON file of {path: spec} to use instead of the built-in routes')
+    args = parser.parse_args()
+
+    routes = None
+    if args.routes:
+        with open(args.routes) as f:
+            routes = json.load(f)
+
+    server = StubAPIServer(routes=routes, host=args.host, port=args.port, latency=args.latency)
+    print(f"🧪 Stub API server listening on {server.base_url}")
+    print(f"   Twitter base: {server.base_url}/2")
+    print(f"   Graph base:   {server.base_url}/v18.0")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
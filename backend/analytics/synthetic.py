@@ -0,0 +1,368 @@
+"""
+Synthetic Datasets
+==================
+Deterministic, realistically skewed datasets for benchmarks (see
+analytics/benchmark.py and the benchmark_endpoints command) and load
+testing (generate_synthetic_load command).
+
+The same (scale, seed) always produces the same rows, so latency and
+query counts can be compared between commits. Timestamps are relative to
+now, so the time-windowed endpoints always have recent data.
+
+Distributions:
+- Popularity: places, vendors, stays and events get posts, reviews,
+  reservations and registrations by a Zipf law (rank^-1.1), in a random
+  (seeded) rank order, so a few entities dominate like in real feeds
+- Diurnal: posting hour follows HOURLY_WEIGHTS (lunch and evening peaks,
+  quiet small hours), in the project timezone
+- Seasonal: days are weighted by MONTHLY_WEIGHTS (school holidays and
+  year-end peaks) and WEEKEND_WEIGHT
+- Engagement is heavy-tailed (Pareto)
+
+Rows are written with chunked bulk_create, one transaction per chunk;
+derived tables (rollups, topics, sketches, visit tiers, hidden gems) are
+rebuilt the way the collection pipeline does. Every synthetic row is
+recognisable (post_id "synthetic-…", names "Synthetic …", usernames
+"synthetic-…") so clear() can remove them again.
+
+Usage:
+    counts = generate('s', seed=0)
+    # → {'users': 500, 'places': 50, ..., 'posts': 20000}
+    generate('m', seed=1, posts=2_000_000)   # override any SCALES count
+    clear()
+"""
+
+import random
+from datetime import datetime, time, timedelta
+from itertools import accumulate
+
+from django.db import transaction
+from django.utils import timezone
+
+SCALES = {
+    'xs': {'places': 20, 'vendors': 20, 'stays': 20, 'events': 20, 'users': 100, 'posts': 2_000,
+           'reviews': 100, 'reservations': 100, 'registrations': 300, 'days': 90},
+    's': {'places': 50, 'vendors': 50, 'stays': 50, 'events': 50, 'users': 500, 'posts': 20_000,
+          'reviews': 500, 'reservations': 500, 'registrations': 2_000, 'days': 180},
+    'm': {'places': 200, 'vendors': 200, 'stays': 200, 'events': 200, 'users': 2_000, 'posts': 200_000,
+          'reviews': 4_000, 'reservations': 4_000, 'registrations': 20_000, 'days': 365},
+    'l': {'places': 500, 'vendors': 500, 'stays': 500, 'events': 500, 'users': 5_000, 'posts': 1_000_000,
+          'reviews': 20_000, 'reservations': 20_000, 'registrations': 100_000, 'days': 365},
+}
+
+CHUNK_SIZE = 5_000
+
+ZIPF_EXPONENT = 1.1
+# Relative posting volume per local hour 0..23
+HOURLY_WEIGHTS = [3, 2, 1, 1, 1, 2, 4, 6, 7, 7, 8, 10, 12, 11, 9, 8, 8, 9, 11, 13, 14, 13, 9, 5]
+# Relative volume per month: school holidays (Mar, Jun, Aug) and year-end peaks
+MONTHLY_WEIGHTS = {1: 9, 2: 8, 3: 11, 4: 8, 5: 9, 6: 12, 7: 9, 8: 11, 9: 9, 10: 8, 11: 11, 12: 14}
+WEEKEND_WEIGHT = 1.4
+
+CITIES = ['Alor Setar', 'Langkawi', 'Sungai Petani', 'Kulim', 'Jitra', 'Gurun', 'Baling', 'Pendang']
+CATEGORIES = ['Nature', 'Island', 'Beach', 'Heritage', 'Museum', 'Shopping', 'Food', 'Religious']
+CUISINES = ['Malay', 'Thai', 'Chinese', 'Indian', 'Western', 'Seafood', 'Cafe']
+STAY_TYPES = ['Hotel', 'Apartment', 'Guest House', 'Homestay']
+PLATFORMS = ['twitter', 'instagram', 'facebook', 'tiktok']
+PLATFORM_WEIGHTS = [3, 4, 2, 1]
+SENTIMENTS = [('positive', 0.6), ('neutral', 0.25), ('negative', 0.15)]
+SENTIMENT_SCORES = {'positive': 0.7, 'neutral': 0.0, 'negative': -0.7}
+PHRASES = {
+    'positive': ['amazing sunset views', 'lovely food and friendly staff', 'best trip this year',
+                 'beautiful beach and clear water', 'must visit again'],
+    'neutral': ['stopped by on the way', 'weekend trip with family', 'checking out the area',
+                'first time here', 'long drive but ok'],
+    'negative': ['too crowded and dirty', 'overpriced and slow service', 'traffic jam everywhere',
+                 'closed when we arrived', 'not worth the drive'],
+}
+
+# Kedah bounding box
+LAT_RANGE = (5.2, 6.5)
+LON_RANGE = (99.6, 101.0)
+
+
+def chunked_create(model, rows, chunk_size=CHUNK_SIZE):
+    """bulk_create rows in chunk_size transactions; returns the created objects."""
+    created = []
+    for start in range(0, len(rows), chunk_size):
+        with transaction.atomic():
+            created.extend(model.objects.bulk_create(rows[start:start + chunk_size]))
+    return created
+
+
+def zipf_weights(n, exponent=ZIPF_EXPONENT):
+    return [1 / rank ** exponent for rank in range(1, n + 1)]
+
+
+def popularity(rng, items, exponent=ZIPF_EXPONENT):
+    """
+    Shuffle items into a random popularity order; returns (items, cumulative
+    Zipf weights) for rng.choices(items, cum_weights=...).
+    """
+    ranked = list(items)
+    rng.shuffle(ranked)
+    return ranked, list(accumulate(zipf_weights(len(ranked), exponent)))
+
+
+def allocate(rng, items, total, exponent=ZIPF_EXPONENT):
+    """Split total into a Zipf-distributed count per item: [(item, count), ...]."""
+    if not items:
+        return []
+    ranked, weights = popularity(rng, items, exponent)
+    scale = total / weights[-1]
+    counts = [round(w * scale) for w in zipf_weights(len(ranked), exponent)]
+    return list(zip(ranked, counts))
+
+
+def day_weights(days, today):
+    """(days ending today, cumulative seasonal × weekday weights)."""
+    dates = [today - timedelta(days=offset) for offset in range(days)]
+    weights = [
+        MONTHLY_WEIGHTS[day.month] * (WEEKEND_WEIGHT if day.weekday() >= 5 else 1)
+        for day in dates
+    ]
+    return dates, list(accumulate(weights))
+
+
+def timestamps(rng, count, days, now):
+    """count aware datetimes over the last `days` days, seasonal and diurnal."""
+    dates, cum_days = day_weights(days, timezone.localtime(now).date())
+    hours = list(range(24))
+    cum_hours = list(accumulate(HOURLY_WEIGHTS))
+    result = []
+    for day, hour in zip(rng.choices(dates, cum_weights=cum_days, k=count),
+                         rng.choices(hours, cum_weights=cum_hours, k=count)):
+        moment = timezone.make_aware(datetime.combine(day, time(hour, rng.randrange(60), rng.randrange(60))))
+        if moment > now:  # later today
+            moment -= timedelta(days=1)
+        result.append(moment)
+    return result
+
+
+def _location(rng):
+    return round(rng.uniform(*LAT_RANGE), 5), round(rng.uniform(*LON_RANGE), 5)
+
+
+def _entities(rng, spec, owner, chunk_size):
+    from events.models import Event
+    from stays.models import Stay
+    from vendors.models import Vendor
+
+    from .models import Place
+
+    places, vendors, stays = [], [], []
+    for i in range(spec['places']):
+        lat, lon = _location(rng)
+        places.append(Place(
+            name=f'Synthetic Place {i}', city=rng.choice(CITIES), category=rng.choice(CATEGORIES),
+            latitude=lat, longitude=lon,
+        ))
+    for i in range(spec['vendors']):
+        lat, lon = _location(rng)
+        vendors.append(Vendor(
+            name=f'Synthetic Warung {i}', city=rng.choice(CITIES), owner=owner,
+            cuisines=rng.sample(CUISINES, 2), lat=lat, lon=lon,
+        ))
+    for i in range(spec['stays']):
+        lat, lon = _location(rng)
+        stays.append(Stay(
+            name=f'Synthetic Stay {i}', type=rng.choice(STAY_TYPES), district=rng.choice(CITIES),
+            priceNight=rng.randint(60, 600), rating=round(rng.uniform(6, 9.8), 1), owner=owner,
+            is_internal=rng.random() < 0.5, lat=lat, lon=lon,
+        ))
+
+    now = timezone.now()
+    # Events follow the seasons too: past ones over the window, some ahead
+    past = timestamps(rng, spec['events'], spec['days'], now)
+    events = []
+    for i, start in enumerate(past):
+        if rng.random() < 0.25:
+            start += timedelta(days=rng.randint(1, 90) + (now - start).days)
+        lat, lon = _location(rng)
+        events.append(Event(
+            title=f'Synthetic Festival {i}', city=rng.choice(CITIES), lat=lat, lon=lon,
+            start_date=start, end_date=start + timedelta(hours=rng.randint(2, 8)),
+            max_capacity=rng.choice([None, 50, 200, 1000]), expected_attendance=rng.randint(20, 800),
+            actual_attendance=rng.randint(10, 800) if start < now else None, created_by=owner,
+        ))
+
+    return (chunked_create(Place, places, chunk_size), chunked_create(Vendor, vendors, chunk_size),
+            chunked_create(Stay, stays, chunk_size), chunked_create(Event, events, chunk_size))
+
+
+def _children(rng, spec, vendors, events, users, chunk_size):
+    from events.models import Event, EventRegistration
+    from vendors.models import MenuItem, OpeningHours, Promotion, Reservation, Review
+
+    now = timezone.now()
+    today = timezone.localdate()
+    items, hours, promotions = [], [], []
+    for vendor in vendors:
+        for j in range(rng.randint(3, 10)):
+            items.append(MenuItem(vendor=vendor, name=f'Item {j}', category='Main', price=rng.randint(5, 40)))
+        for day in range(7):
+            hours.append(OpeningHours(vendor=vendor, day_of_week=day, open_time=time(9), close_time=time(22)))
+        if rng.random() < 0.3:
+            promotions.append(Promotion(vendor=vendor, title='Promo', description='10% off',
+                                        start_date=today - timedelta(days=3), end_date=today + timedelta(days=14)))
+
+    reviews = [
+        Review(vendor=vendor, rating=rng.choices([1, 2, 3, 4, 5], [1, 1, 2, 4, 5])[0], comment='Sedap',
+               author_name=f'Reviewer {j}', verified_visit=rng.random() < 0.4)
+        for vendor, count in allocate(rng, vendors, spec['reviews'])
+        for j in range(count)
+    ]
+
+    reservations = []
+    for vendor, count in allocate(rng, vendors, spec['reservations']):
+        for j, moment in enumerate(timestamps(rng, count, spec['days'], now)):
+            if rng.random() < 0.2:  # upcoming bookings
+                moment += timedelta(days=(now - moment).days + rng.randint(1, 30))
+            reservations.append(Reservation(
+                vendor=vendor, customer_name=f'Guest {j}', customer_email=f'guest{j}@example.com',
+                customer_phone='0120000000', date=timezone.localtime(moment).date(),
+                time=time(timezone.localtime(moment).hour), party_size=rng.randint(1, 8),
+                status='pending' if moment > now else rng.choice(['confirmed', 'completed', 'cancelled']),
+            ))
+
+    registrations = []
+    for event, count in allocate(rng, events, spec['registrations']):
+        for user in rng.sample(users, min(len(users), count)):
+            registrations.append(EventRegistration(
+                event=event, user=user, status=rng.choice(['confirmed', 'confirmed', 'pending', 'cancelled'])))
+
+    for model, rows in ((MenuItem, items), (OpeningHours, hours), (Promotion, promotions), (Review, reviews),
+                        (Reservation, reservations), (EventRegistration, registrations)):
+        chunked_create(model, rows, chunk_size)
+    # bulk_create bypasses EventRegistration.save(), which keeps the counter in step
+    Event.objects.filter(pk__in=[event.pk for event in events]).reconcile_confirmed_counts()
+    return {'reviews': len(reviews), 'reservations': len(reservations), 'registrations': len(registrations)}
+
+
+def _posts(rng, spec, places, vendors, stays, seed, chunk_size, progress):
+    from .keywords import extract_keywords
+    from .models import SocialPost
+    from .rollups import rollup_key
+
+    now = timezone.now()
+    targets, cum_targets = popularity(
+        rng, [('place', p) for p in places] + [('vendor', v) for v in vendors] + [('stay', s) for s in stays])
+    sentiments, sentiment_weights = zip(*SENTIMENTS)
+    cum_platforms = list(accumulate(PLATFORM_WEIGHTS))
+    # Authors are Zipfian too: a few accounts post a lot
+    authors, cum_authors = popularity(rng, range(max(1, spec['posts'] // 5)))
+
+    keys = set()
+    total = spec['posts']
+    for start in range(0, total, chunk_size):
+        size = min(chunk_size, total - start)
+        rows = []
+        picks = zip(
+            rng.choices(targets, cum_weights=cum_targets, k=size),
+            timestamps(rng, size, spec['days'], now),
+            rng.choices(sentiments, sentiment_weights, k=size),
+            rng.choices(PLATFORMS, cum_weights=cum_platforms, k=size),
+            rng.choices(authors, cum_weights=cum_authors, k=size),
+        )
+        for i, ((entity_type, entity), created, sentiment, platform, author) in enumerate(picks, start):
+            content = f'{entity.name}: {rng.choice(PHRASES[sentiment])}'
+            likes = int(rng.paretovariate(1.5) * 10) - 10
+            rows.append(SocialPost(
+                platform=platform, post_id=f'synthetic-{seed}-{i}', content=content,
+                author_id=f'author{author}', created_at=created,
+                likes=likes, comments=likes // rng.randint(5, 20), shares=likes // rng.randint(10, 40),
+                views=likes * rng.randint(5, 30) + rng.randint(0, 100),
+                sentiment=sentiment, sentiment_score=SENTIMENT_SCORES[sentiment],
+                confidence=round(rng.uniform(60, 99), 1), is_tourism=True,
+                extra={'topics': extract_keywords(content), 'synthetic': True},
+                **{entity_type: entity},
+            ))
+            keys.add(tuple(rollup_key(entity_type, entity.pk, created)))
+        with transaction.atomic():
+            SocialPost.objects.bulk_create(rows)
+        if progress:
+            progress('posts', start + size, total)
+    return total, keys
+
+
+def generate(scale='xs', seed=0, chunk_size=CHUNK_SIZE, rollups=True, progress=None, **counts):
+    """
+    Create a dataset in the current database, then rebuild rollups and
+    place scores (unless rollups=False).
+
+    Args:
+        scale: SCALES key giving the default counts
+        seed: Random seed; usernames and post ids include it, so two
+              datasets with different seeds can live side by side
+        progress: Optional callback(label, done, total) after every post chunk
+        **counts: Overrides for any SCALES count (posts=2_000_000, days=730, ...)
+
+    Returns:
+        Row counts per table
+    """
+    from users.models import User
+
+    from .rollups import rebuild_rollups
+    from .scoring import refresh_place_scores
+
+    spec = {**SCALES[scale], **{key: value for key, value in counts.items() if value is not None}}
+    unknown = set(spec) - set(SCALES[scale])
+    if unknown:
+        raise ValueError(f"Unknown counts: {', '.join(sorted(unknown))}")
+    if User.objects.filter(username=f'synthetic-owner-{seed}').exists():
+        raise ValueError(f'A synthetic dataset with seed {seed} already exists; clear() it or use another seed')
+
+    rng = random.Random(seed)
+    owner = User.objects.create(username=f'synthetic-owner-{seed}', role='vendor', password='!')
+    users = chunked_create(User, [
+        User(username=f'synthetic-{seed}-{i}', password='!') for i in range(spec['users'])
+    ], chunk_size)
+    places, vendors, stays, events = _entities(rng, spec, owner, chunk_size)
+    result = {
+        'users': len(users), 'places': len(places), 'vendors': len(vendors), 'stays': len(stays),
+        'events': len(events),
+    }
+    result.update(_children(rng, spec, vendors, events, users, chunk_size))
+    result['posts'], keys = _posts(rng, spec, places, vendors, stays, seed, chunk_size, progress)
+
+    if rollups:
+        rebuild_rollups(keys)
+        refresh_place_scores()
+    return result
+
+
+def clear():
+    """
+    Delete every synthetic row and rebuild the rollups they touched.
+
+    Returns:
+        Number of posts deleted
+    """
+    from events.models import Event
+    from stays.models import Stay
+    from users.models import User
+    from vendors.models import Vendor
+
+    from .models import Place, SocialPost
+    from .rollups import rebuild_rollups
+    from .scoring import refresh_place_scores
+
+    posts = SocialPost.objects.filter(post_id__startswith='synthetic-')
+    days = sorted({timezone.localtime(moment).date() for moment in posts.datetimes('created_at', 'day')})
+    entities = {
+        'place': list(Place.objects.filter(name__startswith='Synthetic ').values_list('pk', flat=True)),
+        'vendor': list(Vendor.objects.filter(name__startswith='Synthetic ').values_list('pk', flat=True)),
+        'stay': list(Stay.objects.filter(name__startswith='Synthetic ').values_list('pk', flat=True)),
+    }
+    deleted = posts.delete()[1].get(SocialPost._meta.label, 0)
+
+    # rebuild_rollups rebuilds the cross product of the ids and days it is given
+    keys = [(t, ids[0], day) for t, ids in entities.items() if ids for day in days]
+    keys += [(t, entity_id, days[0]) for t, ids in entities.items() if days for entity_id in ids]
+    rebuild_rollups(keys)
+
+    for model, field in ((Event, 'title'), (Place, 'name'), (Vendor, 'name'), (Stay, 'name')):
+        model.objects.filter(**{f'{field}__startswith': 'Synthetic '}).delete()
+    User.objects.filter(username__startswith='synthetic-').delete()
+    refresh_place_scores()
+    return deleted
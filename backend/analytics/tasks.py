@@ -22,12 +22,26 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tourism_api.settings')
 django.setup()
 
-from analytics.scraper import SocialMediaScraper
-from analytics.classifier import PostClassifier
-from analytics.models import Place, SocialPost
-from vendors.models import Vendor
-from stays.models import Stay
-from analytics.cache_utils import invalidate_analytics_cache
+from celery import chord
+from celery.exceptions import SoftTimeLimitExceeded
+from django.conf import settings
+
+from analytics.pipeline import (
+    CLASSIFY_BUDGET_SECONDS, chunked, classify_posts, fetch_posts, finish_rollup, finish_run,
+    load_catalog, persist_posts, record_stage, run_inline, warm_cache,
+)
+from analytics.dedup import mark_duplicates
+from analytics.models import PipelineRun
+
+
+# Stages retry on failure; each one is idempotent (see analytics/pipeline.py;
+# a retried fetch reuses the run's landing segment instead of scraping again)
+RETRY_OPTIONS = {
+    'autoretry_for': (Exception,),
+    'retry_backoff': True,
+    'retry_backoff_max': 300,
+    'max_retries': 3,
+}
 
 
 @shared_task  # ✅ ADD THIS DECORATOR
@@ -40,173 +54,137 @@ def collect_and_process_social_posts():
     
     This runs automatically based on the schedule in celery.py
     
+    The work is split into a staged pipeline so classification and storage
+    fan out across workers in chunks:
+    
+        fetch → chord([classify → persist] × chunks) → rollup → warm
+    
     Enhanced to scrape for:
     - Destinations (Place)
     - Restaurants/Vendors (Vendor)
     - Accommodations (Stay)
-    """
-    print("=" * 60)
-    print("🚀 STARTING SOCIAL MEDIA COLLECTION TASK")
-    print("=" * 60)
-    print(f"⏰ Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-    
-    # Step 1: Get all keywords from database (places, vendors, stays)
-    places = Place.objects.all()
-    vendors = Vendor.objects.filter(is_active=True)
-    stays = Stay.objects.filter(is_active=True)
-    
-    keywords = []
-    
-    # Add place names
-    place_names = [place.name for place in places]
-    keywords.extend(place_names)
-    
-    # Add vendor/restaurant names
-    vendor_names = [vendor.name for vendor in vendors]
-    keywords.extend(vendor_names)
-    
-    # Add stay/accommodation names
-    stay_names = [stay.name for stay in stays]
-    keywords.extend(stay_names)
     
-    if not keywords:
-        print("⚠️ No places, vendors, or stays found in database! Add some data first.")
-        return
-    
-    print(f"📍 Found {len(place_names)} destinations in database")
-    print(f"🍽️ Found {len(vendor_names)} restaurants/vendors in database")
-    print(f"🏨 Found {len(stay_names)} accommodations in database")
-    print(f"🔍 Total keywords to search: {len(keywords)}")
-    print()
-    
-    # Step 2: Initialize scraper and classifier
-    scraper = SocialMediaScraper()
-    classifier = PostClassifier(places_list=keywords)
-    
-    # Step 3: Scrape posts from all platforms
-    print("🕷️ Scraping social media posts...")
-    raw_posts = scraper.search_all_platforms(keywords, max_results_per_platform=10)
-    print(f"✅ Collected {len(raw_posts)} raw posts from social media.\n")
-    
-    # Step 4: Process each post
-    tourism_posts_added = 0
-    non_tourism_posts_skipped = 0
-    
-    for post_data in raw_posts:
-        print(f"\n{'='*60}")
-        print(f"📝 Processing {post_data['platform'].upper()} post...")
-        print(f"   Content: {post_data['content'][:80]}...")
-        
-        # Step 4a: Classify with AI
-        classification = classifier.classify_post(post_data['content'])
-        
-        if classification['is_tourism']:
-            print(f"   ✅ Tourism: YES (confidence: {classification['confidence']})")
-            print(f"   📍 Identified: {classification['place_name']}")
-            print(f"   😊 Sentiment: {classification['sentiment']}")
-            
-            # Step 4b: Find what this post is about (place, vendor, or stay)
-            place_obj = None
-            vendor_obj = None
-            stay_obj = None
-            entity_name = classification['place_name']
-            
-            if entity_name:
-                # Try to match with Place first
-                try:
-                    place_obj = Place.objects.get(name__iexact=entity_name)
-                    print(f"   🗺️ Matched to DESTINATION: {place_obj.name}")
-                except Place.DoesNotExist:
-                    pass
-                
-                # Try to match with Vendor if not a place
-                if not place_obj:
-                    try:
-                        vendor_obj = Vendor.objects.get(name__iexact=entity_name, is_active=True)
-                        print(f"   🍽️ Matched to RESTAURANT: {vendor_obj.name}")
-                    except Vendor.DoesNotExist:
-                        pass
-                
-                # Try to match with Stay if not a place or vendor
-                if not place_obj and not vendor_obj:
-                    try:
-                        stay_obj = Stay.objects.get(name__iexact=entity_name, is_active=True)
-                        print(f"   🏨 Matched to ACCOMMODATION: {stay_obj.name}")
-                    except Stay.DoesNotExist:
-                        pass
-                
-                # If nothing matched, skip
-                if not place_obj and not vendor_obj and not stay_obj:
-                    print(f"   ⚠️ '{entity_name}' not found in database. Skipping.")
-                    non_tourism_posts_skipped += 1
-                    continue
-                
-                # Step 4c: Store in database (update if already exists)
-                social_post, created = SocialPost.objects.update_or_create(
-                    platform=post_data['platform'],
-                    post_id=post_data['post_id'],
-                    defaults={
-                        'place': place_obj,
-                        'vendor': vendor_obj,
-                        'stay': stay_obj,
-                        'content': post_data['content'],
-                        'url': post_data['url'],
-                        'created_at': post_data['created_at'],
-                        'likes': post_data['likes'],
-                        'comments': post_data['comments'],
-                        'shares': post_data['shares'],
-                        'views': post_data['views'],
-                        'is_tourism': True,
-                        'sentiment': classification['sentiment'],
-                        'sentiment_score': classification.get('sentiment_score', 0.0),
-                        'confidence': classification['confidence'],
-                        'extra': {
-                            'sentiment': classification['sentiment'],
-                            'confidence': classification['confidence']
-                        }
-                    }
-                )
-                
-                if created:
-                    print(f"   ✨ NEW POST SAVED to database!")
-                    tourism_posts_added += 1
-                else:
-                    print(f"   🔄 Post already exists. Updated metrics.")
-            else:
-                print("   ⚠️ No specific entity identified. Skipping.")
-                non_tourism_posts_skipped += 1
-                
-        else:
-            print(f"   ❌ Tourism: NO (not relevant)")
-            non_tourism_posts_skipped += 1
-    
-    # Step 5: Summary
-    print("\n" + "=" * 60)
-    print("📊 TASK COMPLETED!")
-    print("=" * 60)
-    print(f"✅ Tourism posts added: {tourism_posts_added}")
-    print(f"❌ Non-tourism posts skipped: {non_tourism_posts_skipped}")
-    print(f"📦 Total posts processed: {len(raw_posts)}")
-    print(f"⏰ Finished at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    
-    # Step 6: ✨ INVALIDATE CACHE after new data arrives
-    print("\n" + "=" * 60)
-    print("🗑️ INVALIDATING ANALYTICS CACHE...")
-    print("=" * 60)
-    try:
-        deleted_keys = invalidate_analytics_cache()
-        print(f"✅ Cache invalidation complete! {deleted_keys} keys removed.")
-        print("📝 Next API request will fetch fresh data from database.")
-    except Exception as e:
-        print(f"⚠️ Cache invalidation failed (non-critical): {e}")
-    
-    print("=" * 60)
+    Without a broker (USE_CELERY off) every stage runs in this process via
+    run_inline().
+    """
+    if not settings.USE_CELERY:
+        run = run_inline()
+        print(f"✅ Pipeline run #{run.pk} (inline): {run.stats}")
+        return run.pk
+    
+    run = PipelineRun.objects.create()
+    print(f"🚀 Starting collection pipeline run #{run.pk} at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    pipeline_fetch.apply_async((run.pk,), link_error=pipeline_failed.si(run.pk))
+    return run.pk
+
+
+@shared_task(bind=True, **RETRY_OPTIONS)
+def pipeline_fetch(self, run_id):
+    """Stage 1: fetch new posts, then fan out classify → persist per chunk."""
+    with record_stage(run_id, 'fetch') as timing:
+        posts = fetch_posts(run_id)
+        timing['items'] = len(posts)
+    
+    body = (pipeline_rollup.s(run_id) | pipeline_warm.si(run_id)).on_error(pipeline_failed.si(run_id))
+    if not posts:
+        body.delay([])
+        return 0
+    
+    chunks = chunked(posts)
+    chord(
+        pipeline_classify.s(run_id, number, chunk) | pipeline_persist.s(run_id, number)
+        for number, chunk in enumerate(chunks)
+    )(body)
+    print(f"📦 Run #{run_id}: {len(posts)} posts fanned out in {len(chunks)} chunks")
+    return len(chunks)
+
+
+@shared_task(bind=True, soft_time_limit=CLASSIFY_BUDGET_SECONDS + 60, **RETRY_OPTIONS)
+def pipeline_classify(self, run_id, chunk_number, posts):
+    """Stage 2: flag near-duplicates, classify the rest (AI within a time budget, then keywords)."""
+    keywords, _ = load_catalog()
+    with record_stage(run_id, 'classify', chunk=chunk_number) as timing:
+        mark_duplicates(posts)
+        try:
+            classified = classify_posts(posts, keywords)
+        except SoftTimeLimitExceeded:
+            # Model provider hung past the budget: finish the chunk without AI
+            print(f"⏳ Run #{run_id} chunk {chunk_number}: classification timed out, using keywords")
+            classified = classify_posts(posts, keywords, budget_seconds=0)
+        timing['items'] = len(classified)
+    return classified
+
+
+@shared_task(bind=True, **RETRY_OPTIONS)
+def pipeline_persist(self, classified, run_id, chunk_number):
+    """Stage 3: upsert one chunk; returns the rollup keys it touched."""
+    _, index = load_catalog()
+    with record_stage(run_id, 'persist', chunk=chunk_number) as timing:
+        result = persist_posts(classified, index)
+        timing['items'] = len(classified)
+    return result
+
+
+@shared_task(bind=True, **RETRY_OPTIONS)
+def pipeline_rollup(self, chunk_results, run_id):
+    """Stage 4: rebuild touched rollups and commit scrape checkpoints."""
+    with record_stage(run_id, 'rollup') as timing:
+        stats = finish_rollup(run_id, chunk_results)
+        timing['items'] = stats['rollup_rows']
+    print(f"📊 Run #{run_id}: {stats}")
+    return stats
+
+
+@shared_task(bind=True, **RETRY_OPTIONS)
+def pipeline_warm(self, run_id):
+    """Stage 5: invalidate and re-warm the analytics cache."""
+    with record_stage(run_id, 'warm') as timing:
+        timing['items'] = warm_cache()
+    finish_run(run_id)
+    print(f"✅ Pipeline run #{run_id} finished at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+
+@shared_task
+def pipeline_failed(run_id):
+    finish_run(run_id, 'failed')
+    print(f"❌ Pipeline run #{run_id} failed")
+
+
+
+@shared_task
+def maintain_social_post_partitions():
+    """Keep monthly SocialPost partitions ahead of incoming data (no-op on SQLite)."""
+    from django.core.management import call_command
+    call_command('partition_social_posts')
+
+
+@shared_task
+def archive_old_social_posts():
+    """Move posts past the retention horizon into the cold archive."""
+    from django.core.management import call_command
+    call_command('archive_social_posts')
+
+
+@shared_task
+def refresh_place_scores():
+    """Recompute visit tiers and hidden gems (picks up reclassify / replay runs)."""
+    from django.core.management import call_command
+    call_command('refresh_place_scores')
+
+
+@shared_task
+def purge_slow_queries():
+    """Delete SlowQuery rows older than SLOW_QUERY_LOG['RETENTION_DAYS']."""
+    from django.core.management import call_command
+    call_command('slow_queries', '--purge')
 
 
 # Run the task when this script is executed
 if __name__ == "__main__":
     try:
-        collect_and_process_social_posts()
+        # No broker needed: run every stage in this process
+        run = run_inline()
+        print(f"✅ Pipeline run #{run.pk}: {run.stats}")
     except Exception as e:
         print(f"\n❌ ERROR: {e}")
         import traceback
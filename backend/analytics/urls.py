@@ -120,6 +120,10 @@ urlpatterns = [
     path('trends/hidden-gem', vs.hidden_gem, name='trends-hidden-gem'),
     path('trends/hidden-gem/', vs.hidden_gem),
 
+    # === ADMIN DIAGNOSTICS ===
+    path('admin/slow-queries', vs.slow_queries_report, name='admin-slow-queries'),
+    path('admin/slow-queries/', vs.slow_queries_report),
+
     # Note: tabs/attractions, tabs/vendors, and reports endpoints
     # are legacy and cause model conflicts - removed for clean code
 ]
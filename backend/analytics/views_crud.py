@@ -1,4 +1,5 @@
 from django.db.models import Q
+from django.utils.dateparse import parse_date
 from rest_framework import viewsets, filters, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
@@ -130,8 +131,6 @@ class SocialPostViewSet(viewsets.ModelViewSet):
         # optional date range filtering (YYYY-MM-DD)
         df = p.get("date_from")
         dt = p.get("date_to")
-        if df:
-            qs = qs.filter(created_at__date__gte=df)
-        if dt:
-            qs = qs.filter(created_at__date__lte=dt)
+        if df or dt:
+            qs = qs.in_window(parse_date(df) if df else None, parse_date(dt) if dt else None)
         return qs
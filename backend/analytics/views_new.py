@@ -8,10 +8,13 @@ from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from rest_framework import status
 from datetime import datetime, timedelta
-from .models import Place, SocialPost, PostRaw, PostClean, SentimentTopic
+from .models import (
+    Place, SocialPost, PostRaw, PostClean, SentimentTopic, canonical_window,
+)
 from .serializers import PlaceSerializer, SocialPostSerializer, PostCleanSerializer, SentimentTopicSerializer
 from events.models import Event
 from .cache_utils import generate_cache_key
+from .scoring import visit_tier_scope
 from django.core.cache import cache
 
 class PlacesListView(APIView):
@@ -55,7 +58,7 @@ class SentimentSummaryView(APIView):
         start, end = parse_range(request)
         
         # Use SocialPost with sentiment fields instead of PostClean
-        qs = SocialPost.objects.filter(created_at__date__range=[start, end])
+        qs = SocialPost.objects.canonical().in_window(start, end)
         
         # Filter by city if provided
         city_filter = request.GET.get('city', None)
@@ -106,7 +109,7 @@ class SentimentByCategoryView(APIView):
         
         # Filter by city if provided
         city_filter = request.GET.get('city', None)
-        qs = SocialPost.objects.filter(created_at__date__range=[start, end])
+        qs = SocialPost.objects.canonical().in_window(start, end)
         if city_filter and city_filter != 'all':
             qs = qs.filter(place__city__icontains=city_filter)
         
@@ -148,12 +151,16 @@ class TopKeywordsView(APIView):
     def get(self, request):
         start, end = parse_range(request)
         
+        topics = SentimentTopic.objects.filter(date__range=[start, end])
+        city_filter = request.GET.get('city', None)
+        if city_filter and city_filter != 'all':
+            topics = topics.filter(city__icontains=city_filter.replace('-', ' '))
+        
         topics = (
-            SentimentTopic.objects
-            .filter(date__range=[start, end])
+            topics
             .values('topic', 'sentiment')
             .annotate(count=Sum('count'))
-            .order_by('-count')[:10]
+            .order_by('-count', 'topic')[:10]
         )
         
         return Response([{
@@ -167,9 +174,7 @@ class SocialMetricsView(APIView):
     def get(self, request):
         start, end = parse_range(request)
         
-        metrics = SocialPost.objects.filter(
-            created_at__date__range=[start, end]
-        ).aggregate(
+        metrics = SocialPost.objects.canonical().in_window(start, end).aggregate(
             total_posts=Count('id'),
             total_likes=Sum('likes'),
             total_comments=Sum('comments'),
@@ -185,7 +190,8 @@ class SocialPlatformsView(APIView):
         
         platforms = (
             SocialPost.objects
-            .filter(created_at__date__range=[start, end])
+            .canonical()
+            .in_window(start, end)
             .values('platform')
             .annotate(
                 posts=Count('id'),
@@ -205,7 +211,8 @@ class SocialEngagementView(APIView):
         
         hourly = (
             SocialPost.objects
-            .filter(created_at__date__range=[start, end])
+            .canonical()
+            .in_window(start, end)
             .annotate(hour=ExtractHour('created_at'))
             .values('hour')
             .annotate(
@@ -240,23 +247,19 @@ class PopularPlacesView(APIView):
             places_qs
             .annotate(
                 # Current period metrics
-                posts_count=Count('posts', filter=Q(
-                    posts__created_at__date__range=[start, end]
-                )),
+                posts_count=Count('posts', filter=canonical_window(start, end, prefix='posts__')),
                 total_engagement=Sum(
                     F('posts__likes') + F('posts__comments') + F('posts__shares'),
-                    filter=Q(posts__created_at__date__range=[start, end])
+                    filter=canonical_window(start, end, prefix='posts__')
                 ),
                 
                 # Average sentiment score → Convert to star rating (1-5)
-                avg_sentiment=Avg('posts__sentiment_score', filter=Q(
-                    posts__created_at__date__range=[start, end]
-                )),
+                avg_sentiment=Avg('posts__sentiment_score', filter=canonical_window(start, end, prefix='posts__')),
                 
                 # Previous period engagement for trending calculation
                 prev_engagement=Sum(
                     F('posts__likes') + F('posts__comments') + F('posts__shares'),
-                    filter=Q(posts__created_at__date__range=[prev_start, prev_end])
+                    filter=canonical_window(prev_start, prev_end, prefix='posts__')
                 )
             )
             # Removed: .filter(posts_count__gt=0) - now returns ALL places
@@ -326,11 +329,11 @@ class TrendingPlacesView(APIView):
                 .annotate(
                     engagement=Sum(
                         F('posts__likes') + F('posts__comments') + F('posts__shares'),
-                        filter=Q(posts__created_at__date__range=[start, end])
+                        filter=canonical_window(start, end, prefix='posts__')
                     )
                 )
-                .values('id')
                 .filter(engagement__gt=0)
+                .values('id', 'engagement')
             )
         
         current = {
@@ -373,9 +376,9 @@ class NearbyPlacesView(APIView):
             .annotate(
                 posts_count=Count('posts'),
                 avg_sentiment=Avg(Case(
-                    When(posts__postclean__sentiment='positive', then=1),
-                    When(posts__postclean__sentiment='neutral', then=0),
-                    When(posts__postclean__sentiment='negative', then=-1),
+                    When(posts__sentiment='positive', then=1),
+                    When(posts__sentiment='neutral', then=0),
+                    When(posts__sentiment='negative', then=-1),
                     output_field=IntegerField()
                 ))
             )
@@ -411,8 +414,8 @@ class OverviewMetricsView(APIView):
         prev_start = prev_end - timedelta(days=days)
         
         # Base query
-        posts_qs = SocialPost.objects.filter(created_at__date__range=[start_date, end_date])
-        prev_posts_qs = SocialPost.objects.filter(created_at__date__range=[prev_start, prev_end])
+        posts_qs = SocialPost.objects.canonical().in_window(start_date, end_date)
+        prev_posts_qs = SocialPost.objects.canonical().in_window(prev_start, prev_end)
         
         # Filter by city if specified
         if city and city != 'all':
@@ -500,15 +503,14 @@ class OverviewMetricsView(APIView):
         for item in daily_trends:
             item['date'] = item['date'].strftime('%Y-%m-%d')
         
-        # === 6. TOP KEYWORDS (from extra field) ===
-        keywords_data = []
-        for post in posts_qs.filter(extra__isnull=False)[:100]:
-            if 'keywords' in post.extra and isinstance(post.extra['keywords'], list):
-                keywords_data.extend(post.extra['keywords'])
-        
-        from collections import Counter
-        keyword_counts = Counter(keywords_data).most_common(10)
-        top_keywords = [{'keyword': k, 'count': c} for k, c in keyword_counts]
+        # === 6. TOP KEYWORDS (daily topic counts, see analytics/keywords.py) ===
+        topics_qs = SentimentTopic.objects.filter(date__range=[start_date, end_date])
+        if city and city != 'all':
+            topics_qs = topics_qs.filter(city__icontains=city_search)
+        top_keywords = [
+            {'keyword': t['topic'], 'count': t['count']}
+            for t in topics_qs.values('topic').annotate(count=Sum('count')).order_by('-count', 'topic')[:10]
+        ]
         
         # === 7. SENTIMENT BY CATEGORY ===
         sentiment_by_category = list(
@@ -590,7 +592,7 @@ class SocialEngagementTrendsView(APIView):
         start_date = end_date - timedelta(days=days)
         
         # Base query
-        posts_qs = SocialPost.objects.filter(created_at__date__range=[start_date, end_date])
+        posts_qs = SocialPost.objects.canonical().in_window(start_date, end_date)
         
         # Filter by city if specified
         if city and city != 'all':
@@ -630,39 +632,28 @@ class LeastVisitedDestinationsView(APIView):
         start, end = parse_range(request)
         limit = int(request.GET.get('limit', '5'))
         
-        # Get places with their post counts in the date range
+        # Get places with their post counts and engagement in the date range
+        in_range = canonical_window(start, end, prefix='posts__')
         places_with_counts = Place.objects.annotate(
-            post_count=Count(
-                'posts',
-                filter=Q(posts__created_at__date__range=[start, end])
-            )
+            post_count=Count('posts', filter=in_range),
+            total_likes=Sum('posts__likes', filter=in_range),
+            total_comments=Sum('posts__comments', filter=in_range),
+            total_shares=Sum('posts__shares', filter=in_range),
         ).filter(
             post_count__gt=0  # Only include places with at least some posts
         ).order_by('post_count')[:limit]
         
         result = []
         for place in places_with_counts:
-            # Calculate engagement metrics
-            posts = SocialPost.objects.filter(
-                place=place,
-                created_at__date__range=[start, end]
-            )
-            
-            total_engagement = posts.aggregate(
-                total_likes=Sum('likes'),
-                total_comments=Sum('comments'),
-                total_shares=Sum('shares')
-            )
-            
             result.append({
                 'id': place.id,
                 'name': place.name,
                 'posts': place.post_count,
                 'visitors': place.post_count * 150,  # Estimate based on posts
                 'engagement': (
-                    (total_engagement['total_likes'] or 0) +
-                    (total_engagement['total_comments'] or 0) +
-                    (total_engagement['total_shares'] or 0)
+                    (place.total_likes or 0) +
+                    (place.total_comments or 0) +
+                    (place.total_shares or 0)
                 ),
                 'rating': 3.5 + (place.post_count / 100),  # Simple rating estimate
                 'city': place.city or 'Kedah'
@@ -708,16 +699,20 @@ class EventAttendanceTrendView(APIView):
 
 class PlaceSentimentDetailView(APIView):
     """
-    GET /api/analytics/places/{id}/sentiment/
+    GET /api/analytics/places/{id}/sentiment/?weeks=12
     Detailed sentiment analysis for a specific place.
-    Returns sentiment breakdown, time-based trends, and engagement insights.
+    Returns sentiment breakdown, time-based trends (monthly, and weekly for
+    the last `weeks` weeks), and engagement insights.
+
+    Everything is assembled from the place's PlacePeriodRollup rows
+    (analytics/rollups.py): one read for the place, one for its series.
     """
     permission_classes = [AllowAny]
     
     def get(self, request, place_id):
-        from django.db.models import Count, Avg, Sum, Q
-        from django.db.models.functions import TruncMonth
         from collections import defaultdict
+        from .models import PlacePeriodRollup
+        from .rollups import ROLLUP_TOTALS, period_start
         
         try:
             place = Place.objects.get(id=place_id)
@@ -727,10 +722,23 @@ class PlaceSentimentDetailView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        # Get all social posts for this place
-        posts = SocialPost.objects.filter(place=place)
+        try:
+            weeks = max(1, min(int(request.GET.get('weeks', 12)), 104))
+        except ValueError:
+            weeks = 12
+        
+        # Monthly rows cover the whole history; weekly rows only the recent window
+        first_week = period_start(datetime.now().date(), 'week') - timedelta(weeks=weeks - 1)
+        rows = list(
+            PlacePeriodRollup.objects
+            .filter(place=place)
+            .filter(Q(period='month') | Q(period='week', period_start__gte=first_week))
+            .values('period', 'period_start', 'platform', *ROLLUP_TOTALS)
+            .order_by('period_start')
+        )
+        monthly = [row for row in rows if row['period'] == 'month']
         
-        if not posts.exists():
+        if not monthly and not SocialPost.objects.canonical().filter(place=place).exists():
             # Return demo data for presentation purposes
             return Response({
                 'place_id': place_id,
@@ -783,73 +791,73 @@ class PlaceSentimentDetailView(APIView):
                 'recommendation': 'This destination has strong positive sentiment (52.9%) and growing engagement. Consider promoting during peak seasons.'
             })
         
-        # Sentiment summary
-        sentiment_counts = posts.values('sentiment').annotate(count=Count('id'))
-        total_posts = posts.count()
-        sentiment_summary = {
-            'total_posts': total_posts,
-            'positive': 0,
-            'neutral': 0,
-            'negative': 0,
-            'positive_percentage': 0,
-            'neutral_percentage': 0,
-            'negative_percentage': 0
-        }
+        totals = defaultdict(float)
+        months = defaultdict(lambda: {'positive': 0, 'neutral': 0, 'negative': 0})
+        platforms = defaultdict(lambda: {'count': 0, 'score_sum': 0.0})
+        for row in monthly:
+            for field in ROLLUP_TOTALS:
+                totals[field] += row[field]
+            month = months[row['period_start'].strftime('%Y-%m')]
+            for sentiment in ('positive', 'neutral', 'negative'):
+                month[sentiment] += row[sentiment]
+            platform = platforms[row['platform']]
+            platform['count'] += row['posts']
+            platform['score_sum'] += row['sentiment_score_sum']
+        
+        weekly = defaultdict(lambda: {'positive': 0, 'neutral': 0, 'negative': 0, 'total': 0, 'engagement': 0})
+        for row in rows:
+            if row['period'] != 'week':
+                continue
+            week = weekly[row['period_start'].isoformat()]
+            for sentiment in ('positive', 'neutral', 'negative'):
+                week[sentiment] += row[sentiment]
+            week['total'] += row['posts']
+            week['engagement'] += row['likes'] + row['comments'] + row['shares']
         
-        for item in sentiment_counts:
-            sentiment_type = item['sentiment'] or 'neutral'
-            count = item['count']
+        # Sentiment summary
+        total_posts = int(totals['posts'])
+        sentiment_summary = {'total_posts': total_posts}
+        for sentiment_type in ('positive', 'neutral', 'negative'):
+            count = int(totals[sentiment_type])
             sentiment_summary[sentiment_type] = count
-            sentiment_summary[f'{sentiment_type}_percentage'] = round((count / total_posts) * 100, 1)
-        
-        # Average sentiment score and confidence
-        avg_metrics = posts.aggregate(
-            avg_sentiment_score=Avg('sentiment_score'),
-            avg_confidence=Avg('confidence')
-        )
+            sentiment_summary[f'{sentiment_type}_percentage'] = round((count / total_posts) * 100, 1) if total_posts else 0
         
-        # Convert sentiment score to rating
-        avg_score = avg_metrics['avg_sentiment_score'] or 0
+        # Average sentiment score and confidence → rating
+        avg_score = totals['sentiment_score_sum'] / total_posts if total_posts else 0
+        avg_confidence = totals['confidence_sum'] / total_posts if total_posts else 0
         rating = ((avg_score + 1) / 2) * 4 + 1
         
-        # Sentiment over time (monthly breakdown)
-        monthly_sentiment = posts.annotate(
-            month=TruncMonth('created_at')
-        ).values('month', 'sentiment').annotate(
-            count=Count('id')
-        ).order_by('month')
-        
-        # Organize by month
-        sentiment_timeline = defaultdict(lambda: {'positive': 0, 'neutral': 0, 'negative': 0})
-        for item in monthly_sentiment:
-            month_key = item['month'].strftime('%Y-%m')
-            sentiment_type = item['sentiment'] or 'neutral'
-            sentiment_timeline[month_key][sentiment_type] = item['count']
-        
+        # Sentiment over time (monthly / weekly breakdown)
         timeline_data = [
-            {
-                'month': month,
-                'positive': data['positive'],
-                'neutral': data['neutral'],
-                'negative': data['negative']
-            }
-            for month, data in sorted(sentiment_timeline.items())
+            {'month': month, **data}
+            for month, data in sorted(months.items())
+        ]
+        weekly_data = [
+            {'week': week, **data}
+            for week, data in sorted(weekly.items())
         ]
         
         # Engagement metrics
-        engagement_stats = posts.aggregate(
-            total_engagement=Sum(F('likes') + F('comments') + F('shares')),
-            total_likes=Sum('likes'),
-            total_comments=Sum('comments'),
-            total_shares=Sum('shares'),
-            total_views=Sum('views')
-        )
+        engagement_stats = {
+            'total_engagement': int(totals['likes'] + totals['comments'] + totals['shares']),
+            'total_likes': int(totals['likes']),
+            'total_comments': int(totals['comments']),
+            'total_shares': int(totals['shares']),
+            'total_views': int(totals['views']),
+        }
         
         # Platform breakdown
-        platform_data = posts.values('platform').annotate(
-            count=Count('id'),
-            avg_sentiment=Avg('sentiment_score')
-        ).order_by('-count')
+        platform_data = sorted(
+            (
+                {
+                    'platform': platform,
+                    'count': data['count'],
+                    'avg_sentiment': data['score_sum'] / data['count'] if data['count'] else None,
+                }
+                for platform, data in platforms.items()
+            ),
+            key=lambda item: -item['count']
+        )
         
         # Top keywords (from content if available)
         # This is a simplified version - in production you'd use NLP
@@ -874,30 +882,62 @@ class PlaceSentimentDetailView(APIView):
             'sentiment_summary': sentiment_summary,
             'rating': round(rating, 2),
             'average_sentiment_score': round(avg_score, 3),
-            'average_confidence': round(avg_metrics['avg_confidence'] or 0, 1),
+            'average_confidence': round(avg_confidence, 1),
             'sentiment_over_time': timeline_data,
+            'weekly_sentiment': weekly_data,
             'engagement_stats': engagement_stats,
-            'platform_breakdown': list(platform_data),
+            'platform_breakdown': platform_data,
             'top_keywords': top_keywords,
             'recommendation': recommendation
         })
 
 
+def _visit_tier_scope(request):
+    """(city, category) filters for the visit-tier views; "" means all."""
+    city = (request.GET.get('city') or '').strip()
+    if city == 'all':
+        city = ''
+    category = (request.GET.get('category') or '').strip()
+    if category == 'all':
+        category = ''
+    return city.replace('-', ' '), category
+
+
+def _rating(sentiment_score):
+    """Sentiment score (-1..1) on a 1..5 star scale."""
+    return ((sentiment_score + 1) / 2) * 4 + 1
+
+
+def _sentiment_distribution(summary):
+    positive = summary.positive if summary else 0
+    neutral = summary.neutral if summary else 0
+    negative = summary.negative if summary else 0
+    total = positive + neutral + negative
+    return {
+        'positive': positive,
+        'neutral': neutral,
+        'negative': negative,
+        'positive_percentage': round((positive / total) * 100, 1) if total > 0 else 0,
+        'neutral_percentage': round((neutral / total) * 100, 1) if total > 0 else 0,
+        'negative_percentage': round((negative / total) * 100, 1) if total > 0 else 0
+    }
+
+
 class PlacesByVisitLevelView(APIView):
     """
-    GET /api/analytics/places/by-visit-level/?level=most|least|medium&city=<city>
+    GET /api/analytics/places/by-visit-level/?level=most|least|medium&city=<city>&category=<category>
     Categorizes places by visit frequency with sentiment analysis.
     Uses engagement percentiles to define most/medium/least visited tiers.
-    Supports optional city filtering.
+    Supports optional city / category filtering.
+
+    Tiers and per-tier totals are precomputed from the rollups
+    (PlaceVisitTier / VisitTierSummary, analytics/scoring.py).
     """
     permission_classes = [AllowAny]
     
     def get(self, request):
-        from django.db.models import Count, Avg, Sum, Q
-        import numpy as np
-        
         level = request.GET.get('level', 'most')  # most, least, medium
-        city_filter = request.GET.get('city', None)  # optional city filter
+        city, category = _visit_tier_scope(request)
         
         if level not in ['most', 'least', 'medium']:
             return Response(
@@ -905,21 +945,9 @@ class PlacesByVisitLevelView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Get all places with their engagement metrics
-        places = Place.objects.annotate(
-            posts_count=Count('posts'),
-            total_engagement=Sum(F('posts__likes') + F('posts__comments') + F('posts__shares')),
-            avg_sentiment=Avg('posts__sentiment_score'),
-            positive_count=Count('posts', filter=Q(posts__sentiment='positive')),
-            neutral_count=Count('posts', filter=Q(posts__sentiment='neutral')),
-            negative_count=Count('posts', filter=Q(posts__sentiment='negative'))
-        ).filter(posts_count__gt=0)
-        
-        # Apply city filter if provided
-        if city_filter and city_filter != 'all':
-            places = places.filter(city__icontains=city_filter)
+        summaries, tiers = visit_tier_scope(city, category)
         
-        if not places.exists():
+        if not summaries:
             # Return demo data for presentation purposes
             demo_places = {
                 'most': [
@@ -1087,28 +1115,24 @@ class PlacesByVisitLevelView(APIView):
                 'places': selected_places
             })
         
-        # Calculate engagement percentiles
-        engagements = [p.total_engagement or 0 for p in places]
-        p33 = np.percentile(engagements, 33)
-        p67 = np.percentile(engagements, 67)
+        # Tiers were cut over the places in this scope; every tier shares its thresholds
+        thresholds = next(iter(summaries.values()))
+        p33, p67 = thresholds.p33, thresholds.p67
         
-        # Filter by level
         if level == 'most':
-            filtered_places = [p for p in places if (p.total_engagement or 0) >= p67]
             description = f"Most visited places (top 33% by engagement, ≥{int(p67)} engagement points)"
         elif level == 'least':
-            filtered_places = [p for p in places if (p.total_engagement or 0) <= p33]
             description = f"Least visited places (bottom 33% by engagement, ≤{int(p33)} engagement points)"
         else:  # medium
-            filtered_places = [p for p in places if p33 < (p.total_engagement or 0) < p67]
             description = f"Moderately visited places (middle 33%, {int(p33)}-{int(p67)} engagement points)"
         
-        # Format response
+        tiers = tiers.filter(scope_tier_level=level)
+        
+        # Format response (sorted by engagement descending)
         results = []
-        for place in filtered_places:
-            total_posts = place.posts_count or 1
-            sentiment_score = place.avg_sentiment or 0
-            rating = ((sentiment_score + 1) / 2) * 4 + 1
+        for tier in tiers:
+            place = tier.place
+            total_posts = tier.posts or 1
             
             results.append({
                 'id': place.id,
@@ -1116,18 +1140,18 @@ class PlacesByVisitLevelView(APIView):
                 'category': place.category,
                 'city': place.city,
                 'state': place.state,
-                'total_engagement': place.total_engagement or 0,
-                'posts_count': place.posts_count,
-                'estimated_visitors': place.posts_count * 150,
+                'total_engagement': tier.engagement,
+                'posts_count': tier.posts,
+                'estimated_visitors': tier.posts * 150,
                 'sentiment': {
-                    'positive': place.positive_count,
-                    'neutral': place.neutral_count,
-                    'negative': place.negative_count,
-                    'positive_percentage': round((place.positive_count / total_posts) * 100, 1),
-                    'neutral_percentage': round((place.neutral_count / total_posts) * 100, 1),
-                    'negative_percentage': round((place.negative_count / total_posts) * 100, 1),
-                    'average_score': round(sentiment_score, 3),
-                    'rating': round(rating, 2)
+                    'positive': tier.positive,
+                    'neutral': tier.neutral,
+                    'negative': tier.negative,
+                    'positive_percentage': round((tier.positive / total_posts) * 100, 1),
+                    'neutral_percentage': round((tier.neutral / total_posts) * 100, 1),
+                    'negative_percentage': round((tier.negative / total_posts) * 100, 1),
+                    'average_score': round(tier.avg_sentiment, 3),
+                    'rating': round(_rating(tier.avg_sentiment), 2)
                 },
                 'price': float(place.price) if place.price else None,
                 'is_free': place.is_free,
@@ -1135,35 +1159,19 @@ class PlacesByVisitLevelView(APIView):
                 'longitude': float(place.longitude) if place.longitude else None
             })
         
-        # Sort by engagement descending
-        results.sort(key=lambda x: x['total_engagement'], reverse=True)
-        
-        # Calculate aggregate stats for this level
-        total_engagement = sum(p['total_engagement'] for p in results)
-        avg_sentiment_score = np.mean([p['sentiment']['average_score'] for p in results]) if results else 0
-        avg_rating = np.mean([p['sentiment']['rating'] for p in results]) if results else 0
-        
-        positive_total = sum(p['sentiment']['positive'] for p in results)
-        neutral_total = sum(p['sentiment']['neutral'] for p in results)
-        negative_total = sum(p['sentiment']['negative'] for p in results)
-        total_sentiment_posts = positive_total + neutral_total + negative_total
+        # Aggregate stats for this level
+        summary = summaries.get(level)
+        avg_sentiment_score = summary.avg_sentiment if summary else 0
         
         return Response({
             'level': level,
             'description': description,
             'total_places': len(results),
             'aggregate_stats': {
-                'total_engagement': total_engagement,
+                'total_engagement': summary.engagement if summary else 0,
                 'average_sentiment_score': round(avg_sentiment_score, 3),
-                'average_rating': round(avg_rating, 2),
-                'sentiment_distribution': {
-                    'positive': positive_total,
-                    'neutral': neutral_total,
-                    'negative': negative_total,
-                    'positive_percentage': round((positive_total / total_sentiment_posts) * 100, 1) if total_sentiment_posts > 0 else 0,
-                    'neutral_percentage': round((neutral_total / total_sentiment_posts) * 100, 1) if total_sentiment_posts > 0 else 0,
-                    'negative_percentage': round((negative_total / total_sentiment_posts) * 100, 1) if total_sentiment_posts > 0 else 0
-                }
+                'average_rating': round(_rating(avg_sentiment_score), 2) if summary else 0,
+                'sentiment_distribution': _sentiment_distribution(summary)
             },
             'places': results
         })
@@ -1174,24 +1182,16 @@ class SentimentComparisonView(APIView):
     GET /api/analytics/sentiment/comparison/
     Compares sentiment distribution between most and least visited places.
     Provides insights into how visitor sentiment correlates with visit frequency.
+    Supports optional ?city= / ?category= filtering; reads the precomputed
+    VisitTierSummary rows.
     """
     permission_classes = [AllowAny]
     
     def get(self, request):
-        from django.db.models import Count, Avg, Sum, Q
-        import numpy as np
-        
-        # Get all places with engagement metrics
-        places = Place.objects.annotate(
-            posts_count=Count('posts'),
-            total_engagement=Sum(F('posts__likes') + F('posts__comments') + F('posts__shares')),
-            avg_sentiment=Avg('posts__sentiment_score'),
-            positive_count=Count('posts', filter=Q(posts__sentiment='positive')),
-            neutral_count=Count('posts', filter=Q(posts__sentiment='neutral')),
-            negative_count=Count('posts', filter=Q(posts__sentiment='negative'))
-        ).filter(posts_count__gt=0)
-        
-        if not places.exists():
+        city, category = _visit_tier_scope(request)
+        summaries, _ = visit_tier_scope(city, category)
+        
+        if not summaries:
             # Return demo data for presentation purposes
             return Response({
                 'is_demo_data': True,
@@ -1246,53 +1246,32 @@ class SentimentComparisonView(APIView):
                 }
             })
         
-        # Calculate engagement percentiles
-        engagements = [p.total_engagement or 0 for p in places]
-        p33 = np.percentile(engagements, 33)
-        p67 = np.percentile(engagements, 67)
-        
-        # Categorize places
-        most_visited = [p for p in places if (p.total_engagement or 0) >= p67]
-        least_visited = [p for p in places if (p.total_engagement or 0) <= p33]
+        thresholds = next(iter(summaries.values()))
+        p33, p67 = thresholds.p33, thresholds.p67
         
-        def calculate_stats(place_list, category_name):
-            if not place_list:
+        def calculate_stats(summary, category_name):
+            if not summary:
                 return {
                     'category': category_name,
                     'total_places': 0,
                     'message': 'No data available'
                 }
             
-            positive_total = sum(p.positive_count for p in place_list)
-            neutral_total = sum(p.neutral_count for p in place_list)
-            negative_total = sum(p.negative_count for p in place_list)
-            total_posts = positive_total + neutral_total + negative_total
-            
-            avg_sentiment = np.mean([p.avg_sentiment for p in place_list if p.avg_sentiment is not None])
-            avg_rating = ((avg_sentiment + 1) / 2) * 4 + 1
-            
-            total_engagement = sum(p.total_engagement or 0 for p in place_list)
+            distribution = _sentiment_distribution(summary)
             
             return {
                 'category': category_name,
-                'total_places': len(place_list),
-                'total_posts': total_posts,
-                'total_engagement': total_engagement,
-                'average_engagement_per_place': round(total_engagement / len(place_list), 1),
-                'sentiment_distribution': {
-                    'positive': positive_total,
-                    'neutral': neutral_total,
-                    'negative': negative_total,
-                    'positive_percentage': round((positive_total / total_posts) * 100, 1) if total_posts > 0 else 0,
-                    'neutral_percentage': round((neutral_total / total_posts) * 100, 1) if total_posts > 0 else 0,
-                    'negative_percentage': round((negative_total / total_posts) * 100, 1) if total_posts > 0 else 0
-                },
-                'average_sentiment_score': round(avg_sentiment, 3),
-                'average_rating': round(avg_rating, 2)
+                'total_places': summary.places,
+                'total_posts': summary.positive + summary.neutral + summary.negative,
+                'total_engagement': summary.engagement,
+                'average_engagement_per_place': round(summary.engagement / summary.places, 1),
+                'sentiment_distribution': distribution,
+                'average_sentiment_score': round(summary.avg_sentiment, 3),
+                'average_rating': round(_rating(summary.avg_sentiment), 2)
             }
         
-        most_stats = calculate_stats(most_visited, 'Most Visited')
-        least_stats = calculate_stats(least_visited, 'Least Visited')
+        most_stats = calculate_stats(summaries.get('most'), 'Most Visited')
+        least_stats = calculate_stats(summaries.get('least'), 'Least Visited')
         
         # Calculate insights
         insights = []
@@ -1326,7 +1305,7 @@ class SentimentComparisonView(APIView):
             'methodology': {
                 'most_visited_threshold': f'≥{int(p67)} engagement points (top 33%)',
                 'least_visited_threshold': f'≤{int(p33)} engagement points (bottom 33%)',
-                'total_places_analyzed': places.count(),
+                'total_places_analyzed': sum(summary.places for summary in summaries.values()),
                 'engagement_calculation': 'likes + comments + shares',
                 'rating_formula': '((sentiment_score + 1) / 2) * 4 + 1'
             }
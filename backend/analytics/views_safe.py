@@ -1,16 +1,22 @@
 # backend/analytics/views_safe.py
 
 from datetime import date, timedelta
+from django.core.paginator import Paginator
 from django.http import JsonResponse, HttpResponse
 from django.db.models import Count, Sum
 from django.db.models.functions import Coalesce, TruncDate
 from django.utils.dateparse import parse_date
 from django.views.decorators.http import require_GET
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 
 # Your current models
-from .models import Place, SocialPost
+from common.permissions import IsAdmin
+
+from . import slow_queries
+from .models import HiddenGemScore, Place, SocialPost, TermSketch
+from .reach import city_filter, unique_authors
+from .sketches import DEFAULT_CAPACITY, SpaceSaving
 
 
 # ────────────────────────── Helpers ──────────────────────────
@@ -50,8 +56,7 @@ def visitors_metrics(request):
         return JsonResponse({"detail": "Invalid date range"}, status=400)
 
     poi_id = request.GET.get("poi_id")
-    qs = SocialPost.objects.filter(created_at__date__gte=start,
-                                   created_at__date__lte=end)
+    qs = SocialPost.objects.canonical().in_window(start, end)
     if poi_id:
         qs = qs.filter(place_id=poi_id)
 
@@ -69,8 +74,7 @@ def engagement_metrics(request):
         return JsonResponse({"detail": "Invalid date range"}, status=400)
 
     poi_id = request.GET.get("poi_id")
-    qs = SocialPost.objects.filter(created_at__date__gte=start,
-                                   created_at__date__lte=end)
+    qs = SocialPost.objects.canonical().in_window(start, end)
     if poi_id:
         qs = qs.filter(place_id=poi_id)
 
@@ -98,8 +102,7 @@ def mentions_timeseries(request):
 
     poi_id = request.GET.get("poi_id")
 
-    base = SocialPost.objects.filter(created_at__date__gte=start,
-                                     created_at__date__lte=end)
+    base = SocialPost.objects.canonical().in_window(start, end)
     if poi_id:
         base = base.filter(place_id=poi_id)
 
@@ -129,9 +132,7 @@ def top_pois(request):
         return JsonResponse({"detail": "Invalid date range"}, status=400)
     limit = int(request.GET.get("limit", 5))
 
-    qs = SocialPost.objects.filter(created_at__date__gte=start,
-                                   created_at__date__lte=end,
-                                   place__isnull=False)
+    qs = SocialPost.objects.canonical().in_window(start, end).filter(place__isnull=False)
 
     rows = (qs.values("place_id", "place__name")
               .annotate(count=Count("id"))
@@ -152,9 +153,7 @@ def least_pois(request):
         return JsonResponse({"detail": "Invalid date range"}, status=400)
     limit = int(request.GET.get("limit", 5))
 
-    qs = SocialPost.objects.filter(created_at__date__gte=start,
-                                   created_at__date__lte=end,
-                                   place__isnull=False)
+    qs = SocialPost.objects.canonical().in_window(start, end).filter(place__isnull=False)
 
     rows = (qs.values("place_id", "place__name")
               .annotate(count=Count("id"))
@@ -175,9 +174,7 @@ def top_attractions(request):
         return JsonResponse({"items": []})
 
     limit = int(request.GET.get("limit", 1))
-    qs = SocialPost.objects.filter(created_at__date__gte=start,
-                                   created_at__date__lte=end,
-                                   place__isnull=False)
+    qs = SocialPost.objects.canonical().in_window(start, end).filter(place__isnull=False)
     rows = (qs.values("place__name")
               .annotate(count=Count("id"))
               .order_by("-count", "place__name")[:limit])
@@ -188,18 +185,32 @@ def top_attractions(request):
 @require_GET
 def metrics_totals(request):
     """
-    GET /api/metrics/totals?date_from=&date_to=
-    -> {"range_days":N,"total_posts":int,"unique_authors":null}
-       (unique_authors unknown in SocialPost, so null)
+    GET /api/metrics/totals?date_from=&date_to=&city=
+    -> {"range_days":N,"total_posts":int,"unique_authors":int,"unique_authors_error":float}
+       unique_authors is a HyperLogLog estimate (analytics/reach.py);
+       unique_authors_error is its relative standard error (e.g. 0.016)
     """
     start, end = _range_from_request(request)
     if not start:
         return JsonResponse({"range_days": 0, "total_posts": 0, "unique_authors": None})
 
-    qs = SocialPost.objects.filter(created_at__date__gte=start,
-                                   created_at__date__lte=end)
+    qs = SocialPost.objects.canonical().in_window(start, end)
+    city = (request.GET.get("city") or "").strip()
+    if city and city != "all":
+        city = city.replace("-", " ")
+        # Same entity set as the author sketches: places, vendors and stays in the city
+        qs = qs.filter(city_filter(city))
+    else:
+        city = None
+
+    authors, error = unique_authors(start, end, city=city)
     days = (end - start).days + 1
-    return JsonResponse({"range_days": days, "total_posts": qs.count(), "unique_authors": None})
+    return JsonResponse({
+        "range_days": days,
+        "total_posts": qs.count(),
+        "unique_authors": authors,
+        "unique_authors_error": round(error, 4),
+    })
 
 
 # ───────────────────── Map & Trends (UI cards) ─────────────────────
@@ -215,9 +226,9 @@ def map_heat(request):
         return JsonResponse({"items": []})
 
     qs = (SocialPost.objects
-          .filter(created_at__date__gte=start,
-                  created_at__date__lte=end,
-                  place__isnull=False,
+          .canonical()
+          .in_window(start, end)
+          .filter(place__isnull=False,
                   place__latitude__isnull=False,
                   place__longitude__isnull=False))
 
@@ -249,13 +260,88 @@ def sentiment_trend(_request):
 
 
 @require_GET
-def wordcloud(_request):
-    return JsonResponse({"items": []})
+def wordcloud(request):
+    """
+    GET /api/trends/wordcloud?date_from=&date_to=&city=&limit=
+    -> {"items":[{term,count,error}], "total": int}
+
+    Merges the per-day Space-Saving sketches (TermSketch) in the range, so
+    the cost depends on days × sketch size, not on the number of posts.
+    count is an upper bound; the true count is at least count - error.
+    """
+    start, end = _range_from_request(request)
+    if not start:
+        return JsonResponse({"detail": "Invalid date range"}, status=400)
+    try:
+        limit = max(1, min(int(request.GET.get("limit", 50)), DEFAULT_CAPACITY))
+    except ValueError:
+        limit = 50
+
+    qs = TermSketch.objects.filter(date__range=[start, end])
+    city = (request.GET.get("city") or "").strip()
+    if city and city != "all":
+        qs = qs.filter(city__iexact=city.replace("-", " "))
+
+    # Fold day by day so memory stays at one sketch
+    merged = SpaceSaving()
+    for data in qs.values_list("sketch", flat=True).iterator():
+        merged = SpaceSaving.merge([merged, SpaceSaving.from_dict(data)])
+
+    return JsonResponse({
+        "items": [
+            {"term": term, "count": count, "error": error}
+            for term, count, error in merged.top(limit)
+        ],
+        "total": merged.total,
+    })
 
 
 @require_GET
-def hidden_gem(_request):
-    return JsonResponse({"items": []})
+def hidden_gem(request):
+    """
+    GET /api/trends/hidden-gem?city=&category=&page=&page_size=
+    -> {"items":[{rank,poi_id,name,city,category,score,...}], "count", "page", "pages"}
+
+    Reads the ranking precomputed each collection run (analytics/scoring.py).
+    """
+    qs = HiddenGemScore.objects.select_related("place").order_by("rank")
+    city = (request.GET.get("city") or "").strip()
+    if city and city != "all":
+        qs = qs.filter(city__iexact=city.replace("-", " "))
+    category = (request.GET.get("category") or "").strip()
+    if category:
+        qs = qs.filter(category__iexact=category)
+
+    try:
+        page_size = max(1, min(int(request.GET.get("page_size", 10)), 100))
+    except ValueError:
+        page_size = 10
+    page = Paginator(qs, page_size).get_page(request.GET.get("page"))
+
+    return JsonResponse({
+        "items": [
+            {
+                "rank": gem.rank,
+                "poi_id": gem.place_id,
+                "name": gem.place.name,
+                "city": gem.city,
+                "category": gem.category,
+                "image_url": gem.place.image_url or "",
+                "score": gem.score,
+                "avg_sentiment": round(gem.avg_sentiment, 3),
+                "rating": round(((gem.avg_sentiment + 1) / 2) * 4 + 1, 2),
+                "positive_pct": round(gem.positive_share * 100, 1),
+                "posts": gem.posts,
+                "engagement": gem.engagement,
+                "engagement_percentile": round(gem.engagement_percentile, 1),
+            }
+            for gem in page
+        ],
+        "count": page.paginator.count,
+        "page": page.number,
+        "pages": page.paginator.num_pages,
+        "computed_at": page[0].computed_at.isoformat() if page else None,
+    })
 
 
 # Alias to match older naming (kept for compatibility)
@@ -299,7 +385,7 @@ def overview_metrics(request):
 
     city = (request.GET.get("city") or "").strip() or None
 
-    qs = SocialPost.objects.filter(created_at__date__gte=start, created_at__date__lte=end)
+    qs = SocialPost.objects.canonical().in_window(start, end)
     if city:
         qs = qs.filter(place__city__iexact=city)
 
@@ -321,3 +407,28 @@ def overview_metrics(request):
     return Response({"totals": totals, "changes": {
         "visitors_pct": None, "engagement_pct": None, "posts_pct": None, "shares_pct": None, "page_views_pct": None
     }})
+
+
+@api_view(["GET"])
+@permission_classes([IsAdmin])
+def slow_queries_report(request):
+    """
+    GET /api/admin/slow-queries?days=7&limit=20&order=total|count|avg|max  (admin only)
+    -> {"enabled", "threshold_ms", "items": [{"fingerprint", "sql", "count", "total_ms",
+        "avg_ms", "max_ms", "last_seen", "views", "explain"}, ...]}
+    """
+    order = request.GET.get("order", "total")
+    if order not in ("total", "count", "avg", "max"):
+        return Response({"detail": "order must be total, count, avg or max"}, status=400)
+    try:
+        days = max(1, int(request.GET.get("days", 7)))
+        limit = min(max(1, int(request.GET.get("limit", 20))), 200)
+    except ValueError:
+        return Response({"detail": "days and limit must be integers"}, status=400)
+
+    config = slow_queries.get_config()
+    return Response({
+        "enabled": config["ENABLED"],
+        "threshold_ms": config["THRESHOLD_MS"],
+        "items": slow_queries.top_offenders(days, limit, order),
+    })
@@ -0,0 +1,202 @@
+"""
+Request Profiling Middleware
+============================
+Opt-in, sampled per-request breakdown of where the time goes:
+
+    db      - number of queries and time spent executing them
+    cache   - cache reads / writes and time spent in the cache backend
+    view    - the view itself (including the queries and cache calls it makes)
+    render  - response rendering (DRF JSON serialization)
+    total   - the whole request inside this middleware
+
+Sampled responses carry a Server-Timing header (shown in the browser
+devtools Timing tab); requests slower than THRESHOLD_MS are also logged as
+one JSON line on the "profiling" logger:
+
+    Server-Timing: db;dur=41.2;desc="12 queries", cache;dur=0.3;desc="1 reads, 1 writes",
+                   view;dur=55.0, render;dur=3.1, total;dur=59.4
+
+Settings (REQUEST_PROFILING, see tourism_api/settings.py):
+    ENABLED       - off by default; when off the middleware removes itself
+    SAMPLE_RATE   - fraction of requests profiled (0..1)
+    THRESHOLD_MS  - only log sampled requests at least this slow
+    FORCE_HEADER  - with DEBUG on, requests sending this header (e.g.
+                    X-Profile: 1) are always profiled
+
+Unsampled requests cost one random() call.
+"""
+
+import json
+import logging
+import random
+import time
+from collections import Counter, defaultdict
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger('profiling')
+
+DEFAULTS = {
+    'ENABLED': False,
+    'SAMPLE_RATE': 0.01,
+    'THRESHOLD_MS': 500,
+    'FORCE_HEADER': 'X-Profile',
+}
+
+CACHE_READS = ('get', 'get_many', 'has_key')
+CACHE_WRITES = ('set', 'add', 'set_many', 'delete', 'delete_many', 'touch', 'incr', 'decr')
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'REQUEST_PROFILING', {})}
+
+
+class RequestProfile:
+    """Timings (ms) and counts for one request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.durations = defaultdict(float)
+        self.counts = Counter()
+        self.marks = {}
+
+    def elapsed(self, since=None):
+        return (time.perf_counter() - (self.started if since is None else since)) * 1000
+
+    def __call__(self, execute, sql, params, many, context):
+        """Database execute_wrapper."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.durations['db'] += self.elapsed(started)
+            self.counts['db'] += 1
+
+    def wrap_cache(self, backend, method, kind):
+        original = getattr(backend, method)
+
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                self.durations['cache'] += self.elapsed(started)
+                self.counts[kind] += 1
+
+        return timed
+
+    def metrics(self):
+        metrics = {
+            'db': (self.durations['db'], f"{self.counts['db']} queries"),
+            'cache': (self.durations['cache'],
+                      f"{self.counts['cache_reads']} reads, {self.counts['cache_writes']} writes"),
+        }
+        for name in ('view', 'render', 'total'):
+            if name in self.durations:
+                metrics[name] = (self.durations[name], None)
+        return metrics
+
+    def server_timing(self):
+        parts = []
+        for name, (duration, description) in self.metrics().items():
+            part = f'{name};dur={duration:.1f}'
+            if description:
+                part += f';desc="{description}"'
+            parts.append(part)
+        return ', '.join(parts)
+
+    def as_dict(self):
+        data = {f'{name}_ms': round(duration, 1) for name, (duration, _) in self.metrics().items()}
+        data.update({
+            'db_queries': self.counts['db'],
+            'cache_reads': self.counts['cache_reads'],
+            'cache_writes': self.counts['cache_writes'],
+        })
+        return data
+
+
+class ProfilingMiddleware:
+    """
+    Keep first in MIDDLEWARE so "total" covers the other middleware and
+    "render" starts after every other process_template_response hook.
+    """
+
+    def __init__(self, get_response):
+        config = get_config()
+        if not config['ENABLED']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = float(config['SAMPLE_RATE'])
+        self.threshold_ms = float(config['THRESHOLD_MS'])
+        self.force_header = config['FORCE_HEADER']
+
+    def should_profile(self, request):
+        if self.force_header and settings.DEBUG and request.headers.get(self.force_header):
+            return True
+        return random.random() < self.sample_rate
+
+    def __call__(self, request):
+        if not self.should_profile(request):
+            return self.get_response(request)
+
+        profile = request._profile = RequestProfile()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(profile))
+            backends = self._instrument_caches(profile)
+            try:
+                response = self.get_response(request)
+            finally:
+                for backend, method in backends:
+                    del backend.__dict__[method]
+
+        if 'view_started' in profile.marks and 'view' not in profile.durations:
+            profile.durations['view'] = profile.elapsed(profile.marks['view_started'])
+        profile.durations['total'] = profile.elapsed()
+
+        response['Server-Timing'] = profile.server_timing()
+        if profile.durations['total'] >= self.threshold_ms:
+            match = getattr(request, 'resolver_match', None)
+            logger.info(json.dumps({
+                'event': 'request_profile',
+                'method': request.method,
+                'path': request.path,
+                'view': match.view_name or match._func_path if match else '',
+                'status': response.status_code,
+                **profile.as_dict(),
+            }))
+        return response
+
+    def _instrument_caches(self, profile):
+        """Time the cache backends of this thread by shadowing their methods."""
+        patched = []
+        for alias in settings.CACHES:
+            backend = caches[alias]
+            for methods, kind in ((CACHE_READS, 'cache_reads'), (CACHE_WRITES, 'cache_writes')):
+                for method in methods:
+                    if method in backend.__dict__:  # already shadowed (nested request)
+                        continue
+                    setattr(backend, method, profile.wrap_cache(backend, method, kind))
+                    patched.append((backend, method))
+        return patched
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        profile = getattr(request, '_profile', None)
+        if profile:
+            profile.marks['view_started'] = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        profile = getattr(request, '_profile', None)
+        if profile and 'view_started' in profile.marks:
+            profile.durations['view'] = profile.elapsed(profile.marks['view_started'])
+            render_started = time.perf_counter()
+
+            def rendered(response):
+                profile.durations['render'] = profile.elapsed(render_started)
+
+            response.add_post_render_callback(rendered)
+        return response
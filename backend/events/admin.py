@@ -128,12 +128,31 @@ class EventRegistrationAdmin(admin.ModelAdmin):
     @admin.action(description='✅ Mark as confirmed')
     def mark_as_confirmed(self, request, queryset):
         updated = queryset.update(status='confirmed')
+        self._reconcile_events(queryset)
         self.message_user(request, f"✅ Marked {updated} registration(s) as confirmed", messages.SUCCESS)
     
     @admin.action(description='❌ Mark as cancelled')
     def mark_as_cancelled(self, request, queryset):
         updated = queryset.update(status='cancelled')
+        self._reconcile_events(queryset)
         self.message_user(request, f"❌ Marked {updated} registration(s) as cancelled", messages.SUCCESS)
+    
+    # Admin edits bypass Event.set_registration_status, so recount the affected events
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        Event.objects.filter(pk=obj.event_id).reconcile_confirmed_counts()
+    
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        Event.objects.filter(pk=obj.event_id).reconcile_confirmed_counts()
+    
+    def delete_queryset(self, request, queryset):
+        event_ids = list(queryset.values_list('event_id', flat=True).distinct())
+        super().delete_queryset(request, queryset)
+        Event.objects.filter(pk__in=event_ids).reconcile_confirmed_counts()
+    
+    def _reconcile_events(self, queryset):
+        Event.objects.filter(pk__in=queryset.values('event_id')).reconcile_confirmed_counts()
 
 
 @admin.register(EventReminder)
@@ -266,6 +285,7 @@ class EventAdmin(admin.ModelAdmin):
             event.is_recurring_instance = False
             event.parent_event = None
             event.actual_attendance = None
+            event.confirmed_count = 0
             event.save()
         
         self.message_user(request, f"✅ Duplicated {queryset.count()} event(s)", messages.SUCCESS)
@@ -0,0 +1,170 @@
+"""
+Event Calendar
+==============
+Backs /api/events/calendar/ (compact per-day buckets for a date window)
+and /api/events/ical/ (an iCalendar feed per city or tag), so calendar
+views no longer page through the whole event table.
+
+Both read events with EventQuerySet.overlapping(), which the
+event_effective_end_idx index on (COALESCE(end_date, start_date),
+start_date) serves. Calendar responses and rendered feeds are cached per
+window (or day), filter and data version. The version is bumped whenever an Event row is written
+(events/signals.py, plus the bulk inserts in events/recurrence.py), so a
+cached window is never served after its events change. Both endpoints use
+the version as their ETag.
+"""
+
+from collections import defaultdict
+from datetime import timedelta, timezone as dt_timezone
+
+from django.core.cache import cache
+from django.db.models import Q
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .recurrence import RECURRENCE_STEPS, expand_occurrences
+
+DATA_VERSION_KEY = 'events:data_version'
+CALENDAR_CACHE_TIMEOUT = 60 * 60
+
+# How far back the iCal feed reaches for finished events
+ICAL_PAST_DAYS = 90
+
+ICAL_FIELDS = (
+    'id', 'title', 'description', 'start_date', 'end_date', 'location_name', 'city', 'lat', 'lon', 'tags',
+    'recurrence_type', 'recurrence_interval', 'recurrence_count', 'recurrence_end_date',
+    'parent_event', 'is_recurring_instance',
+)
+
+
+def data_version():
+    """Current version of the event data, for cache keys and ETags."""
+    cache.add(DATA_VERSION_KEY, 1, None)
+    return cache.get(DATA_VERSION_KEY, 1)
+
+
+def bump_data_version():
+    try:
+        cache.incr(DATA_VERSION_KEY)
+    except ValueError:  # evicted
+        cache.add(DATA_VERSION_KEY, 1, None)
+
+
+def calendar_buckets(queryset, window_start, window_end):
+    """
+    Occurrences overlapping [window_start, window_end) (recurring events
+    expanded) as compact per-day buckets.
+
+    Returns:
+        {'events': [compact occurrence, ...],
+         'days': {'YYYY-MM-DD': [index into events, ...], ...}}
+        where an event spanning several days is listed under each of them
+    """
+    events = []
+    days = defaultdict(list)
+    first_day = timezone.localdate(window_start)
+    last_day = timezone.localdate(window_end - timedelta(microseconds=1))
+    for occurrence in expand_occurrences(queryset, window_start, window_end):
+        event = occurrence['event']
+        events.append({
+            'id': None if occurrence['virtual'] else event.pk,
+            'parent_event': event.pk if occurrence['virtual'] else event.parent_event_id,
+            'title': event.title,
+            'start': occurrence['start'],
+            'end': occurrence['end'],
+            'city': event.city,
+            'location_name': event.location_name,
+            'tags': event.tags,
+            'is_virtual': occurrence['virtual'],
+        })
+        day = max(timezone.localdate(occurrence['start']), first_day)
+        end_day = min(timezone.localdate(occurrence['end'] or occurrence['start']), last_day)
+        while day <= end_day:
+            days[day.isoformat()].append(len(events) - 1)
+            day += timedelta(days=1)
+    return {'events': events, 'days': dict(days)}
+
+
+def feed_events(queryset):
+    """
+    Events for an iCal feed: everything ending within the last
+    ICAL_PAST_DAYS or later, plus recurring series still running, read in
+    chunks with only the columns the feed needs.
+    """
+    cutoff = timezone.now() - timedelta(days=ICAL_PAST_DAYS)
+    ongoing_series = Q(
+        recurrence_type__in=list(RECURRENCE_STEPS), is_recurring_instance=False,
+    ) & (Q(recurrence_end_date__isnull=True) | Q(recurrence_end_date__gte=cutoff.date()))
+    return (
+        queryset.alias(effective_end=Coalesce('end_date', 'start_date'))
+        .filter(Q(effective_end__gte=cutoff) | ongoing_series)
+        .only(*ICAL_FIELDS)
+        .order_by('start_date')
+        .iterator(chunk_size=500)
+    )
+
+
+def _ical_time(value):
+    return value.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def _ical_text(value):
+    return (value or '').replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\r\n', '\\n').replace('\n', '\\n')
+
+
+def _fold(line):
+    """Fold a content line at 75 octets (RFC 5545 §3.1)."""
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line + '\r\n'
+    parts = []
+    while encoded:
+        cut = 75 if not parts else 74
+        # never split a multi-byte character
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode())
+        encoded = encoded[cut:]
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def ical_lines(events, name):
+    """
+    Stream an iCalendar document for `events`. A recurring parent carries
+    its RRULE; a materialized instance is emitted as an override of that
+    occurrence (the parent's UID plus RECURRENCE-ID), so calendar clients
+    do not show it twice.
+    """
+    stamp = _ical_time(timezone.now())
+    yield _fold('BEGIN:VCALENDAR')
+    yield _fold('VERSION:2.0')
+    yield _fold('PRODID:-//Kedah Tourism//Events//EN')
+    yield _fold('CALSCALE:GREGORIAN')
+    yield _fold(f'X-WR-CALNAME:{_ical_text(name)}')
+    for event in events:
+        uid = event.parent_event_id if event.is_recurring_instance and event.parent_event_id else event.pk
+        lines = [
+            'BEGIN:VEVENT',
+            f'UID:event-{uid}@kedah-tourism',
+            f'DTSTAMP:{stamp}',
+            f'DTSTART:{_ical_time(event.start_date)}',
+        ]
+        if event.end_date:
+            lines.append(f'DTEND:{_ical_time(event.end_date)}')
+        if uid != event.pk:
+            lines.append(f'RECURRENCE-ID:{_ical_time(event.start_date)}')
+        if event.rrule:
+            lines.append(f'RRULE:{event.rrule}')
+        lines.append(f'SUMMARY:{_ical_text(event.title)}')
+        location = ', '.join(part for part in (event.location_name, event.city) if part)
+        if location:
+            lines.append(f'LOCATION:{_ical_text(location)}')
+        if event.lat is not None and event.lon is not None:
+            lines.append(f'GEO:{event.lat};{event.lon}')
+        if event.description:
+            lines.append(f'DESCRIPTION:{_ical_text(event.description)}')
+        if event.tags:
+            lines.append('CATEGORIES:' + ','.join(_ical_text(str(tag)) for tag in event.tags))
+        lines.append('END:VEVENT')
+        yield ''.join(_fold(line) for line in lines)
+    yield _fold('END:VCALENDAR')
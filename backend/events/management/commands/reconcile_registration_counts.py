@@ -0,0 +1,36 @@
+"""
+Management command to repair Event.confirmed_count
+==================================================
+python manage.py reconcile_registration_counts            - Fix every drifted event
+python manage.py reconcile_registration_counts --dry-run  - Only report them
+
+confirmed_count is maintained by Event.add_registration / set_registration_status;
+writes that bypass them (scripts, raw SQL, bulk updates) leave it drifting
+until this runs. Schedule it nightly or run it after data fixes.
+"""
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, Q
+
+from events.models import Event
+
+
+class Command(BaseCommand):
+    help = 'Recount confirmed registrations for events whose confirmed_count has drifted'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='List drifted events without fixing them')
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            drifted = (
+                Event.objects.annotate(actual=Count('registrations', filter=Q(registrations__status='confirmed')))
+                .exclude(confirmed_count=F('actual'))
+                .values_list('pk', 'title', 'confirmed_count', 'actual')
+            )
+            for pk, title, stored, actual in drifted:
+                self.stdout.write(f'  #{pk} {title}: {stored} → {actual}')
+            self.stdout.write(f'{len(drifted)} event(s) drifted')
+            return
+
+        repaired = Event.objects.all().reconcile_confirmed_counts()
+        self.stdout.write(self.style.SUCCESS(f'✅ Repaired confirmed_count on {repaired} event(s)'))
@@ -0,0 +1,28 @@
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def count_confirmed(apps, schema_editor):
+    Event = apps.get_model('events', 'Event')
+    EventRegistration = apps.get_model('events', 'EventRegistration')
+    confirmed = (
+        EventRegistration.objects.filter(event=models.OuterRef('pk'), status='confirmed')
+        .order_by().values('event').annotate(n=models.Count('pk')).values('n')
+    )
+    Event.objects.update(confirmed_count=Coalesce(models.Subquery(confirmed), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0009_event_approval_message_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='confirmed_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of confirmed registrations, maintained by add_registration / set_registration_status'),
+        ),
+        migrations.RunPython(count_confirmed, migrations.RunPython.noop),
+    ]
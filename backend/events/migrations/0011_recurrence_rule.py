@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-19 07:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0010_event_confirmed_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='recurrence_count',
+            field=models.PositiveIntegerField(blank=True, help_text='Total number of occurrences including the first (RRULE COUNT); blank for no limit', null=True),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='recurrence_interval',
+            field=models.PositiveSmallIntegerField(default=1, help_text='Repeat every N days/weeks/months/years (RRULE INTERVAL)'),
+        ),
+    ]
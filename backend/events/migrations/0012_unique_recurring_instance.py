@@ -0,0 +1,41 @@
+# Generated by Django 5.2.6 on 2026-10-19 07:58
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def merge_duplicate_instances(apps, schema_editor):
+    """Keep the oldest row per (parent_event, start_date); move registrations onto it."""
+    Event = apps.get_model('events', 'Event')
+    EventRegistration = apps.get_model('events', 'EventRegistration')
+    duplicated = (
+        Event.objects.filter(parent_event__isnull=False)
+        .values('parent_event', 'start_date')
+        .annotate(n=models.Count('pk'), keep=models.Min('pk'))
+        .filter(n__gt=1)
+    )
+    for group in duplicated:
+        extra = Event.objects.filter(
+            parent_event=group['parent_event'], start_date=group['start_date'],
+        ).exclude(pk=group['keep'])
+        EventRegistration.objects.filter(event__in=extra).update(event=group['keep'])
+        extra.delete()
+        Event.objects.filter(pk=group['keep']).update(
+            confirmed_count=EventRegistration.objects.filter(event=group['keep'], status='confirmed').count()
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0011_recurrence_rule'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_instances, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='event',
+            constraint=models.UniqueConstraint(fields=('parent_event', 'start_date'), name='unique_recurring_instance'),
+        ),
+    ]
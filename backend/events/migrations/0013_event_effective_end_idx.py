@@ -0,0 +1,20 @@
+# Generated by Django 5.2.6 on 2026-10-19 07:59
+
+import django.db.models.functions.comparison
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0012_unique_recurring_instance'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(django.db.models.functions.comparison.Coalesce('end_date', 'start_date'), models.F('start_date'), name='event_effective_end_idx'),
+        ),
+    ]
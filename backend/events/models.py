@@ -1,8 +1,62 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
+from django.db.models.functions import Coalesce
 from django.conf import settings
-from django.utils.timezone import now
-from datetime import timedelta
-from dateutil.relativedelta import relativedelta
+from django.utils.timezone import make_aware, now
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+
+class EventQuerySet(models.QuerySet):
+    def with_registration_stats(self, user=None):
+        """
+        Annotate has_registration_form - plus user_is_registered /
+        user_reminder_set for an authenticated user - as subqueries, so
+        EventSerializer reads them with the events instead of querying per
+        event. Attendee counts come from the confirmed_count column.
+        """
+        event = models.OuterRef('pk')
+        qs = self.select_related('created_by').annotate(
+            has_registration_form=models.Exists(EventRegistrationForm.objects.filter(event=event)),
+        )
+        if user is not None and user.is_authenticated:
+            qs = qs.annotate(
+                user_is_registered=models.Exists(
+                    EventRegistration.objects.filter(event=event, user=user, status='confirmed')),
+                user_reminder_set=models.Exists(
+                    EventReminder.objects.filter(event=event, user=user, is_sent=False)),
+            )
+        return qs
+
+    def overlapping(self, window_start, window_end):
+        """
+        Events overlapping [window_start, window_end). An event without an
+        end date counts as ending when it starts; the effective-end filter
+        is served by the event_effective_end_idx expression index.
+        """
+        return self.alias(effective_end=Coalesce('end_date', 'start_date')).filter(
+            effective_end__gte=window_start, start_date__lt=window_end,
+        )
+
+    def reconcile_confirmed_counts(self):
+        """
+        Reset confirmed_count from the registrations table for the events in
+        this queryset whose counter has drifted. Each fix is a single UPDATE
+        that recounts at write time, so it is safe alongside live
+        registrations. Returns the number of events repaired.
+        """
+        actual = Coalesce(models.Subquery(
+            EventRegistration.objects.filter(event=models.OuterRef('pk'), status='confirmed')
+            .order_by().values('event').annotate(n=models.Count('pk')).values('n')
+        ), 0)
+        drifted = list(
+            self.annotate(actual_confirmed=actual)
+            .exclude(confirmed_count=F('actual_confirmed'))
+            .values_list('pk', flat=True)
+        )
+        if drifted:
+            Event.objects.filter(pk__in=drifted).update(confirmed_count=actual)
+        return len(drifted)
+
 
 class Event(models.Model):
     title = models.CharField(max_length=200)
@@ -33,6 +87,11 @@ class Event(models.Model):
     
     # ✨ NEW: Capacity Management
     max_capacity = models.IntegerField(null=True, blank=True, help_text="Maximum number of attendees (leave blank for unlimited)")
+    confirmed_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Number of confirmed registrations, maintained by add_registration / set_registration_status"
+    )
     
     # ✨ NEW: Custom Registration Forms
     requires_approval = models.BooleanField(
@@ -64,6 +123,8 @@ class Event(models.Model):
         help_text="How often this event repeats"
     )
     recurrence_end_date = models.DateField(null=True, blank=True, help_text="Stop generating recurring instances after this date")
+    recurrence_interval = models.PositiveSmallIntegerField(default=1, help_text="Repeat every N days/weeks/months/years (RRULE INTERVAL)")
+    recurrence_count = models.PositiveIntegerField(null=True, blank=True, help_text="Total number of occurrences including the first (RRULE COUNT); blank for no limit")
     parent_event = models.ForeignKey(
         'self',
         on_delete=models.CASCADE,
@@ -74,12 +135,20 @@ class Event(models.Model):
     )
     is_recurring_instance = models.BooleanField(default=False, help_text="True if this event was auto-generated from a recurring parent")
 
+    objects = EventQuerySet.as_manager()
+
     class Meta:
         ordering = ["-start_date"]
         indexes = [
             models.Index(fields=["city"]),
             models.Index(fields=["start_date"]),
             models.Index(fields=["recurrence_type"]),
+            # Calendar range queries: effective end >= window start, start < window end
+            models.Index(Coalesce("end_date", "start_date"), "start_date", name="event_effective_end_idx"),
+        ]
+        constraints = [
+            # One instance per occurrence, however many generators race
+            models.UniqueConstraint(fields=["parent_event", "start_date"], name="unique_recurring_instance"),
         ]
 
     def __str__(self):
@@ -89,7 +158,7 @@ class Event(models.Model):
     @property
     def attendee_count(self):
         """Return count of confirmed registrations"""
-        return self.registrations.filter(status='confirmed').count()
+        return self.confirmed_count
     
     # ✨ NEW PROPERTY: Get spots remaining
     @property
@@ -107,6 +176,29 @@ class Event(models.Model):
             return False
         return self.attendee_count >= self.max_capacity
     
+    # ✨ NEW PROPERTY: iCalendar recurrence rule
+    @property
+    def rrule(self):
+        """RFC 5545 RRULE for a recurring parent (e.g. FREQ=WEEKLY;INTERVAL=2), or None"""
+        if self.recurrence_type == 'none' or self.is_recurring_instance:
+            return None
+        parts = [f"FREQ={self.recurrence_type.upper()}", f"INTERVAL={self.recurrence_interval}"]
+        start = self.start_date.astimezone(dt_timezone.utc)  # DTSTART is written in UTC
+        if start.day > 28 and (self.recurrence_type == 'monthly' or start.month == 2):
+            # Occurrences clamp to the month's last day (Jan 31 -> Feb 28, see events/recurrence.py);
+            # a bare RRULE would skip the months without that day instead
+            if self.recurrence_type == 'yearly':
+                parts.append(f"BYMONTH={start.month}")
+            parts.append("BYMONTHDAY=" + ",".join(str(day) for day in range(28, start.day + 1)))
+            parts.append("BYSETPOS=-1")
+        if self.recurrence_count:
+            parts.append(f"COUNT={self.recurrence_count}")
+        elif self.recurrence_end_date:
+            # recurrence_end_date is a local date; UNTIL is the end of that day in UTC
+            until = make_aware(datetime.combine(self.recurrence_end_date, time(23, 59, 59)))
+            parts.append(f"UNTIL={until.astimezone(dt_timezone.utc):%Y%m%dT%H%M%SZ}")
+        return ";".join(parts)
+    
     # ✨ NEW PROPERTY: Check if event is happening now
     @property
     def is_happening_now(self):
@@ -169,85 +261,82 @@ class Event(models.Model):
     # ✨ NEW METHOD: Register user for event
     def register_user(self, user):
         """Register a user for this event"""
-        if self.is_full:
-            raise ValueError("Event is at full capacity")
-        
-        registration, created = EventRegistration.objects.get_or_create(
-            user=user,
-            event=self,
-            defaults={'status': 'confirmed'}
-        )
-        
-        if not created and registration.status == 'cancelled':
-            registration.status = 'confirmed'
-            registration.save()
-        
+        with transaction.atomic():
+            self._lock_for_registration()  # event row first, like every other transition
+            registration = self.registrations.filter(user=user).first()
+            if registration is None:
+                return self.add_registration(user=user, status='confirmed')
+            if registration.status == 'cancelled':
+                self.set_registration_status(registration, 'confirmed')
         return registration
     
     # ✨ NEW METHOD: Unregister user from event
     def unregister_user(self, user):
         """Cancel user's registration"""
-        EventRegistration.objects.filter(
-            user=user,
-            event=self
-        ).update(status='cancelled')
+        with transaction.atomic():
+            locked = self._lock_for_registration()
+            registrations = self.registrations.filter(user=user).exclude(status='cancelled')
+            confirmed = sum(1 for status in registrations.values_list('status', flat=True) if status == 'confirmed')
+            registrations.update(status='cancelled')
+            self._add_confirmed(locked, -confirmed)
+    
+    def add_registration(self, **fields):
+        """
+        Create a registration for this event (status defaults to confirmed)
+        and count it in confirmed_count. The event row is locked first, so
+        concurrent requests cannot overbook max_capacity; raises ValueError
+        when a confirmed registration would exceed it.
+        """
+        with transaction.atomic():
+            locked = self._lock_for_registration()
+            registration = EventRegistration(**{**fields, 'event': self})
+            delta = int(registration.status == 'confirmed')
+            if delta and locked.is_full:
+                raise ValueError("Event is at full capacity")
+            registration.save()
+            self._add_confirmed(locked, delta)
+        return registration
+    
+    def set_registration_status(self, registration, status, **fields):
+        """
+        Move one of this event's registrations to `status` (saving any extra
+        `fields`, e.g. reviewed_by) and keep confirmed_count in step. Raises
+        ValueError when confirming into a full event.
+        """
+        with transaction.atomic():
+            locked = self._lock_for_registration()
+            # Re-read under the lock: a concurrent request may already have moved it
+            previous = EventRegistration.objects.filter(pk=registration.pk).values_list('status', flat=True).get()
+            delta = int(status == 'confirmed') - int(previous == 'confirmed')
+            if delta > 0 and locked.is_full:
+                raise ValueError("Event is at full capacity")
+            registration.status = status
+            for name, value in fields.items():
+                setattr(registration, name, value)
+            registration.save()
+            self._add_confirmed(locked, delta)
+        return registration
+    
+    def _lock_for_registration(self):
+        """SELECT ... FOR UPDATE this event's capacity columns (call inside a transaction)"""
+        return Event.objects.select_for_update().only('max_capacity', 'confirmed_count').get(pk=self.pk)
+    
+    def _add_confirmed(self, locked, delta):
+        if delta:
+            Event.objects.filter(pk=self.pk).update(confirmed_count=F('confirmed_count') + delta)
+        self.confirmed_count = locked.confirmed_count + delta
     
     # ✨ NEW METHOD: Generate recurring instances
     def generate_recurring_instances(self, count=12):
-        """Generate future event instances based on recurrence rule"""
+        """Generate the next `count` future event instances based on recurrence rule"""
+        from .recurrence import materialize_instances
+        
         if self.recurrence_type == 'none' or self.is_recurring_instance:
             return []
         
-        instances = []
-        current_date = self.start_date
-        end_limit = self.recurrence_end_date or (now().date() + timedelta(days=365))
-        
-        for i in range(count):
-            # Calculate next occurrence
-            if self.recurrence_type == 'daily':
-                current_date = current_date + timedelta(days=1)
-            elif self.recurrence_type == 'weekly':
-                current_date = current_date + timedelta(weeks=1)
-            elif self.recurrence_type == 'monthly':
-                current_date = current_date + relativedelta(months=1)
-            elif self.recurrence_type == 'yearly':
-                current_date = current_date + relativedelta(years=1)
-            
-            if current_date.date() > end_limit:
-                break
-            
-            # Check if instance already exists for this date
-            existing = Event.objects.filter(
-                parent_event=self,
-                start_date__date=current_date.date()
-            ).exists()
-            
-            if existing:
-                continue  # Skip if already exists
-            
-            # Create instance
-            instance = Event.objects.create(
-                title=self.title,
-                description=self.description,
-                start_date=current_date,
-                end_date=self.end_date + (current_date - self.start_date) if self.end_date else None,
-                location_name=self.location_name,
-                city=self.city,
-                lat=self.lat,
-                lon=self.lon,
-                tags=self.tags,
-                expected_attendance=self.expected_attendance,
-                is_published=self.is_published,
-                image_url=self.image_url,
-                created_by=self.created_by,
-                max_capacity=self.max_capacity,
-                parent_event=self,
-                is_recurring_instance=True,
-                recurrence_type='none'
-            )
-            instances.append(instance)
-        
-        return instances
+        until = now() + timedelta(days=365)
+        instances = materialize_instances([self], until=until, limit=count)
+        return list(self.recurring_instances.filter(start_date__in=[i.start_date for i in instances]))
     
     # ✨ NEW METHOD: Get nearby stays
     def get_nearby_stays(self, radius_km=10):
@@ -259,7 +348,7 @@ class Event(models.Model):
             return Stay.objects.none()
         
         stays = []
-        for stay in Stay.objects.filter(is_internal=True):
+        for stay in Stay.objects.filter(is_internal=True).select_related('owner').prefetch_related('stay_images'):
             if stay.lat and stay.lon:
                 # Haversine formula
                 R = 6371  # Earth radius in km
@@ -298,7 +387,7 @@ class Event(models.Model):
             return Vendor.objects.none()
         
         vendors = []
-        for vendor in Vendor.objects.filter(is_active=True):
+        for vendor in Vendor.objects.filter(is_active=True).select_related('owner').with_review_stats():
             if vendor.lat and vendor.lon:
                 R = 6371
                 lat1, lon1 = radians(self.lat), radians(self.lon)
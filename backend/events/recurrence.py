@@ -0,0 +1,238 @@
+"""
+Recurring Events
+================
+A recurring parent event carries an RRULE-style rule: recurrence_type is
+FREQ (daily / weekly / monthly / yearly), recurrence_interval is INTERVAL,
+recurrence_count is COUNT (occurrences including the parent itself) and
+recurrence_end_date is UNTIL. Occurrence n starts at
+
+    parent.start_date + n × interval × step
+
+always counted from the parent, so a monthly series on the 31st does not
+drift to the 28th after February.
+
+Calendar queries expand occurrences on the fly for the requested window
+(expand_occurrences); the expansion of each (event, window) is cached, so
+the cost depends on the window, not on how long a series runs. A concrete
+Event row (is_recurring_instance=True) exists only where something needs
+one: materialize_occurrence() creates it when an occurrence gets its
+first registration, and the hourly generate_next_recurring_instances task
+keeps series materialized up to RECURRING_EVENT_HORIZON_DAYS ahead for
+clients that list instances from /api/events/ (0 turns it off).
+"""
+
+import hashlib
+from datetime import datetime, timedelta
+from itertools import islice
+
+from dateutil.relativedelta import relativedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import Event
+
+RECURRENCE_STEPS = {
+    'daily': relativedelta(days=1),
+    'weekly': relativedelta(weeks=1),
+    'monthly': relativedelta(months=1),
+    'yearly': relativedelta(years=1),
+}
+
+# Longest possible step per type, to skip ahead without overshooting
+MAX_STEP_DAYS = {'daily': 1, 'weekly': 7, 'monthly': 31, 'yearly': 366}
+
+OCCURRENCE_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Longest window a calendar query may expand
+MAX_WINDOW_DAYS = 366
+
+INSTANCE_BATCH_SIZE = 500
+
+
+def horizon():
+    """End of the rolling window generate_next_recurring_instances keeps materialized."""
+    return timezone.now() + timedelta(days=settings.RECURRING_EVENT_HORIZON_DAYS)
+
+
+def duration(event):
+    return event.end_date - event.start_date if event.end_date else timedelta(0)
+
+
+def occurrence_starts(parent, after, until):
+    """
+    Start datetimes of the parent's repeats (not the parent itself) with
+    after <= start <= until, honouring INTERVAL, COUNT and UNTIL.
+    """
+    step = RECURRENCE_STEPS.get(parent.recurrence_type)
+    if step is None or parent.is_recurring_instance:
+        return
+    interval = parent.recurrence_interval or 1
+    n = max(1, (after - parent.start_date).days // (MAX_STEP_DAYS[parent.recurrence_type] * interval))
+    while True:
+        if parent.recurrence_count and n >= parent.recurrence_count:
+            return
+        start = parent.start_date + step * (n * interval)
+        if start > until or (parent.recurrence_end_date and timezone.localtime(start).date() > parent.recurrence_end_date):
+            return
+        if start >= after:
+            yield start
+        n += 1
+
+
+def is_occurrence(parent, start):
+    return any(True for _ in occurrence_starts(parent, start, start))
+
+
+def rule_key(parent):
+    """Changes whenever anything that moves the parent's occurrences changes."""
+    rule = (parent.start_date.isoformat(), parent.end_date and parent.end_date.isoformat(),
+            parent.recurrence_type, parent.recurrence_interval, parent.recurrence_count,
+            parent.recurrence_end_date and parent.recurrence_end_date.isoformat())
+    return hashlib.md5(repr(rule).encode()).hexdigest()[:12]
+
+
+def cached_occurrence_starts(parent, window_start, window_end):
+    """
+    Starts of the repeats overlapping [window_start, window_end), cached
+    per (event, rule, window).
+    """
+    key = f"event_occurrences:{parent.pk}:{rule_key(parent)}:{window_start.isoformat()}:{window_end.isoformat()}"
+    starts = cache.get(key)
+    if starts is None:
+        # Same overlap rule as EventQuerySet.overlapping(): an occurrence without an end
+        # date counts only from its start
+        after = window_start - duration(parent) if parent.end_date else window_start
+        starts = [start.isoformat() for start in occurrence_starts(parent, after, window_end) if start < window_end]
+        cache.set(key, starts, OCCURRENCE_CACHE_TIMEOUT)
+    return [datetime.fromisoformat(start) for start in starts]
+
+
+def expand_occurrences(queryset, window_start, window_end):
+    """
+    Every occurrence overlapping [window_start, window_end) of the events in
+    `queryset`: concrete events (one-time events, parents, materialized
+    instances) plus the virtual repeats of recurring parents that have no
+    row yet. Runs three queries whatever the length of the series.
+
+    Returns:
+        List of dicts (event, start, end, virtual) ordered by start; for a
+        virtual occurrence `event` is its parent
+    """
+    occurrences = [
+        {'event': event, 'start': event.start_date, 'end': event.end_date, 'virtual': False}
+        for event in queryset.overlapping(window_start, window_end)
+    ]
+
+    parents = list(
+        queryset.filter(
+            recurrence_type__in=list(RECURRENCE_STEPS), is_recurring_instance=False, start_date__lt=window_end,
+        ).exclude(recurrence_end_date__lt=(window_start - timedelta(days=1)).date())
+    )
+    if parents:
+        materialized = set(
+            Event.objects.filter(
+                parent_event__in=parents,
+                start_date__gte=window_start - max(duration(p) for p in parents),
+                start_date__lt=window_end,
+            ).values_list('parent_event_id', 'start_date')
+        )
+        for parent in parents:
+            length = duration(parent)
+            for start in cached_occurrence_starts(parent, window_start, window_end):
+                if (parent.pk, start) in materialized:
+                    continue
+                occurrences.append({
+                    'event': parent, 'start': start, 'end': start + length if parent.end_date else None,
+                    'virtual': True,
+                })
+
+    occurrences.sort(key=lambda o: o['start'])
+    return occurrences
+
+
+def build_instance(parent, start):
+    """Unsaved Event copying the parent's details for the occurrence at `start`."""
+    return Event(
+        title=parent.title,
+        description=parent.description,
+        start_date=start,
+        end_date=parent.end_date + (start - parent.start_date) if parent.end_date else None,
+        location_name=parent.location_name,
+        city=parent.city,
+        lat=parent.lat,
+        lon=parent.lon,
+        tags=parent.tags,
+        expected_attendance=parent.expected_attendance,
+        is_published=parent.is_published,
+        image_url=parent.image_url,
+        created_by_id=parent.created_by_id,
+        max_capacity=parent.max_capacity,
+        requires_approval=parent.requires_approval,
+        approval_message=parent.approval_message,
+        parent_event=parent,
+        is_recurring_instance=True,
+        recurrence_type='none',
+    )
+
+
+def materialize_occurrence(parent, start):
+    """
+    The concrete Event for the parent's occurrence at `start`, created on
+    first use (e.g. its first registration). Raises ValueError when `start`
+    is not an occurrence of the parent.
+    """
+    from .calendar import bump_data_version
+
+    if not is_occurrence(parent, start):
+        raise ValueError("Not an occurrence of this event")
+    instance = Event.objects.filter(parent_event=parent, start_date=start).first()
+    if instance is not None:
+        return instance
+    # unique (parent_event, start_date): a concurrent request creating the same row is a no-op
+    Event.objects.bulk_create([build_instance(parent, start)], ignore_conflicts=True)
+    bump_data_version()  # bulk_create sends no post_save
+    return Event.objects.get(parent_event=parent, start_date=start)
+
+
+def missing_instances(parents, after, until, limit=None):
+    """
+    Unsaved instances for every occurrence of `parents` between `after` and
+    `until` (at most `limit` per parent) that has no row yet, computed in
+    memory after one query for the existing instance dates.
+    """
+    parents = list(parents)
+    existing = set(
+        Event.objects.filter(parent_event__in=parents, start_date__gte=after)
+        .values_list('parent_event_id', 'start_date__date')
+    )
+    missing = []
+    for parent in parents:
+        starts = islice(occurrence_starts(parent, after, until), limit)
+        missing.extend(
+            build_instance(parent, start) for start in starts
+            if (parent.pk, timezone.localtime(start).date()) not in existing
+        )
+    return missing
+
+
+def materialize_instances(parents, until=None, limit=None):
+    """
+    Create the missing instances of `parents` starting between now and
+    `until` (default: the rolling horizon), at most `limit` per parent.
+
+    Inserts go through bulk_create(ignore_conflicts=True) in batches, so
+    concurrent runs (a scheduled task, the admin action)
+    cannot duplicate an occurrence: the unique (parent_event, start_date)
+    constraint drops whichever insert comes second.
+
+    Returns:
+        List of the unsaved instances that were inserted (without pks)
+    """
+    from .calendar import bump_data_version
+
+    instances = missing_instances(parents, timezone.now(), until or horizon(), limit)
+    if instances:
+        Event.objects.bulk_create(instances, batch_size=INSTANCE_BATCH_SIZE, ignore_conflicts=True)
+        bump_data_version()  # bulk_create sends no post_save
+    return instances
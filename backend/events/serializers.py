@@ -127,6 +127,8 @@ class EventSerializer(serializers.ModelSerializer):
             # ✨ RECURRING FIELDS:
             "recurrence_type",
             "recurrence_end_date",
+            "recurrence_interval",
+            "recurrence_count",
             "parent_event",
             "is_recurring_instance",
             # ✨ LIVE STATUS FIELDS:
@@ -174,6 +176,8 @@ class EventSerializer(serializers.ModelSerializer):
         request = self.context.get('request')
         if not request or not request.user.is_authenticated:
             return False
+        if hasattr(obj, 'user_is_registered'):  # EventQuerySet.with_registration_stats(user)
+            return obj.user_is_registered
         return obj.is_user_registered(request.user)
     
     def get_user_has_reminder(self, obj):
@@ -181,6 +185,8 @@ class EventSerializer(serializers.ModelSerializer):
         request = self.context.get('request')
         if not request or not request.user.is_authenticated:
             return False
+        if hasattr(obj, 'user_reminder_set'):
+            return obj.user_reminder_set
         return obj.user_has_reminder(request.user)
     
     def get_is_happening_now(self, obj):
@@ -205,6 +211,8 @@ class EventSerializer(serializers.ModelSerializer):
     
     def get_has_custom_form(self, obj):
         """Check if event has custom registration form"""
+        if hasattr(obj, 'has_registration_form'):
+            return obj.has_registration_form
         return hasattr(obj, 'registration_form')
 
     def validate_tags(self, value):
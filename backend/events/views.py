@@ -1,12 +1,18 @@
 # backend/events/views.py
+import hashlib
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated, AllowAny, IsAdminUser
 from rest_framework.pagination import PageNumberPagination
-from django.utils.timezone import now
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.timezone import is_naive, localdate, make_aware, now
+from datetime import datetime, time, timedelta
 from django.db.models import Q
 from django.db import models
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.text import slugify
 from .models import Event, EventRegistration, EventReminder, EventRegistrationForm, EventRegistrationField
 from .serializers import (
     EventSerializer,
@@ -19,6 +25,28 @@ from .serializers import (
 )
 from common.permissions import AdminOrReadOnly
 from .emails import send_registration_confirmation, send_event_reminder
+from .calendar import CALENDAR_CACHE_TIMEOUT, calendar_buckets, data_version, feed_events, ical_lines
+from .recurrence import MAX_WINDOW_DAYS, build_instance, expand_occurrences, materialize_occurrence
+from analytics.cache_utils import generate_cache_key
+
+
+def _window_from_request(request):
+    """
+    ?from=YYYY-MM-DD&to=YYYY-MM-DD as a [start, end) datetime window in
+    local time; defaults to the next 30 days. None if invalid.
+    """
+    today = localdate()
+    fs = request.query_params.get('from')
+    ts = request.query_params.get('to')
+    try:
+        start = parse_date(fs) if fs else today
+        end = parse_date(ts) if ts else (start or today) + timedelta(days=30)
+    except ValueError:  # well-formed but impossible, e.g. 2025-02-30
+        return None
+    if not start or not end or start > end or (end - start).days >= MAX_WINDOW_DAYS:
+        return None
+    return (make_aware(datetime.combine(start, time.min)),
+            make_aware(datetime.combine(end + timedelta(days=1), time.min)))
 
 
 class EventPagination(PageNumberPagination):
@@ -42,18 +70,15 @@ class EventViewSet(viewsets.ModelViewSet):
 
     def perform_create(self, serializer):
         """Automatically set created_by to current user"""
-        event = serializer.save(created_by=self.request.user)
-        
-        # Auto-generate recurring instances if recurrence is set
-        if event.recurrence_type != 'none':
-            event.generate_recurring_instances()
+        # Recurring instances are materialized by the generate_next_recurring_instances beat task
+        serializer.save(created_by=self.request.user)
     
     def perform_update(self, serializer):
         """Keep original created_by on updates"""
         serializer.save()
 
     def get_queryset(self):
-        qs = super().get_queryset()
+        qs = super().get_queryset().with_registration_stats(self.request.user)
         
         # Only show published events to non-admin users
         if not self.request.user.is_staff:
@@ -97,41 +122,12 @@ class EventViewSet(viewsets.ModelViewSet):
         if hide_instances == "1":
             # Admin view: show only parent events (templates), hide instances
             qs = qs.filter(is_recurring_instance=False)
-        else:
-            # Default user view: show ALL events
-            # - One-time events (recurrence_type='none')
-            # - Recurring instances (is_recurring_instance=True)  
-            # - Parent recurring events (for visibility, they should show too)
-            # Also auto-generate upcoming instances for recurring events
-            self._ensure_recurring_instances(qs)
-            
-            # Show all events - don't filter out parent recurring events
-            # The frontend will display them appropriately
-            pass  # No additional filtering needed - show all published events
+        # Default user view shows ALL events: one-time events, recurring
+        # instances and their parents. Instances are materialized by the
+        # generate_next_recurring_instances beat task, never on read.
 
         return qs
     
-    def _ensure_recurring_instances(self, queryset):
-        """Ensure recurring events have upcoming instances generated"""
-        from datetime import timedelta
-        
-        # Find parent recurring events that need instances
-        parent_events = Event.objects.filter(
-            recurrence_type__in=['daily', 'weekly', 'monthly', 'yearly'],
-            is_recurring_instance=False
-        )
-        
-        for event in parent_events:
-            # Check if there are any future instances
-            future_instances = Event.objects.filter(
-                parent_event=event,
-                start_date__gte=now()
-            ).count()
-            
-            # If no future instances, generate some
-            if future_instances == 0:
-                event.generate_recurring_instances(count=6)  # Generate next 6 occurrences
-    
     # ✨ NEW: Happening Now Endpoint
     @action(detail=False, methods=['get'], permission_classes=[AllowAny])
     def happening_now(self, request):
@@ -150,14 +146,128 @@ class EventViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(happening_events, many=True)
         return Response(serializer.data)
     
+    @action(detail=False, methods=['get'], permission_classes=[AllowAny])
+    def occurrences(self, request):
+        """
+        Every occurrence between ?from= and ?to= (YYYY-MM-DD, inclusive; at
+        most MAX_WINDOW_DAYS apart), with repeats of recurring events
+        expanded on the fly. Accepts the same filters as the list (city,
+        tag, q, ...). Virtual occurrences have no id: register for one by
+        posting its start_date as occurrence_start to the parent's
+        register / submit_registration endpoint.
+        """
+        window = _window_from_request(request)
+        if window is None:
+            return Response({
+                'error': f'from and to must be dates (YYYY-MM-DD), from <= to, at most {MAX_WINDOW_DAYS} days apart'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        events = []
+        for occurrence in expand_occurrences(self.get_queryset(), *window):
+            event = occurrence['event']
+            if occurrence['virtual']:
+                parent, event = event, build_instance(event, occurrence['start'])
+                event.created_by = parent.created_by  # already selected with the parent
+                event.has_registration_form = event.user_is_registered = event.user_reminder_set = False
+            events.append(event)
+        
+        data = self.get_serializer(events, many=True).data
+        for item, event in zip(data, events):
+            item['is_virtual'] = event.pk is None
+        return Response({'count': len(data), 'occurrences': data})
+    
+    @action(detail=False, methods=['get'], permission_classes=[AllowAny])
+    def calendar(self, request):
+        """
+        Compact per-day buckets for a calendar view between ?from= and ?to=
+        (YYYY-MM-DD, inclusive), optionally for one ?city=. Cached per
+        window and event data version; see events/calendar.py.
+        """
+        window = _window_from_request(request)
+        if window is None:
+            return Response({
+                'error': f'from and to must be dates (YYYY-MM-DD), from <= to, at most {MAX_WINDOW_DAYS} days apart'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        city = request.query_params.get('city') or ''
+        
+        cache_key = generate_cache_key(
+            'events:calendar', v=data_version(), start=window[0].date(), end=window[1].date(),
+            city=city.lower(), staff=request.user.is_staff,
+        )
+        etag = f'"{hashlib.md5(cache_key.encode()).hexdigest()}"'
+        if request.headers.get('If-None-Match') == etag:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+        
+        payload = cache.get(cache_key)
+        if payload is None:
+            events = Event.objects.all() if request.user.is_staff else Event.objects.filter(is_published=True)
+            if city:
+                events = events.filter(city__iexact=city)
+            payload = {
+                'from': window[0].date(),
+                'to': (window[1] - timedelta(days=1)).date(),
+                **calendar_buckets(events, *window),
+            }
+            cache.set(cache_key, payload, CALENDAR_CACHE_TIMEOUT)
+        return Response(payload, headers={'ETag': etag})
+    
+    @action(detail=False, methods=['get'], permission_classes=[AllowAny])
+    def ical(self, request):
+        """
+        iCalendar (.ics) feed of published events for one ?city= or ?tag=;
+        recurring events carry their RRULE. The rendered feed is cached per
+        filter, day and event data version, like the calendar windows.
+        """
+        city = request.query_params.get('city')
+        tag = request.query_params.get('tag')
+        if not city and not tag:
+            return Response({'error': 'city or tag is required'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        feed_key = generate_cache_key('events:ical', v=data_version(), day=localdate(), city=city, tag=tag)
+        etag = f'"{hashlib.md5(feed_key.encode()).hexdigest()}"'
+        if request.headers.get('If-None-Match') == etag:
+            return HttpResponseNotModified(headers={'ETag': etag})
+        
+        name = f"{city or tag} events"
+        body = cache.get(feed_key)
+        if body is None:
+            events = Event.objects.filter(is_published=True)
+            if city:
+                events = events.filter(city__iexact=city)
+            if tag:
+                events = events.filter(tags__contains=[tag])
+            body = ''.join(ical_lines(feed_events(events), name))
+            cache.set(feed_key, body, CALENDAR_CACHE_TIMEOUT)
+        response = HttpResponse(body, content_type='text/calendar; charset=utf-8')
+        response['Content-Disposition'] = f'inline; filename="{slugify(name)}.ics"'
+        response['ETag'] = etag
+        return response
+    
+    def get_registration_event(self):
+        """
+        The event a registration request targets: the URL's event, or - when
+        occurrence_start is posted for a recurring event - that occurrence,
+        materialized on its first registration. Raises ValueError for a
+        start that is not one of the event's occurrences.
+        """
+        event = self.get_object()
+        occurrence_start = self.request.data.get('occurrence_start')
+        if not occurrence_start:
+            return event
+        start = parse_datetime(occurrence_start)
+        if start is None:
+            raise ValueError("occurrence_start must be an ISO datetime")
+        if is_naive(start):
+            start = make_aware(start)  # no offset: local time, like the calendar windows
+        return materialize_occurrence(event, start)
+    
     # ✨ NEW: Registration Endpoints
     
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
     def register(self, request, pk=None):
         """Register current user for this event"""
-        event = self.get_object()
-        
         try:
+            event = self.get_registration_event()
             registration = event.register_user(request.user)
             serializer = EventRegistrationSerializer(registration)
             return Response({
@@ -196,8 +306,7 @@ class EventViewSet(viewsets.ModelViewSet):
                     event=event,
                     status='confirmed'
                 )
-                registration.status = 'cancelled'
-                registration.save()
+                event.set_registration_status(registration, 'cancelled')
                 
                 return Response({
                     'message': 'Registration cancelled successfully',
@@ -225,8 +334,7 @@ class EventViewSet(viewsets.ModelViewSet):
                 contact_email=contact_email,
                 status='confirmed'
             )
-            registration.status = 'cancelled'
-            registration.save()
+            event.set_registration_status(registration, 'cancelled')
             
             return Response({
                 'message': 'Registration cancelled successfully',
@@ -364,11 +472,11 @@ class EventViewSet(viewsets.ModelViewSet):
         radius = float(request.query_params.get('radius', 5))
         
         vendors = event.get_nearby_restaurants(radius_km=radius)
-        from vendors.serializers import VendorSerializer
+        from vendors.serializers import VendorListSerializer
         
         return Response({
             'count': len(vendors),
-            'restaurants': VendorSerializer(vendors, many=True).data
+            'restaurants': VendorListSerializer(vendors, many=True).data
         })
     
     # ✨ NEW: Recurring event management
@@ -493,7 +601,10 @@ class EventViewSet(viewsets.ModelViewSet):
             }
         }
         """
-        event = self.get_object()
+        try:
+            event = self.get_registration_event()
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         
         # Check if event is full
         if event.is_full:
@@ -560,7 +671,10 @@ class EventViewSet(viewsets.ModelViewSet):
             if not serializer.is_valid():
                 return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
             
-            registration = serializer.save()
+            try:
+                registration = event.add_registration(**serializer.validated_data)
+            except ValueError as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
             
             # Send appropriate email based on status
             if registration.status == 'pending':
@@ -626,19 +740,19 @@ class EventViewSet(viewsets.ModelViewSet):
                 'error': 'Pending registration not found'
             }, status=status.HTTP_404_NOT_FOUND)
         
-        # Check capacity
-        if event.is_full:
+        # Update registration (checks capacity under the event row lock)
+        try:
+            event.set_registration_status(
+                registration, 'confirmed',
+                reviewed_by=request.user,
+                reviewed_at=timezone_now(),
+                admin_notes=request.data.get('admin_notes', ''),
+            )
+        except ValueError:
             return Response({
                 'error': 'Event is at full capacity. Cannot approve more registrations.'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        # Update registration
-        registration.status = 'confirmed'
-        registration.reviewed_by = request.user
-        registration.reviewed_at = timezone_now()
-        registration.admin_notes = request.data.get('admin_notes', '')
-        registration.save()
-        
         # Send approval email
         email_sent = send_approval_email(registration, event)
         if email_sent:
@@ -668,11 +782,12 @@ class EventViewSet(viewsets.ModelViewSet):
             }, status=status.HTTP_404_NOT_FOUND)
         
         # Update registration
-        registration.status = 'rejected'
-        registration.reviewed_by = request.user
-        registration.reviewed_at = timezone_now()
-        registration.admin_notes = request.data.get('admin_notes', '')
-        registration.save()
+        event.set_registration_status(
+            registration, 'rejected',
+            reviewed_by=request.user,
+            reviewed_at=timezone_now(),
+            admin_notes=request.data.get('admin_notes', ''),
+        )
         
         # Send rejection email
         reason = request.data.get('reason', 'Unfortunately, we cannot approve your registration at this time.')
@@ -14,6 +14,10 @@ python manage.py collectstatic --noinput --clear || echo "Warning: Static files
 echo "🗄️  Running database migrations..."
 python manage.py migrate --noinput
 
+# One-time backfill of the analytics rollups from existing posts
+echo "🧮 Backfilling analytics rollups (first deploy only)..."
+python manage.py rebuild_rollups --all --once
+
 # Start Gunicorn (remove the database check that might be slow)
 echo "🚀 Starting Gunicorn..."
 exec gunicorn --bind :8000 --workers 2 --timeout 120 --access-logfile - --error-logfile - tourism_api.wsgi:application
@@ -67,8 +67,10 @@ class StaySerializer(serializers.ModelSerializer):
             if request:
                 return request.build_absolute_uri(obj.main_image.url)
             return obj.main_image.url
-        # Fallback to first stay_image if no main_image
-        first_image = obj.stay_images.filter(is_primary=True).first() or obj.stay_images.first()
+        # Fallback to first stay_image if no main_image (primary first, see StayImage.Meta.ordering;
+        # .all() so a prefetch_related('stay_images') is used)
+        images = list(obj.stay_images.all())
+        first_image = images[0] if images else None
         if first_image:
             request = self.context.get('request')
             if request:
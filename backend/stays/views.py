@@ -9,7 +9,7 @@ from .serializers import StaySerializer, StayImageSerializer
 from common.permissions import IsStayOwnerOrReadOnly
 
 class StayViewSet(viewsets.ModelViewSet):
-    queryset = Stay.objects.all().order_by("priceNight")
+    queryset = Stay.objects.select_related("owner").prefetch_related("stay_images").order_by("priceNight")
     serializer_class = StaySerializer
     permission_classes = [IsStayOwnerOrReadOnly]
     parser_classes = [MultiPartParser, FormParser, JSONParser]
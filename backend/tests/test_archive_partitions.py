@@ -0,0 +1,122 @@
+import shutil
+import tempfile
+from datetime import date, datetime, time, timedelta
+from io import StringIO
+from pathlib import Path
+from unittest import skipIf, skipUnless
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from analytics.archive import read_archive
+from analytics.checkpoints import archive_watermark
+from analytics.models import EntityDailyRollup, Place, SocialPost
+from analytics.partitions import add_months, convert_to_partitioned, index_definitions, partition_name, retarget_index
+from analytics.rollups import rebuild_rollups, rollup_key
+
+
+def local(day, hour=0, minute=0):
+    return datetime.combine(day, time(hour, minute), tzinfo=timezone.get_current_timezone())
+
+
+class InWindowTests(TestCase):
+    def test_window_uses_local_day_bounds(self):
+        day = date(2025, 3, 10)
+        for post_id, created_at in (
+            ('before', local(day) - timedelta(seconds=1)),
+            ('first', local(day)),
+            ('last', local(day, 23, 59)),
+            ('after', local(day + timedelta(days=1))),
+        ):
+            SocialPost.objects.create(platform='twitter', post_id=post_id, created_at=created_at)
+
+        ids = set(SocialPost.objects.in_window(day, day).values_list('post_id', flat=True))
+        self.assertEqual(ids, {'first', 'last'})
+        self.assertEqual(SocialPost.objects.in_window(None, day).count(), 3)
+        self.assertEqual(SocialPost.objects.in_window(day + timedelta(days=1), None).count(), 1)
+
+
+class PartitionHelperTests(SimpleTestCase):
+    def test_month_arithmetic_and_names(self):
+        self.assertEqual(add_months(date(2024, 11, 1), 3), date(2025, 2, 1))
+        self.assertEqual(add_months(date(2025, 1, 1), -1), date(2024, 12, 1))
+        self.assertEqual(partition_name(date(2025, 2, 1)), 'analytics_socialpost_y2025m02')
+
+
+class ArchiveSocialPostsTests(TestCase):
+    def setUp(self):
+        self.archive_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.archive_dir, ignore_errors=True)
+        override = override_settings(SOCIAL_ARCHIVE_DIR=self.archive_dir)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.place = Place.objects.create(name='Langkawi')
+        self.old_day = timezone.localdate() - timedelta(days=400)
+        for i in range(3):
+            SocialPost.objects.create(
+                platform='twitter', post_id=f'old-{i}', created_at=local(self.old_day, 10),
+                place=self.place, likes=2, sentiment='positive',
+            )
+        self.recent = SocialPost.objects.create(
+            platform='twitter', post_id='new', created_at=timezone.now(), place=self.place,
+        )
+
+    def archive(self, *args):
+        out = StringIO()
+        call_command('archive_social_posts', *args, stdout=out)
+        return out.getvalue()
+
+    def test_moves_old_posts_to_files_and_keeps_rollups(self):
+        self.archive('--chunk-size', '2')
+
+        self.assertEqual(list(SocialPost.objects.values_list('post_id', flat=True)), ['new'])
+        rollup = EntityDailyRollup.objects.get(entity_id=self.place.pk, date=self.old_day)
+        self.assertEqual((rollup.posts, rollup.likes, rollup.positive), (3, 6, 3))
+
+        files = sorted(Path(self.archive_dir).rglob('*.jsonl.gz'))
+        self.assertEqual(len(files), 2)
+        self.assertEqual(files[0].parent.name, self.old_day.strftime('%Y-%m'))
+        rows = [row for path in files for row in read_archive(path)]
+        self.assertEqual(sorted(row['post_id'] for row in rows), ['old-0', 'old-1', 'old-2'])
+        self.assertEqual(rows[0]['place_id'], self.place.pk)
+
+        self.assertEqual(archive_watermark(), timezone.localdate() - timedelta(days=365))
+
+    def test_rollups_before_watermark_are_not_rebuilt(self):
+        self.archive()
+        rebuild_rollups([rollup_key('place', self.place.pk, local(self.old_day, 10))])
+        self.assertEqual(EntityDailyRollup.objects.get(entity_id=self.place.pk, date=self.old_day).posts, 3)
+
+    def test_dry_run_changes_nothing(self):
+        output = self.archive('--dry-run')
+        self.assertIn('3 posts would be archived', output)
+        self.assertEqual(SocialPost.objects.count(), 4)
+        self.assertIsNone(archive_watermark())
+
+
+class PartitionCommandTests(TestCase):
+    @skipIf(connection.vendor == 'postgresql', 'converts on PostgreSQL')
+    def test_noop_without_postgres(self):
+        out = StringIO()
+        call_command('partition_social_posts', '--convert', stdout=out)
+        self.assertIn('not PostgreSQL', out.getvalue())
+
+    def test_index_definitions_are_retargeted_to_the_new_table(self):
+        definition = ('CREATE INDEX analytics_s_simhash_b0_idx ON public.analytics_socialpost_unpartitioned '
+                      'USING btree (simhash_b0)')
+        self.assertEqual(retarget_index(definition, 'analytics_socialpost'),
+                         'CREATE INDEX analytics_s_simhash_b0_idx ON "analytics_socialpost" USING btree (simhash_b0)')
+
+    @skipUnless(connection.vendor == 'postgresql', 'partitioning needs PostgreSQL')
+    def test_conversion_keeps_every_non_unique_index(self):
+        def index_columns():
+            with connection.cursor() as cursor:
+                return sorted(d.split(' USING ', 1)[1] for d in index_definitions(cursor, 'analytics_socialpost').values())
+
+        before = index_columns()
+        self.assertIn('btree (simhash_b0)', before)
+        self.assertTrue(convert_to_partitioned())
+        self.assertEqual(index_columns(), before)
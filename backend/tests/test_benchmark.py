@@ -0,0 +1,51 @@
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from analytics import synthetic
+from analytics.benchmark import compare, concrete_path, get_endpoints, measure, percentile, route_ids
+from analytics.models import EntityDailyRollup, Place, SocialPost
+from events.models import Event
+from stays.models import Stay
+from users.models import User
+from vendors.models import Vendor
+
+
+class BenchmarkHelperTests(SimpleTestCase):
+    def test_nearest_rank_percentiles(self):
+        values = list(range(1, 101))
+        self.assertEqual([percentile(values, q) for q in (50, 95, 99, 100)], [50, 95, 99, 100])
+        self.assertEqual(percentile([7.0], 99), 7.0)
+
+    def test_compare_reports_changes_for_shared_endpoints(self):
+        baseline = {'a': {'p95_ms': 10.0, 'queries': 3}, 'gone': {'p95_ms': 1.0, 'queries': 1}}
+        current = {'a': {'p95_ms': 25.0, 'queries': 5}, 'new': {'p95_ms': 1.0, 'queries': 1}}
+        self.assertEqual(compare(current, baseline), {'a': {'p95_ms': 15.0, 'p95_ratio': 2.5, 'queries': 2}})
+
+
+@override_settings(DEBUG_PROPAGATE_EXCEPTIONS=False)
+class SyntheticDatasetTests(TestCase):
+    def test_generate_is_deterministic_and_builds_rollups(self):
+        counts = synthetic.generate('xs', seed=7)
+        spec = synthetic.SCALES['xs']
+        self.assertEqual((counts['places'], counts['posts']), (spec['places'], spec['posts']))
+        self.assertEqual(SocialPost.objects.count(), spec['posts'])
+        self.assertTrue(EntityDailyRollup.objects.exists())
+
+        first = list(SocialPost.objects.order_by('post_id').values_list('post_id', 'content', 'likes')[:20])
+        titles = list(Event.objects.order_by('pk').values_list('title', 'city'))
+        for model in (SocialPost, Event, Place, Vendor, Stay, User):
+            model.objects.all().delete()
+        synthetic.generate('xs', seed=7)
+        self.assertEqual(list(SocialPost.objects.order_by('post_id').values_list('post_id', 'content', 'likes')[:20]),
+                         first)
+        self.assertEqual(list(Event.objects.order_by('pk').values_list('title', 'city')), titles)
+
+    def test_measure_reports_latency_queries_and_memory(self):
+        synthetic.generate('xs')
+        self.client.raise_request_exception = False
+        path = concrete_path(get_endpoints()['analytics.views_new.TrendingPlacesView'], route_ids())
+
+        result = measure(self.client, path, iterations=3)
+        self.assertEqual(result['status'], 200)
+        self.assertEqual(result['queries'], 3)
+        self.assertLessEqual(result['p50_ms'], result['p99_ms'])
+        self.assertGreater(result['peak_memory_kb'], 0)
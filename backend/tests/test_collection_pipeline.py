@@ -0,0 +1,168 @@
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
+
+from celery import current_app
+import tempfile
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from analytics import pipeline
+from analytics.checkpoints import load_checkpoints
+from analytics.models import EntityDailyRollup, PipelineRun, Place, SocialPost
+
+
+POSTED_AT = (timezone.now() - timedelta(days=1)).replace(microsecond=0)
+
+
+def raw_post(post_id, content, likes=10):
+    return {
+        'platform': 'twitter', 'post_id': post_id, 'content': content,
+        'url': f'https://twitter.com/user/status/{post_id}', 'created_at': POSTED_AT.isoformat(),
+        'likes': likes, 'comments': 1, 'shares': 2, 'views': 100,
+    }
+
+
+class FakeScraper:
+    def __init__(self, posts):
+        self.posts = posts
+
+    def collect(self, keywords, checkpoints=None):
+        return list(self.posts), {('twitter', 'Langkawi'): {'since_id': '42', 'last_timestamp': POSTED_AT}}
+
+
+class FakeClassifier:
+    def __init__(self, *args, **kwargs):
+        self.calls = []
+
+    def classify_post(self, content, use_ai=True):
+        self.calls.append(use_ai)
+        place = next((name for name in ('Langkawi', 'Gunung Jerai') if name in content), None)
+        return {'is_tourism': place is not None, 'place_name': place, 'sentiment': 'positive', 'confidence': 0.9}
+
+
+class LandingDirMixin:
+    """Keep raw landing segments out of the repo's data/ directory."""
+
+    def setUp(self):
+        super().setUp()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.landing_dir = Path(tmp.name)
+        settings_override = override_settings(RAW_LANDING_DIR=self.landing_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+
+class CollectionPipelineTests(LandingDirMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.langkawi = Place.objects.create(name='Langkawi', city='Langkawi')
+        self.jerai = Place.objects.create(name='Gunung Jerai', city='Gurun')
+        self.posts = [
+            raw_post('1', 'Langkawi beaches today'),
+            raw_post('2', 'Hiking Gunung Jerai', likes=5),
+            raw_post('3', 'Nothing to do with travel'),
+        ]
+
+    def test_inline_run_persists_rolls_up_and_commits_checkpoints(self):
+        run = pipeline.run_inline(scraper=FakeScraper(self.posts), classifier=FakeClassifier())
+
+        self.assertEqual(run.status, 'succeeded')
+        self.assertEqual(run.stats['added'], 2)
+        self.assertEqual(run.stats['skipped'], 1)
+        self.assertEqual(SocialPost.objects.count(), 2)
+
+        rollup = EntityDailyRollup.objects.get(entity_type='place', entity_id=self.langkawi.pk)
+        self.assertEqual((rollup.posts, rollup.likes, rollup.positive), (1, 10, 1))
+        self.assertEqual(rollup.date, timezone.localtime(POSTED_AT).date())
+
+        self.assertEqual(load_checkpoints()[('twitter', 'Langkawi')]['since_id'], '42')
+        stages = set(run.timings.values_list('stage', flat=True))
+        self.assertEqual(stages, {'fetch', 'classify', 'persist', 'rollup', 'warm'})
+
+    def test_rerun_is_idempotent_and_moves_rollups_with_the_post(self):
+        pipeline.run_inline(scraper=FakeScraper(self.posts), classifier=FakeClassifier())
+
+        # Same post now mentions the other place with more likes
+        moved = [raw_post('1', 'Gunung Jerai sunrise', likes=50)]
+        run = pipeline.run_inline(scraper=FakeScraper(moved), classifier=FakeClassifier())
+
+        self.assertEqual(run.stats['updated'], 1)
+        self.assertEqual(SocialPost.objects.count(), 2)
+        self.assertFalse(EntityDailyRollup.objects.filter(entity_id=self.langkawi.pk).exists())
+        jerai = EntityDailyRollup.objects.get(entity_id=self.jerai.pk)
+        self.assertEqual((jerai.posts, jerai.likes), (2, 55))
+
+    def test_refetched_post_keeps_its_stored_created_at(self):
+        pipeline.run_inline(scraper=FakeScraper(self.posts), classifier=FakeClassifier())
+
+        # Timestamp no longer parses: persist falls back to now() for new posts only
+        refetched = [{**raw_post('1', 'Langkawi beaches today', likes=30), 'created_at': 'garbage'}]
+        run = pipeline.run_inline(scraper=FakeScraper(refetched), classifier=FakeClassifier())
+
+        self.assertEqual((run.stats['added'], run.stats['updated']), (0, 1))
+        post = SocialPost.objects.get(platform='twitter', post_id='1')
+        self.assertEqual((post.likes, post.created_at), (30, POSTED_AT))
+
+    def test_classification_falls_back_to_keywords_after_budget(self):
+        classifier = FakeClassifier()
+        pipeline.classify_posts(self.posts, ['Langkawi'], budget_seconds=0, classifier=classifier)
+        self.assertEqual(classifier.calls, [False, False, False])
+
+    def test_failed_persist_leaves_checkpoints_uncommitted(self):
+        with mock.patch.object(pipeline, 'persist_posts', side_effect=RuntimeError('db down')):
+            with self.assertRaises(RuntimeError):
+                pipeline.run_inline(scraper=FakeScraper(self.posts), classifier=FakeClassifier())
+
+        self.assertEqual(load_checkpoints(), {})
+        self.assertEqual(PipelineRun.objects.get().status, 'failed')
+
+    def test_retried_fetch_reuses_the_landed_segment(self):
+        run = PipelineRun.objects.create()
+        first = pipeline.fetch_posts(run.pk, scraper=FakeScraper(self.posts))
+        retried = pipeline.fetch_posts(run.pk, scraper=FakeScraper([raw_post('9', 'Langkawi again')]))
+
+        self.assertEqual([p['post_id'] for p in retried], [p['post_id'] for p in first])
+        self.assertEqual(len(list(self.landing_dir.glob('dt=*/*.jsonl.gz'))), 1)
+
+    @override_settings(USE_CELERY=False)
+    def test_task_runs_inline_without_a_broker(self):
+        from analytics import tasks
+
+        with mock.patch('analytics.scraper.SocialMediaScraper', return_value=FakeScraper(self.posts)), \
+                mock.patch('analytics.classifier.PostClassifier', FakeClassifier), \
+                mock.patch.object(tasks.pipeline_fetch, 'apply_async') as apply_async:
+            run_id = tasks.collect_and_process_social_posts()
+
+        apply_async.assert_not_called()
+        self.assertEqual(PipelineRun.objects.get(pk=run_id).status, 'succeeded')
+        self.assertEqual(SocialPost.objects.count(), 2)
+
+
+@override_settings(USE_CELERY=True)
+class CeleryPipelineTests(LandingDirMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.eager = (current_app.conf.task_always_eager, current_app.conf.task_eager_propagates)
+        current_app.conf.task_always_eager = current_app.conf.task_eager_propagates = True
+
+    def tearDown(self):
+        current_app.conf.task_always_eager, current_app.conf.task_eager_propagates = self.eager
+
+    def test_chord_runs_all_stages_eagerly(self):
+        from analytics import tasks
+
+        Place.objects.create(name='Langkawi', city='Langkawi')
+        posts = [raw_post(str(i), f'Langkawi trip {i}') for i in range(pipeline.CHUNK_SIZE + 5)]
+
+        with mock.patch('analytics.scraper.SocialMediaScraper', return_value=FakeScraper(posts)), \
+                mock.patch('analytics.classifier.PostClassifier', FakeClassifier):
+            run_id = tasks.collect_and_process_social_posts()
+
+        run = PipelineRun.objects.get(pk=run_id)
+        self.assertEqual(run.status, 'succeeded')
+        self.assertEqual(run.stats['added'], len(posts))
+        self.assertEqual(run.timings.filter(stage='persist').count(), 2)
+        self.assertEqual(EntityDailyRollup.objects.get().posts, len(posts))
@@ -0,0 +1,109 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+
+from analytics import pipeline
+from analytics.dedup import MAX_DISTANCE, distance, fingerprint, mark_duplicates, propagate_to_duplicates
+from analytics.models import EntityDailyRollup, Place, SocialPost
+
+from tests.test_collection_pipeline import POSTED_AT, FakeClassifier, FakeScraper, LandingDirMixin, raw_post
+
+CAPTION = 'Golden hour at Pantai Cenang Langkawi, the water was so calm and clear today'
+
+
+class FingerprintTests(SimpleTestCase):
+    def test_cross_posts_and_reshares_are_near_duplicates(self):
+        original = fingerprint(CAPTION)
+        for variant in (
+            CAPTION + ' https://instagr.am/p/abc123',
+            'RT @travelmy: ' + CAPTION,
+            CAPTION.upper() + '!!',
+        ):
+            self.assertLessEqual(distance(original, fingerprint(variant)), MAX_DISTANCE, variant)
+
+    def test_different_posts_are_far_apart(self):
+        other = fingerprint('Traffic jam on the way to Gunung Jerai, took three hours to reach the top')
+        self.assertGreater(distance(fingerprint(CAPTION), other), MAX_DISTANCE)
+
+    def test_short_posts_are_not_fingerprinted(self):
+        self.assertIsNone(fingerprint('so nice 😍'))
+
+
+class DedupPipelineTests(LandingDirMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.langkawi = Place.objects.create(name='Langkawi', city='Langkawi')
+
+    def test_duplicates_in_a_batch_inherit_and_are_counted_once(self):
+        classifier = FakeClassifier()
+        posts = [
+            raw_post('1', CAPTION, likes=10),
+            {**raw_post('2', 'RT @travelmy: ' + CAPTION, likes=3), 'platform': 'facebook'},
+        ]
+        pipeline.run_inline(scraper=FakeScraper(posts), classifier=classifier)
+
+        self.assertEqual(len(classifier.calls), 1)
+        canonical = SocialPost.objects.get(post_id='1')
+        duplicate = SocialPost.objects.get(post_id='2')
+        self.assertFalse(canonical.is_duplicate)
+        self.assertTrue(duplicate.is_duplicate)
+        self.assertEqual(duplicate.duplicate_of, canonical)
+        self.assertEqual(duplicate.place, self.langkawi)
+        self.assertIsNotNone(duplicate.simhash_b0)
+
+        rollups = EntityDailyRollup.objects.filter(entity_id=self.langkawi.pk)
+        self.assertEqual([(r.platform, r.posts, r.likes) for r in rollups], [('twitter', 1, 10)])
+
+    def test_later_duplicate_found_through_band_index(self):
+        pipeline.run_inline(scraper=FakeScraper([raw_post('1', CAPTION)]), classifier=FakeClassifier())
+        SocialPost.objects.filter(post_id='1').update(sentiment='negative')
+
+        posts = mark_duplicates([raw_post('9', CAPTION + ' #malaysia'), raw_post('1', CAPTION)])
+        self.assertEqual(posts[0]['duplicate_of'], ['twitter', '1'])
+        self.assertEqual(posts[0]['classification']['sentiment'], 'negative')
+        self.assertEqual(posts[0]['classification']['place_name'], 'Langkawi')
+        # A re-fetched post is not a duplicate of itself
+        self.assertNotIn('duplicate_of', posts[1])
+
+    def test_reclassified_canonical_updates_its_duplicates(self):
+        posts = [raw_post('1', CAPTION), {**raw_post('2', CAPTION), 'platform': 'facebook'}]
+        pipeline.run_inline(scraper=FakeScraper(posts), classifier=FakeClassifier())
+        SocialPost.objects.filter(post_id='1').update(sentiment='neutral', confidence=0.1)
+
+        self.assertEqual(propagate_to_duplicates([SocialPost.objects.get(post_id='1').pk]), 1)
+        duplicate = SocialPost.objects.get(post_id='2')
+        self.assertEqual((duplicate.sentiment, duplicate.confidence), ('neutral', 0.1))
+
+    def test_older_post_arriving_later_becomes_canonical(self):
+        pipeline.run_inline(scraper=FakeScraper([raw_post('2', 'RT @travelmy: ' + CAPTION)]), classifier=FakeClassifier())
+
+        original = {**raw_post('1', CAPTION, likes=40), 'created_at': (POSTED_AT - timedelta(hours=3)).isoformat()}
+        pipeline.run_inline(scraper=FakeScraper([original]), classifier=FakeClassifier())
+
+        canonical = SocialPost.objects.get(post_id='1')
+        reshare = SocialPost.objects.get(post_id='2')
+        self.assertFalse(canonical.is_duplicate)
+        self.assertEqual((reshare.is_duplicate, reshare.duplicate_of_id), (True, canonical.pk))
+        self.assertEqual(EntityDailyRollup.objects.get(entity_id=self.langkawi.pk).likes, 40)
+
+    def test_backfill_fingerprints_keeps_the_earliest_post_canonical(self):
+        def stored(post_id, content, hours_ago):
+            return SocialPost.objects.create(
+                platform='twitter', post_id=post_id, content=content, place=self.langkawi,
+                created_at=POSTED_AT - timedelta(hours=hours_ago), sentiment='positive',
+            )
+
+        repost = stored('2', 'RT @travelmy: ' + CAPTION, hours_ago=1)
+        original = stored('1', CAPTION, hours_ago=5)
+        other = stored('3', 'Traffic jam on the way to Gunung Jerai, took three hours to reach the top', 2)
+
+        out = StringIO()
+        call_command('fingerprint_posts', '--chunk-size', '1', stdout=out)
+
+        self.assertIn('Fingerprinted 3 posts, 1 near-duplicates flagged', out.getvalue())
+        repost.refresh_from_db()
+        self.assertEqual((repost.is_duplicate, repost.duplicate_of_id), (True, original.pk))
+        self.assertFalse(SocialPost.objects.filter(pk__in=[original.pk, other.pk], is_duplicate=True).exists())
+        self.assertIsNotNone(SocialPost.objects.get(pk=original.pk).simhash_b0)
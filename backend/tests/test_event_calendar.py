@@ -0,0 +1,133 @@
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+
+from dateutil.rrule import rrulestr
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from events.models import Event
+from events.recurrence import materialize_occurrence, occurrence_starts
+
+
+class EventCalendarTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.day = timezone.localdate() + timedelta(days=3)
+        self.evening = timezone.make_aware(datetime.combine(self.day, time(20)))
+
+    def calendar(self, **params):
+        params = {'from': self.day, 'to': self.day + timedelta(days=6), **params}
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/events/calendar/', params)
+        return response, len(queries)
+
+    def test_buckets_occurrences_per_day(self):
+        Event.objects.create(title='Paddy Festival', city='Alor Setar', start_date=self.evening,
+                             end_date=self.evening + timedelta(days=1))
+        Event.objects.create(title='Night Market', city='Alor Setar', recurrence_type='weekly',
+                             start_date=self.evening - timedelta(weeks=4, days=1),
+                             end_date=self.evening - timedelta(weeks=4, days=1) + timedelta(hours=3))
+        Event.objects.create(title='Jazz Night', city='Langkawi', start_date=self.evening)
+        Event.objects.create(title='Draft', city='Alor Setar', start_date=self.evening, is_published=False)
+
+        response, _ = self.calendar(city='alor setar')
+        data = response.json()
+        titles = [e['title'] for e in data['events']]
+        self.assertEqual(titles, ['Paddy Festival', 'Night Market'])
+        self.assertTrue(data['events'][1]['is_virtual'])
+        self.assertEqual({day: [titles[i] for i in idx] for day, idx in data['days'].items()}, {
+            str(self.day): ['Paddy Festival'],
+            str(self.day + timedelta(days=1)): ['Paddy Festival'],
+            str(self.day + timedelta(days=6)): ['Night Market'],
+        })
+
+    def test_cached_per_window_until_events_change(self):
+        Event.objects.create(title='Paddy Festival', city='Alor Setar', start_date=self.evening)
+        first, queries = self.calendar()
+        self.assertGreater(queries, 0)
+        again, cached_queries = self.calendar()
+        self.assertEqual(cached_queries, 0)
+        self.assertEqual(again.json(), first.json())
+
+        response = self.client.get('/api/events/calendar/', {'from': self.day, 'to': self.day + timedelta(days=6)},
+                                   HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+        Event.objects.create(title='Jazz Night', city='Langkawi', start_date=self.evening)
+        changed, _ = self.calendar()
+        self.assertNotEqual(changed['ETag'], first['ETag'])
+        self.assertEqual(len(changed.json()['events']), 2)
+
+    def test_rejects_bad_windows(self):
+        self.assertEqual(self.calendar(to=self.day - timedelta(days=1))[0].status_code, 400)
+        for params in ({'from': '2025-02-30'}, {'from': '2025-02-01', 'to': '2025-13-01'}):
+            self.assertEqual(self.client.get('/api/events/calendar/', params).status_code, 400)
+            self.assertEqual(self.client.get('/api/events/occurrences/', params).status_code, 400)
+
+
+class EventIcalFeedTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_city_feed_with_recurrence(self):
+        start = timezone.now().replace(microsecond=0) + timedelta(days=1)
+        parent = Event.objects.create(title='Night Market', city='Langkawi', start_date=start,
+                                      end_date=start + timedelta(hours=3), recurrence_type='weekly',
+                                      recurrence_count=4, location_name='Pantai Cenang',
+                                      description='Stalls, food; music, ' * 10)
+        instance = materialize_occurrence(parent, start + timedelta(weeks=1))
+        Event.objects.create(title='Elsewhere', city='Alor Setar', start_date=start)
+        Event.objects.create(title='Long gone', city='Langkawi', start_date=start - timedelta(days=400))
+
+        response = APIClient().get('/api/events/ical/', {'city': 'Langkawi'})
+        self.assertEqual(response['Content-Type'], 'text/calendar; charset=utf-8')
+        body = response.content.decode()
+        lines = body.split('\r\n')
+
+        self.assertEqual(body.count('BEGIN:VEVENT'), 2)
+        self.assertNotIn('Elsewhere', body)
+        self.assertNotIn('Long gone', body)
+        self.assertIn('RRULE:FREQ=WEEKLY;INTERVAL=1;COUNT=4', lines)
+        self.assertEqual(body.count(f'UID:event-{parent.pk}@kedah-tourism'), 2)
+        self.assertIn(f'RECURRENCE-ID:{instance.start_date.astimezone(dt_timezone.utc):%Y%m%dT%H%M%SZ}', lines)
+        self.assertTrue(all(len(line.encode()) <= 75 for line in lines))
+        self.assertIn(r'Stalls\, food\; music', body.replace('\r\n ', ''))
+
+    def test_feed_is_cached_until_events_change(self):
+        start = timezone.now() + timedelta(days=1)
+        Event.objects.create(title='Night Market', city='Langkawi', start_date=start)
+        first = APIClient().get('/api/events/ical/', {'city': 'Langkawi'})
+
+        with CaptureQueriesContext(connection) as queries:
+            cached = APIClient().get('/api/events/ical/', {'city': 'Langkawi'})
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(cached.content, first.content)
+
+        Event.objects.create(title='Book Fair', city='Langkawi', start_date=start)
+        self.assertIn(b'Book Fair', APIClient().get('/api/events/ical/', {'city': 'Langkawi'}).content)
+
+    def test_until_is_the_local_end_of_day_in_utc(self):
+        event = Event(recurrence_type='daily', recurrence_interval=1, recurrence_end_date=date(2026, 3, 1),
+                      start_date=timezone.now())
+        # Asia/Kuala_Lumpur is UTC+8
+        self.assertEqual(event.rrule, 'FREQ=DAILY;INTERVAL=1;UNTIL=20260301T155959Z')
+
+    def test_month_end_series_rrule_matches_server_side_occurrences(self):
+        for recurrence_type, start in (('monthly', datetime(2026, 1, 31, 10, tzinfo=dt_timezone.utc)),
+                                       ('monthly', datetime(2026, 1, 30, 10, tzinfo=dt_timezone.utc)),
+                                       ('yearly', datetime(2024, 2, 29, 10, tzinfo=dt_timezone.utc))):
+            event = Event(recurrence_type=recurrence_type, recurrence_interval=1, recurrence_count=6,
+                          start_date=start)
+            server = [start, *occurrence_starts(event, start, start + timedelta(days=366 * 6))]
+            client = list(rrulestr(event.rrule, dtstart=start))
+            self.assertEqual(client, server, event.rrule)
+        self.assertEqual(Event(recurrence_type='monthly', recurrence_interval=1,
+                               start_date=datetime(2026, 1, 31, 10, tzinfo=dt_timezone.utc)).rrule,
+                         'FREQ=MONTHLY;INTERVAL=1;BYMONTHDAY=28,29,30,31;BYSETPOS=-1')
+
+    def test_requires_city_or_tag(self):
+        self.assertEqual(APIClient().get('/api/events/ical/').status_code, 400)
@@ -0,0 +1,58 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from events.models import Event, EventRegistrationForm, EventReminder
+from users.models import User
+
+
+class EventListAnnotationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='visitor', password='x')
+        self.other = User.objects.create_user(username='other', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def add_events(self, count):
+        start = timezone.now() + timedelta(days=3)
+        events = []
+        for i in range(count):
+            event = Event.objects.create(title=f'Festival {i}', start_date=start + timedelta(hours=i), max_capacity=2)
+            event.add_registration(user=self.other, status='confirmed')
+            event.add_registration(user=User.objects.create_user(username=f'p{event.pk}'), status='pending')
+            events.append(event)
+        return events
+
+    def list_events(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/events/')
+        return {e['id']: e for e in response.json()['results']}, len(queries)
+
+    def test_registration_stats_come_from_annotations(self):
+        first, second, _ = self.add_events(3)
+        first.add_registration(user=self.user, status='confirmed')
+        EventReminder.objects.create(event=second, user=self.user, reminder_time='1_day')
+        EventRegistrationForm.objects.create(event=second, title='Sign up')
+
+        events, queries = self.list_events()
+        self.assertEqual(
+            {k: events[first.pk][k] for k in ('attendee_count', 'spots_remaining', 'is_full', 'user_registered')},
+            {'attendee_count': 2, 'spots_remaining': 0, 'is_full': True, 'user_registered': True},
+        )
+        self.assertEqual(events[second.pk]['attendee_count'], 1)
+        self.assertTrue(events[second.pk]['user_has_reminder'])
+        self.assertTrue(events[second.pk]['has_custom_form'])
+        self.assertFalse(events[first.pk]['has_custom_form'])
+
+        self.add_events(5)
+        _, more_queries = self.list_events()
+        self.assertEqual(more_queries, queries)
+
+    def test_anonymous_list_has_no_user_flags(self):
+        event, = self.add_events(1)
+        data = APIClient().get('/api/events/').json()['results'][0]
+        self.assertEqual((data['id'], data['attendee_count'], data['user_registered']), (event.pk, 1, False))
@@ -0,0 +1,55 @@
+from datetime import date
+
+from django.test import SimpleTestCase, TestCase
+
+from analytics.models import EntityDailyRollup, HiddenGemScore, Place
+from analytics.scoring import percentile, refresh_hidden_gems
+
+
+class PercentileTests(SimpleTestCase):
+    def test_matches_numpy_linear_interpolation(self):
+        values = [10, 40, 20, 30]
+        self.assertAlmostEqual(percentile(values, 33), 19.9)
+        self.assertAlmostEqual(percentile(values, 67), 30.1)
+        self.assertEqual(percentile([5], 67), 5)
+
+
+class HiddenGemTests(TestCase):
+    def add_place(self, name, city, engagement, positive, negative=0, score=0.8):
+        place = Place.objects.create(name=name, city=city, category='Nature')
+        posts = positive + negative
+        EntityDailyRollup.objects.create(
+            entity_type='place', entity_id=place.pk, date=date(2025, 1, 1), platform='twitter',
+            posts=posts, likes=engagement, positive=positive, negative=negative,
+            sentiment_score_sum=score * positive - score * negative,
+        )
+        return place
+
+    def setUp(self):
+        self.popular = [self.add_place(f'Popular {i}', 'Langkawi', 5000 + i, 10) for i in range(4)]
+        self.middle = [self.add_place(f'Middle {i}', 'Langkawi', 1000 + i, 10) for i in range(3)]
+        self.gem = self.add_place('Quiet Waterfall', 'Gurun', 50, 4)
+        self.liked = self.add_place('Old Mosque', 'Langkawi', 80, 3, negative=1)
+        self.disliked = self.add_place('Dusty Museum', 'Langkawi', 60, 1, negative=3)
+        self.too_new = self.add_place('New Cafe', 'Langkawi', 10, 2)
+
+    def test_ranks_liked_places_in_the_least_visited_tercile(self):
+        self.assertEqual(refresh_hidden_gems(), 2)
+        ranked = list(HiddenGemScore.objects.values_list('place__name', flat=True))
+        self.assertEqual(ranked, ['Quiet Waterfall', 'Old Mosque'])
+
+        gem = HiddenGemScore.objects.get(place=self.gem)
+        self.assertEqual((gem.rank, gem.city, gem.posts, gem.positive_share), (1, 'Gurun', 4, 1.0))
+
+    def test_view_is_paginated_and_filters_by_city(self):
+        refresh_hidden_gems()
+
+        data = self.client.get('/api/trends/hidden-gem/?page_size=1').json()
+        self.assertEqual((data['count'], data['pages'], data['page']), (2, 2, 1))
+        self.assertEqual(data['items'][0]['name'], 'Quiet Waterfall')
+
+        data = self.client.get('/api/trends/hidden-gem/?page_size=1&page=2').json()
+        self.assertEqual(data['items'][0]['name'], 'Old Mosque')
+
+        data = self.client.get('/api/trends/hidden-gem/?city=langkawi').json()
+        self.assertEqual([item['poi_id'] for item in data['items']], [self.liked.pk])
@@ -0,0 +1,90 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from analytics import pipeline
+from analytics.keywords import extract_keywords, rebuild_topics
+from analytics.models import AuthorSketch, EntityDailyRollup, Place, SentimentTopic, SocialPost, TermSketch
+
+from tests.test_collection_pipeline import POSTED_AT, FakeClassifier, FakeScraper, LandingDirMixin, raw_post
+
+
+class ExtractKeywordsTests(SimpleTestCase):
+    def test_phrases_are_split_on_stopwords(self):
+        self.assertEqual(
+            extract_keywords('Sunset cruise in Langkawi was amazing! #travel https://t.co/x'),
+            ['sunset', 'cruise', 'sunset cruise', 'langkawi', 'amazing', 'travel', 'amazing travel'],
+        )
+
+    def test_malay_stopwords_numbers_and_duplicates_are_dropped(self):
+        self.assertEqual(
+            extract_keywords('Makan nasi lemak di Langkawi, 2 kali nasi lemak!'),
+            ['makan', 'nasi', 'makan nasi', 'lemak', 'nasi lemak', 'langkawi', 'kali', 'kali nasi'],
+        )
+
+
+class SentimentTopicTests(LandingDirMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        Place.objects.create(name='Langkawi', city='Langkawi', category='Island')
+        Place.objects.create(name='Gunung Jerai', city='Gurun', category='Nature')
+        self.posts = [
+            raw_post('1', 'Langkawi cable car views'),
+            raw_post('2', 'Riding the Langkawi cable car again'),
+            raw_post('3', 'Gunung Jerai views from the top'),
+        ]
+
+    def run_pipeline(self, posts):
+        pipeline.run_inline(scraper=FakeScraper(posts), classifier=FakeClassifier())
+
+    def test_pipeline_counts_topics_once_per_day(self):
+        self.run_pipeline(self.posts)
+        self.run_pipeline(self.posts)  # re-fetch must not double count
+
+        day = timezone.localtime(POSTED_AT).date()
+        row = SentimentTopic.objects.get(topic='cable car', city='Langkawi')
+        self.assertEqual((row.date, row.sentiment, row.category, row.count), (day, 'positive', 'Island', 2))
+        self.assertEqual(SentimentTopic.objects.get(topic='views', city='Gurun').count, 1)
+
+    def test_posts_without_stored_topics_are_extracted_on_rebuild(self):
+        self.run_pipeline(self.posts[:1])
+        SocialPost.objects.update(extra={})
+        SentimentTopic.objects.all().delete()
+
+        rebuild_topics([timezone.localtime(POSTED_AT).date()])
+        self.assertTrue(SentimentTopic.objects.filter(topic='langkawi cable').exists())
+
+    def test_views_read_topic_counts_for_the_window(self):
+        self.run_pipeline(self.posts)
+
+        response = self.client.get('/api/sentiment/keywords/?range=7&city=langkawi')
+        words = {item['word']: item['count'] for item in response.json()}
+        self.assertEqual(words['cable car'], 2)
+        self.assertNotIn('gunung jerai', words)
+
+        response = self.client.get('/api/overview-metrics/?period=week')
+        keywords = {item['keyword']: item['count'] for item in response.json()['top_keywords']}
+        self.assertEqual(keywords['views'], 2)
+
+    def test_rebuild_rollups_backfills_posts_stored_directly(self):
+        langkawi = Place.objects.get(name='Langkawi')
+        for i, content in enumerate(['Langkawi cable car views', 'Langkawi cable car at dawn']):
+            SocialPost.objects.create(
+                platform='twitter', post_id=str(i), content=content, place=langkawi,
+                created_at=POSTED_AT, sentiment='positive', author_id=f'user{i}',
+            )
+        SocialPost.objects.create(platform='twitter', post_id='x', content='Sunny cable car weekend', created_at=POSTED_AT)
+
+        out = StringIO()
+        call_command('rebuild_rollups', '--all', stdout=out)
+
+        self.assertIn('Rebuilt 1 days', out.getvalue())
+        self.assertEqual(SentimentTopic.objects.get(topic='cable car', city='Langkawi').count, 2)
+        self.assertEqual(SentimentTopic.objects.get(topic='cable car', city='').count, 1)
+        self.assertEqual(TermSketch.objects.filter(city='Langkawi').count(), 1)
+        self.assertEqual(AuthorSketch.objects.filter(entity_id=langkawi.pk).count(), 1)
+        self.assertEqual(EntityDailyRollup.objects.get(entity_id=langkawi.pk).posts, 2)
@@ -0,0 +1,128 @@
+import importlib
+from datetime import date, timedelta
+from io import StringIO
+
+from django.apps import apps as django_apps
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Sum
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from analytics import pipeline
+from analytics.models import EntityDailyRollup, Place, PlacePeriodRollup, SocialPost
+from analytics.rollups import period_end, period_start, rebuild_period_rollups
+
+from tests.test_collection_pipeline import POSTED_AT, FakeClassifier, FakeScraper, LandingDirMixin, raw_post
+
+
+class PeriodBoundsTests(SimpleTestCase):
+    def test_weeks_start_on_monday_and_months_on_the_first(self):
+        self.assertEqual(period_start(date(2025, 1, 1), 'week'), date(2024, 12, 30))
+        self.assertEqual(period_end(date(2024, 12, 30), 'week'), date(2025, 1, 5))
+        self.assertEqual(period_start(date(2024, 2, 29), 'month'), date(2024, 2, 1))
+        self.assertEqual(period_end(date(2024, 2, 1), 'month'), date(2024, 2, 29))
+        self.assertEqual(period_end(date(2024, 12, 1), 'month'), date(2024, 12, 31))
+
+
+class PlacePeriodRollupTests(TestCase):
+    def setUp(self):
+        self.place = Place.objects.create(name='Langkawi', city='Langkawi')
+        self.today = timezone.localdate()
+
+    def add_day(self, day, platform='twitter', posts=2, positive=1, negative=1, likes=10):
+        EntityDailyRollup.objects.create(
+            entity_type='place', entity_id=self.place.pk, date=day, platform=platform,
+            posts=posts, likes=likes, comments=1, shares=1, positive=positive, negative=negative,
+            sentiment_score_sum=0.5 * positive - 0.5 * negative, confidence_sum=80.0 * posts,
+        )
+
+    def test_days_are_summed_into_weeks_and_months(self):
+        self.add_day(date(2025, 1, 30))
+        self.add_day(date(2025, 1, 31), platform='instagram', posts=1, positive=1, negative=0)
+        self.add_day(date(2025, 2, 1))
+
+        rebuild_period_rollups({self.place.pk}, {date(2025, 1, 31)})
+        months = {(r.period_start, r.platform): r.posts for r in PlacePeriodRollup.objects.filter(period='month')}
+        self.assertEqual(months, {(date(2025, 1, 1), 'twitter'): 2, (date(2025, 1, 1), 'instagram'): 1})
+        week = PlacePeriodRollup.objects.get(period='week', platform='twitter')
+        self.assertEqual((week.period_start, week.posts, week.likes), (date(2025, 1, 27), 4, 20))
+
+    def test_detail_view_reads_series_in_two_queries(self):
+        for offset in (0, 1, 8, 40):
+            self.add_day(self.today - timedelta(days=offset))
+        self.add_day(self.today, platform='instagram', posts=3, positive=3, negative=0)
+        rebuild_period_rollups({self.place.pk}, {self.today - timedelta(days=o) for o in (0, 1, 8, 40)})
+
+        with self.assertNumQueries(2):
+            data = self.client.get(f'/api/analytics/places/{self.place.pk}/sentiment/?weeks=2').json()
+
+        summary = data['sentiment_summary']
+        self.assertEqual((summary['total_posts'], summary['positive'], summary['negative']), (11, 7, 4))
+        self.assertEqual(data['engagement_stats']['total_engagement'], 5 * 12)
+        self.assertEqual(data['platform_breakdown'], [
+            {'platform': 'twitter', 'count': 8, 'avg_sentiment': 0.0},
+            {'platform': 'instagram', 'count': 3, 'avg_sentiment': 0.5},
+        ])
+        self.assertEqual(sum(m['positive'] + m['neutral'] + m['negative'] for m in data['sentiment_over_time']), 11)
+        self.assertLessEqual(len(data['weekly_sentiment']), 2)
+        self.assertEqual(sum(w['total'] for w in data['weekly_sentiment']),
+                         sum(r.posts for r in EntityDailyRollup.objects.filter(
+                             date__gte=period_start(self.today, 'week') - timedelta(weeks=1))))
+        self.assertEqual(data['average_confidence'], 80.0)
+
+    def test_demo_data_without_rollups(self):
+        data = self.client.get(f'/api/analytics/places/{self.place.pk}/sentiment/').json()
+        self.assertTrue(data['is_demo_data'])
+
+
+class PeriodRollupPipelineTests(LandingDirMixin, TestCase):
+    def test_rollup_stage_maintains_period_rows(self):
+        place = Place.objects.create(name='Langkawi', city='Langkawi')
+        posts = [raw_post('1', 'Langkawi sunset'), raw_post('2', 'Langkawi beach', likes=5)]
+        pipeline.run_inline(scraper=FakeScraper(posts), classifier=FakeClassifier())
+
+        day = timezone.localtime(POSTED_AT).date()
+        month = PlacePeriodRollup.objects.get(place=place, period='month')
+        self.assertEqual((month.period_start, month.posts, month.likes), (day.replace(day=1), 2, 15))
+        self.assertTrue(PlacePeriodRollup.objects.filter(place=place, period='week',
+                                                         period_start=period_start(day, 'week')).exists())
+
+
+class PeriodRollupBackfillTests(TestCase):
+    def add_posts(self, place, **fields):
+        for i, sentiment in enumerate(['positive', 'positive', 'negative']):
+            SocialPost.objects.create(platform='twitter', post_id=f'{place.pk}-{i}', content='Langkawi', place=place,
+                                      created_at=timezone.now() - timedelta(days=i), sentiment=sentiment, **fields)
+
+    def test_detail_view_never_writes_and_shows_posts_once_backfilled(self):
+        place = Place.objects.create(name='Langkawi', city='Langkawi')
+        self.add_posts(place)
+
+        with CaptureQueriesContext(connection) as queries:
+            data = self.client.get(f'/api/analytics/places/{place.pk}/sentiment/').json()
+        self.assertFalse(any(q['sql'].startswith(('INSERT', 'UPDATE', 'DELETE')) for q in queries.captured_queries))
+        self.assertNotIn('is_demo_data', data)
+        self.assertEqual((data['sentiment_summary']['total_posts'], data['sentiment_over_time']), (0, []))
+
+        call_command('rebuild_rollups', '--all', stdout=StringIO())
+        summary = self.client.get(f'/api/analytics/places/{place.pk}/sentiment/').json()['sentiment_summary']
+        self.assertEqual((summary['total_posts'], summary['positive'], summary['negative']), (3, 2, 1))
+
+    def test_only_duplicate_posts_count_as_no_posts(self):
+        place = Place.objects.create(name='Langkawi', city='Langkawi')
+        self.add_posts(place, is_duplicate=True)
+        self.assertTrue(self.client.get(f'/api/analytics/places/{place.pk}/sentiment/').json()['is_demo_data'])
+
+    def test_migration_backfills_period_rollups_from_posts(self):
+        place = Place.objects.create(name='Langkawi', city='Langkawi')
+        self.add_posts(place)
+        SocialPost.objects.create(platform='twitter', post_id='dup', content='Langkawi', place=place,
+                                  created_at=timezone.now(), sentiment='positive', is_duplicate=True)
+
+        migration = importlib.import_module('analytics.migrations.0022_place_period_rollup')
+        migration.backfill_period_rollups(django_apps, None)
+        month = PlacePeriodRollup.objects.filter(place=place, period='month').aggregate(
+            posts=Sum('posts'), positive=Sum('positive'), negative=Sum('negative'))
+        self.assertEqual(month, {'posts': 3, 'positive': 2, 'negative': 1})
@@ -0,0 +1,58 @@
+import json
+import re
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from analytics.models import Place
+
+PROFILE_ALL = {'ENABLED': True, 'SAMPLE_RATE': 1.0, 'THRESHOLD_MS': 0}
+
+
+def server_timing(response):
+    """{'db': (dur, desc), ...} from a Server-Timing header."""
+    metrics = {}
+    for name, duration, description in re.findall(r'(\w+);dur=([\d.]+)(?:;desc="([^"]*)")?', response['Server-Timing']):
+        metrics[name] = (float(duration), description)
+    return metrics
+
+
+class ProfilingMiddlewareTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        Place.objects.create(name='Langkawi', city='Langkawi')
+
+    @override_settings(REQUEST_PROFILING=PROFILE_ALL)
+    def test_sampled_request_gets_server_timing_and_log_line(self):
+        with self.assertLogs('profiling', 'INFO') as logs:
+            response = self.client.get('/api/places/')
+
+        metrics = server_timing(response)
+        self.assertEqual(set(metrics), {'db', 'cache', 'view', 'render', 'total'})
+        self.assertRegex(metrics['db'][1], r'^[1-9]\d* queries$')
+        self.assertLessEqual(metrics['view'][0], metrics['total'][0])
+
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual((line['event'], line['path'], line['status']), ('request_profile', '/api/places/', 200))
+        self.assertGreaterEqual(line['db_queries'], 1)
+
+    @override_settings(REQUEST_PROFILING=PROFILE_ALL)
+    def test_cache_calls_are_counted_and_backend_restored(self):
+        response = self.client.get('/api/sentiment/summary/')
+        self.assertIn('1 reads, 1 writes', server_timing(response)['cache'][1])
+        self.assertNotIn('get', cache.__dict__)
+        self.assertNotIn('get', type(cache).__dict__)
+
+    @override_settings(REQUEST_PROFILING={**PROFILE_ALL, 'THRESHOLD_MS': 60_000})
+    def test_fast_requests_are_not_logged(self):
+        with self.assertNoLogs('profiling'):
+            response = self.client.get('/api/ping/')
+        self.assertIn('Server-Timing', response)
+
+    @override_settings(REQUEST_PROFILING={**PROFILE_ALL, 'SAMPLE_RATE': 0.0}, DEBUG=True)
+    def test_unsampled_requests_are_untouched_unless_forced(self):
+        self.assertNotIn('Server-Timing', self.client.get('/api/ping/'))
+        self.assertIn('Server-Timing', self.client.get('/api/ping/', HTTP_X_PROFILE='1'))
+
+    def test_disabled_by_default(self):
+        self.assertNotIn('Server-Timing', self.client.get('/api/ping/'))
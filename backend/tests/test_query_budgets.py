@@ -0,0 +1,185 @@
+"""
+Query budgets for every GET endpoint in analytics/urls.py and api/urls.py.
+
+Each endpoint is requested (anonymously, cold cache) against a small and a
+large seeded dataset. A test fails when an endpoint's query count grows
+with the number of rows (an N+1) or exceeds its declared budget in
+QUERY_BUDGETS. New endpoints must declare a budget.
+"""
+
+from datetime import time, timedelta
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from analytics.benchmark import concrete_path, get_endpoints, route_ids
+from analytics.models import Place, SocialPost
+from analytics.rollups import rebuild_rollups, rollup_key
+from analytics.scoring import refresh_place_scores
+from events.models import Event, EventRegistration
+from stays.models import Stay
+from users.models import User
+from vendors.models import MenuItem, OpeningHours, Promotion, Review, Vendor
+
+SMALL, LARGE = 2, 6
+
+# Max queries per endpoint (view name, or view name.action for viewsets)
+QUERY_BUDGETS = {
+    'analytics.views_crud.PlaceViewSet.list': 2,
+    'analytics.views_crud.PlaceViewSet.retrieve': 1,
+    'analytics.views_crud.SocialPostViewSet.list': 2,
+    'analytics.views_crud.SocialPostViewSet.retrieve': 1,
+    'rest_framework.routers.APIRootView': 0,
+    'analytics.views_safe.ping': 0,
+    'analytics.views_new.OverviewMetricsView': 8,
+    'analytics.views_safe.metrics_totals': 2,
+    'analytics.views_safe.visitors_metrics': 1,
+    'analytics.views_safe.engagement_metrics': 1,
+    'analytics.views_safe.top_attractions': 1,
+    'analytics.views_new.PlacesListView': 1,
+    'analytics.views_new.PopularPlacesView': 1,
+    'analytics.views_new.TrendingPlacesView': 3,
+    'analytics.views_new.NearbyPlacesView': 1,
+    'analytics.views_new.LeastVisitedDestinationsView': 1,
+    'analytics.views_new.PlacesByVisitLevelView': 2,
+    'analytics.views_new.PlaceSentimentDetailView': 2,
+    'analytics.views_new.SentimentSummaryView': 1,
+    'analytics.views_new.SentimentByCategoryView': 1,
+    'analytics.views_new.TopKeywordsView': 1,
+    'analytics.views_new.SentimentComparisonView': 1,
+    'analytics.views_new.SocialMetricsView': 1,
+    'analytics.views_new.SocialPlatformsView': 1,
+    'analytics.views_new.SocialEngagementView': 1,
+    'analytics.views_new.SocialEngagementTrendsView': 1,
+    'analytics.views_new.EventAttendanceTrendView': 1,
+    'analytics.views_safe.top_pois': 1,
+    'analytics.views_safe.least_pois': 1,
+    'analytics.views_safe.mentions_timeseries': 1,
+    'analytics.search.search_pois': 1,
+    'analytics.views_safe.map_heat': 1,
+    'analytics.views_safe.wordcloud': 1,
+    'analytics.views_safe.hidden_gem': 1,
+    'analytics.views_safe.slow_queries_report': 0,
+    'vendors.views.VendorViewSet.list': 2,
+    'vendors.views.VendorViewSet.retrieve': 6,
+    'vendors.views.VendorViewSet.menu': 2,
+    'vendors.views.VendorViewSet.promotions': 2,
+    'vendors.views.VendorViewSet.reviews': 3,
+    'vendors.views.MenuItemViewSet.list': 0,
+    'vendors.views.MenuItemViewSet.retrieve': 0,
+    'vendors.views.OpeningHoursViewSet.list': 0,
+    'vendors.views.OpeningHoursViewSet.retrieve': 0,
+    'vendors.views.ReviewViewSet.list': 2,
+    'vendors.views.ReviewViewSet.retrieve': 1,
+    'vendors.views.PromotionViewSet.list': 0,
+    'vendors.views.PromotionViewSet.retrieve': 0,
+    'vendors.views.ReservationViewSet.list': 0,
+    'vendors.views.ReservationViewSet.retrieve': 0,
+    'events.views.EventViewSet.list': 3,
+    'events.views.EventViewSet.happening_now': 2,
+    'events.views.EventViewSet.occurrences': 3,
+    'events.views.EventViewSet.calendar': 3,
+    'events.views.EventViewSet.ical': 0,
+    'events.views.EventViewSet.retrieve': 3,
+    'events.views.EventViewSet.attendees': 6,
+    'events.views.EventViewSet.my_registration': 0,
+    'events.views.EventViewSet.my_reminders': 0,
+    'events.views.EventViewSet.nearby_restaurants': 3,
+    'events.views.EventViewSet.nearby_stays': 4,
+    'events.views.EventViewSet.pending_registrations': 0,
+    'events.views.EventViewSet.registration_form': 3,
+    'stays.views.StayViewSet.list': 19,
+    'stays.views.StayViewSet.hybrid_search': 23,
+    'stays.views.StayViewSet.retrieve': 9,
+}
+
+# Endpoints whose query count still grows with the data; they are checked
+# against their budget at the small size only.
+KNOWN_N_PLUS_ONE = {
+    # _enhance_with_social_metrics searches posts per stay
+    'stays.views.StayViewSet.list',
+    'stays.views.StayViewSet.hybrid_search',
+}
+
+
+def seed(start, count):
+    """Add `count` of every entity (with children) numbered from `start`."""
+    now = timezone.now()
+    today = timezone.localdate()
+    owner = User.objects.create_user(username=f'owner{start}', password='x', role='vendor')
+    keys = []
+    for i in range(start, start + count):
+        place = Place.objects.create(
+            name=f'Place {i}', city='Alor Setar' if i % 2 else 'Langkawi', category='Nature')
+        vendor = Vendor.objects.create(name=f'Warung {i}', city='Alor Setar', owner=owner, cuisines=['Malay'],
+                                       lat=6.12 + i / 1000, lon=100.36)
+        stay = Stay.objects.create(name=f'Stay {i}', type='Hotel', district='Langkawi', priceNight=120, owner=owner,
+                                   lat=6.12, lon=100.36 + i / 1000)
+        for j in range(3):
+            created = now - timedelta(days=j, hours=i)
+            for entity in ({'place': place}, {'vendor': vendor}, {'stay': stay}):
+                post = SocialPost.objects.create(
+                    platform=('twitter', 'instagram', 'facebook')[j], post_id=f'{i}-{j}-{next(iter(entity))}',
+                    content=f'Lovely visit number {j} to {i}', created_at=created,
+                    likes=10 * j, comments=j, shares=1, views=100,
+                    sentiment=('positive', 'neutral', 'negative')[j], sentiment_score=0.5 - 0.5 * j,
+                    confidence=80, is_tourism=True, author_id=f'user{i}{j}', **entity)
+                entity_type, entity_obj = next(iter(entity.items()))
+                keys.append(rollup_key(entity_type, entity_obj.pk, post.created_at))
+
+            Review.objects.create(vendor=vendor, rating=3 + j % 3, comment='Sedap', author_name=f'Ali {j}')
+            MenuItem.objects.create(vendor=vendor, name=f'Nasi {j}', category='Main', price=8)
+            OpeningHours.objects.create(vendor=vendor, day_of_week=j, open_time=time(9), close_time=time(22))
+        Promotion.objects.create(vendor=vendor, title='Raya', description='10% off',
+                                 start_date=today - timedelta(days=1), end_date=today + timedelta(days=7))
+
+        for offset in (-30, 10):
+            event = Event.objects.create(
+                title=f'Festival {i} {offset}', city='Alor Setar', max_capacity=100, lat=6.12, lon=100.36,
+                start_date=now + timedelta(days=offset), end_date=now + timedelta(days=offset, hours=4),
+                expected_attendance=50, actual_attendance=40 if offset < 0 else None, created_by=owner)
+            for j in range(2):
+                visitor = User.objects.create_user(username=f'visitor{i}-{offset}-{j}', password='x')
+                EventRegistration.objects.create(event=event, user=visitor, status='confirmed')
+
+    Event.objects.filter(created_by=owner).reconcile_confirmed_counts()
+    rebuild_rollups({tuple(key) for key in keys})
+    refresh_place_scores()
+    return route_ids()
+
+
+@override_settings(DEBUG_PROPAGATE_EXCEPTIONS=False)
+class QueryBudgetTests(TestCase):
+    def measure(self, endpoints, ids):
+        self.client.raise_request_exception = False
+        counts = {}
+        for name, regex in endpoints.items():
+            path = concrete_path(regex, ids)
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(path)
+            with self.subTest(endpoint=name, path=path):
+                self.assertLess(response.status_code, 500)
+            counts[name] = len(queries)
+        return counts
+
+    def test_endpoints_stay_within_budget_and_do_not_grow(self):
+        endpoints = get_endpoints()
+        ids = seed(0, SMALL)
+        small = self.measure(endpoints, ids)
+        seed(SMALL, LARGE - SMALL)
+        large = self.measure(endpoints, ids)
+
+        for name in endpoints:
+            with self.subTest(endpoint=name):
+                self.assertIn(name, QUERY_BUDGETS, f'{name} has no query budget ({small[name]} queries)')
+                self.assertLessEqual(small[name], QUERY_BUDGETS[name])
+                if name in KNOWN_N_PLUS_ONE:
+                    continue
+                self.assertEqual(
+                    large[name], small[name],
+                    f'{name}: {small[name]} queries for {SMALL} rows, {large[name]} for {LARGE}')
+                self.assertLessEqual(large[name], QUERY_BUDGETS[name])
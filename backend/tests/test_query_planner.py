@@ -0,0 +1,79 @@
+from django.test import SimpleTestCase
+
+from analytics.query_planner import (
+    KeywordMatcher, PLATFORM_QUERY_LIMITS, build_query, distribute_cursor, group_cursor, pack_keywords,
+)
+from analytics.stub_server import CANNED_ROUTES, StubAPIServer
+from tests.test_scraper_fetch import stub_scraper
+
+
+CATALOG = [f'Kedah Place {i}' for i in range(150)] + [f'Warung{i}' for i in range(150)]
+
+
+class QueryPackingTests(SimpleTestCase):
+    def test_packs_large_catalog_within_limits(self):
+        groups = pack_keywords(CATALOG, 'twitter')
+        limits = PLATFORM_QUERY_LIMITS['twitter']
+
+        self.assertLessEqual(len(groups), len(CATALOG) // 10)
+        self.assertEqual(sorted(k for g in groups for k in g), sorted(CATALOG))
+        for group in groups:
+            self.assertLessEqual(len(group), limits['max_terms'])
+            self.assertLessEqual(len(build_query(group, 'twitter')), limits['max_length'])
+
+    def test_quotes_phrases_and_dedups_names(self):
+        groups = pack_keywords(['Alor Setar', 'Langkawi', 'langkawi'], 'twitter')
+        self.assertEqual(groups, [['Alor Setar', 'Langkawi']])
+        self.assertEqual(build_query(groups[0]), '("Alor Setar" OR Langkawi) -is:retweet')
+        self.assertEqual(build_query(['Langkawi']), 'Langkawi -is:retweet')
+
+    def test_parked_keywords_get_their_own_query(self):
+        checkpoints = {('twitter', 'Langkawi'): {'since_id': '5', 'paging_token': 'abc'}}
+        groups = pack_keywords(['Langkawi', 'Gunung Jerai', 'Pekan Rabu'], 'twitter', checkpoints)
+        self.assertIn(['Langkawi'], groups)
+        self.assertEqual(len(groups), 2)
+
+    def test_group_cursor_uses_oldest_member(self):
+        checkpoints = {
+            ('twitter', 'A'): {'since_id': '900'},
+            ('twitter', 'B'): {'since_id': '1000'},
+        }
+        self.assertEqual(group_cursor(['A', 'B'], 'twitter', checkpoints)['since_id'], '900')
+        self.assertEqual(group_cursor(['A', 'C'], 'twitter', checkpoints)['since_id'], '')
+
+        updates = distribute_cursor({'since_id': '950'}, ['A', 'B'], 'twitter', checkpoints)
+        self.assertEqual(updates[('twitter', 'A')]['since_id'], '950')
+        self.assertEqual(updates[('twitter', 'B')]['since_id'], '1000')
+
+    def test_matcher_maps_text_back_to_keywords(self):
+        matcher = KeywordMatcher(['Langkawi', 'Alor Setar', 'Setar'])
+        self.assertEqual(matcher.match('From ALOR SETAR to Langkawi!'), ['Alor Setar', 'Langkawi'])
+        self.assertEqual(matcher.match('Langkawian food'), [])
+
+
+class PackedCollectTests(SimpleTestCase):
+    def test_packed_queries_cut_requests_and_split_when_saturated(self):
+        issued = []
+
+        def search(query):
+            issued.append(query['query'])
+            # Packed queries always have another page; single names don't
+            packed = ' OR ' in query['query']
+            name = query['query'].replace(' -is:retweet', '')
+            return {'status': 200, 'json': {
+                'data': [{'id': str(100 + len(issued)), 'text': f'Visiting {name.strip("()")}'}],
+                'meta': {'next_token': 'more'} if packed else {},
+            }}
+
+        routes = dict(CANNED_ROUTES, **{'/2/tweets/search/recent': search})
+        with StubAPIServer(routes=routes) as server:
+            posts, updates = stub_scraper(server).collect(['Langkawi', 'Kuah', 'Jerai', 'Gurun'], max_pages=1)
+
+        queries = [q['query'] for path, q in server.requests if path == '/2/tweets/search/recent']
+        # 1 packed query, 2 halves, 4 singles
+        self.assertEqual(len(queries), 7)
+        self.assertIn('Langkawi -is:retweet', queries)
+        for keyword in ['Langkawi', 'Kuah', 'Jerai', 'Gurun']:
+            self.assertEqual(updates[('twitter', keyword)]['paging_token'], '')
+        single = [p for p in posts if p['content'] == 'Visiting Gurun']
+        self.assertEqual(single[0]['keywords'], ['Gurun'])
@@ -0,0 +1,72 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from analytics.checkpoints import load_backfill_state, save_backfill_state
+from analytics.models import EntityDailyRollup, Place, SocialPost
+from analytics.rollups import rebuild_rollups, rollup_key
+
+
+class ReclassifyPostsCommandTests(TestCase):
+    def setUp(self):
+        self.langkawi = Place.objects.create(name='Langkawi')
+        self.old_place = Place.objects.create(name='Somewhere Else')
+        posted_at = timezone.now() - timedelta(days=2)
+        self.posts = [
+            SocialPost.objects.create(
+                platform='twitter', post_id=str(i), created_at=posted_at, likes=1,
+                content=f'Langkawi beach was amazing {i}', place=self.old_place,
+                sentiment='neutral', confidence=0.1,
+            )
+            for i in range(5)
+        ]
+        # Already correct: should not be rewritten
+        self.posts.append(SocialPost.objects.create(
+            platform='twitter', post_id='ok', created_at=posted_at, content='Langkawi trip',
+            place=self.langkawi, sentiment='neutral', confidence=0.6,
+        ))
+        rebuild_rollups([rollup_key('place', self.old_place.pk, posted_at)])
+
+    def reclassify(self, *args):
+        out = StringIO()
+        call_command('reclassify_posts', '--chunk-size', '2', *args, stdout=out)
+        return out.getvalue()
+
+    def test_relinks_posts_and_rebuilds_only_affected_rollups(self):
+        self.reclassify('--workers', '2')
+
+        self.assertEqual(SocialPost.objects.filter(place=self.langkawi).count(), 6)
+        post = SocialPost.objects.get(post_id='0')
+        self.assertEqual((post.sentiment, post.extra['sentiment']), ('positive', 'positive'))
+
+        self.assertFalse(EntityDailyRollup.objects.filter(entity_id=self.old_place.pk).exists())
+        self.assertEqual(EntityDailyRollup.objects.get(entity_id=self.langkawi.pk).posts, 6)
+
+        state = load_backfill_state('reclassify_posts')
+        self.assertEqual(state['totals'], {'scanned': 6, 'changed': 5})
+        self.assertEqual(state['last_pk'], self.posts[-1].pk)
+
+    def test_resumes_an_interrupted_run_after_last_checkpointed_pk(self):
+        save_backfill_state('reclassify_posts', {
+            'last_pk': self.posts[2].pk, 'max_pk': self.posts[-1].pk, 'totals': {'scanned': 3, 'changed': 3},
+        })
+
+        self.assertIn('Resuming', self.reclassify('--workers', '0'))
+        self.assertEqual(SocialPost.objects.get(pk=self.posts[0].pk).place, self.old_place)
+        self.assertEqual(SocialPost.objects.get(pk=self.posts[3].pk).place, self.langkawi)
+        state = load_backfill_state('reclassify_posts')
+        self.assertEqual((state['completed'], state['totals']), (True, {'scanned': 6, 'changed': 5}))
+
+        self.reclassify('--workers', '0', '--restart')
+        self.assertEqual(SocialPost.objects.get(pk=self.posts[0].pk).place, self.langkawi)
+
+    def test_run_after_a_completed_run_starts_over(self):
+        self.reclassify('--workers', '0')
+        SocialPost.objects.filter(pk=self.posts[0].pk).update(place=self.old_place)
+
+        self.assertNotIn('Nothing to reclassify', self.reclassify('--workers', '0'))
+        self.assertEqual(SocialPost.objects.get(pk=self.posts[0].pk).place, self.langkawi)
+        self.assertEqual(load_backfill_state('reclassify_posts')['totals'], {'scanned': 6, 'changed': 1})
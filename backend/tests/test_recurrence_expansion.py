@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from events.models import Event
+from users.models import User
+
+
+class OccurrenceExpansionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def add_series(self, start, **fields):
+        return Event.objects.create(title='Night Market', city='Alor Setar', start_date=start,
+                                    end_date=start + timedelta(hours=3), recurrence_type='weekly', **fields)
+
+    def occurrences(self, day_from, day_to, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/events/occurrences/', {'from': day_from, 'to': day_to, **params})
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()['occurrences'], len(queries)
+
+    def test_expands_a_window_without_rows_or_growth_with_series_length(self):
+        window_start = timezone.localdate() + timedelta(days=7)
+        window_end = window_start + timedelta(days=13)
+        at = timezone.make_aware(datetime.combine(window_start, datetime.min.time())) + timedelta(hours=20)
+        self.add_series(at - timedelta(weeks=3))
+        Event.objects.create(title='Jazz Night', city='Langkawi', start_date=at + timedelta(days=1))
+
+        found, queries = self.occurrences(window_start, window_end)
+        self.assertEqual([(o['title'], o['is_virtual']) for o in found],
+                         [('Night Market', True), ('Jazz Night', False), ('Night Market', True)])
+        self.assertEqual(found[0]['id'], None)
+        self.assertEqual(Event.objects.count(), 2)
+
+        self.add_series(at - timedelta(weeks=300))
+        cache.clear()
+        found, more_queries = self.occurrences(window_start, window_end, city='alor setar')
+        self.assertEqual(len(found), 4)
+        self.assertEqual(more_queries, queries)
+
+    def test_interval_and_count(self):
+        start = timezone.now().replace(microsecond=0) + timedelta(days=1)
+        parent = self.add_series(start, recurrence_interval=2, recurrence_count=3)
+        found, _ = self.occurrences(start.date(), start.date() + timedelta(days=60))
+        self.assertEqual([timezone.localtime(datetime.fromisoformat(o['start_date'])) - start for o in found],
+                         [timedelta(0), timedelta(weeks=2), timedelta(weeks=4)])
+        self.assertEqual(parent.rrule, 'FREQ=WEEKLY;INTERVAL=2;COUNT=3')
+
+    def test_registration_materializes_only_that_occurrence(self):
+        start = timezone.now().replace(microsecond=0) + timedelta(days=1)
+        parent = self.add_series(start, max_capacity=10)
+        found, _ = self.occurrences(start.date(), start.date() + timedelta(days=20))
+        second = found[1]['start_date']
+
+        self.client.force_authenticate(User.objects.create_user(username='visitor', password='x'))
+        response = self.client.post(f'/api/events/{parent.pk}/register/', {'occurrence_start': second}, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(response.json()['spots_remaining'], 9)
+        self.assertEqual(parent.recurring_instances.count(), 1)
+
+        found, _ = self.occurrences(start.date(), start.date() + timedelta(days=20))
+        self.assertEqual([(o['is_virtual'], o['attendee_count']) for o in found],
+                         [(False, 0), (False, 1), (True, 0)])
+
+        response = self.client.post(f'/api/events/{parent.pk}/register/',
+                                    {'occurrence_start': (start + timedelta(days=1)).isoformat()}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(parent.recurring_instances.count(), 1)
+
+        # Without an offset the start is read as local time
+        third = timezone.localtime(datetime.fromisoformat(found[2]['start_date'])).replace(tzinfo=None)
+        self.client.force_authenticate(User.objects.create_user(username='local', password='x'))
+        response = self.client.post(f'/api/events/{parent.pk}/register/', {'occurrence_start': third.isoformat()},
+                                    format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(parent.recurring_instances.count(), 2)
+
+    def test_rejects_oversized_windows(self):
+        response = self.client.get('/api/events/occurrences/', {'from': '2026-01-01', 'to': '2027-06-01'})
+        self.assertEqual(response.status_code, 400)
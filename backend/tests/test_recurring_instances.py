@@ -0,0 +1,97 @@
+from datetime import datetime, timedelta
+
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from events.models import Event
+from events.recurrence import build_instance, missing_instances, occurrence_starts
+from events.tasks import generate_next_recurring_instances
+
+
+@override_settings(RECURRING_EVENT_HORIZON_DAYS=30)
+class RecurringInstanceTests(TestCase):
+    def add_parent(self, weeks_ago=10, **fields):
+        start = timezone.now() - timedelta(weeks=weeks_ago, hours=1)
+        return Event.objects.create(title='Sunday Market', start_date=start, end_date=start + timedelta(hours=4),
+                                    recurrence_type='weekly', **fields)
+
+    def test_list_endpoint_never_generates_instances(self):
+        self.add_parent()
+        with CaptureQueriesContext(connection) as one_parent:
+            APIClient().get('/api/events/')
+        for _ in range(5):
+            self.add_parent()
+        with CaptureQueriesContext(connection) as six_parents:
+            APIClient().get('/api/events/')
+
+        self.assertFalse(Event.objects.filter(is_recurring_instance=True).exists())
+        self.assertEqual(len(six_parents), len(one_parent))
+        self.assertFalse(any(q['sql'].startswith(('INSERT', 'UPDATE')) for q in six_parents.captured_queries))
+
+    def test_task_fills_the_rolling_horizon_once(self):
+        parent = self.add_parent()
+        self.add_parent(is_published=False)
+
+        generate_next_recurring_instances()
+        starts = list(parent.recurring_instances.order_by('start_date').values_list('start_date', flat=True))
+        self.assertIn(len(starts), (4, 5))
+        self.assertTrue(all(timezone.now() <= s <= timezone.now() + timedelta(days=30) for s in starts))
+        self.assertEqual(Event.objects.filter(is_recurring_instance=True).count(), len(starts))
+
+        self.assertEqual(generate_next_recurring_instances(), 'Created 0 recurring event instances')
+
+    def test_creating_a_series_does_not_materialize_it(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            parent = self.add_parent(weeks_ago=0, recurrence_end_date=(timezone.now() + timedelta(days=15)).date())
+        self.assertFalse(parent.recurring_instances.exists())
+
+    def test_task_is_scheduled_with_a_rolling_horizon(self):
+        from tourism_api.celery import app
+
+        tasks = {entry['task'] for entry in app.conf.beat_schedule.values()}
+        self.assertIn('events.tasks.generate_next_recurring_instances', tasks)
+
+    @override_settings(RECURRING_EVENT_HORIZON_DAYS=0)
+    def test_task_is_a_no_op_without_a_horizon(self):
+        self.add_parent()
+        with CaptureQueriesContext(connection) as queries:
+            generate_next_recurring_instances()
+        self.assertEqual(len(queries), 0)
+        self.assertFalse(Event.objects.filter(is_recurring_instance=True).exists())
+
+    def test_monthly_occurrences_are_counted_from_the_parent(self):
+        parent = Event(recurrence_type='monthly', start_date=timezone.make_aware(datetime(2026, 1, 31, 10)))
+        starts = occurrence_starts(parent, parent.start_date, timezone.make_aware(datetime(2026, 5, 1)))
+        self.assertEqual([s.day for s in starts], [28, 31, 30])
+
+    def test_task_query_count_does_not_grow_with_parents(self):
+        self.add_parent()
+        with CaptureQueriesContext(connection) as one_parent:
+            generate_next_recurring_instances()
+        for _ in range(5):
+            self.add_parent()
+        Event.objects.filter(is_recurring_instance=True).delete()
+        with CaptureQueriesContext(connection) as six_parents:
+            generate_next_recurring_instances()
+        self.assertEqual(len(six_parents), len(one_parent))
+
+    def test_racing_generators_cannot_duplicate_an_occurrence(self):
+        parent = self.add_parent()
+        until = timezone.now() + timedelta(days=30)
+        first, second = missing_instances([parent], timezone.now(), until), missing_instances([parent], timezone.now(), until)
+        Event.objects.bulk_create(first, ignore_conflicts=True)
+        Event.objects.bulk_create(second, ignore_conflicts=True)
+        self.assertEqual(parent.recurring_instances.count(), len(first))
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            build_instance(parent, first[0].start_date).save()
+
+    def test_generate_recurring_instances_returns_saved_rows(self):
+        parent = self.add_parent()
+        instances = parent.generate_recurring_instances(count=3)
+        self.assertEqual(len(instances), 3)
+        self.assertTrue(all(i.pk and i.start_date > timezone.now() for i in instances))
+        self.assertEqual(parent.generate_recurring_instances(count=3), [])
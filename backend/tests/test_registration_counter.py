@@ -0,0 +1,75 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from events.models import Event, EventRegistration
+from users.models import User
+
+
+class ConfirmedCountTests(TestCase):
+    def setUp(self):
+        self.event = Event.objects.create(title='Paddy Festival', start_date=timezone.now() + timedelta(days=5),
+                                          max_capacity=2, requires_approval=True)
+        self.admin = User.objects.create_user(username='admin', password='x', is_staff=True)
+        self.client = APIClient()
+
+    def submit(self, name):
+        return APIClient().post(f'/api/events/{self.event.pk}/submit_registration/',
+                                {'form_data': {'name': name, 'email': f'{name}@example.com'}}, format='json')
+
+    def review(self, registration_id, decision):
+        self.client.force_authenticate(self.admin)
+        return self.client.post(f'/api/events/{self.event.pk}/registrations/{registration_id}/{decision}/')
+
+    def confirmed_count(self):
+        self.event.refresh_from_db()
+        return self.event.confirmed_count
+
+    def test_transitions_keep_the_counter_and_capacity(self):
+        ids = [self.submit(name).json()['registration']['id'] for name in ('ana', 'ben', 'cai')]
+        self.assertEqual(self.confirmed_count(), 0)
+
+        self.assertEqual(self.review(ids[0], 'approve').status_code, 200)
+        self.assertEqual(self.review(ids[1], 'approve').status_code, 200)
+        self.assertEqual(self.confirmed_count(), 2)
+        response = self.review(ids[2], 'approve')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(EventRegistration.objects.get(pk=ids[2]).status, 'pending')
+        self.assertEqual(self.submit('dee').status_code, 400)
+
+        self.assertEqual(self.review(ids[2], 'reject').status_code, 200)
+        self.assertEqual(self.confirmed_count(), 2)
+
+        response = APIClient().post(f'/api/events/{self.event.pk}/cancel_registration/',
+                                    {'registration_id': ids[0], 'contact_email': 'ana@example.com'}, format='json')
+        self.assertEqual(response.json()['attendee_count'], 1)
+        self.assertEqual(self.confirmed_count(), 1)
+
+    def test_register_and_unregister_user(self):
+        self.event.requires_approval = False
+        self.event.save()
+        visitor = User.objects.create_user(username='visitor', password='x')
+
+        self.event.register_user(visitor)
+        self.event.register_user(visitor)
+        self.assertEqual(self.confirmed_count(), 1)
+        self.event.unregister_user(visitor)
+        self.assertEqual(self.confirmed_count(), 0)
+        self.event.register_user(visitor)
+        self.assertEqual(self.confirmed_count(), 1)
+
+    def test_reconcile_command_repairs_drift(self):
+        self.event.add_registration(contact_name='ana', status='confirmed')
+        other = Event.objects.create(title='Jazz Night', start_date=timezone.now())
+        EventRegistration.objects.create(event=other, contact_name='ben', status='confirmed')
+        Event.objects.filter(pk=self.event.pk).update(confirmed_count=7)
+
+        out = StringIO()
+        call_command('reconcile_registration_counts', stdout=out)
+        self.assertIn('2 event(s)', out.getvalue())
+        self.assertEqual(self.confirmed_count(), 1)
+        self.assertEqual(Event.objects.get(pk=other.pk).confirmed_count, 1)
@@ -0,0 +1,87 @@
+from django.test import TestCase
+
+from analytics.checkpoints import commit_checkpoints, load_checkpoints
+from analytics.models import ScrapeCheckpoint
+from analytics.stub_server import CANNED_ROUTES, StubAPIServer
+from tests.test_scraper_fetch import stub_scraper
+
+
+def tweet(tweet_id, created_at='2025-01-05T08:30:00.000Z'):
+    return {'id': tweet_id, 'text': f'Langkawi trip {tweet_id}', 'created_at': created_at,
+            'public_metrics': {'like_count': 1}}
+
+
+def paged_search(query):
+    """Two pages of results, then nothing newer than since_id=13."""
+    if query.get('since_id') == '13':
+        return {'status': 200, 'json': {'meta': {'result_count': 0}}}
+    if query.get('next_token') == 'page-2':
+        return {'status': 200, 'json': {'data': [tweet('11')], 'meta': {'result_count': 1}}}
+    return {'status': 200, 'json': {
+        'data': [tweet('13', '2025-01-06T10:00:00.000Z'), tweet('12')],
+        'meta': {'newest_id': '13', 'next_token': 'page-2', 'result_count': 2},
+    }}
+
+
+class ScrapeCheckpointTests(TestCase):
+    def run_collect(self, server, max_pages):
+        posts, updates = stub_scraper(server).collect(
+            ['Langkawi'], checkpoints=load_checkpoints(), max_pages=max_pages)
+        commit_checkpoints(updates)
+        return [p['post_id'] for p in posts if p['platform'] == 'twitter']
+
+    def test_twitter_walk_parks_at_page_cap_then_resumes_and_advances(self):
+        routes = dict(CANNED_ROUTES, **{'/2/tweets/search/recent': paged_search})
+        with StubAPIServer(routes=routes) as server:
+            first = self.run_collect(server, max_pages=1)
+            parked = ScrapeCheckpoint.objects.get(platform='twitter', keyword='Langkawi')
+            self.assertEqual(first, ['13', '12'])
+            self.assertEqual(parked.paging_token, 'page-2')
+            self.assertEqual(parked.since_id, '')   # not advanced until the walk completes
+            self.assertEqual(parked.head_id, '13')
+
+            second = self.run_collect(server, max_pages=1)
+            done = ScrapeCheckpoint.objects.get(platform='twitter', keyword='Langkawi')
+            self.assertEqual(second, ['11'])
+            self.assertEqual(done.since_id, '13')
+            self.assertEqual(done.paging_token, '')
+            self.assertEqual(done.last_timestamp.isoformat(), '2025-01-06T10:00:00+00:00')
+
+            third = self.run_collect(server, max_pages=1)
+            self.assertEqual(third, [])
+            self.assertEqual(ScrapeCheckpoint.objects.get(platform='twitter').since_id, '13')
+
+        queries = [q for path, q in server.requests if path == '/2/tweets/search/recent']
+        self.assertEqual(queries[1]['next_token'], 'page-2')
+        self.assertEqual(queries[2]['since_id'], '13')
+
+    def test_instagram_walk_stops_at_last_timestamp(self):
+        with StubAPIServer() as server:
+            self.run_collect(server, max_pages=5)
+            cursor = ScrapeCheckpoint.objects.get(platform='instagram', keyword='')
+            self.assertEqual(cursor.since_id, '18000000000000001')
+
+            posts, updates = stub_scraper(server).collect(['Langkawi'], checkpoints=load_checkpoints())
+
+        self.assertFalse([p for p in posts if p['platform'] == 'instagram'])
+        self.assertEqual(updates[('instagram', '')]['last_timestamp'], cursor.last_timestamp)
+
+    def test_instagram_posts_carry_the_author_username(self):
+        def media(query):
+            post = dict(CANNED_ROUTES['/v18.0/17841400000000000/media']['json']['data'][0])
+            if 'username' in query['fields'].split(','):
+                post['username'] = 'kedah.traveller'
+            return {'status': 200, 'json': {'data': [post]}}
+
+        routes = dict(CANNED_ROUTES, **{'/v18.0/17841400000000000/media': media})
+        with StubAPIServer(routes=routes) as server:
+            posts, _ = stub_scraper(server).collect(['Langkawi'])
+
+        self.assertEqual([p['author_id'] for p in posts if p['platform'] == 'instagram'], ['kedah.traveller'])
+
+    def test_failed_walk_does_not_move_the_cursor(self):
+        routes = dict(CANNED_ROUTES, **{'/2/tweets/search/recent': {'status': 400, 'json': {}}})
+        with StubAPIServer(routes=routes) as server:
+            _, updates = stub_scraper(server).collect(['Langkawi'])
+
+        self.assertNotIn(('twitter', 'Langkawi'), updates)
@@ -0,0 +1,107 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+from django.test import SimpleTestCase
+
+from analytics.fetch import FetchError, PlatformFetcher
+from analytics.scraper import SocialMediaScraper
+from analytics.stub_server import CANNED_ROUTES, StubAPIServer
+
+
+def stub_scraper(server, **fetch_options):
+    return SocialMediaScraper(
+        twitter_api_base=server.base_url + '/2',
+        graph_api_base=server.base_url + '/v18.0',
+        twitter_bearer_token='stub-token',
+        facebook_access_token='stub-token',
+        fetch_options={'backoff': 0.01, **fetch_options},
+    )
+
+
+class AsyncScraperFetchTests(SimpleTestCase):
+    def test_search_all_platforms_fetches_twitter_and_instagram_from_stub(self):
+        with StubAPIServer() as server:
+            posts = stub_scraper(server).search_all_platforms(['Langkawi', 'Alor Setar'])
+
+        by_platform = {}
+        for post in posts:
+            by_platform.setdefault(post['platform'], []).append(post)
+
+        self.assertEqual([p['post_id'] for p in by_platform['twitter']],
+                         ['1700000000000000001', '1700000000000000002'])
+        self.assertEqual(by_platform['instagram'][0]['likes'], 210)
+        # TikTok has no key configured, so it still degrades to demo data
+        self.assertIn('tiktok', by_platform)
+
+        paths = {path for path, _ in server.requests}
+        self.assertIn('/2/tweets/search/recent', paths)
+        self.assertIn('/v18.0/17841400000000000/media', paths)
+
+    def test_retries_transient_errors_then_succeeds(self):
+        routes = dict(CANNED_ROUTES)
+        routes['/2/tweets/search/recent'] = [
+            {'status': 503, 'json': {'error': 'busy'}},
+            {'status': 429, 'json': {'error': 'slow down'}, 'headers': {'Retry-After': '0'}},
+            CANNED_ROUTES['/2/tweets/search/recent'],
+        ]
+        with StubAPIServer(routes=routes) as server:
+            posts = stub_scraper(server).search_twitter(['Langkawi'])
+
+        self.assertEqual(len(posts), 2)
+        self.assertEqual(posts[0]['post_id'], '1700000000000000001')
+        hits = [path for path, _ in server.requests if path == '/2/tweets/search/recent']
+        self.assertEqual(len(hits), 3)
+
+    def test_gives_up_after_retries_and_raises_fetch_error(self):
+        routes = {'/always-down': {'status': 502, 'json': {}}}
+
+        async def fetch(base_url):
+            fetcher = PlatformFetcher('stub', base_url, retries=2, backoff=0.01)
+            try:
+                await fetcher.get_json('/always-down')
+            finally:
+                await fetcher.aclose()
+
+        with StubAPIServer(routes=routes) as server:
+            with self.assertRaises(FetchError) as ctx:
+                asyncio.run(fetch(server.base_url))
+
+        self.assertEqual(ctx.exception.status_code, 502)
+        self.assertEqual(len(server.requests), 3)
+
+    def test_per_host_concurrency_limit_is_respected(self):
+        routes = {'/slow': {'status': 200, 'json': {'ok': True}}}
+
+        async def fetch_many(base_url):
+            fetcher = PlatformFetcher('stub', base_url, per_host_limit=2)
+            try:
+                return await asyncio.gather(*(fetcher.get_json('/slow') for _ in range(8)))
+            finally:
+                await fetcher.aclose()
+
+        with StubAPIServer(routes=routes, latency=0.05) as server:
+            results = asyncio.run(fetch_many(server.base_url))
+
+        self.assertEqual(len(results), 8)
+        self.assertLessEqual(server.max_in_flight, 2)
+        self.assertEqual(server.max_in_flight, 2)
+
+    def test_retry_after_is_capped_and_accepts_http_dates(self):
+        fetcher = PlatformFetcher('stub', 'http://stub.invalid', max_retry_after=5)
+
+        class Response:
+            def __init__(self, retry_after):
+                self.headers = {'Retry-After': retry_after}
+
+        try:
+            self.assertEqual(fetcher._retry_delay(0, Response('86400')), 5)
+            self.assertEqual(fetcher._retry_delay(0, Response('2')), 2)
+            soon = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=3), usegmt=True)
+            self.assertLessEqual(fetcher._retry_delay(0, Response(soon)), 3)
+            tomorrow = format_datetime(datetime.now(timezone.utc) + timedelta(days=1), usegmt=True)
+            self.assertEqual(fetcher._retry_delay(0, Response(tomorrow)), 5)
+            # Unparseable values fall back to exponential backoff
+            self.assertLess(fetcher._retry_delay(0, Response('soon')), 1)
+        finally:
+            asyncio.run(fetcher.aclose())
@@ -0,0 +1,91 @@
+import random
+from collections import Counter
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+
+from analytics import pipeline
+from analytics.models import Place, TermSketch
+from analytics.sketches import SpaceSaving
+
+from tests.test_collection_pipeline import FakeClassifier, FakeScraper, LandingDirMixin, raw_post
+
+
+def zipf_stream(seed, length=20000, vocabulary=2000, skew=1.1):
+    rng = random.Random(seed)
+    terms = [f'term{i}' for i in range(vocabulary)]
+    weights = [1 / (rank + 1) ** skew for rank in range(vocabulary)]
+    return rng.choices(terms, weights=weights, k=length)
+
+
+class SpaceSavingAccuracyTests(SimpleTestCase):
+    def assert_bounds(self, sketch, exact):
+        total = sum(exact.values())
+        self.assertEqual(sketch.total, total)
+        for term, true_count in exact.items():
+            count, error = sketch.estimate(term)
+            self.assertLessEqual(count - error, true_count, term)
+            self.assertGreaterEqual(count, true_count, term)
+            if true_count > total / sketch.capacity:
+                self.assertIn(term, sketch)
+
+    def test_single_stream_matches_exact_counts_within_bounds(self):
+        stream = zipf_stream(seed=1)
+        sketch = SpaceSaving(capacity=100)
+        sketch.update(stream)
+        exact = Counter(stream)
+
+        self.assertEqual(len(sketch), 100)
+        self.assert_bounds(sketch, exact)
+        top = [term for term, _, _ in sketch.top(10)]
+        self.assertEqual(top, [term for term, _ in exact.most_common(10)])
+
+    def test_merged_days_keep_the_bounds(self):
+        days = [zipf_stream(seed=day, length=5000) for day in range(7)]
+        sketches = []
+        for stream in days:
+            sketch = SpaceSaving(capacity=100)
+            sketch.update(stream)
+            sketches.append(SpaceSaving.from_dict(sketch.to_dict()))  # JSON round trip
+
+        merged = SpaceSaving.merge(sketches)
+        exact = Counter(term for stream in days for term in stream)
+
+        self.assertEqual(len(merged), 100)
+        self.assert_bounds(merged, exact)
+        top = {term for term, _, _ in merged.top(10)}
+        overlap = top & {term for term, _ in exact.most_common(10)}
+        self.assertGreaterEqual(len(overlap), 9)
+
+    def test_exact_while_under_capacity(self):
+        sketch = SpaceSaving(capacity=10)
+        sketch.update(['a', 'b', 'a', 'c', 'a', 'b'])
+        self.assertEqual(sketch.top(2), [('a', 3, 0), ('b', 2, 0)])
+        self.assertEqual(sketch.estimate('zzz'), (0, 0))
+
+
+class WordcloudTests(LandingDirMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        Place.objects.create(name='Langkawi', city='Langkawi')
+        Place.objects.create(name='Gunung Jerai', city='Gurun')
+
+    def test_wordcloud_merges_daily_city_sketches(self):
+        posts = [
+            raw_post('1', 'Langkawi cable car views'),
+            raw_post('2', 'Langkawi cable car again'),
+            raw_post('3', 'Gunung Jerai sunrise views'),
+        ]
+        pipeline.run_inline(scraper=FakeScraper(posts), classifier=FakeClassifier())
+        self.assertEqual(set(TermSketch.objects.values_list('city', flat=True)), {'Langkawi', 'Gurun'})
+
+        response = self.client.get('/api/trends/wordcloud/?limit=6').json()
+        self.assertEqual(len(response['items']), 6)
+        self.assertEqual({item['count'] for item in response['items']}, {2})
+        self.assertIn({'term': 'views', 'count': 2, 'error': 0}, response['items'])
+
+        items = self.client.get('/api/trends/wordcloud/?city=langkawi').json()['items']
+        terms = {item['term']: item['count'] for item in items}
+        self.assertEqual(terms['cable car'], 2)
+        self.assertNotIn('sunrise', terms)
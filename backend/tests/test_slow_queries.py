@@ -0,0 +1,73 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from analytics import slow_queries
+from analytics.models import Place, SlowQuery
+from users.models import User
+
+CAPTURE_ALL = {'ENABLED': True, 'THRESHOLD_MS': 0, 'EXPLAIN_SAMPLE_RATE': 0}
+
+
+class NormalizeTests(SimpleTestCase):
+    def test_literals_and_in_lists_share_a_fingerprint(self):
+        a = slow_queries.normalize('SELECT * FROM "t" WHERE "city" = \'Langkawi\' AND "id" IN (1, 2, 3) LIMIT 21')
+        b = slow_queries.normalize("SELECT *  FROM \"t\"\nWHERE \"city\" = 'Gurun' AND \"id\" IN (%s) LIMIT 5")
+        self.assertEqual(a, 'SELECT * FROM "t" WHERE "city" = ? AND "id" IN (...) LIMIT ?')
+        self.assertEqual(slow_queries.fingerprint(a), slow_queries.fingerprint(b))
+
+
+@override_settings(SLOW_QUERY_LOG=CAPTURE_ALL)
+class SlowQueryCaptureTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        Place.objects.create(name='Langkawi', city='Langkawi')
+        slow_queries.install()
+        self.addCleanup(slow_queries.uninstall)
+
+    def test_queries_are_recorded_with_view_location_and_first_explain(self):
+        self.client.get('/api/sentiment/summary/')
+        self.client.get('/api/sentiment/summary/?range=30')  # same pattern again
+        slow_queries.uninstall()
+
+        rows = SlowQuery.objects.filter(view='analytics.views_new.SentimentSummaryView.get')
+        self.assertEqual(rows.count(), 2)
+        self.assertEqual(len({row.fingerprint for row in rows}), 1)
+        self.assertTrue(all(row.location.startswith('analytics/views_new.py:') for row in rows))
+        # First occurrence is always explained, the sample rate is 0 for the rest
+        self.assertEqual(sorted(bool(row.explain) for row in rows), [False, True])
+        self.assertFalse(SlowQuery.objects.filter(sql__contains='analytics_slowquery').exists())
+
+    def test_admin_endpoint_and_command_report_top_offenders(self):
+        self.client.get('/api/sentiment/summary/')
+        slow_queries.uninstall()
+
+        client = APIClient()
+        self.assertIn(client.get('/api/admin/slow-queries/').status_code, (401, 403))
+        client.force_authenticate(User.objects.create_user(username='boss', password='x', role='admin'))
+        data = client.get('/api/admin/slow-queries/?order=count').json()
+        self.assertTrue(data['enabled'])
+        top = next(item for item in data['items'] if 'SentimentSummaryView' in ' '.join(item['views']))
+        self.assertEqual(top['count'], 1)
+        self.assertIn('analytics_socialpost', top['sql'])
+        self.assertTrue(top['explain'])
+        self.assertEqual(client.get('/api/admin/slow-queries/?order=worst').status_code, 400)
+
+        out = StringIO()
+        call_command('slow_queries', '--explain', stdout=out)
+        self.assertIn(top['fingerprint'], out.getvalue())
+
+    def test_rows_buffered_inside_a_rolled_back_block_are_not_lost(self):
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                for _ in range(60):
+                    Place.objects.filter(city='Gurun').count()
+                raise RuntimeError('rollback')
+        slow_queries.flush()  # what request_finished / task_postrun / exit do
+        slow_queries.uninstall()
+
+        self.assertEqual(SlowQuery.objects.filter(sql__contains='"city" = ?').count(), 60)
@@ -0,0 +1,73 @@
+import random
+from collections import Counter
+from datetime import datetime
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from analytics import synthetic
+from analytics.models import EntityDailyRollup, Place, SocialPost
+from events.models import Event, EventRegistration
+from vendors.models import Reservation, Review
+
+SMALL_LOAD = {'posts': 3000, 'places': 10, 'vendors': 5, 'stays': 5, 'events': 5, 'users': 40,
+              'reviews': 50, 'reservations': 50, 'registrations': 60, 'days': 60}
+
+
+class DistributionTests(SimpleTestCase):
+    def test_allocate_is_zipfian_and_sums_to_about_total(self):
+        counts = sorted((n for _, n in synthetic.allocate(random.Random(1), range(50), 10_000)), reverse=True)
+        self.assertAlmostEqual(sum(counts), 10_000, delta=50)
+        self.assertGreater(counts[0], 10 * counts[25])
+
+    def test_timestamps_follow_hours_and_stay_in_the_past(self):
+        now = timezone.make_aware(datetime(2025, 6, 15, 12, 30))
+        moments = synthetic.timestamps(random.Random(2), 20_000, 30, now)
+        self.assertTrue(all(moment <= now for moment in moments))
+        hours = Counter(timezone.localtime(moment).hour for moment in moments)
+        self.assertGreater(hours[20], 5 * hours[3])
+
+
+@override_settings(DEBUG=True)
+class GenerateSyntheticLoadCommandTests(TestCase):
+    def run_command(self, *args, **options):
+        out = StringIO()
+        call_command('generate_synthetic_load', *args, stdout=out, **options)
+        return out.getvalue()
+
+    def test_generates_counts_and_rollups_then_clears(self):
+        output = self.run_command(scale='xs', seed=3, chunk_size=700, **SMALL_LOAD)
+        self.assertIn('posts: 3,000/3,000', output)
+        self.assertEqual(SocialPost.objects.filter(post_id__startswith='synthetic-3-').count(), 3000)
+        self.assertEqual(Place.objects.count(), 10)
+        self.assertAlmostEqual(Review.objects.count(), 50, delta=5)
+        self.assertAlmostEqual(Reservation.objects.count(), 50, delta=5)
+        self.assertTrue(EventRegistration.objects.exists())
+        for event in Event.objects.all():
+            self.assertEqual(event.confirmed_count, event.registrations.filter(status='confirmed').count())
+        self.assertEqual(
+            sum(EntityDailyRollup.objects.values_list('posts', flat=True)), 3000)
+
+        # Posts per place are skewed, not uniform
+        per_place = sorted(Counter(SocialPost.objects.exclude(place=None).values_list('place_id', flat=True))
+                           .values(), reverse=True)
+        self.assertGreater(per_place[0], 3 * per_place[len(per_place) // 2])
+
+        with self.assertRaises(CommandError):
+            self.run_command(scale='xs', seed=3, **SMALL_LOAD)
+
+        self.run_command(clear=True)
+        self.assertFalse(SocialPost.objects.exists())
+        self.assertFalse(Place.objects.exists())
+        self.assertFalse(EntityDailyRollup.objects.exists())
+
+    @override_settings(DEBUG=False)
+    def test_refuses_without_debug_unless_forced(self):
+        with self.assertRaises(CommandError):
+            self.run_command(scale='xs', posts=10)
+        self.run_command('--skip-rollups', '--force', scale='xs', posts=10, users=5, registrations=5)
+        self.assertEqual(SocialPost.objects.count(), 10)
+        self.assertFalse(EntityDailyRollup.objects.exists())
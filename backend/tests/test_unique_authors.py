@@ -0,0 +1,81 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from analytics import pipeline
+from analytics.models import AuthorSketch, Place, SocialPost
+from analytics.reach import unique_authors
+from analytics.rollups import rebuild_rollups, rollup_key
+from analytics.sketches import HyperLogLog
+from vendors.models import Vendor
+
+from tests.test_collection_pipeline import POSTED_AT, FakeClassifier, FakeScraper, LandingDirMixin, raw_post
+
+User = get_user_model()
+
+
+class HyperLogLogTests(SimpleTestCase):
+    def test_estimate_is_within_three_standard_errors(self):
+        for n in (10, 1_000, 50_000):
+            hll = HyperLogLog()
+            hll.update(f'twitter:{i}' for i in range(n))
+            self.assertLessEqual(abs(hll.estimate() - n) / n, 3 * hll.relative_error, n)
+
+    def test_merge_equals_sketch_of_the_union(self):
+        a, b, union = HyperLogLog(), HyperLogLog(), HyperLogLog()
+        a.update(range(0, 6000))
+        b.update(range(4000, 10000))
+        union.update(range(0, 10000))
+
+        merged = HyperLogLog.merge([a, b])
+        self.assertEqual(merged.registers, union.registers)
+        self.assertEqual(HyperLogLog.from_bytes(merged.to_bytes()).registers, union.registers)
+
+    def test_repeated_values_are_counted_once(self):
+        hll = HyperLogLog()
+        hll.update(['twitter:1'] * 100 + ['twitter:2'] * 100)
+        self.assertEqual(round(hll.estimate()), 2)
+
+
+class UniqueAuthorsTests(LandingDirMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        Place.objects.create(name='Langkawi', city='Langkawi')
+        Place.objects.create(name='Gunung Jerai', city='Gurun')
+        self.posts = [
+            {**raw_post('1', 'Langkawi sunset cruise'), 'author_id': '101'},
+            {**raw_post('2', 'Langkawi cable car'), 'author_id': '101'},
+            {**raw_post('3', 'Langkawi night market'), 'author_id': '102'},
+            {**raw_post('4', 'Gunung Jerai hike'), 'author_id': '103'},
+            raw_post('5', 'Gunung Jerai anonymous post'),
+        ]
+        pipeline.run_inline(scraper=FakeScraper(self.posts), classifier=FakeClassifier())
+        self.day = timezone.localtime(POSTED_AT).date()
+
+    def test_pipeline_writes_one_sketch_per_entity_and_day(self):
+        self.assertEqual(sorted(AuthorSketch.objects.values_list('city', flat=True)), ['Gurun', 'Langkawi'])
+        self.assertEqual(unique_authors(self.day, self.day), (3, HyperLogLog().relative_error))
+        self.assertEqual(unique_authors(self.day, self.day, city='langkawi')[0], 2)
+
+        # Re-fetching rebuilds rather than adds
+        pipeline.run_inline(scraper=FakeScraper(self.posts), classifier=FakeClassifier())
+        self.assertEqual(AuthorSketch.objects.count(), 2)
+
+    def test_metrics_totals_returns_estimate_and_error(self):
+        response = self.client.get(f'/api/metrics/totals?date_from={self.day}&date_to={self.day}&city=langkawi')
+        data = response.json()
+        self.assertEqual((data['total_posts'], data['unique_authors']), (3, 2))
+        self.assertAlmostEqual(data['unique_authors_error'], 0.0163, places=4)
+
+    def test_city_totals_cover_the_same_entities_as_the_sketches(self):
+        owner = User.objects.create_user(username='owner', password='x', role='vendor')
+        vendor = Vendor.objects.create(name='Warung Langkawi', city='Langkawi', owner=owner, cuisines=['Malay'],
+                                       lat=6.3, lon=99.8)
+        SocialPost.objects.create(platform='twitter', post_id='v1', content='Best nasi lemak', vendor=vendor,
+                                  created_at=POSTED_AT, author_id='104')
+        rebuild_rollups([rollup_key('vendor', vendor.pk, POSTED_AT)])
+
+        data = self.client.get(f'/api/metrics/totals?date_from={self.day}&date_to={self.day}&city=langkawi').json()
+        self.assertEqual((data['total_posts'], data['unique_authors']), (4, 3))
@@ -0,0 +1,127 @@
+from datetime import date, timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from analytics.models import EntityDailyRollup, Place, PlaceVisitTier, SocialPost, VisitTierSummary
+from analytics.scoring import refresh_visit_tiers
+
+
+class VisitTierTests(TestCase):
+    def add_place(self, name, city, category, engagement, positive=2, negative=0, score=0.5):
+        place = Place.objects.create(name=name, city=city, category=category)
+        EntityDailyRollup.objects.create(
+            entity_type='place', entity_id=place.pk, date=date(2025, 1, 1), platform='twitter',
+            posts=positive + negative, likes=engagement, positive=positive, negative=negative,
+            sentiment_score_sum=score * (positive + negative),
+        )
+        return place
+
+    def setUp(self):
+        self.tower = self.add_place('Menara', 'Alor Setar', 'Landmark', 900, positive=8, negative=2)
+        self.beach = self.add_place('Pantai Cenang', 'Langkawi', 'Beach', 800)
+        self.mosque = self.add_place('Zahir Mosque', 'Alor Setar', 'Religious Site', 500)
+        self.market = self.add_place('Pekan Rabu', 'Alor Setar', 'Shopping', 100, score=-0.5)
+        self.museum = self.add_place('Royal Museum', 'Alor Setar', 'Museum', 50)
+        Place.objects.create(name='No Posts Yet', city='Alor Setar')
+
+    def test_tiers_and_scope_summaries(self):
+        self.assertEqual(refresh_visit_tiers(), 5)
+
+        tiers = dict(PlaceVisitTier.objects.values_list('place__name', 'tier'))
+        self.assertEqual(tiers, {
+            'Menara': 'most', 'Pantai Cenang': 'most', 'Zahir Mosque': 'medium',
+            'Pekan Rabu': 'least', 'Royal Museum': 'least',
+        })
+
+        overall = VisitTierSummary.objects.get(tier='least', city='', category='')
+        self.assertEqual((overall.places, overall.posts, overall.engagement), (2, 4, 150))
+        self.assertAlmostEqual(overall.avg_sentiment, 0.0)
+        city = VisitTierSummary.objects.get(tier='most', city='Alor Setar', category='')
+        self.assertEqual((city.places, city.positive, city.negative), (1, 8, 2))
+        self.assertTrue(VisitTierSummary.objects.filter(tier='most', city='Langkawi', category='Beach').exists())
+
+    def test_places_by_visit_level_reads_precomputed_tiers(self):
+        refresh_visit_tiers()
+
+        with self.assertNumQueries(2):
+            data = self.client.get('/api/analytics/places/by-visit-level/?level=most').json()
+        self.assertEqual([p['name'] for p in data['places']], ['Menara', 'Pantai Cenang'])
+        self.assertEqual(data['aggregate_stats']['total_engagement'], 1700)
+        self.assertEqual(data['places'][0]['sentiment']['positive_percentage'], 80.0)
+
+        data = self.client.get('/api/analytics/places/by-visit-level/?level=most&city=alor-setar').json()
+        self.assertEqual([p['id'] for p in data['places']], [self.tower.pk])
+        self.assertNotIn('is_demo_data', data)
+
+        # Tiers are cut within the scope: the only museum is the most visited museum
+        data = self.client.get('/api/analytics/places/by-visit-level/?level=most&category=museum').json()
+        self.assertEqual([p['id'] for p in data['places']], [self.museum.pk])
+
+        data = self.client.get('/api/analytics/places/by-visit-level/?city=Kulim').json()
+        self.assertTrue(data['is_demo_data'])
+
+    def test_city_tiers_match_the_per_city_percentiles_of_the_original_view(self):
+        refresh_visit_tiers()
+        # Alor Setar alone: engagement 50 / 100 / 500 / 900 -> p33 = 99.5, p67 = 504, unlike the
+        # global cut where Pekan Rabu (100) is least visited
+        expected = {'most': ['Menara'], 'medium': ['Zahir Mosque', 'Pekan Rabu'], 'least': ['Royal Museum']}
+        for level, names in expected.items():
+            for city in ('Alor Setar', 'alor-setar', 'setar'):
+                data = self.client.get(f'/api/analytics/places/by-visit-level/?level={level}&city={city}').json()
+                self.assertEqual([p['name'] for p in data['places']], names, (level, city))
+        data = self.client.get('/api/analytics/places/by-visit-level/?level=least&city=setar').json()
+        self.assertIn('≤99 engagement points', data['description'])
+        self.assertEqual(PlaceVisitTier.objects.get(place=self.market).tier, 'least')
+
+        data = self.client.get('/api/analytics/sentiment/comparison/?city=alor').json()
+        self.assertEqual(data['comparison']['least_visited']['total_places'], 1)
+
+    def test_partial_city_matching_several_cities_tiers_them_together(self):
+        self.add_place('Kuala Kedah Fort', 'Kuala Kedah', 'Historical', 300)
+        refresh_visit_tiers()
+        # "la" matches Kuala Kedah and Langkawi: 300 / 800 -> p33 = 465, p67 = 635
+        data = self.client.get('/api/analytics/places/by-visit-level/?level=least&city=la').json()
+        self.assertEqual([p['name'] for p in data['places']], ['Kuala Kedah Fort'])
+        data = self.client.get('/api/analytics/sentiment/comparison/?city=la').json()
+        self.assertEqual(data['comparison']['most_visited']['total_engagement'], 800)
+
+    def test_sentiment_comparison_reads_summaries(self):
+        refresh_visit_tiers()
+
+        with self.assertNumQueries(1):
+            data = self.client.get('/api/analytics/sentiment/comparison/').json()
+        most, least = data['comparison']['most_visited'], data['comparison']['least_visited']
+        self.assertEqual((most['total_places'], most['total_posts'], most['total_engagement']), (2, 12, 1700))
+        self.assertEqual((least['total_places'], least['average_engagement_per_place']), (2, 75.0))
+        self.assertEqual(data['methodology']['total_places_analyzed'], 5)
+
+        data = self.client.get('/api/analytics/sentiment/comparison/?city=Langkawi').json()
+        self.assertEqual(data['comparison']['least_visited']['total_places'], 0)
+
+    def test_demo_data_before_first_refresh(self):
+        data = self.client.get('/api/analytics/sentiment/comparison/').json()
+        self.assertTrue(data['is_demo_data'])
+
+
+class VisitTierBackfillTests(TestCase):
+    def test_rebuild_rollups_backfills_posts_stored_directly(self):
+        place = Place.objects.create(name='Menara', city='Alor Setar', category='Landmark')
+        for i in range(5):
+            SocialPost.objects.create(
+                platform='twitter', post_id=str(i), content='Menara Alor Setar at night', place=place,
+                created_at=timezone.now() - timedelta(days=i), likes=10, sentiment='positive',
+            )
+        self.assertTrue(self.client.get('/api/analytics/places/by-visit-level/').json()['is_demo_data'])
+
+        call_command('rebuild_rollups', '--all', '--once', stdout=StringIO())
+        data = self.client.get('/api/analytics/places/by-visit-level/').json()
+        self.assertNotIn('is_demo_data', data)
+        self.assertEqual([p['id'] for p in data['places']], [place.pk])
+
+        # --once does nothing after a completed full rebuild
+        out = StringIO()
+        call_command('rebuild_rollups', '--all', '--once', stdout=out)
+        self.assertIn('already rebuilt', out.getvalue())
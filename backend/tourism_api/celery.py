@@ -21,24 +21,45 @@ app.conf.beat_schedule = {
         'schedule': crontab(minute=0, hour='*/2'),  # Every 2 hours
     },
     
-    # ✨ NEW: Generate next recurring event instances every hour
+    # Create next months' SocialPost partitions (PostgreSQL only)
+    'maintain-social-post-partitions': {
+        'task': 'analytics.tasks.maintain_social_post_partitions',
+        'schedule': crontab(minute=30, hour=1, day_of_month=1),  # 1st of every month
+    },
+    
+    # Recompute visit tiers / hidden gems between collection runs
+    'refresh-place-scores-hourly': {
+        'task': 'analytics.tasks.refresh_place_scores',
+        'schedule': crontab(minute=15),  # Every hour at :15
+    },
+    
+    # Drop slow-query log rows past SLOW_QUERY_LOG['RETENTION_DAYS']
+    'purge-slow-queries-daily': {
+        'task': 'analytics.tasks.purge_slow_queries',
+        'schedule': crontab(minute=45, hour=2),  # Daily at 2:45am
+    },
+    
+    # Keep recurring series materialized RECURRING_EVENT_HORIZON_DAYS ahead,
+    # so /api/events/ (the public timeline) lists their upcoming instances
     'generate-recurring-events-hourly': {
         'task': 'events.tasks.generate_next_recurring_instances',
         'schedule': crontab(minute=0, hour='*/1'),  # Every hour
     },
     
-    # ✨ NEW: Clean up old recurring instances weekly
-    'cleanup-old-recurring-instances': {
-        'task': 'events.tasks.cleanup_old_recurring_instances',
-        'schedule': crontab(minute=0, hour=0, day_of_week=0),  # Every Sunday at midnight
-    },
-    
     # Alternative schedules you can use:
     # 'collect-social-media-hourly': {
     #     'task': 'analytics.tasks.collect_and_process_social_posts',
     #     'schedule': crontab(minute=0, hour='*/1'),  # Every hour
     # },
     
+    # Archive social posts past the retention horizon. Keep this off until the
+    # dashboard views read EntityDailyRollup for archived days: most of them
+    # still aggregate SocialPost, so archived days would drop to zero there.
+    # 'archive-old-social-posts': {
+    #     'task': 'analytics.tasks.archive_old_social_posts',
+    #     'schedule': crontab(minute=0, hour=3, day_of_week=1),  # Every Monday at 3am
+    # },
+    
     # 'collect-social-media-daily': {
     #     'task': 'analytics.tasks.collect_and_process_social_posts',
     #     'schedule': crontab(minute=0, hour=0),  # Daily at midnight
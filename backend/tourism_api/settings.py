@@ -75,6 +75,7 @@ if os.environ.get('CLOUDINARY_CLOUD_NAME'):
 
 # ── Middleware ────────────────────────────────────────────────────────────────
 MIDDLEWARE = [
+    "common.profiling.ProfilingMiddleware",  # no-op unless REQUEST_PROFILING_ENABLED
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -208,6 +209,25 @@ LOGGING = {
     "root": {"handlers": ["console"], "level": "INFO"},
 }
 
+# ── Request profiling ─────────────────────────────────────────────────────────
+# Sampled Server-Timing headers and slow-request log lines (common/profiling.py)
+REQUEST_PROFILING = {
+    'ENABLED': os.environ.get('REQUEST_PROFILING_ENABLED', 'False').lower() in ('true', '1', 'yes'),
+    'SAMPLE_RATE': float(os.environ.get('REQUEST_PROFILING_SAMPLE_RATE', '0.01')),
+    'THRESHOLD_MS': float(os.environ.get('REQUEST_PROFILING_THRESHOLD_MS', '500')),
+    'FORCE_HEADER': 'X-Profile',
+}
+
+# ── Slow-query log ────────────────────────────────────────────────────────────
+# Queries slower than THRESHOLD_MS are stored with a sampled EXPLAIN plan
+# (analytics/slow_queries.py; `manage.py slow_queries`, /api/admin/slow-queries)
+SLOW_QUERY_LOG = {
+    'ENABLED': os.environ.get('SLOW_QUERY_LOG_ENABLED', 'False').lower() in ('true', '1', 'yes'),
+    'THRESHOLD_MS': float(os.environ.get('SLOW_QUERY_THRESHOLD_MS', '200')),
+    'EXPLAIN_SAMPLE_RATE': float(os.environ.get('SLOW_QUERY_EXPLAIN_SAMPLE_RATE', '0.1')),
+    'RETENTION_DAYS': int(os.environ.get('SLOW_QUERY_RETENTION_DAYS', '30')),
+}
+
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 # ── Celery Configuration ─────────────────────────────────────────────────────
@@ -218,6 +238,28 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 
+# Same check as tourism_api/__init__.py: without a broker, tasks that would
+# fan out to workers run their work inline instead
+USE_CELERY = bool(os.environ.get('REDIS_URL') or os.environ.get('CELERY_BROKER_URL'))
+
+# ── Raw post landing zone ─────────────────────────────────────────────────────
+# Every fetched payload is appended here as gzip JSONL (analytics/landing.py)
+RAW_LANDING_DIR = Path(os.environ.get('RAW_LANDING_DIR', BASE_DIR / "data" / "raw_posts"))
+
+# ── SocialPost retention ──────────────────────────────────────────────────────
+# Posts older than this are moved to gzip JSONL archives (analytics/archive.py)
+# when archive_social_posts runs; their daily rollups stay in the database.
+# Not scheduled: views that aggregate SocialPost directly lose archived days
+SOCIAL_ARCHIVE_DIR = Path(os.environ.get('SOCIAL_ARCHIVE_DIR', BASE_DIR / "data" / "archive"))
+SOCIAL_POST_RETENTION_DAYS = int(os.environ.get('SOCIAL_POST_RETENTION_DAYS', 365))
+
+# ── Recurring events ──────────────────────────────────────────────────────────
+# The hourly beat task keeps each recurring series materialized this far ahead
+# for clients that list instances from /api/events/ (the events timeline);
+# calendar views expand occurrences virtually via /api/events/occurrences/.
+# 0 materializes instances only when they get registrations (events/recurrence.py)
+RECURRING_EVENT_HORIZON_DAYS = int(os.environ.get('RECURRING_EVENT_HORIZON_DAYS', 90))
+
 # ── Email Configuration (Gmail for Development) ──────────────────────────────
 EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
 EMAIL_HOST = os.environ.get('EMAIL_HOST', 'smtp.gmail.com')
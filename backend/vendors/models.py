@@ -1,6 +1,22 @@
 from django.db import models
+from django.db.models.functions import Coalesce
 from django.conf import settings
 
+
+class VendorQuerySet(models.QuerySet):
+    def with_review_stats(self):
+        """
+        Annotate avg_rating and review_count as subqueries, so they are
+        read with the vendors (no query per row) and aren't skewed by
+        joins other filters add.
+        """
+        reviews = Review.objects.filter(vendor=models.OuterRef('pk')).order_by().values('vendor')
+        return self.annotate(
+            avg_rating=models.Subquery(reviews.annotate(avg=models.Avg('rating')).values('avg')),
+            review_count=Coalesce(models.Subquery(reviews.annotate(n=models.Count('pk')).values('n')), 0),
+        )
+
+
 class Vendor(models.Model):
     # Basic Information
     name = models.CharField(max_length=200)
@@ -65,6 +81,8 @@ class Vendor(models.Model):
         help_text="Vendor user who owns this vendor profile"
     )
 
+    objects = VendorQuerySet.as_manager()
+
     class Meta:
         ordering = ["city", "name"]
         indexes = [models.Index(fields=["city"])]
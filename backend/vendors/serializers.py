@@ -2,7 +2,7 @@
 from datetime import datetime
 import base64
 import json
-from django.db.models import Avg
+from django.db.models import Avg, Count, Q
 from rest_framework import serializers
 from .models import Vendor, MenuItem, OpeningHours, Review, Promotion, Reservation
 
@@ -133,8 +133,12 @@ class VendorDetailSerializer(serializers.ModelSerializer):
         return PromotionSerializer(promotions, many=True).data
 
     def get_rating_summary(self, obj):
-        reviews = obj.reviews.all()
-        if not reviews:
+        stats = obj.reviews.aggregate(
+            total=Count('id'),
+            average=Avg('rating'),
+            **{str(i): Count('id', filter=Q(rating=i)) for i in range(1, 6)}
+        )
+        if not stats['total']:
             return {
                 'average_rating': 0,
                 'total_reviews': 0,
@@ -143,17 +147,10 @@ class VendorDetailSerializer(serializers.ModelSerializer):
                 }
             }
         
-        total = reviews.count()
-        avg_rating = reviews.aggregate(Avg('rating'))['rating__avg']
-        distribution = {
-            str(i): reviews.filter(rating=i).count()
-            for i in range(1, 6)
-        }
-        
         return {
-            'average_rating': round(avg_rating, 1),
-            'total_reviews': total,
-            'rating_distribution': distribution
+            'average_rating': round(stats['average'], 1),
+            'total_reviews': stats['total'],
+            'rating_distribution': {str(i): stats[str(i)] for i in range(1, 6)}
         }
 
 
@@ -179,16 +176,16 @@ class VendorListSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['owner', 'owner_username', 'created_at', 'updated_at']
     
-    def get_rating_average(self, obj):
-        avg = obj.reviews.aggregate(Avg('rating'))['rating__avg']
-        return round(avg, 1) if avg else 0
-    
-    def get_total_reviews(self, obj):
-        return obj.reviews.count()
+    def _review_stats(self, obj):
+        # Annotated by Vendor.objects.with_review_stats(); single vendors fall back to a query
+        if hasattr(obj, 'review_count') and hasattr(obj, 'avg_rating'):
+            return obj.avg_rating, obj.review_count
+        stats = obj.reviews.aggregate(avg=Avg('rating'), count=Count('id'))
+        return stats['avg'], stats['count']
     
     def get_rating_average(self, obj):
-        avg = obj.reviews.aggregate(Avg('rating'))['rating__avg']
+        avg, _ = self._review_stats(obj)
         return round(avg, 1) if avg else 0
     
     def get_total_reviews(self, obj):
-        return obj.reviews.count()
+        return self._review_stats(obj)[1]
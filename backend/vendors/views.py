@@ -1,6 +1,6 @@
 # backend/vendors/views.py
 from datetime import datetime, timedelta
-from django.db.models import Q, Avg, Count, F
+from django.db.models import Q, Count, F
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
@@ -25,7 +25,7 @@ class VendorPagination(PageNumberPagination):
 
 
 class VendorViewSet(viewsets.ModelViewSet):
-    queryset = Vendor.objects.all().order_by("city", "name")
+    queryset = Vendor.objects.select_related("owner").with_review_stats().order_by("city", "name")
     permission_classes = [IsVendorOwnerOrReadOnly]
     pagination_class = VendorPagination  # Use custom pagination to show all restaurants
     
@@ -85,7 +85,7 @@ class VendorViewSet(viewsets.ModelViewSet):
         if min_rating:
             try:
                 rating = float(min_rating)
-                qs = qs.annotate(avg_rating=Avg('reviews__rating')).filter(avg_rating__gte=rating)
+                qs = qs.filter(avg_rating__gte=rating)
             except ValueError:
                 pass
         if has_promotions:
@@ -166,10 +166,8 @@ class VendorAnalyticsView(APIView):
         # Get top rated vendors
         top_rated = (
             Vendor.objects
-            .annotate(
-                avg_rating=Avg('reviews__rating'),
-                review_count=Count('reviews')
-            )
+            .select_related('owner')
+            .with_review_stats()
             .filter(review_count__gt=10)  # minimum reviews threshold
             .order_by('-avg_rating')[:10]
         )
@@ -177,13 +175,16 @@ class VendorAnalyticsView(APIView):
         # Get most reviewed vendors
         most_reviewed = (
             Vendor.objects
-            .annotate(review_count=Count('reviews'))
+            .select_related('owner')
+            .with_review_stats()
             .order_by('-review_count')[:10]
         )
         
         # Get trending vendors (most recent positive reviews)
         trending = (
             Vendor.objects
+            .select_related('owner')
+            .with_review_stats()
             .filter(
                 reviews__date__range=[start_date, end_date],
                 reviews__rating__gte=4
@@ -211,8 +212,8 @@ class VendorSearchView(APIView):
         lon = request.GET.get('lon')
         radius = float(request.GET.get('radius', 5))  # km
         
-        # Start with all vendors
-        qs = Vendor.objects.all()
+        # Start with all vendors (review stats annotated up front)
+        qs = Vendor.objects.select_related('owner').with_review_stats()
         
         # Apply filters
         if cuisine:
@@ -232,7 +233,7 @@ class VendorSearchView(APIView):
         if rating:
             try:
                 min_rating = float(rating)
-                qs = qs.annotate(avg_rating=Avg('reviews__rating')).filter(avg_rating__gte=min_rating)
+                qs = qs.filter(avg_rating__gte=min_rating)
             except ValueError:
                 pass
         
@@ -250,8 +251,6 @@ class VendorSearchView(APIView):
         
         # Annotate with useful metrics
         qs = qs.annotate(
-            avg_rating=Avg('reviews__rating'),
-            review_count=Count('reviews'),
             has_promotions=Count('promotions', filter=Q(
                 promotions__is_active=True,
                 promotions__start_date__lte=datetime.now().date(),